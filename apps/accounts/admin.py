@@ -3,7 +3,9 @@ Django admin configuration for accounts app.
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from django.utils import timezone
+
+from apps.core.admin import DeferredSignalsAdminMixin
+from . import moderation
 from .models import (
     CustomUser, CustomerProfile, SalonManagerProfile,
     StylistProfile, SiteAdminProfile
@@ -93,7 +95,7 @@ class CustomUserAdmin(BaseUserAdmin):
 
 
 @admin.register(SalonManagerProfile)
-class SalonManagerProfileAdmin(admin.ModelAdmin):
+class SalonManagerProfileAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     """
     Admin for salon manager profiles with approval actions.
     """
@@ -122,14 +124,8 @@ class SalonManagerProfileAdmin(admin.ModelAdmin):
     get_phone.short_description = 'شماره تلفن'
     
     def approve_managers(self, request, queryset):
-        """Bulk approve salon managers."""
-        updated = 0
-        for manager in queryset.filter(is_approved=False):
-            manager.is_approved = True
-            manager.approved_at = timezone.now()
-            manager.approved_by = request.user
-            manager.save()
-            updated += 1
+        """Bulk approve salon managers (one UPDATE, see apps.accounts.moderation)."""
+        updated = moderation.approve_managers(queryset, request.user)
         
         self.message_user(request, f'{updated} مدیر سالن تأیید شد')
     approve_managers.short_description = 'تأیید مدیران انتخاب شده'
@@ -25,6 +25,7 @@ from apps.accounts.models import (
 )
 from apps.salons.models import Salon, Service, WorkingHours
 from apps.appointments.models import Appointment
+from apps.core.deferred import deferred_signals
 from apps.ratings.models import Rating, Review
 
 User = get_user_model()
@@ -40,7 +41,9 @@ class Command(BaseCommand):
             help='Clear existing data before seeding',
         )
 
+    @deferred_signals()
     def handle(self, *args, **options):
+        # Caches, aggregates and leaderboards are refreshed once at the end
         if options['clear']:
             self.stdout.write('Clearing existing data...')
             User.objects.filter(is_superuser=False).delete()
@@ -266,9 +269,6 @@ class Command(BaseCommand):
                 is_approved=True
             )
             
-            # Update salon rating cache
-            salon.update_rating_cache()
-            
             self.stdout.write(f'  ✓ Rating & Review created')
 
         self.stdout.write(self.style.SUCCESS('\n✅ Database seeded successfully!'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerprofile',
+            name='selfie_photo_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='نسخه\u200cهای کوچک عکس سلفی'),
+        ),
+        migrations.AddField(
+            model_name='salonmanagerprofile',
+            name='salon_photo_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='نسخه\u200cهای کوچک عکس سالن'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_photo_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد امتیازها'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='مجموع امتیازها'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='ratings_1',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='امتیازهای ۱'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='ratings_2',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='امتیازهای ۲'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='ratings_3',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='امتیازهای ۳'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='ratings_4',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='امتیازهای ۴'),
+        ),
+        migrations.AddField(
+            model_name='stylistprofile',
+            name='ratings_5',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='امتیازهای ۵'),
+        ),
+    ]
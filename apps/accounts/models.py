@@ -11,7 +11,7 @@ This module defines:
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from apps.core.models import TimeStampedModel
+from apps.core.models import RatingAggregatesModel, TimeStampedModel
 from .validators import validate_iranian_phone
 import jdatetime
 
@@ -129,6 +129,9 @@ class CustomerProfile(TimeStampedModel):
         upload_to='customer_photos/',
         verbose_name="عکس سلفی"
     )
+    selfie_photo_derivatives = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="نسخه‌های کوچک عکس سلفی"
+    )
     
     gender = models.CharField(
         max_length=10,
@@ -208,6 +211,9 @@ class SalonManagerProfile(TimeStampedModel):
     
     salon_name = models.CharField(max_length=100, verbose_name="نام سالن")
     salon_photo = models.ImageField(upload_to='salon_photos/', verbose_name="عکس سالن")
+    salon_photo_derivatives = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="نسخه‌های کوچک عکس سالن"
+    )
     salon_address = models.TextField(verbose_name="آدرس سالن")
     
     salon_gender_type = models.CharField(
@@ -266,7 +272,7 @@ class SalonManagerProfile(TimeStampedModel):
         return f"{status} {self.salon_name} ({self.user.phone_number})"
 
 
-class StylistProfile(TimeStampedModel):
+class StylistProfile(RatingAggregatesModel, TimeStampedModel):
     """
     Profile for hairstylists who provide services.
     
@@ -351,6 +357,17 @@ class StylistProfile(TimeStampedModel):
             return f"{self.first_name} {self.last_name}"
         return f"آرایشگر - {self.user.phone_number}"
     
+    # salon_id as last loaded or saved, so moving a stylist can invalidate
+    # the salon they left too (see apps.salons.signals)
+    _saved_salon_id = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'salon_id' in instance.__dict__:
+            instance._saved_salon_id = instance.salon_id
+        return instance
+    
     @property
     def full_name(self):
         """Return full name if available."""
@@ -0,0 +1,52 @@
+"""
+Bulk user and manager moderation for site admins.
+
+Each operation is one UPDATE of the rows whose state actually changes,
+then one batched cache invalidation and one notification job for the
+people affected, rather than a save(), its signals and a message per row.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.chat.tasks import notify_moderation_on_commit
+from apps.core.deferred import deferred_signals
+from apps.core.utils import bump_cache_generation
+from apps.ratings.leaderboards import update_manager_leaderboards_on_commit, update_user_leaderboards_on_commit
+
+
+def set_users_active(users, active: bool) -> int:
+    """
+    Activate (or deactivate) the users of a queryset; returns how many changed.
+
+    Inactive users are rejected at authentication; the only cached state
+    that depends on is_active is the stylist leaderboards, which are
+    rescored for these users in one job after commit.
+    """
+    with transaction.atomic():
+        ids = list(users.exclude(is_active=active).values_list('pk', flat=True))
+        if not ids:
+            return 0
+        updated = users.model.objects.filter(pk__in=ids).exclude(is_active=active).update(
+            is_active=active, updated_at=timezone.now()
+        )
+        update_user_leaderboards_on_commit(ids)
+        notify_moderation_on_commit('users_activated' if active else 'users_deactivated', ids)
+    return updated
+
+
+def approve_managers(managers, admin_user) -> int:
+    """Approve the pending managers of a queryset; returns how many were approved."""
+    with deferred_signals():
+        with transaction.atomic():
+            ids = list(managers.filter(is_approved=False).values_list('pk', flat=True))
+            if not ids:
+                return 0
+            now = timezone.now()
+            updated = managers.model.objects.filter(pk__in=ids, is_approved=False).update(
+                is_approved=True, approved_at=now, approved_by=admin_user, updated_at=now
+            )
+            # Their salons enter the listings and the leaderboards
+            bump_cache_generation('salon_catalog')
+            update_manager_leaderboards_on_commit(ids)
+            notify_moderation_on_commit('managers_approved', ids)
+    return updated
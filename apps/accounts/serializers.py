@@ -4,18 +4,20 @@ REST Framework serializers for user authentication and profiles.
 from rest_framework import serializers
 from .models import CustomUser, CustomerProfile, SalonManagerProfile, StylistProfile, SiteAdminProfile
 from .validators import validate_iranian_phone
+from apps.core.serializers import ImageDerivativesField
 
 
 class CustomerProfileSerializer(serializers.ModelSerializer):
     """Serializer for customer profiles."""
     jalali_date_of_birth = serializers.ReadOnlyField()
     full_name = serializers.ReadOnlyField()
+    selfie_photo_sizes = ImageDerivativesField(source='selfie_photo_derivatives')
     
     class Meta:
         model = CustomerProfile
         fields = [
             'id', 'first_name', 'last_name', 'full_name',
-            'selfie_photo', 'gender', 'date_of_birth',
+            'selfie_photo', 'selfie_photo_sizes', 'gender', 'date_of_birth',
             'jalali_date_of_birth', 'telegram_chat_id', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
@@ -23,11 +25,12 @@ class CustomerProfileSerializer(serializers.ModelSerializer):
 
 class SalonManagerProfileSerializer(serializers.ModelSerializer):
     """Serializer for salon manager profiles."""
+    salon_photo_sizes = ImageDerivativesField(source='salon_photo_derivatives')
     
     class Meta:
         model = SalonManagerProfile
         fields = [
-            'id', 'salon_name', 'salon_photo', 'salon_address',
+            'id', 'salon_name', 'salon_photo', 'salon_photo_sizes', 'salon_address',
             'salon_gender_type', 'telegram_chat_id', 'is_approved', 'approved_at',
             'created_at', 'updated_at'
         ]
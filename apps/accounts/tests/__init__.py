@@ -0,0 +1 @@
+# Test package for accounts app
@@ -0,0 +1,116 @@
+"""
+Tests for the bulk user and manager moderation endpoints.
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework.test import APIClient
+
+from apps.accounts.models import SalonManagerProfile
+from apps.chat.tasks import moderation_chat_ids
+from apps.core.utils import get_cache_generation
+from apps.ratings.leaderboards import AUDIENCES, board_key, top
+from apps.ratings.models import Rating
+from apps.core.tests.factories import FixturesMixin, next_phone
+
+User = get_user_model()
+
+DELAY = 'apps.chat.tasks.send_moderation_notifications.delay'
+
+
+class BulkUserModerationTestCase(FixturesMixin, TestCase):
+    """Test set-based user and manager updates, batched invalidation and one notification job."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(phone_number=next_phone(), password='x', user_type='site_admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.salon = self.make_salon()
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.customer.telegram_chat_id = '1001'
+        self.customer.save()
+        self.day = date(2026, 1, 1)
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), data, format='json')
+
+    def test_site_admin_only(self):
+        self.client.force_authenticate(self.customer.user)
+
+        response = self.post('accounts:api_admin_users_bulk', {'action': 'deactivate', 'ids': [self.admin.id]})
+
+        self.assertEqual(response.status_code, 403)
+        self.admin.refresh_from_db()
+        self.assertTrue(self.admin.is_active)
+
+    def test_deactivate_users_by_filter(self):
+        others = [self.make_customer() for _ in range(3)]
+
+        with mock.patch(DELAY) as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.post('accounts:api_admin_users_bulk', {
+                'action': 'deactivate', 'filter': {'user_type': 'customer'},
+            })
+
+        self.assertEqual(response.data['updated'], 4)
+        self.assertFalse(User.objects.filter(user_type='customer', is_active=True).exists())
+        self.admin.refresh_from_db()
+        self.assertTrue(self.admin.is_active)
+        event, ids = delay.call_args.args
+        self.assertEqual(sorted(ids), sorted([self.customer.user_id] + [other.user_id for other in others]))
+        self.assertEqual(moderation_chat_ids(event, ids), {'1001'})
+
+        response = self.post('accounts:api_admin_users_bulk', {'action': 'activate', 'ids': ids[:2]})
+        self.assertEqual(response.data['updated'], 2)
+
+    def test_deactivated_stylists_leave_leaderboards(self):
+        get_redis_connection('default').delete(*[board_key('stylists', gender) for gender in AUDIENCES])
+        stylist = self.make_stylist(self.salon)
+        appointment = self.book(self.customer, stylist, self.service, self.day, time(10, 0), status='completed')
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, rating=5)
+        self.assertEqual([pk for pk, _ in top('stylists')], [stylist.id])
+
+        with mock.patch(DELAY), self.captureOnCommitCallbacks(execute=True):
+            self.post('accounts:api_admin_users_bulk', {'action': 'deactivate', 'ids': [stylist.user_id]})
+        self.assertEqual(top('stylists'), [])
+        self.assertEqual(top('stylists', self.salon.gender_type), [])
+        self.assertEqual(self.client.get(reverse('salons:api_salon_top')).data['stylists'], [])
+
+        with mock.patch(DELAY), self.captureOnCommitCallbacks(execute=True):
+            self.post('accounts:api_admin_users_bulk', {'action': 'activate', 'ids': [stylist.user_id]})
+        self.assertEqual([pk for pk, _ in top('stylists')], [stylist.id])
+
+    def test_approve_managers(self):
+        get_redis_connection('default').delete(*[board_key('salons', gender) for gender in AUDIENCES])
+        salons = [self.make_salon() for _ in range(2)]
+        for salon in salons:
+            stylist = self.make_stylist(salon)
+            self.day += timedelta(days=1)
+            appointment = self.book(self.customer, stylist, self.make_service(salon), self.day, time(10, 0),
+                                    status='completed')
+            with self.captureOnCommitCallbacks(execute=True):
+                Rating.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, rating=5)
+        SalonManagerProfile.objects.filter(salons__in=salons).update(is_approved=False)
+        get_redis_connection('default').delete(*[board_key('salons', gender) for gender in AUDIENCES])
+        catalog = get_cache_generation('salon_catalog')
+
+        with mock.patch(DELAY) as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.post('accounts:api_admin_approve_managers', {
+                'ids': [salon.manager_id for salon in salons] + [self.salon.manager_id],
+            })
+
+        self.assertEqual(response.data['updated'], 2)
+        manager = SalonManagerProfile.objects.get(pk=salons[0].manager_id)
+        self.assertTrue(manager.is_approved)
+        self.assertEqual(manager.approved_by, self.admin)
+        self.assertIsNotNone(manager.approved_at)
+        self.assertGreater(get_cache_generation('salon_catalog'), catalog)
+        self.assertEqual(sorted(pk for pk, _ in top('salons')), sorted(salon.id for salon in salons))
+        event, ids = delay.call_args.args
+        self.assertEqual(event, 'managers_approved')
+        self.assertEqual(sorted(ids), sorted(salon.manager_id for salon in salons))
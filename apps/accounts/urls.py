@@ -32,8 +32,11 @@ urlpatterns = [
     path('api/approve-manager/<int:manager_id>/', views.api_approve_manager, name='api_approve_manager'),
     path('api/pending-managers/', views.api_pending_managers, name='api_pending_managers'),
     path('api/admin/stats/', views.api_admin_stats, name='api_admin_stats'),
+    path('api/admin/cache-stats/', views.api_admin_cache_stats, name='api_admin_cache_stats'),
     path('api/admin/users/', views.api_admin_users, name='api_admin_users'),
+    path('api/admin/users/bulk/', views.api_admin_users_bulk, name='api_admin_users_bulk'),
     path('api/admin/users/<int:user_id>/', views.api_admin_user_detail, name='api_admin_user_detail'),
+    path('api/admin/managers/approve/', views.api_admin_approve_managers, name='api_admin_approve_managers'),
     path('api/me/', views.api_current_user, name='api_current_user'),
     
     # Profile update endpoints
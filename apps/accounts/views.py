@@ -14,7 +14,10 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from apps.core.bulk import BulkSelectionError, select_targets
+from apps.core.caching import cache_stats
 from .models import CustomUser, SalonManagerProfile, StylistProfile
+from .moderation import approve_managers, set_users_active
 from .forms import (
     CustomerRegistrationForm, SalonManagerRegistrationForm,
     LoginForm, StylistProfileCompletionForm
@@ -25,6 +28,19 @@ from .serializers import (
 )
 from .permissions import IsSalonManager, IsStylist, IsSiteAdmin
 
+# Filter names accepted by the bulk admin endpoints
+USER_BULK_FILTERS = {
+    'user_type': 'user_type',
+    'is_active': 'is_active',
+    'joined_after': 'date_joined__gte',
+    'joined_before': 'date_joined__lt',
+}
+MANAGER_BULK_FILTERS = {
+    'salon_gender_type': 'salon_gender_type',
+    'created_after': 'created_at__gte',
+    'created_before': 'created_at__lt',
+}
+
 
 # ============================================================================
 # Template-based Views (MPA)
@@ -317,6 +333,27 @@ def api_approve_manager(request, manager_id):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([IsSiteAdmin])
+def api_admin_approve_managers(request):
+    """
+    Approve many pending salon managers at once.
+    
+    POST /accounts/api/admin/managers/approve/
+    {"ids": [...]} or {"filter": {"salon_gender_type": "female", ...}}
+    """
+    try:
+        managers = select_targets(SalonManagerProfile.objects.all(), request.data, MANAGER_BULK_FILTERS)
+    except BulkSelectionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated = approve_managers(managers, request.user)
+    return Response({
+        'message': f'{updated} مدیر سالن تأیید شد',
+        'updated': updated,
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsSiteAdmin])
 def api_pending_managers(request):
@@ -458,6 +495,19 @@ def api_admin_stats(request):
     return Response(stats, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsSiteAdmin])
+def api_admin_cache_stats(request):
+    """
+    Hit/miss/recompute counters of the stampede-safe caches, for monitoring.
+    
+    Returns {name: {event: count}} summed over all processes; see
+    apps.core.caching and apps.core.local_cache ('local:' names) for
+    the events.
+    """
+    return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsSiteAdmin])
 def api_admin_users(request):
@@ -503,3 +553,29 @@ def api_admin_user_detail(request, user_id):
     elif request.method == 'DELETE':
         user.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@permission_classes([IsSiteAdmin])
+def api_admin_users_bulk(request):
+    """
+    Activate or deactivate many users at once.
+    
+    POST /accounts/api/admin/users/bulk/
+    {"action": "activate" | "deactivate", "ids": [...]} or
+    {"action": ..., "filter": {"user_type": "customer", "joined_before": "2025-01-01", ...}}
+    The requesting admin is never deactivated.
+    """
+    action = request.data.get('action')
+    if action not in ('activate', 'deactivate'):
+        return Response({'error': 'عملیات باید activate یا deactivate باشد'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        users = select_targets(CustomUser.objects.exclude(pk=request.user.pk), request.data, USER_BULK_FILTERS)
+    except BulkSelectionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated = set_users_active(users, action == 'activate')
+    return Response({
+        'message': f'{updated} کاربر {"فعال" if action == "activate" else "غیرفعال"} شد',
+        'updated': updated,
+    }, status=status.HTTP_200_OK)
@@ -2,7 +2,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Appointment
+from .models import Appointment, Visit
+
+
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
     list_display = [
@@ -15,7 +17,7 @@ class AppointmentAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('اطلاعات نوبت', {
-            'fields': ('customer', 'stylist', 'service', 'appointment_date', 'jalali_date', 'appointment_time', 'status')
+            'fields': ('customer', 'stylist', 'service', 'visit', 'appointment_date', 'jalali_date', 'appointment_time', 'status')
         }),
         ('یادداشت‌ها', {
             'fields': ('customer_notes', 'admin_notes')
@@ -28,3 +30,20 @@ class AppointmentAdmin(admin.ModelAdmin):
         }),
     )
 
+
+class VisitAppointmentInline(admin.TabularInline):
+    """Inline admin for the appointments of a visit."""
+    model = Appointment
+    extra = 0
+    fields = ['stylist', 'service', 'appointment_time', 'status']
+    readonly_fields = ['stylist', 'service', 'appointment_time']
+    can_delete = False
+
+
+@admin.register(Visit)
+class VisitAdmin(admin.ModelAdmin):
+    list_display = ['customer', 'salon', 'jalali_date', 'created_at']
+    list_filter = ['visit_date', 'created_at']
+    search_fields = ['customer__first_name', 'customer__last_name', 'salon__name']
+    readonly_fields = ['jalali_date', 'created_at', 'updated_at']
+    inlines = [VisitAppointmentInline]
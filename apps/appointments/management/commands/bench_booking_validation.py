@@ -0,0 +1,107 @@
+"""
+Benchmark booking validation: queries and latency per request.
+
+Creates a throwaway salon, stylist, service and customer inside a
+transaction that is rolled back at the end, then validates the same
+booking payload repeatedly. --rtt-ms adds a fixed delay per query to
+model the network round trip to a database on another host.
+"""
+import statistics
+import time as clock
+from contextlib import nullcontext
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from apps.accounts.models import CustomerProfile, SalonManagerProfile, StylistProfile
+from apps.appointments.serializers import BookAppointmentSerializer
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.models import Salon, Service, WorkingHours
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark BookAppointmentSerializer validation (query count and p95 latency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--rtt-ms', type=float, default=0, help='Simulated database round trip per query')
+
+    def handle(self, *args, **options):
+        rtt = options['rtt_ms'] / 1000
+
+        def delay(execute, sql, params, many, context):
+            clock.sleep(rtt)
+            return execute(sql, params, many, context)
+
+        try:
+            with transaction.atomic():
+                with connection.execute_wrapper(delay) if rtt else nullcontext():
+                    self.run(options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, iterations):
+        manager_user = User.objects.create_user(phone_number='09399999001', password='x', user_type='salon_manager')
+        manager = SalonManagerProfile.objects.create(
+            user=manager_user, salon_name='بنچمارک', salon_address='تهران',
+            salon_gender_type='male', is_approved=True
+        )
+        salon = Salon.objects.create(manager=manager, name='بنچمارک', address='تهران', gender_type='male')
+        for day in range(7):
+            WorkingHours.objects.create(salon=salon, day_of_week=day, start_time=time(9, 0), end_time=time(18, 0))
+        stylist_user = User.objects.create_user(phone_number='09399999002', password='x', user_type='stylist')
+        stylist = StylistProfile.objects.create(
+            user=stylist_user, salon=salon, first_name='آرایشگر', last_name='بنچمارک', is_temporary=False
+        )
+        service = Service.objects.create(salon=salon, service_type='haircut', price=100000, duration_minutes=30)
+        customer_user = User.objects.create_user(phone_number='09399999003', password='x', user_type='customer')
+        CustomerProfile.objects.create(
+            user=customer_user, first_name='مشتری', last_name='بنچمارک',
+            gender='male', date_of_birth=date(1995, 1, 1)
+        )
+
+        request = APIRequestFactory().post('/appointments/api/book/')
+        payload = {
+            'stylist_id': stylist.id,
+            'service_id': service.id,
+            'jalali_date': gregorian_to_jalali(date.today() + timedelta(days=3)),
+            'time_slot': '10:00',
+        }
+
+        def validate():
+            # A fresh user per request, as the view would see it
+            request.user = User.objects.get(pk=customer_user.pk)
+            serializer = BookAppointmentSerializer(data=payload, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+
+        # Warm up, then count queries for a single request
+        validate()
+        with CaptureQueriesContext(connection) as queries:
+            validate()
+        # The user lookup stands in for authentication and isn't counted
+        query_count = len(queries) - 1
+
+        samples = []
+        for _ in range(iterations):
+            started = clock.perf_counter()
+            validate()
+            samples.append((clock.perf_counter() - started) * 1000)
+        samples.sort()
+
+        self.stdout.write(f"queries per validation: {query_count}")
+        self.stdout.write(
+            f"latency: mean {statistics.mean(samples):.2f} ms  "
+            f"p50 {samples[len(samples) // 2]:.2f} ms  "
+            f"p95 {samples[int(len(samples) * 0.95)]:.2f} ms  (n={iterations})"
+        )
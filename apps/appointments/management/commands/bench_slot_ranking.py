@@ -0,0 +1,111 @@
+"""
+Benchmark the cost of gap-minimizing slot ranking.
+
+Without arguments, times availability filtering with and without
+ranking on synthetic days. With --stylist-id and --jalali-date, times
+the real availability endpoint against the configured database.
+"""
+import random
+import statistics
+import time as clock
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import CustomerProfile
+from apps.appointments.scheduling import (
+    SLOT_MINUTES, free_minutes_mask, overlaps, score_slots
+)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark slot ranking overhead on the availability endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--bookings', type=int, default=12, help='Bookings per synthetic day')
+        parser.add_argument('--stylist-id', type=int, help='Time the real endpoint for this stylist')
+        parser.add_argument('--jalali-date', help='Date for the real endpoint, e.g. 1403/05/10')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['stylist_id']:
+            if not options['jalali_date']:
+                raise CommandError('--jalali-date is required with --stylist-id')
+            self.bench_endpoint(options)
+        else:
+            self.bench_synthetic(options)
+
+    def bench_synthetic(self, options):
+        rng = random.Random(options['seed'])
+        window = (9 * 60, 21 * 60)
+        durations = (30, 45, 60, 90)
+
+        days = []
+        for _ in range(100):
+            busy = []
+            for _ in range(options['bookings']):
+                start = rng.randrange(window[0], window[1] - 30, 15)
+                end = start + rng.choice(durations)
+                if not overlaps(busy, start, end):
+                    busy.append((start, end))
+            days.append(sorted(busy))
+
+        def filter_slots(busy, duration):
+            return [
+                start for start in range(window[0], window[1], SLOT_MINUTES)
+                if start + duration <= window[1] and not overlaps(busy, start, start + duration)
+            ]
+
+        def rank_slots(busy, duration):
+            starts = filter_slots(busy, duration)
+            scores = score_slots(free_minutes_mask([window], busy), starts, duration)
+            return sorted(starts, key=lambda start: (-scores[start][0], start))
+
+        baseline = self.measure(lambda i: filter_slots(days[i % len(days)], 45), options['iterations'])
+        ranked = self.measure(lambda i: rank_slots(days[i % len(days)], 45), options['iterations'])
+        self.report('filter only', baseline)
+        self.report('filter + rank', ranked)
+        self.stdout.write(
+            f"ranking overhead: {statistics.mean(ranked) - statistics.mean(baseline):.1f} µs per request"
+        )
+
+    def bench_endpoint(self, options):
+        from apps.appointments.views import get_availability
+
+        customer = CustomerProfile.objects.select_related('user').first()
+        if customer is None:
+            raise CommandError('At least one customer is needed to call the endpoint')
+
+        factory = APIRequestFactory()
+        params = {'stylist_id': options['stylist_id'], 'jalali_date': options['jalali_date']}
+
+        def call(extra):
+            request = factory.get('/appointments/api/availability/', {**params, **extra})
+            force_authenticate(request, user=customer.user)
+            response = get_availability(request)
+            if response.status_code != 200:
+                raise CommandError(f'Endpoint returned {response.status_code}: {response.data}')
+
+        iterations = max(1, options['iterations'] // 10)
+        self.report('endpoint', self.measure(lambda i: call({}), iterations))
+        self.report('endpoint rank=1', self.measure(lambda i: call({'rank': '1'}), iterations))
+
+    def measure(self, func, iterations):
+        samples = []
+        for i in range(iterations):
+            started = clock.perf_counter()
+            func(i)
+            samples.append((clock.perf_counter() - started) * 1e6)
+        return samples
+
+    def report(self, label, samples):
+        self.stdout.write(
+            f"{label:>16}: mean {statistics.mean(samples):8.1f} µs  "
+            f"p95 {percentile(samples, 0.95):8.1f} µs  (n={len(samples)})"
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+        ('appointments', '0005_appointment_cancellation_reason'),
+        ('salons', '0010_salon_stylist_assignment_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Visit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('visit_date', models.DateField(verbose_name='تاریخ مراجعه')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visits', to='accounts.customerprofile', verbose_name='مشتری')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visits', to='salons.salon', verbose_name='سالن')),
+            ],
+            options={
+                'verbose_name': 'مراجعه',
+                'verbose_name_plural': 'مراجعه\u200cها',
+                'ordering': ['-visit_date', '-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='visit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='appointments.visit', verbose_name='مراجعه'),
+        ),
+    ]
@@ -4,10 +4,50 @@ Appointment booking model with double-booking prevention.
 from django.db import models
 from apps.core.models import TimeStampedModel
 from apps.accounts.models import CustomerProfile, StylistProfile
-from apps.salons.models import Service
+from apps.salons.models import Salon, Service
 import jdatetime
 
 
+class Visit(TimeStampedModel):
+    """
+    A single salon visit made of several back-to-back appointments.
+    
+    Each part is a regular Appointment (one service, one stylist), so
+    double-booking protection and stylist calendars work unchanged.
+    """
+    customer = models.ForeignKey(
+        CustomerProfile,
+        on_delete=models.CASCADE,
+        related_name='visits',
+        verbose_name="مشتری"
+    )
+    
+    salon = models.ForeignKey(
+        Salon,
+        on_delete=models.CASCADE,
+        related_name='visits',
+        verbose_name="سالن"
+    )
+    
+    visit_date = models.DateField(verbose_name="تاریخ مراجعه")
+    
+    class Meta:
+        verbose_name = "مراجعه"
+        verbose_name_plural = "مراجعه‌ها"
+        ordering = ['-visit_date', '-created_at']
+    
+    def __str__(self):
+        return f"{self.customer.full_name} - {self.salon.name} ({self.jalali_date})"
+    
+    @property
+    def jalali_date(self):
+        """Convert visit date to Jalali (Persian) calendar."""
+        if self.visit_date:
+            jdate = jdatetime.date.fromgregorian(date=self.visit_date)
+            return jdate.strftime('%Y/%m/%d')
+        return None
+
+
 class Appointment(TimeStampedModel):
     """
     Appointment model for booking services.
@@ -43,6 +83,16 @@ class Appointment(TimeStampedModel):
         verbose_name="خدمت"
     )
     
+    # Set when the appointment is one part of a multi-service visit
+    visit = models.ForeignKey(
+        Visit,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='appointments',
+        verbose_name="مراجعه"
+    )
+    
     # Appointment date and time (stored in UTC)
     appointment_date = models.DateField(verbose_name="تاریخ نوبت")
     appointment_time = models.TimeField(verbose_name="ساعت نوبت")
@@ -93,6 +143,17 @@ class Appointment(TimeStampedModel):
     def __str__(self):
         return f"{self.customer.full_name} - {self.stylist.full_name} ({self.jalali_date})"
     
+    # Status of the row as last loaded or saved; the pre_save handler
+    # compares against it instead of reading the row again
+    _stored_status = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in instance.__dict__:
+            instance._stored_status = instance.status
+        return instance
+    
     @property
     def jalali_date(self):
         """Convert appointment date to Jalali (Persian) calendar."""
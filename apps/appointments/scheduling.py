@@ -0,0 +1,750 @@
+"""
+Interval-based scheduling engine for appointments.
+
+Times of day are handled as minutes since midnight so that overlap
+checks are plain integer comparisons. An appointment occupies the
+half-open interval [start, start + service duration).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+
+from apps.accounts.models import StylistProfile
+from apps.salons.models import SalonResource, ScheduleException, Service
+from apps.salons.schedules import get_salon_schedule, stylist_windows
+from .models import Appointment, Visit
+
+# Statuses that occupy a stylist's time
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+# Granularity of bookable start times
+SLOT_MINUTES = 30
+
+MINUTES_PER_DAY = 24 * 60
+
+# Bounds for multi-service visit search
+VISIT_MAX_SERVICES = 5
+VISIT_MAX_STYLISTS_PER_SERVICE = 8
+
+Interval = Tuple[int, int]
+
+# Badges for slots ranked by how well they pack a stylist's day
+SLOT_BADGE_EXACT_FIT = 'exact_fit'
+SLOT_BADGE_ADJACENT = 'adjacent'
+SLOT_BADGE_LEAVES_GAP = 'leaves_gap'
+
+
+class SlotUnavailable(Exception):
+    """Raised when a requested slot cannot be booked."""
+
+
+class NoAvailableStylist(SlotUnavailable):
+    """Raised when no eligible stylist is free for the requested slot."""
+
+
+class ResourceTimeline:
+    """
+    Per-minute occupancy of a salon's shared resources on one day.
+
+    Built once per day from a single query, then every slot check is
+    an in-memory scan of the affected minutes.
+    """
+
+    def __init__(self, capacities: Dict[int, int]):
+        self.capacities = capacities
+        self.usage = {resource_id: [0] * MINUTES_PER_DAY for resource_id in capacities}
+
+    def add(self, resource_ids: Iterable[int], start: int, end: int) -> None:
+        """Record one unit of each resource as used during [start, end)."""
+        for resource_id in resource_ids:
+            usage = self.usage.get(resource_id)
+            if usage is None:
+                continue
+            for minute in range(start, min(end, MINUTES_PER_DAY)):
+                usage[minute] += 1
+
+    def fits(self, resource_ids: Iterable[int], start: int, end: int) -> bool:
+        """Check that one more unit of each resource is free during [start, end)."""
+        for resource_id in resource_ids:
+            usage = self.usage.get(resource_id)
+            if usage is None:
+                # Inactive resources don't constrain bookings
+                continue
+            if start < end and max(usage[start:end]) >= self.capacities[resource_id]:
+                return False
+        return True
+
+
+@dataclass
+class ChainPart:
+    """One service of a visit, placed on a stylist's calendar."""
+    service: object
+    stylist_id: int
+    start: int
+    end: int
+
+
+def time_to_minutes(value: time) -> int:
+    """Convert a time of day to minutes since midnight."""
+    return value.hour * 60 + value.minute
+
+
+def minutes_to_time(minutes: int) -> time:
+    """Convert minutes since midnight to a time of day."""
+    return time(minutes // 60, minutes % 60)
+
+
+def persian_weekday(gregorian_date: date) -> int:
+    """
+    Get day of week in the Persian calendar (0=Saturday, 6=Friday).
+
+    Python's weekday() starts at Monday, the Persian week at Saturday.
+    """
+    return (gregorian_date.weekday() + 2) % 7
+
+
+def overlaps(intervals: Iterable[Interval], start: int, end: int) -> bool:
+    """Check whether [start, end) intersects any of the given intervals."""
+    return any(busy_start < end and start < busy_end for busy_start, busy_end in intervals)
+
+
+def interval_mask(start: int, end: int) -> int:
+    """Bitmask with one bit set per minute of [start, end)."""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def free_minutes_mask(windows: Iterable[Interval], busy: Iterable[Interval]) -> int:
+    """
+    Bitmask of the free minutes of a stylist's day.
+
+    The whole day is a single integer (bit i = minute i), so gap lookups
+    below are a handful of word-level operations instead of a scan.
+    Breaks between working windows count as taken.
+    """
+    mask = 0
+    for window in windows:
+        mask |= interval_mask(*window)
+    for start, end in busy:
+        mask &= ~interval_mask(start, end)
+    return mask
+
+
+def score_slots(free_mask: int, starts: Iterable[int], duration: int,
+                min_gap: int = SLOT_MINUTES) -> Dict[int, Tuple[int, Optional[str]]]:
+    """
+    Score candidate starts by how tightly they pack the stylist's day.
+
+    A slot gains a point for each side that touches an existing booking
+    or the edge of the working window, and loses a point for each side
+    that strands a free gap shorter than min_gap (too short to sell).
+
+    Args:
+        free_mask: Free minutes, as returned by free_minutes_mask
+        starts: Candidate start minutes (assumed free for the duration)
+        duration: Length of the service being booked
+        min_gap: Shortest gap that can still be booked
+
+    Returns:
+        Mapping of start to (score, badge); badge may be None
+    """
+    # Occupied minutes, with a sentinel bit closing the day
+    taken = ~free_mask & ((1 << (MINUTES_PER_DAY + 1)) - 1)
+    scores = {}
+    for start in starts:
+        end = start + duration
+        # Free run before the slot ends at the highest taken bit below start
+        left = start - (taken & ((1 << start) - 1)).bit_length()
+        # Free run after the slot ends at the lowest taken bit from end
+        above = taken >> end
+        right = (above & -above).bit_length() - 1
+
+        touching = (left == 0) + (right == 0)
+        stranded = (0 < left < min_gap) + (0 < right < min_gap)
+        if stranded:
+            badge = SLOT_BADGE_LEAVES_GAP
+        elif touching == 2:
+            badge = SLOT_BADGE_EXACT_FIT
+        elif touching == 1:
+            badge = SLOT_BADGE_ADJACENT
+        else:
+            badge = None
+        scores[start] = (touching - stranded, badge)
+    return scores
+
+
+def load_booking_context(stylist_id: int, service_id: int) -> Optional[Tuple[StylistProfile, Service]]:
+    """
+    Fetch a stylist with salon and manager, and one of the salon's services, in one query.
+
+    The service columns ride along as annotations on the stylist row and
+    are turned back into a Service instance, so nothing is lazily loaded
+    while validating or rendering the booking.
+
+    Returns:
+        (stylist, service), or None if either is missing or the service
+        belongs to another salon
+    """
+    service_fields = [field.attname for field in Service._meta.concrete_fields]
+    rows = StylistProfile.objects.select_related('salon__manager').filter(
+        pk=stylist_id,
+        salon__services__pk=service_id
+    ).annotate(**{
+        f'service_{name}': F(f'salon__services__{name}') for name in service_fields
+    })
+    stylist = next(iter(rows), None)
+    if stylist is None:
+        return None
+
+    service = Service.from_db(
+        Service.objects.db, service_fields,
+        [getattr(stylist, f'service_{name}') for name in service_fields]
+    )
+    service.salon = stylist.salon
+    return stylist, service
+
+
+def check_lead_time(on_date: date, start_time: time) -> None:
+    """
+    Reject slots in the past or closer than BOOKING_MIN_LEAD_MINUTES.
+
+    Raises:
+        SlotUnavailable: if the slot starts too soon
+    """
+    lead = timedelta(minutes=getattr(settings, 'BOOKING_MIN_LEAD_MINUTES', 0))
+    starts_at = timezone.make_aware(datetime.combine(on_date, start_time))
+    if starts_at < timezone.now() + lead:
+        raise SlotUnavailable("این زمان برای رزرو گذشته یا خیلی نزدیک است")
+
+
+def earliest_start(on_date: date) -> int:
+    """
+    Earliest start on a day that passes check_lead_time, in minutes since midnight.
+
+    Returns:
+        0 for days beyond the lead time, MINUTES_PER_DAY for days within it
+    """
+    lead = timedelta(minutes=getattr(settings, 'BOOKING_MIN_LEAD_MINUTES', 0))
+    earliest = timezone.localtime(timezone.now() + lead)
+    if on_date != earliest.date():
+        return 0 if on_date > earliest.date() else MINUTES_PER_DAY
+    # Round up so the start is never inside the lead time
+    return time_to_minutes(earliest.time()) + (1 if earliest.second or earliest.microsecond else 0)
+
+
+def window_containing(windows: Iterable[Interval], start: int, end: int) -> Optional[Interval]:
+    """Return the working window that contains [start, end), if any."""
+    for window in windows:
+        if window[0] <= start and end <= window[1]:
+            return window
+    return None
+
+
+def check_slot_bounds(windows: List[Interval], start: int, duration: int) -> None:
+    """
+    Check that a slot lies on the slot grid inside one working window.
+
+    The grid starts over at the beginning of each window, so split
+    shifts keep their own slot boundaries.
+
+    Raises:
+        SlotUnavailable: if the stylist is off or the slot is off-grid
+    """
+    if not windows:
+        raise SlotUnavailable("آرایشگر در این روز کار نمی‌کند")
+    window = window_containing(windows, start, start + duration)
+    if window is None:
+        raise SlotUnavailable("این زمان خارج از ساعت کاری است")
+    if (start - window[0]) % SLOT_MINUTES:
+        raise SlotUnavailable(f"زمان نوبت باید در بازه‌های {SLOT_MINUTES} دقیقه‌ای باشد")
+
+
+def fits_slot_bounds(windows: List[Interval], start: int, duration: int) -> bool:
+    """check_slot_bounds as a predicate, for filtering candidate stylists."""
+    try:
+        check_slot_bounds(windows, start, duration)
+    except SlotUnavailable:
+        return False
+    return True
+
+
+def get_working_windows(salon, stylist_ids: Iterable[int], on_date: date) -> Dict[int, List[Interval]]:
+    """
+    Resolve the working windows of several stylists on a date.
+
+    Read from the salon's compiled weekly schedule, so this runs no
+    queries once the schedule is cached.
+
+    Returns:
+        Mapping of stylist id to sorted (start, end) windows; empty if off
+    """
+    schedule = get_salon_schedule(salon.id)
+    day = persian_weekday(on_date)
+    return {stylist_id: stylist_windows(schedule, stylist_id, day) for stylist_id in stylist_ids}
+
+
+def get_blocked_intervals(salon, stylist_ids: Iterable[int], on_date: date) -> Dict[int, List[Interval]]:
+    """
+    Load closures and time off covering a date for several stylists in one query.
+
+    Salon-level exceptions block every stylist; full-day exceptions
+    block the whole day.
+
+    Returns:
+        Mapping of stylist id to a sorted list of blocked (start, end) minutes
+    """
+    blocked = {stylist_id: [] for stylist_id in stylist_ids}
+    rows = ScheduleException.objects.filter(
+        Q(stylist_id__in=list(blocked)) | Q(salon=salon),
+        start_date__lte=on_date,
+        end_date__gte=on_date
+    ).order_by().values_list('stylist_id', 'start_time', 'end_time')
+
+    for stylist_id, start_time, end_time in rows:
+        if start_time is None:
+            interval = (0, MINUTES_PER_DAY)
+        else:
+            interval = (time_to_minutes(start_time), time_to_minutes(end_time))
+        targets = blocked.values() if stylist_id is None else [blocked[stylist_id]]
+        for intervals in targets:
+            intervals.append(interval)
+
+    for intervals in blocked.values():
+        intervals.sort()
+    return blocked
+
+
+def find_exception_conflicts(exception) -> List[Appointment]:
+    """
+    List active appointments that fall inside a closure or time off, in one query.
+    """
+    appointments = Appointment.objects.filter(
+        appointment_date__range=(exception.start_date, exception.end_date),
+        status__in=ACTIVE_STATUSES
+    ).select_related('customer', 'stylist__salon', 'service').order_by('appointment_date', 'appointment_time')
+    if exception.stylist_id:
+        appointments = appointments.filter(stylist_id=exception.stylist_id)
+    else:
+        appointments = appointments.filter(stylist__salon_id=exception.salon_id)
+
+    if exception.start_time is None:
+        return list(appointments)
+
+    start = time_to_minutes(exception.start_time)
+    end = time_to_minutes(exception.end_time)
+    return [
+        appointment for appointment in appointments
+        if time_to_minutes(appointment.appointment_time) < end
+        and start < time_to_minutes(appointment.appointment_time) + appointment.service.duration_minutes
+    ]
+
+
+def get_busy_intervals(stylist_ids: Iterable[int], on_date: date) -> Dict[int, List[Interval]]:
+    """
+    Load the occupied intervals of several stylists on a date in one query.
+
+    Returns:
+        Mapping of stylist id to a sorted list of (start, end) minutes
+    """
+    busy = {stylist_id: [] for stylist_id in stylist_ids}
+    rows = Appointment.objects.filter(
+        stylist_id__in=list(busy),
+        appointment_date=on_date,
+        status__in=ACTIVE_STATUSES
+    ).values_list('stylist_id', 'appointment_time', 'service__duration_minutes')
+
+    for stylist_id, start_time, duration in rows:
+        start = time_to_minutes(start_time)
+        busy[stylist_id].append((start, start + duration))
+
+    for intervals in busy.values():
+        intervals.sort()
+    return busy
+
+
+def find_customer_overlaps(customer, on_date: date, start: int, end: int) -> List[dict]:
+    """
+    Find the customer's own active appointments that intersect [start, end).
+
+    One query on the (customer, appointment_date) index; a customer has
+    only a handful of bookings per day, so the overlap test runs in Python.
+
+    Returns:
+        Conflicting appointments as dicts with id, salon_name, start and end
+    """
+    rows = Appointment.objects.filter(
+        customer=customer,
+        appointment_date=on_date,
+        status__in=ACTIVE_STATUSES
+    ).values_list('id', 'appointment_time', 'service__duration_minutes', 'stylist__salon__name')
+
+    conflicts = []
+    for appointment_id, start_time, duration, salon_name in rows:
+        busy_start = time_to_minutes(start_time)
+        busy_end = busy_start + duration
+        if busy_start < end and start < busy_end:
+            conflicts.append({
+                'id': appointment_id,
+                'salon_name': salon_name,
+                'start': busy_start,
+                'end': busy_end,
+            })
+    return conflicts
+
+
+def describe_customer_overlap(conflict: dict) -> str:
+    """Format a conflict from find_customer_overlaps for the customer."""
+    return (
+        f"شما در این زمان در {conflict['salon_name']} نوبت دیگری دارید "
+        f"({minutes_to_time(conflict['start']).strftime('%H:%M')} تا "
+        f"{minutes_to_time(conflict['end']).strftime('%H:%M')})"
+    )
+
+
+def get_service_resources(service_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Load the resources required by several services in one query.
+
+    Returns:
+        Mapping of service id to required resource ids
+    """
+    resources = {service_id: [] for service_id in service_ids}
+    rows = Service.required_resources.through.objects.filter(
+        service_id__in=list(resources)
+    ).values_list('service_id', 'salonresource_id')
+    for service_id, resource_id in rows:
+        resources[service_id].append(resource_id)
+    return resources
+
+
+def load_resource_timeline(salon, on_date: date) -> ResourceTimeline:
+    """
+    Build the resource occupancy of a salon on a date.
+
+    One query for the capacities and one for the day's bookings,
+    independent of how many slots are checked afterwards.
+    """
+    timeline = ResourceTimeline(dict(
+        SalonResource.objects.filter(salon=salon, is_active=True).values_list('id', 'capacity')
+    ))
+    if not timeline.capacities:
+        return timeline
+
+    rows = Appointment.objects.filter(
+        stylist__salon=salon,
+        appointment_date=on_date,
+        status__in=ACTIVE_STATUSES,
+        service__required_resources__in=list(timeline.capacities)
+    ).values_list('appointment_time', 'service__duration_minutes', 'service__required_resources')
+
+    for start_time, duration, resource_id in rows:
+        start = time_to_minutes(start_time)
+        timeline.add([resource_id], start, start + duration)
+    return timeline
+
+
+def lock_resources(resource_ids: Iterable[int]) -> None:
+    """
+    Lock resource rows (in id order, to avoid deadlocks) for the current transaction.
+
+    Bookings that share a resource serialize on it; the rest of the salon
+    stays unlocked.
+    """
+    resource_ids = sorted(set(resource_ids))
+    if resource_ids:
+        list(SalonResource.objects.select_for_update().filter(pk__in=resource_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def check_slot_resources(salon, service, on_date: date, start: int) -> None:
+    """
+    Lock the service's resources and verify capacity for a booking.
+
+    Must be called inside the booking transaction.
+
+    Raises:
+        SlotUnavailable: if a required resource is full
+    """
+    resource_ids = get_service_resources([service.id])[service.id]
+    if not resource_ids:
+        return
+    lock_resources(resource_ids)
+    timeline = load_resource_timeline(salon, on_date)
+    if not timeline.fits(resource_ids, start, start + service.duration_minutes):
+        raise SlotUnavailable("ظرفیت سالن برای این خدمت در این زمان تکمیل است")
+
+
+def rank_candidate_stylists(salon, service, on_date: date, policy: str) -> List[int]:
+    """
+    Return ids of stylists eligible for a service, best candidate first.
+
+    Policies:
+        least_booked: fewest active appointments on the requested day
+        round_robin: least recently assigned a booking
+        highest_rated: highest average rating
+    """
+    stylists = StylistProfile.objects.filter(
+        salon=salon,
+        is_temporary=False,
+        user__is_active=True
+    )
+    if service.stylist_id:
+        stylists = stylists.filter(id=service.stylist_id)
+
+    if policy == 'round_robin':
+        stylists = stylists.annotate(
+            last_assigned=Max('appointments__created_at')
+        ).order_by(F('last_assigned').asc(nulls_first=True), 'id')
+    elif policy == 'highest_rated':
+        stylists = stylists.annotate(
+            avg_rating=Avg('ratings__rating')
+        ).order_by(F('avg_rating').desc(nulls_last=True), 'id')
+    else:
+        stylists = stylists.annotate(
+            day_load=Count(
+                'appointments',
+                filter=Q(
+                    appointments__appointment_date=on_date,
+                    appointments__status__in=ACTIVE_STATUSES
+                )
+            )
+        ).order_by('day_load', 'id')
+
+    return list(stylists.values_list('id', flat=True))
+
+
+def book_with_any_stylist(customer, salon, service, on_date: date, start_time: time,
+                          policy: str, **extra_fields) -> Appointment:
+    """
+    Pick a free stylist by policy and create the appointment.
+
+    Candidates are ranked without locks. Each candidate is then locked
+    individually with SKIP LOCKED, re-checked and booked in the same
+    transaction, so concurrent requests fan out to different stylists
+    instead of serializing on the whole salon.
+
+    Only stylists for whom the start lies on the slot grid of one of
+    their working windows are considered, as on the direct booking path.
+
+    Raises:
+        SlotUnavailable: if the start time is not a whole minute
+        NoAvailableStylist: if every eligible stylist is busy or off
+    """
+    if start_time.second or start_time.microsecond:
+        raise SlotUnavailable(f"زمان نوبت باید در بازه‌های {SLOT_MINUTES} دقیقه‌ای باشد")
+    start = time_to_minutes(start_time)
+    end = start + service.duration_minutes
+
+    candidates = rank_candidate_stylists(salon, service, on_date, policy)
+    windows = get_working_windows(salon, candidates, on_date)
+    blocked = get_blocked_intervals(salon, candidates, on_date)
+    candidates = [
+        stylist_id for stylist_id in candidates
+        if fits_slot_bounds(windows[stylist_id], start, service.duration_minutes)
+        and not overlaps(blocked[stylist_id], start, end)
+    ]
+    busy = get_busy_intervals(candidates, on_date)
+
+    for stylist_id in candidates:
+        if overlaps(busy[stylist_id], start, end):
+            continue
+
+        with transaction.atomic():
+            stylist = StylistProfile.objects.select_for_update(skip_locked=True).filter(pk=stylist_id).first()
+            if stylist is None:
+                # Another request is booking this stylist right now
+                continue
+
+            # A concurrent booking may have committed since ranking
+            if overlaps(get_busy_intervals([stylist_id], on_date)[stylist_id], start, end):
+                continue
+
+            # Resources are shared by all stylists, so a full resource ends the search
+            check_slot_resources(salon, service, on_date, start)
+
+            # Spare callers a lazy load of the salon we already have
+            stylist.salon = salon
+
+            return Appointment.objects.create(
+                customer=customer,
+                stylist=stylist,
+                service=service,
+                appointment_date=on_date,
+                appointment_time=start_time,
+                **extra_fields
+            )
+
+    raise NoAvailableStylist("هیچ آرایشگری در این زمان آزاد نیست")
+
+
+def _fit_chain(services, pools, windows, busy, start: int,
+               resources=None, timeline: Optional[ResourceTimeline] = None) -> Optional[List[ChainPart]]:
+    """
+    Place services back to back from start, or return None.
+
+    Parts never overlap each other, so each one can pick its stylist
+    independently; the previous part's stylist is tried first to keep
+    the customer in the same chair.
+    """
+    parts = []
+    cursor = start
+    previous = None
+    for service, pool in zip(services, pools):
+        end = cursor + service.duration_minutes
+        if timeline is not None and not timeline.fits(resources[service.id], cursor, end):
+            return None
+        ordered = pool if previous not in pool else [previous] + [s for s in pool if s != previous]
+        for stylist_id in ordered:
+            if window_containing(windows[stylist_id], cursor, end) and not overlaps(busy[stylist_id], cursor, end):
+                break
+        else:
+            return None
+        parts.append(ChainPart(service=service, stylist_id=stylist_id, start=cursor, end=end))
+        previous = stylist_id
+        cursor = end
+    return parts
+
+
+def solve_visit_chain(salon, services: Sequence, on_date: date, not_before: int = 0) -> Optional[List[ChainPart]]:
+    """
+    Find the earliest start at which services fit back to back.
+
+    Runs a fixed number of queries regardless of salon size (four, or
+    six when the services need shared resources, plus one to compile
+    the schedule on a cold cache). The search is bounded to
+    VISIT_MAX_STYLISTS_PER_SERVICE least-loaded stylists per service
+    and the slot grid of each working window.
+
+    Args:
+        services: Services in the order they should be performed
+        not_before: Earliest acceptable start, in minutes since midnight
+
+    Returns:
+        List of parts, or None if no chain fits on that day
+    """
+    stylist_ids = list(StylistProfile.objects.filter(
+        salon=salon,
+        is_temporary=False,
+        user__is_active=True
+    ).values_list('id', flat=True))
+    windows = get_working_windows(salon, stylist_ids, on_date)
+    stylist_ids = [stylist_id for stylist_id in stylist_ids if windows[stylist_id]]
+    if not stylist_ids:
+        return None
+
+    busy = get_busy_intervals(stylist_ids, on_date)
+    load = {stylist_id: sum(end - start for start, end in busy[stylist_id]) for stylist_id in stylist_ids}
+
+    # Time off counts as busy, but not as load
+    for stylist_id, intervals in get_blocked_intervals(salon, stylist_ids, on_date).items():
+        if intervals:
+            busy[stylist_id] = sorted(busy[stylist_id] + intervals)
+
+    pools = []
+    for service in services:
+        pool = [service.stylist_id] if service.stylist_id else stylist_ids
+        pool = sorted((s for s in pool if s in load), key=lambda s: (load[s], s))
+        if not pool:
+            return None
+        pools.append(pool[:VISIT_MAX_STYLISTS_PER_SERVICE])
+
+    resources = get_service_resources({service.id for service in services})
+    timeline = None
+    if any(resources.values()):
+        timeline = load_resource_timeline(salon, on_date)
+
+    total = sum(service.duration_minutes for service in services)
+    day_end = max(windows[s][-1][1] for s in stylist_ids)
+
+    # Candidate starts lie on the slot grid of some working window
+    starts = set()
+    for window_start, _ in {window for s in stylist_ids for window in windows[s]}:
+        starts.update(range(window_start, day_end - total + 1, SLOT_MINUTES))
+
+    for start in sorted(start for start in starts if start >= not_before):
+        parts = _fit_chain(services, pools, windows, busy, start, resources, timeline)
+        if parts:
+            return parts
+    return None
+
+
+def book_visit(customer, salon, services: Sequence, on_date: date, not_before: int = 0,
+               customer_notes: str = '', attempts: int = 3,
+               warnings: Optional[List[str]] = None) -> Visit:
+    """
+    Solve and commit a multi-service visit atomically.
+
+    The chosen stylists are locked in id order (so concurrent visits
+    cannot deadlock) and re-checked before all parts are inserted. If a
+    concurrent booking took one of the slots, the chain is solved again.
+
+    Starts within BOOKING_MIN_LEAD_MINUTES of now are never offered,
+    whatever not_before says.
+    A chain overlapping the customer's own appointments is rejected, or
+    only reported when BOOKING_CUSTOMER_OVERLAP is 'warn'.
+
+    Args:
+        warnings: List that overlap warnings are appended to in warn mode
+
+    Raises:
+        NoAvailableStylist: if no chain fits on that day
+        SlotUnavailable: if the chain overlaps the customer's appointments
+    """
+    # The dashboard module imports this one
+    from apps.salons.dashboard import invalidate_dashboards_for_stylists
+
+    status = 'confirmed' if salon.auto_approve_appointments else 'pending'
+    not_before = max(not_before, earliest_start(on_date))
+
+    for _ in range(attempts):
+        parts = solve_visit_chain(salon, services, on_date, not_before)
+        if parts is None:
+            break
+
+        conflicts = find_customer_overlaps(customer, on_date, parts[0].start, parts[-1].end)
+        if conflicts:
+            message = describe_customer_overlap(conflicts[0])
+            if getattr(settings, 'BOOKING_CUSTOMER_OVERLAP', 'block') != 'warn':
+                raise SlotUnavailable(message)
+            if warnings is not None and message not in warnings:
+                warnings.append(message)
+
+        stylist_ids = sorted({part.stylist_id for part in parts})
+        with transaction.atomic():
+            list(StylistProfile.objects.select_for_update().filter(pk__in=stylist_ids).order_by('pk').values_list('pk', flat=True))
+
+            busy = get_busy_intervals(stylist_ids, on_date)
+            if any(overlaps(busy[part.stylist_id], part.start, part.end) for part in parts):
+                continue
+
+            resources = get_service_resources({part.service.id for part in parts})
+            if any(resources.values()):
+                lock_resources(resource_id for ids in resources.values() for resource_id in ids)
+                timeline = load_resource_timeline(salon, on_date)
+                if not all(timeline.fits(resources[part.service.id], part.start, part.end) for part in parts):
+                    continue
+
+            visit = Visit.objects.create(customer=customer, salon=salon, visit_date=on_date)
+            Appointment.objects.bulk_create([
+                Appointment(
+                    visit=visit,
+                    customer=customer,
+                    stylist_id=part.stylist_id,
+                    service=part.service,
+                    appointment_date=on_date,
+                    appointment_time=minutes_to_time(part.start),
+                    status=status,
+                    customer_notes=customer_notes
+                )
+                for part in parts
+            ])
+            # bulk_create sends no post_save, so refresh the dashboards here
+            transaction.on_commit(lambda: invalidate_dashboards_for_stylists(stylist_ids))
+            return visit
+
+    raise NoAvailableStylist("هیچ زمان آزادی برای این ترکیب خدمات پیدا نشد")
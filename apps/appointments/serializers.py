@@ -1,14 +1,45 @@
 """
 Serializers for appointments app with Jalali calendar support.
 """
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Appointment
+from .models import Appointment, Visit
 from apps.accounts.serializers import CustomerProfileSerializer, StylistProfileSerializer
-from apps.salons.models import Service
+from apps.salons.models import Salon, Service
 from .utils import jalali_to_gregorian, gregorian_to_jalali
+from .scheduling import (
+    SLOT_MINUTES, VISIT_MAX_SERVICES, SlotUnavailable, book_visit, book_with_any_stylist,
+    check_lead_time, check_slot_bounds, check_slot_resources, describe_customer_overlap,
+    find_customer_overlaps, get_blocked_intervals, get_busy_intervals, get_working_windows,
+    load_booking_context, overlaps, time_to_minutes
+)
 from datetime import time
 
 
+def check_customer_overlap(serializer, on_date, start_time, duration):
+    """
+    Reject (or warn about) bookings that overlap the customer's own appointments.
+    
+    Controlled by settings.BOOKING_CUSTOMER_OVERLAP ('block' or 'warn').
+    Warnings are collected on serializer.warnings for the response.
+    """
+    customer = getattr(serializer.context['request'].user, 'customer_profile', None)
+    if customer is None:
+        return
+    
+    start = time_to_minutes(start_time)
+    conflicts = find_customer_overlaps(customer, on_date, start, start + duration)
+    if not conflicts:
+        return
+    
+    message = describe_customer_overlap(conflicts[0])
+    if getattr(settings, 'BOOKING_CUSTOMER_OVERLAP', 'block') == 'warn':
+        serializer.warnings = getattr(serializer, 'warnings', []) + [message]
+    else:
+        raise serializers.ValidationError(message)
+
+
 class AppointmentSerializer(serializers.ModelSerializer):
     """Serializer for appointments with Jalali date display."""
     jalali_date = serializers.ReadOnlyField()
@@ -40,18 +71,25 @@ class BookAppointmentSerializer(serializers.Serializer):
     customer_notes = serializers.CharField(required=False, allow_blank=True)
     
     def validate(self, data):
-        """Validate and convert Jalali date to Gregorian."""
-        from apps.accounts.models import StylistProfile
-        from django.shortcuts import get_object_or_404
+        """
+        Validate the booking and convert Jalali date to Gregorian.
         
-        # Validate stylist exists
-        stylist = get_object_or_404(StylistProfile, id=data['stylist_id'])
-        data['stylist'] = stylist
+        Stylist, salon, manager and service come from one joined query;
+        the slot is checked against working hours, closures and time off,
+        the slot grid and the minimum lead time.
+        """
+        context = load_booking_context(data['stylist_id'], data['service_id'])
+        if context is None:
+            self._raise_not_found(data)
+        stylist, service = context
         
-        # Validate service exists and belongs to stylist's salon
-        service = get_object_or_404(Service, id=data['service_id'])
-        if service.salon != stylist.salon:
-            raise serializers.ValidationError("این سرویس در سالن این آرایشگر ارائه نمی‌شود")
+        if not stylist.salon.manager.is_approved:
+            raise serializers.ValidationError("این سالن هنوز تایید نشده است")
+        if not service.is_active:
+            raise serializers.ValidationError("این خدمت در حال حاضر ارائه نمی‌شود")
+        if service.stylist_id and service.stylist_id != stylist.id:
+            raise serializers.ValidationError("این خدمت توسط آرایشگر دیگری ارائه می‌شود")
+        data['stylist'] = stylist
         data['service'] = service
         
         # Convert Jalali to Gregorian
@@ -61,14 +99,38 @@ class BookAppointmentSerializer(serializers.Serializer):
         except Exception as e:
             raise serializers.ValidationError(f"تاریخ نامعتبر است: {str(e)}")
         
-        # Validate time slot format
-        data['appointment_time'] = data['time_slot']
+        start_time = data['time_slot']
+        data['appointment_time'] = start_time
+        try:
+            if start_time.second or start_time.microsecond:
+                raise SlotUnavailable(f"زمان نوبت باید در بازه‌های {SLOT_MINUTES} دقیقه‌ای باشد")
+            check_lead_time(gregorian_date, start_time)
+            start = time_to_minutes(start_time)
+            windows = get_working_windows(stylist.salon, [stylist.id], gregorian_date)[stylist.id]
+            check_slot_bounds(windows, start, service.duration_minutes)
+            blocked = get_blocked_intervals(stylist.salon, [stylist.id], gregorian_date)[stylist.id]
+            if overlaps(blocked, start, start + service.duration_minutes):
+                raise SlotUnavailable("سالن یا آرایشگر در این زمان تعطیل است")
+        except SlotUnavailable as e:
+            raise serializers.ValidationError(str(e))
+        
+        check_customer_overlap(self, gregorian_date, start_time, service.duration_minutes)
         
         return data
     
+    def _raise_not_found(self, data):
+        """Report which part of the booking is missing (failure path only)."""
+        from apps.accounts.models import StylistProfile
+        from django.shortcuts import get_object_or_404
+        
+        get_object_or_404(StylistProfile, id=data['stylist_id'])
+        get_object_or_404(Service, id=data['service_id'])
+        raise serializers.ValidationError("این سرویس در سالن این آرایشگر ارائه نمی‌شود")
+    
     def create(self, validated_data):
         """Create appointment with transaction safety."""
         from django.db import transaction
+        from apps.accounts.models import StylistProfile
         
         # Get customer from context (current user)
         customer = self.context['request'].user.customer_profile
@@ -81,8 +143,20 @@ class BookAppointmentSerializer(serializers.Serializer):
         validated_data.pop('jalali_date')
         validated_data.pop('time_slot')
         
+        on_date = validated_data['appointment_date']
+        start = time_to_minutes(validated_data['appointment_time'])
+        
         # Create with database lock to prevent double-booking
         with transaction.atomic():
+            # Serialize with other bookings targeting the same stylist
+            StylistProfile.objects.select_for_update().filter(pk=stylist.pk).exists()
+            if overlaps(get_busy_intervals([stylist.id], on_date)[stylist.id],
+                        start, start + service.duration_minutes):
+                raise serializers.ValidationError("این زمان قبلاً رزرو شده است")
+            try:
+                check_slot_resources(stylist.salon, service, on_date, start)
+            except SlotUnavailable as e:
+                raise serializers.ValidationError(str(e))
             appointment = Appointment.objects.create(
                 customer=customer,
                 stylist=stylist,
@@ -93,6 +167,156 @@ class BookAppointmentSerializer(serializers.Serializer):
         return appointment
 
 
+class BookAnyStylistSerializer(serializers.Serializer):
+    """
+    Serializer for booking without choosing a stylist.
+    
+    The server picks a free stylist using the salon's assignment policy.
+    """
+    salon_id = serializers.IntegerField()
+    service_id = serializers.IntegerField()
+    jalali_date = serializers.CharField(help_text="Format: YYYY/MM/DD (e.g., 1402/09/20)")
+    time_slot = serializers.TimeField(help_text="Format: HH:MM (e.g., 14:30)")
+    policy = serializers.ChoiceField(
+        choices=Salon.ASSIGNMENT_POLICY_CHOICES,
+        required=False,
+        help_text="Overrides the salon's default stylist assignment policy"
+    )
+    customer_notes = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, data):
+        """Validate salon and service, convert Jalali date to Gregorian."""
+        from django.shortcuts import get_object_or_404
+        
+        salon = get_object_or_404(Salon.objects.approved(), id=data['salon_id'])
+        data['salon'] = salon
+        
+        service = get_object_or_404(Service, id=data['service_id'], is_active=True)
+        if service.salon_id != salon.id:
+            raise serializers.ValidationError("این سرویس در این سالن ارائه نمی‌شود")
+        data['service'] = service
+        
+        try:
+            data['appointment_date'] = jalali_to_gregorian(data['jalali_date'])
+        except Exception as e:
+            raise serializers.ValidationError(f"تاریخ نامعتبر است: {str(e)}")
+        
+        try:
+            if data['time_slot'].second or data['time_slot'].microsecond:
+                raise SlotUnavailable(f"زمان نوبت باید در بازه‌های {SLOT_MINUTES} دقیقه‌ای باشد")
+            check_lead_time(data['appointment_date'], data['time_slot'])
+        except SlotUnavailable as e:
+            raise serializers.ValidationError(str(e))
+        
+        check_customer_overlap(self, data['appointment_date'], data['time_slot'], service.duration_minutes)
+        
+        data.setdefault('policy', salon.stylist_assignment_policy)
+        return data
+    
+    def create(self, validated_data):
+        """Pick a stylist and create the appointment atomically."""
+        customer = self.context['request'].user.customer_profile
+        
+        try:
+            return book_with_any_stylist(
+                customer=customer,
+                salon=validated_data['salon'],
+                service=validated_data['service'],
+                on_date=validated_data['appointment_date'],
+                start_time=validated_data['time_slot'],
+                policy=validated_data['policy'],
+                customer_notes=validated_data.get('customer_notes', '')
+            )
+        except SlotUnavailable as e:
+            raise serializers.ValidationError(str(e))
+
+
+class VisitSerializer(serializers.ModelSerializer):
+    """Serializer for multi-service visits with their appointments."""
+    jalali_date = serializers.ReadOnlyField()
+    salon_name = serializers.CharField(source='salon.name', read_only=True)
+    appointments = AppointmentSerializer(many=True, read_only=True)
+    total_price = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Visit
+        fields = [
+            'id', 'salon', 'salon_name', 'visit_date', 'jalali_date',
+            'total_price', 'appointments', 'created_at'
+        ]
+    
+    def get_total_price(self, obj):
+        return sum(appointment.service.price for appointment in obj.appointments.all())
+
+
+class BookVisitSerializer(serializers.Serializer):
+    """
+    Serializer for booking several services back to back in one visit.
+    
+    The server finds the earliest time on the requested day at which all
+    services fit consecutively, possibly with different stylists.
+    """
+    salon_id = serializers.IntegerField()
+    service_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=VISIT_MAX_SERVICES,
+        help_text="Services in the order they should be performed"
+    )
+    jalali_date = serializers.CharField(help_text="Format: YYYY/MM/DD (e.g., 1402/09/20)")
+    not_before = serializers.TimeField(required=False, help_text="Earliest acceptable start (HH:MM)")
+    customer_notes = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, data):
+        """Validate salon and services, convert Jalali date to Gregorian and reject past days."""
+        from django.shortcuts import get_object_or_404
+        
+        salon = get_object_or_404(Salon.objects.approved(), id=data['salon_id'])
+        data['salon'] = salon
+        
+        services = Service.objects.in_bulk(data['service_ids'])
+        if any(
+            service_id not in services or services[service_id].salon_id != salon.id or not services[service_id].is_active
+            for service_id in data['service_ids']
+        ):
+            raise serializers.ValidationError("برخی از خدمات انتخاب شده در این سالن ارائه نمی‌شوند")
+        data['services'] = [services[service_id] for service_id in data['service_ids']]
+        
+        try:
+            data['appointment_date'] = jalali_to_gregorian(data['jalali_date'])
+        except Exception as e:
+            raise serializers.ValidationError(f"تاریخ نامعتبر است: {str(e)}")
+        
+        if data['appointment_date'] < timezone.localdate():
+            raise serializers.ValidationError("این تاریخ گذشته است")
+        
+        return data
+    
+    def create(self, validated_data):
+        """
+        Solve the chain and create all appointments atomically.
+        
+        Overlap warnings (BOOKING_CUSTOMER_OVERLAP='warn') are collected on
+        self.warnings for the response.
+        """
+        customer = self.context['request'].user.customer_profile
+        not_before = validated_data.get('not_before')
+        self.warnings = []
+        
+        try:
+            return book_visit(
+                customer=customer,
+                salon=validated_data['salon'],
+                services=validated_data['services'],
+                on_date=validated_data['appointment_date'],
+                not_before=time_to_minutes(not_before) if not_before else 0,
+                customer_notes=validated_data.get('customer_notes', ''),
+                warnings=self.warnings
+            )
+        except SlotUnavailable as e:
+            raise serializers.ValidationError(str(e))
+
+
 class AvailabilityQuerySerializer(serializers.Serializer):
     """Serializer for availability query parameters."""
     stylist_id = serializers.IntegerField()
@@ -1,9 +1,11 @@
 """
-Django signals for appointment webhook delivery.
+Django signals for appointment webhook delivery and manager dashboard
+invalidation (coalesced per stylist inside deferred_signals()).
 """
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from apps.salons.dashboard import invalidate_dashboard_for_stylist
 from .models import Appointment
 
 import logging
@@ -17,16 +19,24 @@ def track_status_changes(sender, instance, **kwargs):
     Track appointment status changes to detect confirmation events.
     
     This adds a _previous_status attribute to track when status changes
-    from 'pending' to 'confirmed'.
+    from 'pending' to 'confirmed'. Instances loaded from the database
+    already know their stored status, so only hand-built ones with a pk
+    are looked up.
     """
-    if instance.pk:
-        try:
-            previous = Appointment.objects.get(pk=instance.pk)
-            instance._previous_status = previous.status
-        except Appointment.DoesNotExist:
-            instance._previous_status = None
-    else:
+    if not instance.pk:
         instance._previous_status = None
+    elif instance._stored_status is not None:
+        instance._previous_status = instance._stored_status
+    else:
+        instance._previous_status = Appointment.objects.filter(
+            pk=instance.pk
+        ).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Appointment)
+def remember_stored_status(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'status' in update_fields:
+        instance._stored_status = instance.status
 
 
 @receiver(post_save, sender=Appointment)
@@ -62,3 +72,10 @@ def schedule_webhook_on_appointment_event(sender, instance, created, **kwargs):
             lambda: __import__('apps.chat.services.notifications', fromlist=['send_appointment_confirmed_notification'])
             .send_appointment_confirmed_notification(instance)
         )
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_dashboard_on_appointment_change(sender, instance, **kwargs):
+    """Today's appointments and the pending count are on the manager dashboard."""
+    invalidate_dashboard_for_stylist(instance.stylist_id)
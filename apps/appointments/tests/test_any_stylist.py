@@ -0,0 +1,148 @@
+"""
+Tests for "any stylist" booking with policy-based stylist selection.
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment
+from apps.appointments.scheduling import (
+    NoAvailableStylist, SlotUnavailable, book_with_any_stylist, persian_weekday, rank_candidate_stylists
+)
+from apps.appointments.utils import gregorian_to_jalali
+from apps.ratings.models import Rating
+from apps.salons.models import WorkingHours
+from apps.core.tests.factories import FixturesMixin
+
+
+class AnyStylistSelectionTestCase(FixturesMixin, TestCase):
+    """Test stylist ranking and selection."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.first = self.make_stylist(self.salon)
+        self.second = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=60)
+        self.customer = self.make_customer()
+        self.day = date.today() + timedelta(days=3)
+
+    def test_least_booked_prefers_idle_stylist(self):
+        self.book(self.make_customer(), self.first, self.service, self.day, time(9, 0))
+
+        ranked = rank_candidate_stylists(self.salon, self.service, self.day, 'least_booked')
+        self.assertEqual(ranked, [self.second.id, self.first.id])
+
+    def test_highest_rated_prefers_better_stylist(self):
+        past = self.book(self.customer, self.second, self.service, self.day - timedelta(days=10),
+                         time(9, 0), status='completed')
+        Rating.objects.create(customer=self.customer, stylist=self.second, appointment=past, rating=5)
+
+        ranked = rank_candidate_stylists(self.salon, self.service, self.day, 'highest_rated')
+        self.assertEqual(ranked[0], self.second.id)
+
+    def test_round_robin_prefers_least_recently_assigned(self):
+        self.book(self.make_customer(), self.first, self.service, self.day, time(9, 0))
+        self.book(self.make_customer(), self.second, self.service, self.day, time(11, 0))
+
+        ranked = rank_candidate_stylists(self.salon, self.service, self.day, 'round_robin')
+        self.assertEqual(ranked, [self.first.id, self.second.id])
+
+    def test_temporary_stylists_are_not_eligible(self):
+        temporary = self.make_stylist(self.salon, is_temporary=True)
+
+        ranked = rank_candidate_stylists(self.salon, self.service, self.day, 'least_booked')
+        self.assertNotIn(temporary.id, ranked)
+
+    def test_skips_stylist_with_overlapping_booking(self):
+        # 09:30 overlaps the first stylist's 09:00-10:00 appointment
+        self.book(self.make_customer(), self.first, self.service, self.day, time(9, 0))
+        self.book(self.make_customer(), self.second, self.service, self.day, time(12, 0))
+
+        appointment = book_with_any_stylist(
+            self.customer, self.salon, self.service, self.day, time(9, 30), 'round_robin'
+        )
+        self.assertEqual(appointment.stylist, self.second)
+
+    def test_raises_when_everyone_is_busy(self):
+        self.book(self.make_customer(), self.first, self.service, self.day, time(9, 0))
+        self.book(self.make_customer(), self.second, self.service, self.day, time(9, 0))
+
+        with self.assertRaises(NoAvailableStylist):
+            book_with_any_stylist(self.customer, self.salon, self.service, self.day, time(9, 0), 'least_booked')
+
+    def test_raises_outside_working_hours(self):
+        with self.assertRaises(NoAvailableStylist):
+            book_with_any_stylist(self.customer, self.salon, self.service, self.day, time(17, 30), 'least_booked')
+
+
+    def test_raises_off_slot_grid(self):
+        for start_time in (time(10, 7), time(10, 0, 30)):
+            with self.subTest(start_time=start_time), self.assertRaises(SlotUnavailable):
+                book_with_any_stylist(self.customer, self.salon, self.service, self.day, start_time, 'least_booked')
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_grid_follows_each_stylists_windows(self):
+        # The second stylist's shift starts at 09:15, so 09:15 is on their grid only
+        WorkingHours.objects.create(
+            stylist=self.second, day_of_week=persian_weekday(self.day), start_time=time(9, 15), end_time=time(18, 0)
+        )
+
+        appointment = book_with_any_stylist(
+            self.customer, self.salon, self.service, self.day, time(9, 15), 'least_booked'
+        )
+
+        self.assertEqual(appointment.stylist, self.second)
+
+
+class AnyStylistBookingAPITestCase(FixturesMixin, TestCase):
+    """Test the any-stylist booking endpoint."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+        self.day = date.today() + timedelta(days=3)
+
+    def test_books_with_salon_default_policy(self):
+        response = self.client.post(reverse('appointments:api_book_any'), {
+            'salon_id': self.salon.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        appointment = Appointment.objects.get()
+        self.assertEqual(appointment.stylist, self.stylist)
+        self.assertEqual(appointment.appointment_date, self.day)
+
+    def test_rejects_service_from_other_salon(self):
+        other_service = self.make_service(self.make_salon())
+
+        response = self.client.post(reverse('appointments:api_book_any'), {
+            'salon_id': self.salon.id,
+            'service_id': other_service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_rejects_off_grid_time(self):
+        response = self.client.post(reverse('appointments:api_book_any'), {
+            'salon_id': self.salon.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:07',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Appointment.objects.exists())
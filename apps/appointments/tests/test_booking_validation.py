@@ -0,0 +1,130 @@
+"""
+Tests for direct booking validation (single joined fetch, schedule checks).
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.appointments.models import Appointment
+from apps.appointments.scheduling import load_booking_context
+from apps.appointments.serializers import BookAppointmentSerializer
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.models import WorkingHours
+from apps.salons.schedules import get_salon_schedule, invalidate_salon_schedule
+from apps.core.tests.factories import FixturesMixin
+
+
+class BookingValidationTestCase(FixturesMixin, TestCase):
+    """Test BookAppointmentSerializer validation rules."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=60)
+        self.customer = self.make_customer()
+        self.day = date.today() + timedelta(days=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+
+    def post_booking(self, time_slot='10:00', day=None, **overrides):
+        payload = {
+            'stylist_id': self.stylist.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(day or self.day),
+            'time_slot': time_slot,
+        }
+        payload.update(overrides)
+        return self.client.post(reverse('appointments:api_book'), payload, format='json')
+
+    def test_context_is_one_query(self):
+        with self.assertNumQueries(1):
+            stylist, service = load_booking_context(self.stylist.id, self.service.id)
+            # Nothing below may hit the database again
+            self.assertTrue(stylist.salon.manager.is_approved)
+            self.assertEqual(service.salon.name, self.salon.name)
+            self.assertEqual(service.duration_minutes, 60)
+
+    def test_validation_query_count(self):
+        request = APIRequestFactory().post('/')
+        request.user = self.customer.user
+        serializer = BookAppointmentSerializer(data={
+            'stylist_id': self.stylist.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:00',
+        }, context={'request': request})
+        get_salon_schedule(self.salon.id)
+
+        # Context, closures and the customer's own bookings; hours come from the cache
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_valid_booking_is_created(self):
+        response = self.post_booking()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['appointment']['salon_name'], self.salon.name)
+
+    def test_rejects_off_grid_time(self):
+        self.assertEqual(self.post_booking('10:10').status_code, 400)
+
+    def test_rejects_slot_outside_working_hours(self):
+        # Starts inside the window but a 60 minute service runs past closing
+        self.assertEqual(self.post_booking('17:30').status_code, 400)
+        self.assertEqual(self.post_booking('08:00').status_code, 400)
+
+    def test_rejects_day_off(self):
+        WorkingHours.objects.update(is_active=False)
+        invalidate_salon_schedule(self.salon.id)
+
+        self.assertEqual(self.post_booking().status_code, 400)
+
+    @override_settings(BOOKING_MIN_LEAD_MINUTES=24 * 60)
+    def test_rejects_slot_within_lead_time(self):
+        soon = timezone.localtime() + timedelta(hours=2)
+        response = self.post_booking('10:00', day=soon.date())
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_past_slot(self):
+        yesterday = date.today() - timedelta(days=1)
+
+        self.assertEqual(self.post_booking('10:00', day=yesterday).status_code, 400)
+
+    def test_rejects_inactive_service(self):
+        self.service.is_active = False
+        self.service.save()
+
+        self.assertEqual(self.post_booking().status_code, 400)
+
+    def test_rejects_unapproved_salon(self):
+        self.salon.manager.is_approved = False
+        self.salon.manager.save()
+
+        self.assertEqual(self.post_booking().status_code, 400)
+
+    def test_rejects_service_of_another_stylist(self):
+        self.service.stylist = self.make_stylist(self.salon)
+        self.service.save()
+
+        self.assertEqual(self.post_booking().status_code, 400)
+
+    def test_rejects_service_from_other_salon(self):
+        other = self.make_service(self.make_salon())
+
+        self.assertEqual(self.post_booking(service_id=other.id).status_code, 400)
+
+    def test_missing_stylist_is_not_found(self):
+        self.assertEqual(self.post_booking(stylist_id=999999).status_code, 404)
+
+    def test_rejects_overlap_with_stylist_booking(self):
+        self.book(self.make_customer(), self.stylist, self.service, self.day, time(9, 30))
+
+        response = self.post_booking('10:00')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.count(), 1)
@@ -0,0 +1,119 @@
+"""
+Tests for detecting a customer's overlapping appointments across salons.
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment, Visit
+from apps.appointments.scheduling import find_customer_overlaps
+from apps.appointments.utils import gregorian_to_jalali
+from apps.core.tests.factories import FixturesMixin
+
+
+class CustomerOverlapTestCase(FixturesMixin, TestCase):
+    """Test that customers can't double-book themselves."""
+
+    def setUp(self):
+        self.customer = self.make_customer()
+        self.day = date.today() + timedelta(days=3)
+
+        other_salon = self.make_salon()
+        self.other_stylist = self.make_stylist(other_salon)
+        self.other_service = self.make_service(other_salon, duration=60)
+
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=30)
+
+        # Existing booking 10:00-11:00 at the other salon
+        self.book(self.customer, self.other_stylist, self.other_service, self.day, time(10, 0))
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+
+    def post_booking(self, time_slot):
+        return self.client.post(reverse('appointments:api_book'), {
+            'stylist_id': self.stylist.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': time_slot,
+        }, format='json')
+
+    def test_lookup_is_one_query(self):
+        with self.assertNumQueries(1):
+            conflicts = find_customer_overlaps(self.customer, self.day, 10 * 60 + 30, 11 * 60)
+        self.assertEqual(len(conflicts), 1)
+
+    def test_overlapping_booking_is_blocked(self):
+        response = self.post_booking('10:30')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_back_to_back_booking_is_allowed(self):
+        response = self.post_booking('11:00')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('warnings', response.data)
+
+    def test_cancelled_appointments_are_ignored(self):
+        Appointment.objects.update(status='cancelled')
+
+        self.assertEqual(self.post_booking('10:30').status_code, 201)
+
+    @override_settings(BOOKING_CUSTOMER_OVERLAP='warn')
+    def test_warn_mode_books_with_warning(self):
+        response = self.post_booking('10:30')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['warnings']), 1)
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_any_stylist_booking_is_checked(self):
+        response = self.client.post(reverse('appointments:api_book_any'), {
+            'salon_id': self.salon.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '09:30',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(reverse('appointments:api_book_any'), {
+            'salon_id': self.salon.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:00',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def post_visit(self, not_before):
+        return self.client.post(reverse('appointments:api_book_visit'), {
+            'salon_id': self.salon.id,
+            'service_ids': [self.service.id, self.service.id],
+            'jalali_date': gregorian_to_jalali(self.day),
+            'not_before': not_before,
+        }, format='json')
+
+    def test_visit_booking_is_checked(self):
+        response = self.post_visit('09:30')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Visit.objects.exists())
+
+    def test_visit_after_existing_booking_is_allowed(self):
+        response = self.post_visit('11:00')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('warnings', response.data)
+
+    @override_settings(BOOKING_CUSTOMER_OVERLAP='warn')
+    def test_warn_mode_books_visit_with_warning(self):
+        response = self.post_visit('09:30')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['warnings']), 1)
+        self.assertEqual(Visit.objects.count(), 1)
@@ -0,0 +1,110 @@
+"""
+Tests for salon resource capacity (chairs, rooms) in scheduling.
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment
+from apps.appointments.scheduling import (
+    ResourceTimeline, SlotUnavailable, book_with_any_stylist,
+    load_resource_timeline, solve_visit_chain, minutes_to_time
+)
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.models import SalonResource
+from apps.core.tests.factories import FixturesMixin
+
+
+class ResourceTimelineTestCase(TestCase):
+    """Test the in-memory occupancy timeline."""
+
+    def test_capacity_is_enforced_per_minute(self):
+        timeline = ResourceTimeline({1: 2})
+        timeline.add([1], 60, 120)
+        self.assertTrue(timeline.fits([1], 90, 150))
+
+        timeline.add([1], 90, 150)
+        self.assertFalse(timeline.fits([1], 100, 110))
+        self.assertTrue(timeline.fits([1], 150, 180))
+
+    def test_unknown_resources_do_not_constrain(self):
+        self.assertTrue(ResourceTimeline({}).fits([7], 0, 60))
+
+
+class ResourceCapacityTestCase(FixturesMixin, TestCase):
+    """Test that bookings respect shared salon resources."""
+
+    def setUp(self):
+        self.salon = self.make_salon(gender='female')
+        self.open_all_week(self.salon)
+        self.first = self.make_stylist(self.salon)
+        self.second = self.make_stylist(self.salon)
+        self.room = SalonResource.objects.create(salon=self.salon, name='اتاق رنگ', capacity=1)
+        self.coloring = self.make_service(self.salon, duration=60, service_type='hair_color')
+        self.coloring.required_resources.add(self.room)
+        self.haircut = self.make_service(self.salon, duration=30)
+        self.customer = self.make_customer(gender='female')
+        self.day = date.today() + timedelta(days=3)
+
+    def test_timeline_loads_in_two_queries(self):
+        self.book(self.make_customer('female'), self.first, self.coloring, self.day, time(10, 0))
+
+        with self.assertNumQueries(2):
+            timeline = load_resource_timeline(self.salon, self.day)
+        self.assertFalse(timeline.fits([self.room.id], 10 * 60 + 30, 11 * 60 + 30))
+
+    def test_availability_hides_slots_when_room_is_taken(self):
+        self.book(self.make_customer('female'), self.first, self.coloring, self.day, time(10, 0))
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        response = client.get(reverse('appointments:api_availability'), {
+            'stylist_id': self.second.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'service_id': self.coloring.id,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        slots = response.data['available_slots']
+        self.assertIn('09:00', slots)
+        self.assertNotIn('09:30', slots)
+        self.assertNotIn('10:30', slots)
+        self.assertIn('11:00', slots)
+        # The last slot must leave room for the whole service
+        self.assertNotIn('17:30', slots)
+
+    def test_direct_booking_rejected_when_room_is_full(self):
+        self.book(self.make_customer('female'), self.first, self.coloring, self.day, time(10, 0))
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        response = client.post(reverse('appointments:api_book'), {
+            'stylist_id': self.second.id,
+            'service_id': self.coloring.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:30',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_any_stylist_respects_room(self):
+        self.book(self.make_customer('female'), self.first, self.coloring, self.day, time(10, 0))
+
+        with self.assertRaises(SlotUnavailable):
+            book_with_any_stylist(self.customer, self.salon, self.coloring, self.day, time(10, 0), 'least_booked')
+
+        # Services without resources are unaffected
+        appointment = book_with_any_stylist(
+            self.customer, self.salon, self.haircut, self.day, time(10, 0), 'least_booked'
+        )
+        self.assertEqual(appointment.stylist, self.second)
+
+    def test_visit_chain_waits_for_room(self):
+        self.book(self.make_customer('female'), self.first, self.coloring, self.day, time(9, 0))
+
+        parts = solve_visit_chain(self.salon, [self.coloring], self.day)
+
+        self.assertEqual(minutes_to_time(parts[0].start), time(10, 0))
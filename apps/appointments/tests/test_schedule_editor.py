@@ -0,0 +1,142 @@
+"""
+Tests for the bulk weekly schedule editor and cross-salon copy.
+"""
+from datetime import time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.salons.models import Salon, Service, WorkingHours
+from apps.salons.schedules import get_salon_schedule, stylist_windows, sync_working_hours
+from apps.core.tests.factories import FixturesMixin
+
+
+def week(start='09:00', end='18:00', days=range(7)):
+    return [{'day_of_week': day, 'start_time': start, 'end_time': end} for day in days]
+
+
+class WeeklyScheduleTestCase(FixturesMixin, TestCase):
+    """Test replacing a whole schedule in one request."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.salon.manager.user)
+        self.url = reverse('salons:api_manager_weekly_schedule', args=[self.salon.id])
+
+    def test_diff_keeps_matching_rows(self):
+        kept = set(WorkingHours.objects.filter(day_of_week__in=[0, 1]).values_list('id', flat=True))
+        # Days 0-1 unchanged, 2-5 shorter, 6 off
+        hours = week(days=[0, 1]) + week('10:00', '16:00', days=[2, 3, 4, 5])
+
+        response = self.client.put(self.url, {'hours': hours}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['changes'], {'created': 0, 'updated': 4, 'deleted': 1, 'unchanged': 2})
+        self.assertTrue(kept <= set(WorkingHours.objects.values_list('id', flat=True)))
+
+    def test_split_shift_adds_rows(self):
+        hours = week('09:00', '13:00') + week('14:00', '19:00')
+
+        response = self.client.put(self.url, {'hours': hours}, format='json')
+
+        self.assertEqual(response.data['changes']['created'], 7)
+        self.assertEqual(response.data['changes']['updated'], 7)
+        self.assertEqual(WorkingHours.objects.filter(salon=self.salon).count(), 14)
+
+    def test_write_is_a_fixed_number_of_queries(self):
+        hours = week('10:00', '13:00') + week('14:00', '19:00', days=[0, 1, 2])
+
+        # Fetch, bulk_create, bulk_update, and the delete's select + delete
+        with self.assertNumQueries(5):
+            sync_working_hours('salon', {self.salon.id: [
+                (row['day_of_week'], time.fromisoformat(row['start_time']),
+                 time.fromisoformat(row['end_time']), True)
+                for row in hours[:5] + hours[7:]
+            ]})
+
+    def test_cached_schedule_is_dropped_once(self):
+        get_salon_schedule(self.salon.id)
+
+        self.client.put(self.url, {'hours': week('12:00', '20:00')}, format='json')
+
+        schedule = get_salon_schedule(self.salon.id)
+        self.assertEqual(stylist_windows(schedule, self.stylist.id, 0), [(720, 1200)])
+
+    def test_stylist_schedule_leaves_salon_rows(self):
+        response = self.client.put(self.url, {
+            'stylist': self.stylist.id,
+            'hours': week('12:00', '20:00', days=[0]),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stylist.working_hours.count(), 1)
+        self.assertEqual(self.salon.working_hours.count(), 7)
+        schedule = get_salon_schedule(self.salon.id)
+        self.assertEqual(stylist_windows(schedule, self.stylist.id, 0), [(720, 1200)])
+
+        response = self.client.get(self.url, {'stylist': self.stylist.id})
+        self.assertEqual(len(response.data['hours']), 1)
+
+    def test_rejects_reversed_times(self):
+        response = self.client.put(self.url, {'hours': week('18:00', '09:00')}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(WorkingHours.objects.filter(start_time=time(18, 0)).count(), 0)
+
+    def test_rejects_stylist_of_other_salon(self):
+        other = self.make_stylist(self.make_salon())
+
+        response = self.client.put(self.url, {'stylist': other.id, 'hours': []}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class CopySalonSetupTestCase(FixturesMixin, TestCase):
+    """Test copying hours and services to the manager's other salons."""
+
+    def setUp(self):
+        self.source = self.make_salon(gender='female')
+        self.open_all_week(self.source, time(10, 0), time(20, 0))
+        self.make_service(self.source, duration=45, service_type='haircut', price=200000)
+        self.make_service(self.source, duration=90, service_type='hair_color', price=900000)
+        manager = self.source.manager
+        self.female = Salon.objects.create(manager=manager, name='شعبه ۲', gender_type='female')
+        self.male = Salon.objects.create(manager=manager, name='شعبه ۳', gender_type='male')
+        self.open_all_week(self.male)
+        self.make_service(self.male, duration=30, service_type='haircut', price=100000)
+        self.client = APIClient()
+        self.client.force_authenticate(manager.user)
+        self.url = reverse('salons:api_manager_copy_salon_setup', args=[self.source.id])
+
+    def test_copies_schedule_and_services(self):
+        get_salon_schedule(self.male.id)
+
+        response = self.client.post(self.url, {'target_salons': [self.female.id, self.male.id]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['schedule'], {'created': 7, 'updated': 7, 'deleted': 0, 'unchanged': 0})
+        self.assertEqual(response.data['services'], {'created': 2, 'updated': 1, 'skipped': 1})
+        self.assertEqual(get_salon_schedule(self.male.id)['salon'][0], [(600, 1200)])
+        haircut = Service.objects.get(salon=self.male)
+        self.assertEqual((haircut.duration_minutes, haircut.price), (45, 200000))
+        self.assertEqual(self.female.services.count(), 2)
+
+    def test_services_only(self):
+        response = self.client.post(self.url, {
+            'target_salons': [self.female.id], 'schedule': False,
+        }, format='json')
+
+        self.assertNotIn('schedule', response.data)
+        self.assertEqual(self.female.working_hours.count(), 0)
+
+    def test_rejects_salon_of_another_manager(self):
+        other = self.make_salon()
+
+        response = self.client.post(self.url, {'target_salons': [other.id]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(other.working_hours.count(), 0)
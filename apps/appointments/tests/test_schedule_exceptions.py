@@ -0,0 +1,173 @@
+"""
+Tests for salon closures, holidays and stylist time off.
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.appointments.scheduling import (
+    book_with_any_stylist, get_blocked_intervals, minutes_to_time, solve_visit_chain
+)
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.models import ScheduleException
+from apps.core.tests.factories import FixturesMixin
+
+
+class ScheduleExceptionTestCase(FixturesMixin, TestCase):
+    """Test that exceptions block availability and booking."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.first = self.make_stylist(self.salon)
+        self.second = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=30)
+        self.customer = self.make_customer()
+        self.day = date.today() + timedelta(days=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+
+    def get_slots(self, stylist):
+        return self.client.get(reverse('appointments:api_availability'), {
+            'stylist_id': stylist.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+        }).data['available_slots']
+
+    def test_blocked_lookup_is_one_query(self):
+        ScheduleException.objects.create(salon=self.salon, start_date=self.day, end_date=self.day)
+        ScheduleException.objects.create(
+            stylist=self.first, start_date=self.day - timedelta(days=2), end_date=self.day + timedelta(days=2),
+            start_time=time(12, 0), end_time=time(14, 0)
+        )
+
+        with self.assertNumQueries(1):
+            blocked = get_blocked_intervals(self.salon, [self.first.id, self.second.id], self.day)
+
+        self.assertEqual(blocked[self.first.id], [(0, 1440), (720, 840)])
+        self.assertEqual(blocked[self.second.id], [(0, 1440)])
+
+    def test_salon_closure_empties_availability(self):
+        ScheduleException.objects.create(
+            salon=self.salon, start_date=self.day - timedelta(days=1), end_date=self.day + timedelta(days=10),
+            reason='نوروز'
+        )
+
+        self.assertEqual(self.get_slots(self.first), [])
+
+    def test_partial_time_off_hides_slots(self):
+        ScheduleException.objects.create(
+            stylist=self.first, start_date=self.day, end_date=self.day,
+            start_time=time(12, 0), end_time=time(14, 0)
+        )
+
+        slots = self.get_slots(self.first)
+        self.assertIn('11:30', slots)
+        self.assertNotIn('12:00', slots)
+        self.assertNotIn('13:30', slots)
+        self.assertIn('14:00', slots)
+        # Other stylists are unaffected
+        self.assertIn('12:00', self.get_slots(self.second))
+
+    def test_direct_booking_rejected_during_time_off(self):
+        ScheduleException.objects.create(stylist=self.first, start_date=self.day, end_date=self.day)
+
+        response = self.client.post(reverse('appointments:api_book'), {
+            'stylist_id': self.first.id,
+            'service_id': self.service.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'time_slot': '10:00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_any_stylist_skips_stylist_on_leave(self):
+        ScheduleException.objects.create(stylist=self.first, start_date=self.day, end_date=self.day)
+
+        # Both are idle, so without the time off the first would win the tie
+        appointment = book_with_any_stylist(
+            self.customer, self.salon, self.service, self.day, time(10, 0), 'least_booked'
+        )
+        self.assertEqual(appointment.stylist, self.second)
+
+    def test_visit_chain_starts_after_closure(self):
+        ScheduleException.objects.create(
+            salon=self.salon, start_date=self.day, end_date=self.day,
+            start_time=time(9, 0), end_time=time(11, 0)
+        )
+
+        parts = solve_visit_chain(self.salon, [self.service], self.day)
+
+        self.assertEqual(minutes_to_time(parts[0].start), time(11, 0))
+
+
+class ScheduleExceptionAPITestCase(FixturesMixin, TestCase):
+    """Test the manager endpoints for closures and time off."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=60)
+        self.day = date.today() + timedelta(days=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.salon.manager.user)
+        self.url = reverse('salons:api_manager_schedule_exceptions', args=[self.salon.id])
+
+    def test_create_lists_conflicting_bookings(self):
+        clashing = self.book(self.make_customer(), self.stylist, self.service, self.day, time(11, 30))
+        self.book(self.make_customer(), self.stylist, self.service, self.day, time(15, 0))
+
+        response = self.client.post(f'{self.url}?conflicts=1', {
+            'stylist': self.stylist.id,
+            'jalali_start_date': gregorian_to_jalali(self.day),
+            'jalali_end_date': gregorian_to_jalali(self.day),
+            'start_time': '12:00',
+            'end_time': '14:00',
+            'reason': 'مرخصی',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([a['id'] for a in response.data['conflicts']], [clashing.id])
+        exception = ScheduleException.objects.get()
+        self.assertEqual(exception.start_date, self.day)
+        self.assertIsNone(exception.salon)
+
+    def test_salon_closure_without_stylist(self):
+        response = self.client.post(self.url, {
+            'jalali_start_date': gregorian_to_jalali(self.day),
+            'jalali_end_date': gregorian_to_jalali(self.day + timedelta(days=12)),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['is_full_day'])
+        self.assertNotIn('conflicts', response.data)
+        self.assertEqual(ScheduleException.objects.get().salon, self.salon)
+
+    def test_rejects_reversed_dates(self):
+        response = self.client.post(self.url, {
+            'jalali_start_date': gregorian_to_jalali(self.day),
+            'jalali_end_date': gregorian_to_jalali(self.day - timedelta(days=1)),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_stylist_of_other_salon(self):
+        other = self.make_stylist(self.make_salon())
+
+        response = self.client.post(self.url, {
+            'stylist': other.id,
+            'jalali_start_date': gregorian_to_jalali(self.day),
+            'jalali_end_date': gregorian_to_jalali(self.day),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_includes_stylist_time_off(self):
+        ScheduleException.objects.create(salon=self.salon, start_date=self.day, end_date=self.day)
+        ScheduleException.objects.create(stylist=self.stylist, start_date=self.day, end_date=self.day)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 2)
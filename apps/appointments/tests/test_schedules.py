@@ -0,0 +1,138 @@
+"""
+Tests for compiled weekly schedules (split shifts, precedence, caching).
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import StylistProfile
+from apps.appointments.scheduling import get_working_windows, persian_weekday
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.models import WorkingHours
+from apps.salons.schedules import get_salon_schedule, stylist_windows
+from apps.core.tests.factories import FixturesMixin
+
+
+class CompiledScheduleTestCase(FixturesMixin, TestCase):
+    """Test schedule compilation and cache invalidation."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.stylist = self.make_stylist(self.salon)
+        self.day = date.today() + timedelta(days=3)
+        self.weekday = persian_weekday(self.day)
+
+        # Split shift with a lunch break at salon level
+        self.morning = WorkingHours.objects.create(
+            salon=self.salon, day_of_week=self.weekday, start_time=time(9, 0), end_time=time(13, 0)
+        )
+        WorkingHours.objects.create(
+            salon=self.salon, day_of_week=self.weekday, start_time=time(14, 0), end_time=time(18, 0)
+        )
+
+    def test_split_shift_has_two_windows(self):
+        schedule = get_salon_schedule(self.salon.id)
+
+        self.assertEqual(stylist_windows(schedule, self.stylist.id, self.weekday), [(540, 780), (840, 1080)])
+
+    def test_stylist_rows_override_salon_rows_for_that_day(self):
+        WorkingHours.objects.create(
+            stylist=self.stylist, day_of_week=self.weekday, start_time=time(12, 0), end_time=time(20, 0)
+        )
+        other_day = (self.weekday + 1) % 7
+        WorkingHours.objects.create(
+            salon=self.salon, day_of_week=other_day, start_time=time(10, 0), end_time=time(16, 0)
+        )
+
+        schedule = get_salon_schedule(self.salon.id)
+
+        self.assertEqual(stylist_windows(schedule, self.stylist.id, self.weekday), [(720, 1200)])
+        # Days without stylist rows still fall back to the salon
+        self.assertEqual(stylist_windows(schedule, self.stylist.id, other_day), [(600, 960)])
+
+    def test_overlapping_rows_are_merged(self):
+        WorkingHours.objects.create(
+            salon=self.salon, day_of_week=self.weekday, start_time=time(12, 0), end_time=time(14, 30)
+        )
+
+        schedule = get_salon_schedule(self.salon.id)
+
+        self.assertEqual(schedule['salon'][self.weekday], [(540, 1080)])
+
+    def test_cached_schedule_runs_no_queries(self):
+        get_salon_schedule(self.salon.id)
+
+        with self.assertNumQueries(0):
+            windows = get_working_windows(self.salon, [self.stylist.id], self.day)
+        self.assertEqual(len(windows[self.stylist.id]), 2)
+
+    def test_editing_hours_rebuilds_schedule(self):
+        get_salon_schedule(self.salon.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.morning.is_active = False
+            self.morning.save()
+
+        windows = get_working_windows(self.salon, [self.stylist.id], self.day)
+        self.assertEqual(windows[self.stylist.id], [(840, 1080)])
+
+    def test_hours_change_is_dropped_only_after_commit(self):
+        get_salon_schedule(self.salon.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.morning.delete()
+            # Still uncommitted: readers keep the old schedule
+            self.assertEqual(len(get_working_windows(self.salon, [self.stylist.id], self.day)[self.stylist.id]), 2)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_working_windows(self.salon, [self.stylist.id], self.day)[self.stylist.id], [(840, 1080)])
+
+    def test_deleting_stylist_hours_rebuilds_schedule(self):
+        own = WorkingHours.objects.create(
+            stylist=self.stylist, day_of_week=self.weekday, start_time=time(12, 0), end_time=time(20, 0)
+        )
+        get_salon_schedule(self.salon.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            own.delete()
+
+        windows = get_working_windows(self.salon, [self.stylist.id], self.day)
+        self.assertEqual(windows[self.stylist.id], [(540, 780), (840, 1080)])
+
+    def test_moving_stylist_rebuilds_both_salons(self):
+        WorkingHours.objects.create(
+            stylist=self.stylist, day_of_week=self.weekday, start_time=time(12, 0), end_time=time(20, 0)
+        )
+        new_salon = self.make_salon()
+        self.assertIn(self.stylist.id, get_salon_schedule(self.salon.id)['stylists'])
+        self.assertNotIn(self.stylist.id, get_salon_schedule(new_salon.id)['stylists'])
+
+        stylist = StylistProfile.objects.get(pk=self.stylist.pk)
+        stylist.salon = new_salon
+        with self.captureOnCommitCallbacks(execute=True):
+            stylist.save()
+
+        self.assertNotIn(self.stylist.id, get_salon_schedule(self.salon.id)['stylists'])
+        self.assertIn(self.stylist.id, get_salon_schedule(new_salon.id)['stylists'])
+
+    def test_availability_skips_lunch_break(self):
+        customer = self.make_customer()
+        service = self.make_service(self.salon, duration=60)
+        client = APIClient()
+        client.force_authenticate(customer.user)
+
+        response = client.get(reverse('appointments:api_availability'), {
+            'stylist_id': self.stylist.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'service_id': service.id,
+        })
+
+        slots = response.data['available_slots']
+        self.assertIn('12:00', slots)
+        self.assertNotIn('12:30', slots)
+        self.assertNotIn('13:00', slots)
+        self.assertIn('14:00', slots)
+        self.assertEqual(len(response.data['windows']), 2)
@@ -0,0 +1,101 @@
+"""
+Tests for gap-minimizing slot ranking.
+"""
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.appointments.scheduling import (
+    SLOT_BADGE_ADJACENT, SLOT_BADGE_EXACT_FIT, SLOT_BADGE_LEAVES_GAP,
+    free_minutes_mask, score_slots
+)
+from apps.appointments.utils import gregorian_to_jalali
+from apps.core.tests.factories import FixturesMixin
+
+
+class SlotScoringTestCase(TestCase):
+    """Test the bitmask scorer."""
+
+    def setUp(self):
+        # Working 09:00-12:00, busy 10:00-10:30
+        self.free = free_minutes_mask([(540, 720)], [(600, 630)])
+
+    def test_exact_fit_scores_highest(self):
+        scores = score_slots(self.free, [540, 630, 660], 60)
+
+        # 09:00-10:00 touches both the opening time and the booking
+        self.assertEqual(scores[540], (2, SLOT_BADGE_EXACT_FIT))
+        self.assertEqual(scores[630][1], SLOT_BADGE_ADJACENT)
+        self.assertEqual(scores[660], (1, SLOT_BADGE_ADJACENT))
+
+    def test_stranded_gap_is_penalized(self):
+        scores = score_slots(self.free, [555, 540], 30, min_gap=30)
+
+        # 09:15-09:45 leaves 15 minutes on each side
+        self.assertEqual(scores[555], (-2, SLOT_BADGE_LEAVES_GAP))
+        self.assertEqual(scores[540][1], SLOT_BADGE_ADJACENT)
+
+    def test_slot_at_midnight_is_handled(self):
+        scores = score_slots(free_minutes_mask([(0, 120)], []), [0], 120)
+
+        self.assertEqual(scores[0], (2, SLOT_BADGE_EXACT_FIT))
+
+
+class RankedAvailabilityTestCase(FixturesMixin, TestCase):
+    """Test ranked slots on the availability endpoint."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon, duration=30)
+        self.customer = self.make_customer()
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+        self.day = date.today() + timedelta(days=3)
+
+    def test_ranked_slots_put_adjacent_slots_first(self):
+        self.book(self.make_customer(), self.stylist, self.service, self.day, time(12, 0))
+
+        response = self.client.get(reverse('appointments:api_availability'), {
+            'stylist_id': self.stylist.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+            'service_id': self.service.id,
+            'rank': '1',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        ranked = response.data['ranked_slots']
+        self.assertEqual(len(ranked), len(response.data['available_slots']))
+        self.assertEqual(
+            [slot['time'] for slot in ranked[:4]], ['09:00', '11:30', '12:30', '17:30']
+        )
+        self.assertEqual(ranked[0]['badge'], SLOT_BADGE_ADJACENT)
+        # Plain slot list keeps chronological order
+        self.assertEqual(response.data['available_slots'][0], '09:00')
+
+    @override_settings(BOOKING_MIN_LEAD_MINUTES=60)
+    def test_slots_within_lead_time_are_dropped(self):
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12, 10)))
+
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            response = self.client.get(reverse('appointments:api_availability'), {
+                'stylist_id': self.stylist.id,
+                'jalali_date': gregorian_to_jalali(now.date()),
+                'rank': '1',
+            })
+
+        self.assertEqual(response.data['available_slots'][0], '13:30')
+        self.assertEqual(min(slot['time'] for slot in response.data['ranked_slots']), '13:30')
+
+    def test_ranking_is_opt_in(self):
+        response = self.client.get(reverse('appointments:api_availability'), {
+            'stylist_id': self.stylist.id,
+            'jalali_date': gregorian_to_jalali(self.day),
+        })
+
+        self.assertNotIn('ranked_slots', response.data)
@@ -0,0 +1,184 @@
+"""
+Tests for multi-service visits booked as a back-to-back chain.
+"""
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment, Visit
+from apps.appointments.scheduling import (
+    NoAvailableStylist, book_visit, minutes_to_time, solve_visit_chain
+)
+from apps.appointments.utils import gregorian_to_jalali
+from apps.salons.dashboard import get_manager_dashboard, invalidate_manager_dashboard
+from apps.salons.models import WorkingHours
+from apps.salons.schedules import get_salon_schedule, invalidate_salon_schedule
+from apps.core.tests.factories import FixturesMixin
+
+
+class VisitChainSolverTestCase(FixturesMixin, TestCase):
+    """Test the earliest-chain search."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.open_all_week(self.salon)
+        self.first = self.make_stylist(self.salon)
+        self.second = self.make_stylist(self.salon)
+        self.haircut = self.make_service(self.salon, duration=60)
+        self.beard = self.make_service(self.salon, duration=30, service_type='beard_trim')
+        self.customer = self.make_customer()
+        self.day = date.today() + timedelta(days=3)
+
+    def test_chain_starts_at_opening_on_empty_day(self):
+        parts = solve_visit_chain(self.salon, [self.haircut, self.beard], self.day)
+
+        self.assertEqual([minutes_to_time(p.start) for p in parts], [time(9, 0), time(10, 0)])
+        # Same stylist is kept when possible
+        self.assertEqual(parts[0].stylist_id, parts[1].stylist_id)
+
+    def test_chain_switches_stylist_to_stay_consecutive(self):
+        # Only the first stylist can cut hair; both are busy at different times
+        self.haircut.stylist = self.first
+        self.haircut.save()
+        self.book(self.make_customer(), self.first, self.beard, self.day, time(10, 0))
+        self.book(self.make_customer(), self.second, self.haircut, self.day, time(9, 0))
+
+        parts = solve_visit_chain(self.salon, [self.haircut, self.beard], self.day)
+
+        # Haircut 09:00-10:00 with first, beard trim 10:00-10:30 must move to second
+        self.assertEqual(parts[0].stylist_id, self.first.id)
+        self.assertEqual(minutes_to_time(parts[0].start), time(9, 0))
+        self.assertEqual(parts[1].stylist_id, self.second.id)
+        self.assertEqual(minutes_to_time(parts[1].start), time(10, 0))
+
+    def test_not_before_is_rounded_up_to_slot_grid(self):
+        parts = solve_visit_chain(self.salon, [self.beard], self.day, not_before=10 * 60 + 10)
+
+        self.assertEqual(minutes_to_time(parts[0].start), time(10, 30))
+
+    def test_no_chain_when_day_is_too_short(self):
+        WorkingHours.objects.all().update(start_time=time(9, 0), end_time=time(10, 0))
+        invalidate_salon_schedule(self.salon.id)
+
+        self.assertIsNone(solve_visit_chain(self.salon, [self.haircut, self.beard], self.day))
+
+    def test_solver_query_count_is_constant(self):
+        for _ in range(10):
+            self.make_stylist(self.salon)
+        get_salon_schedule(self.salon.id)
+
+        with self.assertNumQueries(4):
+            solve_visit_chain(self.salon, [self.haircut, self.beard, self.haircut], self.day)
+
+    def test_book_visit_commits_all_parts(self):
+        visit = book_visit(self.customer, self.salon, [self.haircut, self.beard], self.day)
+
+        self.assertEqual(visit.appointments.count(), 2)
+        self.assertEqual(
+            list(visit.appointments.order_by('appointment_time').values_list('appointment_time', flat=True)),
+            [time(9, 0), time(10, 0)]
+        )
+
+    @override_settings(BOOKING_MIN_LEAD_MINUTES=0)
+    def test_book_visit_today_starts_after_now(self):
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12, 10)))
+
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            visit = book_visit(self.customer, self.salon, [self.haircut, self.beard], now.date())
+
+        starts = list(visit.appointments.order_by('appointment_time').values_list('appointment_time', flat=True))
+        self.assertEqual(starts, [time(12, 30), time(13, 30)])
+
+    @override_settings(BOOKING_MIN_LEAD_MINUTES=120)
+    def test_book_visit_respects_lead_time(self):
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12, 10)))
+
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            visit = book_visit(self.customer, self.salon, [self.haircut, self.beard], now.date(), not_before=9 * 60)
+
+        first = visit.appointments.order_by('appointment_time').first()
+        self.assertEqual(first.appointment_time, time(14, 30))
+
+    @override_settings(BOOKING_MIN_LEAD_MINUTES=24 * 60)
+    def test_book_visit_lead_time_spans_midnight(self):
+        with self.assertRaises(NoAvailableStylist):
+            book_visit(self.customer, self.salon, [self.beard], timezone.localdate())
+
+    def test_book_visit_in_the_past_finds_nothing(self):
+        with self.assertRaises(NoAvailableStylist):
+            book_visit(self.customer, self.salon, [self.haircut], timezone.localdate() - timedelta(days=1))
+
+    def test_book_visit_refreshes_cached_dashboard(self):
+        manager = self.salon.manager
+        invalidate_manager_dashboard(manager.id)
+        self.assertEqual(get_manager_dashboard(manager)['salons'][0]['pending_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_visit(self.customer, self.salon, [self.haircut, self.beard], self.day)
+
+        self.assertEqual(get_manager_dashboard(manager)['salons'][0]['pending_count'], 2)
+
+    def test_book_visit_raises_when_nothing_fits(self):
+        WorkingHours.objects.all().update(is_active=False)
+        invalidate_salon_schedule(self.salon.id)
+
+        with self.assertRaises(NoAvailableStylist):
+            book_visit(self.customer, self.salon, [self.haircut], self.day)
+        self.assertFalse(Visit.objects.exists())
+
+
+class VisitBookingAPITestCase(FixturesMixin, TestCase):
+    """Test the visit booking endpoint."""
+
+    def setUp(self):
+        self.salon = self.make_salon(auto_approve_appointments=True)
+        self.open_all_week(self.salon)
+        self.make_stylist(self.salon)
+        self.haircut = self.make_service(self.salon, duration=60)
+        self.facial = self.make_service(self.salon, duration=30, service_type='facial')
+        self.customer = self.make_customer()
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer.user)
+        self.day = date.today() + timedelta(days=3)
+
+    def test_books_visit(self):
+        response = self.client.post(reverse('appointments:api_book_visit'), {
+            'salon_id': self.salon.id,
+            'service_ids': [self.haircut.id, self.facial.id],
+            'jalali_date': gregorian_to_jalali(self.day),
+            'not_before': '11:00',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        visit = response.data['visit']
+        self.assertEqual(len(visit['appointments']), 2)
+        self.assertEqual(visit['total_price'], self.haircut.price + self.facial.price)
+        self.assertEqual(
+            set(Appointment.objects.values_list('status', flat=True)), {'confirmed'}
+        )
+
+    def test_rejects_past_date(self):
+        response = self.client.post(reverse('appointments:api_book_visit'), {
+            'salon_id': self.salon.id,
+            'service_ids': [self.haircut.id],
+            'jalali_date': gregorian_to_jalali(timezone.localdate() - timedelta(days=1)),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Visit.objects.exists())
+
+    def test_rejects_foreign_service(self):
+        other = self.make_service(self.make_salon())
+
+        response = self.client.post(reverse('appointments:api_book_visit'), {
+            'salon_id': self.salon.id,
+            'service_ids': [self.haircut.id, other.id],
+            'jalali_date': gregorian_to_jalali(self.day),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Visit.objects.exists())
@@ -5,9 +5,14 @@ from . import views
 app_name = 'appointments'
 
 urlpatterns = [
+    # Template views
+    path('book/', views.booking_page, name='booking_page'),
+    
     # API endpoints
     path('api/availability/', views.get_availability, name='api_availability'),
     path('api/book/', views.book_appointment, name='api_book'),
+    path('api/book/any/', views.book_appointment_any_stylist, name='api_book_any'),
+    path('api/book/visit/', views.book_visit, name='api_book_visit'),
     path('api/my-appointments/', views.my_appointments, name='api_my_appointments'),
     path('api/cancel/<int:appointment_id>/', views.cancel_appointment, name='api_cancel'),
     path('api/approve/<int:appointment_id>/', views.approve_appointment, name='api_approve'),
@@ -1,20 +1,51 @@
 """
 Views for appointment booking and management.
 """
+from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django.db.models import Min, Prefetch
 from datetime import datetime, time
 
-from .models import Appointment
-from .serializers import AppointmentSerializer, BookAppointmentSerializer
-from .utils import jalali_to_gregorian, generate_time_slots
+from .models import Appointment, Visit
+from .serializers import (
+    AppointmentSerializer, BookAppointmentSerializer, BookAnyStylistSerializer,
+    BookVisitSerializer, VisitSerializer
+)
+from .utils import jalali_to_gregorian
 from apps.accounts.permissions import IsCustomer, IsSalonManager, IsStylist
 from apps.accounts.models import StylistProfile
-from apps.salons.models import WorkingHours
+from apps.salons.models import Service
+from .scheduling import (
+    MINUTES_PER_DAY, SLOT_MINUTES, earliest_start, free_minutes_mask, get_blocked_intervals, get_busy_intervals,
+    get_service_resources, get_working_windows, load_resource_timeline, minutes_to_time, overlaps,
+    score_slots
+)
+
+
+@login_required
+def booking_page(request):
+    """
+    Booking form; ?stylist_id= preselects a stylist and lists the
+    services they can perform.
+    
+    GET /appointments/book/?stylist_id=1
+    """
+    context = {}
+    stylist_id = request.GET.get('stylist_id', '')
+    if stylist_id.isdigit():
+        stylist = StylistProfile.objects.filter(pk=stylist_id, is_temporary=False).first()
+        if stylist is not None:
+            context['preselected_stylist'] = stylist
+            context['stylist_services'] = [
+                service
+                for service in Service.objects.filter(salon_id=stylist.salon_id, is_active=True)
+                if service.stylist_id in (None, stylist.id)
+            ]
+    return render(request, 'appointments/booking.html', context)
 
 
 @api_view(['GET'])
@@ -23,9 +54,13 @@ def get_availability(request):
     """
     Get available time slots for a stylist on a specific date.
     
-    GET /appointments/api/availability/?stylist_id=1&jalali_date=1402/09/20
+    GET /appointments/api/availability/?stylist_id=1&jalali_date=1402/09/20&service_id=3&rank=1
     
-    Returns list of available time slots.
+    Returns list of available time slots, none earlier than
+    BOOKING_MIN_LEAD_MINUTES from now. When service_id is given, slots
+    must fit the service's duration and the salon's resource capacity.
+    With rank=1, ranked_slots lists the same slots best-packing first,
+    badged when they close a gap or sit next to an existing booking.
     """
     stylist_id = request.GET.get('stylist_id')
     jalali_date = request.GET.get('jalali_date')
@@ -40,61 +75,93 @@ def get_availability(request):
     except StylistProfile.DoesNotExist:
         return Response({'error': 'آرایشگر یافت نشد'}, status=status.HTTP_404_NOT_FOUND)
     
+    service = None
+    service_id = request.GET.get('service_id')
+    if service_id:
+        try:
+            service = Service.objects.get(id=service_id, salon_id=stylist.salon_id)
+        except (Service.DoesNotExist, ValueError):
+            return Response({'error': 'خدمت یافت نشد'}, status=status.HTTP_404_NOT_FOUND)
+    
     # Convert Jalali to Gregorian
     try:
         gregorian_date = jalali_to_gregorian(jalali_date)
     except:
         return Response({'error': 'فرمت تاریخ نامعتبر است'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Get day of week (0=Saturday, 6=Friday in Persian calendar)
-    # Python's weekday: 0=Monday, convert to Persian
-    python_weekday = gregorian_date.weekday()
-    persian_weekday = (python_weekday + 2) % 7  # Convert to Persian week start (Saturday=0)
-    
-    # Get working hours for this stylist on this day
-    working_hours = WorkingHours.objects.filter(
-        Q(stylist=stylist) | Q(salon=stylist.salon),
-        day_of_week=persian_weekday,
-        is_active=True
-    ).first()
+    # Working windows of this stylist on this day, from the compiled schedule
+    windows = get_working_windows(stylist.salon, [stylist.id], gregorian_date)[stylist.id]
     
-    if not working_hours:
+    if not windows:
         return Response({
             'available_slots': [],
             'message': 'در این روز ساعت کاری تعریف نشده است'
         })
     
-    # Generate all possible time slots
-    all_slots = generate_time_slots(
-        working_hours.start_time,
-        working_hours.end_time,
-        slot_duration_minutes=30
-    )
-    
-    # Get already booked slots
-    booked_appointments = Appointment.objects.filter(
-        stylist=stylist,
-        appointment_date=gregorian_date,
-        status__in=['pending', 'confirmed']
-    ).values_list('appointment_time', flat=True)
-    
-    # Filter out booked slots
-    available_slots = [
-        slot.strftime('%H:%M') for slot in all_slots
-        if slot not in booked_appointments
-    ]
+    # Closures and time off on this day
+    blocked = get_blocked_intervals(stylist.salon, [stylist.id], gregorian_date)[stylist.id]
+    if blocked and blocked[0] == (0, MINUTES_PER_DAY):
+        return Response({
+            'available_slots': [],
+            'message': 'سالن یا آرایشگر در این روز تعطیل است'
+        })
+    
+    # Occupied intervals of this stylist and, if needed, of the salon's resources
+    busy = sorted(get_busy_intervals([stylist.id], gregorian_date)[stylist.id] + blocked)
+    duration = service.duration_minutes if service else SLOT_MINUTES
+    resource_ids = get_service_resources([service.id])[service.id] if service else []
+    timeline = load_resource_timeline(stylist.salon, gregorian_date) if resource_ids else None
     
-    return Response({
+    # Keep slots where the whole service fits inside one window and
+    # which still pass the booking lead time
+    earliest = earliest_start(gregorian_date)
+    available_slots = []
+    available_starts = []
+    for window_start, window_end in windows:
+        for start in range(window_start, window_end - duration + 1, SLOT_MINUTES):
+            if start < earliest:
+                continue
+            end = start + duration
+            if overlaps(busy, start, end):
+                continue
+            if timeline is not None and not timeline.fits(resource_ids, start, end):
+                continue
+            available_slots.append(minutes_to_time(start).strftime('%H:%M'))
+            available_starts.append(start)
+    
+    data = {
         'stylist_id': stylist_id,
         'stylist_name': stylist.full_name,
         'jalali_date': jalali_date,
         'gregorian_date': gregorian_date.isoformat(),
         'available_slots': available_slots,
         'working_hours': {
-            'start': working_hours.start_time.strftime('%H:%M'),
-            'end': working_hours.end_time.strftime('%H:%M')
-        }
-    })
+            'start': minutes_to_time(windows[0][0]).strftime('%H:%M'),
+            'end': minutes_to_time(windows[-1][1]).strftime('%H:%M')
+        },
+        'windows': [
+            {
+                'start': minutes_to_time(window_start).strftime('%H:%M'),
+                'end': minutes_to_time(window_end).strftime('%H:%M')
+            }
+            for window_start, window_end in windows
+        ]
+    }
+    
+    if request.GET.get('rank') in ('1', 'true'):
+        # Gaps shorter than the salon's shortest service can't be sold
+        min_gap = Service.objects.filter(
+            salon_id=stylist.salon_id, is_active=True
+        ).aggregate(shortest=Min('duration_minutes'))['shortest'] or SLOT_MINUTES
+        free = free_minutes_mask(windows, busy)
+        scores = score_slots(free, available_starts, duration, min_gap)
+        ranked = sorted(zip(available_slots, available_starts), key=lambda item: (-scores[item[1]][0], item[1]))
+        data['ranked_slots'] = [
+            {'time': slot, 'score': scores[start][0], 'badge': scores[start][1]}
+            for slot, start in ranked
+        ]
+    
+    return Response(data)
 
 
 from apps.chat.services.notifications import (
@@ -117,7 +184,72 @@ def book_appointment(request):
     }
     """
     serializer = BookAppointmentSerializer(data=request.data, context={'request': request})
+    return _save_booking(serializer)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsCustomer])
+def book_appointment_any_stylist(request):
+    """
+    Book an appointment with whichever stylist is free.
     
+    POST /appointments/api/book/any/
+    Body: {
+        salon_id, service_id, jalali_date, time_slot, policy (optional), customer_notes
+    }
+    """
+    serializer = BookAnyStylistSerializer(data=request.data, context={'request': request})
+    return _save_booking(serializer)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsCustomer])
+def book_visit(request):
+    """
+    Book several services back to back in one visit.
+    
+    POST /appointments/api/book/visit/
+    Body: {
+        salon_id, service_ids: [int], jalali_date, not_before (optional), customer_notes
+    }
+    """
+    serializer = BookVisitSerializer(data=request.data, context={'request': request})
+    
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        visit = serializer.save()
+    except Exception as e:
+        return Response({
+            'error': 'خطا در ثبت نوبت',
+            'detail': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    visit = Visit.objects.prefetch_related(
+        Prefetch('appointments', queryset=Appointment.objects.select_related(
+            'customer', 'stylist__salon', 'service'
+        ).order_by('appointment_time'))
+    ).select_related('salon').get(pk=visit.pk)
+    
+    # Parts are bulk-inserted, so notify once for the whole visit
+    first_part = visit.appointments.all()[0]
+    if first_part.status == 'confirmed':
+        send_appointment_confirmed_notification(first_part)
+    else:
+        send_appointment_created_notification(first_part)
+    
+    data = {
+        'message': 'نوبت با موفقیت ثبت شد',
+        'visit': VisitSerializer(visit).data
+    }
+    if serializer.warnings:
+        data['warnings'] = serializer.warnings
+    return Response(data, status=status.HTTP_201_CREATED)
+
+
+def _save_booking(serializer):
+    """Save a booking serializer, apply auto-approval and notify the customer."""
     if serializer.is_valid():
         try:
             appointment = serializer.save()
@@ -137,10 +269,14 @@ def book_appointment(request):
                 send_appointment_created_notification(appointment)
 
             response_serializer = AppointmentSerializer(appointment)
-            return Response({
+            data = {
                 'message': 'نوبت با موفقیت ثبت شد',
                 'appointment': response_serializer.data
-            }, status=status.HTTP_201_CREATED)
+            }
+            warnings = getattr(serializer, 'warnings', None)
+            if warnings:
+                data['warnings'] = warnings
+            return Response(data, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({
                 'error': 'خطا در ثبت نوبت',
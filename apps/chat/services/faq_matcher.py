@@ -3,8 +3,38 @@ FAQ matching service with keyword detection.
 """
 import re
 from difflib import SequenceMatcher
+
+from django.core.cache import cache
+from django.db.models import F
+
+from apps.core.caching import get_or_compute
+from apps.core.local_cache import LocalCache
 from ..models import FAQ
 
+FAQ_CACHE_KEY = 'faq:active'
+FAQ_CACHE_TIMEOUT = 3600
+
+_local_faqs = LocalCache('faqs', ttl=300, max_entries=1, max_bytes=4 * 1024 * 1024)
+
+
+def active_faqs():
+    """
+    Active FAQs, highest priority first.
+
+    Every chat message is matched against all of them, so they are kept
+    in the process (and in Redis behind it) until an FAQ changes.
+    """
+    return _local_faqs.get('active', lambda: get_or_compute(
+        FAQ_CACHE_KEY, lambda: list(FAQ.objects.filter(is_active=True).order_by('-priority', '-created_at')),
+        FAQ_CACHE_TIMEOUT, name='faqs'
+    ))
+
+
+def invalidate_faqs():
+    """Drop the cached FAQ set everywhere; the next match reloads it."""
+    cache.delete(FAQ_CACHE_KEY)
+    _local_faqs.invalidate()
+
 
 class FAQMatcher:
     """Matches user messages to FAQ entries."""
@@ -39,10 +69,8 @@ class FAQMatcher:
     
     def _exact_match(self, message):
         """Check for exact question match."""
-        return FAQ.objects.filter(
-            question__iexact=message.strip(),
-            is_active=True
-        ).first()
+        clean_message = message.strip().lower()
+        return next((faq for faq in active_faqs() if faq.question.lower() == clean_message), None)
     
     def _keyword_match(self, message):
         """Match based on keywords with scoring."""
@@ -50,11 +78,10 @@ class FAQMatcher:
         if not keywords:
             return None, 0
         
-        faqs = FAQ.objects.filter(is_active=True).order_by('-priority')
         best_match = None
         best_score = 0
         
-        for faq in faqs:
+        for faq in active_faqs():
             if not faq.keywords:
                 continue
             
@@ -72,13 +99,12 @@ class FAQMatcher:
     
     def _fuzzy_match(self, message):
         """Find similar questions using fuzzy string matching."""
-        faqs = FAQ.objects.filter(is_active=True).order_by('-priority')
         best_match = None
         best_score = 0
         
         clean_message = message.strip().lower()
         
-        for faq in faqs:
+        for faq in active_faqs():
             clean_question = faq.question.strip().lower()
             similarity = SequenceMatcher(None, clean_message, clean_question).ratio()
             
@@ -104,5 +130,6 @@ class FAQMatcher:
     
     def increment_view_count(self, faq):
         """Increment view count for analytics."""
-        faq.view_count += 1
-        faq.save(update_fields=['view_count'])
+        # An UPDATE rather than save(): faq is shared by the cached set, and
+        # saving it would invalidate that set on every answered question
+        FAQ.objects.filter(pk=faq.pk).update(view_count=F('view_count') + 1)
@@ -48,9 +48,13 @@ def format_appointment_message(appointment, title):
 
     time_str = appointment.appointment_time.strftime('%H:%M') if appointment.appointment_time else "نامشخص"
     
+    # Multi-service visits list every part of the visit
+    parts = list(appointment.visit.appointments.all()) if appointment.visit_id else [appointment]
     services_list = "، ".join([
-        appointment.service.custom_name or appointment.service.get_service_type_display()
+        part.service.custom_name or part.service.get_service_type_display()
+        for part in parts
     ])
+    total_price = sum(part.service.price for part in parts)
     
     salon_name = appointment.stylist.salon.name
     stylist_name = appointment.stylist.full_name
@@ -62,7 +66,7 @@ def format_appointment_message(appointment, title):
         f"📅 <b>تاریخ:</b> {persian_date}\n"
         f"⏰ <b>ساعت:</b> {time_str}\n"
         f"✂️ <b>خدمات:</b> {services_list}\n"
-        f"💰 <b>مبلغ:</b> {appointment.service.price:,} تومان\n\n"
+        f"💰 <b>مبلغ:</b> {total_price:,} تومان\n\n"
         f"🆔 شناسه نوبت: <code>{appointment.id}</code>"
     )
     
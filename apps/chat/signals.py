@@ -0,0 +1,15 @@
+"""
+Signal handlers for FAQ cache invalidation.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FAQ
+from .services.faq_matcher import invalidate_faqs
+
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def invalidate_faqs_on_change(sender, **kwargs):
+    """The chatbot matches against the cached active set; reload it."""
+    invalidate_faqs()
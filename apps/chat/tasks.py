@@ -0,0 +1,53 @@
+"""
+Celery tasks for Telegram notifications.
+"""
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+from apps.accounts.models import CustomerProfile, SalonManagerProfile, StylistProfile
+from .services.notifications import send_telegram_message
+
+logger = logging.getLogger(__name__)
+
+MODERATION_MESSAGES = {
+    'managers_approved': "✅ <b>سالن شما تأیید شد</b>\n\nاکنون مشتریان می‌توانند سالن شما را ببینند و نوبت رزرو کنند.",
+    'reviews_approved': "✅ نظر شما تأیید و منتشر شد. از همراهی شما سپاسگزاریم!",
+    'reviews_rejected': "❌ نظر شما پس از بررسی منتشر نشد.",
+    'users_activated': "✅ حساب کاربری شما فعال شد.",
+    'users_deactivated': "⛔ حساب کاربری شما غیرفعال شد. برای پیگیری با پشتیبانی تماس بگیرید.",
+}
+
+# (profile model, lookup matching the ids) of the recipients of each kind
+MODERATION_RECIPIENTS = {
+    'managers': [(SalonManagerProfile, 'pk__in')],
+    'reviews': [(CustomerProfile, 'reviews__in')],
+    'users': [(CustomerProfile, 'user_id__in'), (SalonManagerProfile, 'user_id__in'),
+              (StylistProfile, 'user_id__in')],
+}
+
+
+def moderation_chat_ids(event: str, ids) -> set:
+    """Telegram chat ids of everyone affected by a bulk moderation event."""
+    chat_ids = set()
+    for model, lookup in MODERATION_RECIPIENTS[event.split('_')[0]]:
+        chat_ids.update(model.objects.filter(
+            **{lookup: ids}, telegram_chat_id__isnull=False
+        ).exclude(telegram_chat_id='').values_list('telegram_chat_id', flat=True))
+    return chat_ids
+
+
+@shared_task(ignore_result=True)
+def send_moderation_notifications(event: str, ids: list):
+    """Tell the people behind one bulk moderation operation what changed."""
+    text = MODERATION_MESSAGES[event]
+    sent = sum(bool(send_telegram_message(chat_id, text)) for chat_id in moderation_chat_ids(event, ids))
+    logger.info("Moderation event %s: %d of %d rows notified", event, sent, len(ids))
+
+
+def notify_moderation_on_commit(event: str, ids) -> None:
+    """Queue one notification job for a bulk operation once it has committed."""
+    ids = list(ids)
+    if ids:
+        transaction.on_commit(lambda: send_moderation_notifications.delay(event, ids))
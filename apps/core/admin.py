@@ -0,0 +1,13 @@
+"""Shared admin helpers."""
+from .deferred import deferred_signals
+
+
+class DeferredSignalsAdminMixin:
+    """
+    Bulk deletes from the change list run their (cascaded) signal side
+    effects once per salon, stylist and cache key instead of per row.
+    """
+
+    def delete_queryset(self, request, queryset):
+        with deferred_signals():
+            super().delete_queryset(request, queryset)
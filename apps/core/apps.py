@@ -5,3 +5,8 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'هسته سیستم'  # Persian: System Core
+
+    def ready(self):
+        """Queue image derivatives for the registered image fields."""
+        from apps.core.signals import connect_image_signals
+        connect_image_signals()
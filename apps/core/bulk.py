@@ -0,0 +1,47 @@
+"""
+Target selection for bulk admin operations.
+
+A bulk request names its rows either by id or by a filter over a fixed
+set of fields, never both:
+
+    {"ids": [3, 8, 13]}
+    {"filter": {"salon_id": 4, "created_before": "2026-01-01"}}
+
+Each endpoint maps the filter names it accepts to ORM lookups, so
+clients cannot reach arbitrary relations. An empty filter is rejected
+rather than read as "everything".
+"""
+from django.core.exceptions import ValidationError
+
+MAX_IDS = 5000
+
+
+class BulkSelectionError(Exception):
+    """The ids or filter of a bulk request are invalid."""
+
+
+def select_targets(queryset, data, filters: dict):
+    """Narrow queryset to the rows named by data['ids'] or data['filter']."""
+    ids, conditions = data.get('ids'), data.get('filter')
+    if (ids is None) == (conditions is None):
+        raise BulkSelectionError("یکی از ids یا filter را ارسال کنید")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise BulkSelectionError("ids باید فهرستی از شناسه‌ها باشد")
+        if len(ids) > MAX_IDS:
+            raise BulkSelectionError(f"حداکثر {MAX_IDS} شناسه در هر درخواست مجاز است")
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            raise BulkSelectionError("شناسه‌ها باید عدد باشند")
+        return queryset.filter(pk__in=ids)
+
+    if not isinstance(conditions, dict) or not conditions:
+        raise BulkSelectionError("filter نمی‌تواند خالی باشد")
+    unknown = sorted(set(conditions) - set(filters))
+    if unknown:
+        raise BulkSelectionError(f"فیلترهای نامعتبر: {', '.join(unknown)}")
+    try:
+        # Values are converted (and rejected) while the lookups are built
+        return queryset.filter(**{filters[name]: value for name, value in conditions.items()})
+    except (ValidationError, ValueError, TypeError):
+        raise BulkSelectionError("مقدار فیلتر نامعتبر است")
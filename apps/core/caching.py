@@ -0,0 +1,192 @@
+"""
+Stampede-safe caching.
+
+A plain get-then-compute-then-set lets every request that misses an
+expired key recompute it at once: a popular salon list or feedback
+page expiring under load means dozens of identical serializer runs.
+get_or_compute (and the @cached decorator over it) keeps that to one:
+
+- single-flight: the first request to miss takes a Redis lock
+  ('lock:<key>') and recomputes; the others serve the stale value if
+  there is one, otherwise wait up to WAIT_TIMEOUT for the winner's.
+- early expiration: a hit may recompute shortly before expiry with a
+  probability that grows as expiry nears and with the time the last
+  computation took (beta scales it; 0 turns it off), so a hot key is
+  usually refreshed before anyone misses it.
+- stale-while-revalidate: with stale=N an entry stays in Redis N
+  seconds past its expiry, and is served while one request refreshes it.
+
+    @cached(lambda salon_id: f'salon_summary:{salon_id}', timeout=300, stale=60)
+    def salon_summary(salon_id):
+        ...
+
+Entries are stored as (value, expires_at, compute_seconds), so None is
+cached like any other value; read them through this module only.
+
+Outcomes are counted per name: every read is a hit, a stale (expired
+entry found) or a miss; early, recompute, wait and timeout count what
+followed. Counts are kept in process and added to the CACHE_STATS_KEY
+hash in Redis every STATS_FLUSH_INTERVAL seconds; cache_stats() returns
+the totals of all processes.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable
+
+from django.core.cache import cache
+from redis.exceptions import LockError
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 10  # seconds a recomputation may hold the lock
+WAIT_TIMEOUT = 3  # seconds a request waits for another's recomputation
+WAIT_INTERVAL = 0.05
+CACHE_STATS_KEY = 'cache_stats'
+STATS_FLUSH_INTERVAL = 10
+
+_MISSING = object()
+_counts = Counter()
+_counts_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record(name: str, event: str, count: int = 1) -> None:
+    """Count cache outcomes; pushed to Redis every STATS_FLUSH_INTERVAL seconds."""
+    with _counts_lock:
+        _counts[name, event] += count
+        due = time.monotonic() - _last_flush >= STATS_FLUSH_INTERVAL
+    if due:
+        flush_stats()
+
+
+def flush_stats() -> None:
+    """Add this process's counts to the shared CACHE_STATS_KEY hash."""
+    global _last_flush
+    with _counts_lock:
+        counts = dict(_counts)
+        _counts.clear()
+        _last_flush = time.monotonic()
+    if not counts:
+        return
+    from django_redis import get_redis_connection
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        for (name, event), count in counts.items():
+            pipe.hincrby(cache.make_key(CACHE_STATS_KEY), f'{name}:{event}', count)
+        pipe.execute()
+    except Exception:
+        # Keep the counts for the next flush rather than failing the request
+        logger.exception("Could not flush cache stats")
+        with _counts_lock:
+            _counts.update(counts)
+
+
+def cache_stats() -> dict:
+    """Counts of all processes as {name: {event: count}}."""
+    from django_redis import get_redis_connection
+    flush_stats()
+    stats = {}
+    for field, count in get_redis_connection('default').hgetall(cache.make_key(CACHE_STATS_KEY)).items():
+        name, event = field.decode().rsplit(':', 1)
+        stats.setdefault(name, {})[event] = int(count)
+    return stats
+
+
+def _store(key: str, compute: Callable[[], Any], timeout: int, stale: int, name: str) -> Any:
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    cache.set(key, (value, finished + timeout, finished - started), timeout + stale)
+    record(name, 'recompute')
+    return value
+
+
+def _refresh(key, compute, timeout, stale, name, current=_MISSING):
+    """Recompute key unless another process is; otherwise serve current or wait."""
+    lock = cache.lock(f'lock:{key}', timeout=LOCK_TIMEOUT)
+    if lock.acquire(blocking=False):
+        try:
+            return _store(key, compute, timeout, stale, name)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                # Held past LOCK_TIMEOUT; someone else may own it now
+                pass
+
+    if current is not _MISSING:
+        return current
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            record(name, 'wait')
+            return entry[0]
+    record(name, 'timeout')
+    return _store(key, compute, timeout, stale, name)
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: int = 300, stale: int = 0,
+                   beta: float = 1.0, name: str = 'default') -> Any:
+    """
+    Cached value of key, computed by at most one process at a time.
+
+    Args:
+        key: Cache key
+        compute: Function returning the value
+        timeout: Seconds the value is fresh
+        stale: Seconds an expired value may still be served while it is refreshed
+        beta: Eagerness of early recomputation (0 disables it)
+        name: Name the outcomes are counted under
+
+    Returns:
+        Cached or computed value
+    """
+    entry = cache.get(key)
+    if entry is None:
+        record(name, 'miss')
+        return _refresh(key, compute, timeout, stale, name)
+
+    value, expires_at, delta = entry
+    now = time.time()
+    if now >= expires_at:
+        record(name, 'stale')
+        return _refresh(key, compute, timeout, stale, name, value)
+    record(name, 'hit')
+    # -log(u) is exponential with mean 1: recompute early now and then,
+    # more often the closer the expiry and the slower the computation
+    if beta > 0 and now - delta * beta * math.log(1.0 - random.random()) >= expires_at:
+        record(name, 'early')
+        return _refresh(key, compute, timeout, stale, name, value)
+    return value
+
+
+def cached(key: Callable[..., str], timeout: int = 300, stale: int = 0, beta: float = 1.0, name: str = None):
+    """
+    Decorate a function so its results are cached with get_or_compute.
+
+    Args:
+        key: Function of the same arguments returning the cache key
+        timeout, stale, beta: As for get_or_compute
+        name: Name the outcomes are counted under (default: the function's)
+
+    The undecorated function stays available as .uncached.
+    """
+    def decorator(func):
+        stats_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(key(*args, **kwargs), lambda: func(*args, **kwargs),
+                                  timeout, stale, beta, stats_name)
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,82 @@
+"""
+Deferred signal side effects for bulk writes.
+
+Signal handlers keep caches, rating aggregates, leaderboards, search
+documents and page versions in step with every row they see. That is
+right for one booking or one rating, but a seed, an import or an admin
+action touching 10,000 rows would repeat the same cache deletes,
+generation bumps, dashboard lookups and aggregate updates 10,000 times.
+
+Inside deferred_signals() the helpers marked @deferrable or
+@deferrable_batch only record the call; when the outermost block exits
+each distinct call runs once:
+
+    with deferred_signals():
+        with transaction.atomic():
+            for row in rows:
+                Rating.objects.create(...)
+
+- @deferrable: calls with the same (hashable) arguments collapse into one.
+- @deferrable_batch: the last argument is an iterable of ids; calls
+  with the same leading arguments are merged into one call with the
+  union of the ids.
+
+Wrap the transaction in the block (not the other way round) so the
+effects run after commit and a concurrent reader cannot re-cache the
+old rows. deferred_signals also works as a decorator. Effects run in
+the order they were first recorded, also when the block raises.
+"""
+import threading
+from contextlib import ContextDecorator
+from functools import wraps
+
+_state = threading.local()
+
+
+def deferring() -> bool:
+    """True inside deferred_signals()."""
+    return getattr(_state, 'depth', 0) > 0
+
+
+class deferred_signals(ContextDecorator):
+    """Collect deferrable side effects and run each distinct one once at exit."""
+
+    def __enter__(self):
+        if not deferring():
+            _state.pending = {}
+        _state.depth = getattr(_state, 'depth', 0) + 1
+        return self
+
+    def __exit__(self, *exc_info):
+        _state.depth -= 1
+        if not deferring():
+            pending, _state.pending = _state.pending, {}
+            for (func, args), ids in pending.items():
+                if ids is None:
+                    func(*args)
+                else:
+                    func(*args, ids)
+        return False
+
+
+def deferrable(func):
+    """Run func now, or once per distinct arguments at the end of a deferred block."""
+    @wraps(func)
+    def wrapper(*args):
+        if deferring():
+            _state.pending.setdefault((func, args), None)
+            return None
+        return func(*args)
+    return wrapper
+
+
+def deferrable_batch(func):
+    """Run func now, or once per leading arguments with all ids merged at the end of a deferred block."""
+    @wraps(func)
+    def wrapper(*args):
+        *leading, ids = args
+        if deferring():
+            _state.pending.setdefault((func, tuple(leading)), set()).update(ids)
+            return None
+        return func(*args)
+    return wrapper
@@ -0,0 +1,134 @@
+"""
+Resized derivatives of uploaded photos.
+
+Uploaded photos (often multi-megabyte phone pictures) are kept as the
+original, and a Celery task renders smaller copies of each:
+
+    thumb  160x160 square crop
+    card   480x360 crop, the 4:3 salon card
+    full   fit within 1280x1280
+
+each as WebP and JPEG. Orientation from EXIF is applied to the pixels and
+all metadata (EXIF, GPS, ICC, comments) is dropped. Derivative file names
+are derived from a hash of the original's bytes and PIPELINE_VERSION, so
+they are immutable (safe to cache forever), identical uploads share them,
+and changing the pipeline produces new names.
+
+The names are stored on the model in a JSON column next to the image
+field (photo -> photo_derivatives):
+
+    {'source': 'salon_photos/a.jpg', 'sizes': {'card': {'webp': 'derived/..', 'jpeg': '..'}, ...}}
+
+'source' records which upload they were made from, so a replaced photo is
+detected without another query.
+"""
+import hashlib
+import io
+from typing import Dict, Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+PIPELINE_VERSION = 1
+
+# name: (width, height, crop)
+SIZES = {
+    'thumb': (160, 160, True),
+    'card': (480, 360, True),
+    'full': (1280, 1280, False),
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DERIVATIVES_DIR = 'derived'
+
+# (app_label.ModelName, image field) pairs that get derivatives; the JSON
+# column is always f'{field}_derivatives'
+IMAGE_FIELDS = [
+    ('salons.Salon', 'photo'),
+    ('accounts.SalonManagerProfile', 'salon_photo'),
+    ('accounts.CustomerProfile', 'selfie_photo'),
+]
+
+
+def derivatives_field(field_name: str) -> str:
+    return f'{field_name}_derivatives'
+
+
+def _content_hash(data: bytes) -> str:
+    digest = hashlib.sha256(data)
+    digest.update(f'pipeline-{PIPELINE_VERSION}'.encode())
+    return digest.hexdigest()[:32]
+
+
+def _render(image: Image.Image, width: int, height: int, crop: bool) -> Image.Image:
+    if crop:
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return resized
+
+
+def render_derivatives(source_name: str, storage=default_storage) -> Dict:
+    """
+    Render and store every derivative of one stored image.
+
+    Pure storage work (no database access), so it can run in a Celery
+    worker or a process pool. Derivatives that already exist under their
+    content-hashed name are not rendered again. Raises OSError (including
+    PIL.UnidentifiedImageError) for unreadable files.
+    """
+    with storage.open(source_name, 'rb') as source:
+        data = source.read()
+    content_hash = _content_hash(data)
+
+    names = {
+        size: {fmt: f'{DERIVATIVES_DIR}/{content_hash[:2]}/{content_hash}-{size}.{"jpg" if fmt == "jpeg" else fmt}'
+               for fmt in FORMATS}
+        for size in SIZES
+    }
+    missing = [(size, fmt) for size in SIZES for fmt in FORMATS if not storage.exists(names[size][fmt])]
+    if missing:
+        with Image.open(io.BytesIO(data)) as original:
+            # Bake the EXIF orientation into the pixels; nothing else of
+            # the metadata survives the re-encode below
+            image = ImageOps.exif_transpose(original)
+            image = image.convert('RGB')
+        for size, fmt in missing:
+            width, height, crop = SIZES[size]
+            pil_format, options = FORMATS[fmt]
+            buffer = io.BytesIO()
+            _render(image, width, height, crop).save(buffer, pil_format, **options)
+            storage.save(names[size][fmt], ContentFile(buffer.getvalue()))
+
+    return {'source': source_name, 'sizes': names}
+
+
+def derivative_url(derivatives: Optional[Dict], size: str, fmt: str = 'webp') -> Optional[str]:
+    """URL of one derivative, or None until it has been rendered."""
+    name = ((derivatives or {}).get('sizes') or {}).get(size, {}).get(fmt)
+    return default_storage.url(name) if name else None
+
+
+def derivative_urls(derivatives: Optional[Dict], request=None) -> Optional[Dict]:
+    """{size: {format: url}} for serializers, absolute when a request is given."""
+    sizes = (derivatives or {}).get('sizes')
+    if not sizes:
+        return None
+    urls = {}
+    for size, formats in sizes.items():
+        urls[size] = {}
+        for fmt, name in formats.items():
+            url = default_storage.url(name)
+            urls[size][fmt] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def needs_derivatives(instance, field_name: str) -> bool:
+    """True when the image field holds a file its derivatives were not made from."""
+    name = getattr(instance, field_name).name or ''
+    return bool(name) and (getattr(instance, derivatives_field(field_name)) or {}).get('source') != name
@@ -0,0 +1,215 @@
+"""
+Process-local cache tier in front of the Django cache.
+
+Some small objects are read on nearly every request (compiled salon
+schedules, the active FAQ set) and change rarely, yet each read costs a
+Redis round trip plus unpickling, or a query. A LocalCache keeps them in
+the process, in a size-bounded LRU per namespace:
+
+    _schedules = LocalCache('salon_schedules', ttl=300, max_entries=5000, max_bytes=32 * 1024 * 1024)
+
+    schedule = _schedules.get(salon_id, lambda: load_from_redis_or_db(salon_id))
+    _schedules.invalidate([salon_id])
+
+invalidate() drops the keys here and publishes them on the CHANNEL
+Redis pub/sub channel; every process that uses a LocalCache (web
+workers, Celery, the Telegram bot) runs a listener thread that drops
+them too, within milliseconds. Values are only kept while the listener
+is subscribed, and everything is dropped when it reconnects, so a
+missed message cannot leave a stale entry; ttl bounds what is left.
+
+Values are shared by every thread of the process: treat them as
+read-only. Hits, misses, evictions and invalidations are counted under
+'local:<namespace>' (see apps.core.caching.cache_stats); info() reports
+the entries and bytes held by this process.
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.core.cache import cache
+
+from .caching import record
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'local_cache'
+RECONNECT_DELAY = 1
+
+_namespaces: Dict[str, 'LocalCache'] = {}
+_origin = uuid.uuid4().hex
+_listener_pid = None
+_listener_lock = threading.Lock()
+_subscribed = threading.Event()
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def _ensure_listener() -> None:
+    """Start this process's invalidation listener (again after a fork)."""
+    global _listener_pid, _origin
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        if _listener_pid is not None:
+            # A forked child: the parent's entries and listener are not ours
+            _origin = uuid.uuid4().hex
+            _subscribed.clear()
+            for namespace in _namespaces.values():
+                namespace._drop()
+        _listener_pid = os.getpid()
+        threading.Thread(target=_listen, name='local-cache-invalidation', daemon=True).start()
+
+
+def _listen() -> None:
+    pid = os.getpid()
+    while _listener_pid == pid:
+        try:
+            pubsub = _redis().pubsub()
+            pubsub.subscribe(cache.make_key(CHANNEL))
+            for message in pubsub.listen():
+                if message['type'] == 'subscribe':
+                    # Anything published while we were away is lost: start over
+                    for namespace in _namespaces.values():
+                        namespace._drop()
+                    _subscribed.set()
+                elif message['type'] == 'message':
+                    _apply(json.loads(message['data']))
+        except Exception:
+            logger.exception("Local cache invalidation listener disconnected")
+        _subscribed.clear()
+        for namespace in _namespaces.values():
+            namespace._drop()
+        time.sleep(RECONNECT_DELAY)
+
+
+def _apply(message: dict) -> None:
+    namespace = _namespaces.get(message['namespace'])
+    if namespace is not None and message['origin'] != _origin:
+        namespace._drop(message['keys'])
+
+
+def listening(timeout: float = 0) -> bool:
+    """True once this process receives invalidations (waiting up to timeout seconds)."""
+    _ensure_listener()
+    return _subscribed.wait(timeout)
+
+
+class LocalCache:
+    """Size-bounded LRU of one namespace, invalidated across processes."""
+
+    def __init__(self, namespace: str, ttl: int, max_entries: int, max_bytes: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats_name = f'local:{namespace}'
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+        _namespaces[namespace] = self
+
+    def get(self, key, load: Callable[[], Any]) -> Any:
+        """Value of key, loaded with load() (from Redis or the database) on a miss."""
+        return self.get_many([key], lambda keys: {key: load()})[key]
+
+    def get_many(self, keys: Iterable, load_many: Callable[[list], dict]) -> dict:
+        """Values of several keys; load_many(missing keys) returns {key: value} for the misses."""
+        _ensure_listener()
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    missing.append(key)
+            epoch = self._epoch
+        if found:
+            record(self.stats_name, 'hit', len(found))
+        if missing:
+            record(self.stats_name, 'miss', len(missing))
+            loaded = load_many(missing)
+            self._put(loaded, epoch)
+            found.update(loaded)
+        return found
+
+    def _put(self, values: dict, epoch: int) -> None:
+        if not _subscribed.is_set():
+            # Without the listener an entry could outlive an invalidation
+            return
+        sized = {}
+        for key, value in values.items():
+            size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            if size <= self.max_bytes:
+                sized[key] = (value, size)
+        evicted = 0
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if epoch != self._epoch:
+                # Invalidated while loading: the values may predate it
+                return
+            for key, (value, size) in sized.items():
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[2]
+                self._entries[key] = (value, expires_at, size)
+                self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                evicted += 1
+        if evicted:
+            record(self.stats_name, 'evict', evicted)
+
+    def _drop(self, keys: Optional[Iterable] = None) -> None:
+        with self._lock:
+            self._epoch += 1
+            if keys is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._bytes -= entry[2]
+
+    def invalidate(self, keys: Optional[Iterable] = None) -> None:
+        """
+        Drop keys (all of the namespace when None) here and in every other process.
+
+        Args:
+            keys: Keys to drop; ints and strings only, as they travel as JSON
+        """
+        keys = None if keys is None else list(keys)
+        self._drop(keys)
+        record(self.stats_name, 'invalidate')
+        try:
+            _redis().publish(cache.make_key(CHANNEL), json.dumps({
+                'origin': _origin, 'namespace': self.namespace, 'keys': keys,
+            }))
+        except Exception:
+            # Other processes fall back on ttl
+            logger.exception("Could not publish local cache invalidation of %s", self.namespace)
+
+    def info(self) -> dict:
+        """Entries and bytes this process holds for the namespace, and its limits."""
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'bytes': self._bytes,
+                'max_entries': self.max_entries, 'max_bytes': self.max_bytes, 'ttl': self.ttl,
+            }
@@ -0,0 +1,58 @@
+"""
+Render resized copies for images uploaded before the derivative pipeline
+(or after PIPELINE_VERSION changed, with --force).
+
+Rendering is CPU bound, so it runs in a pool of worker processes; the
+workers only touch storage and the parent process writes the results to
+the database, one UPDATE per image.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core.images import IMAGE_FIELDS, derivatives_field, render_derivatives
+from apps.core.tasks import store_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/card/full WebP and JPEG copies of uploaded photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have derivatives')
+
+    def pending(self, force):
+        """(model, pk, field, source name) of every image lacking derivatives."""
+        for model_label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            rows = model.objects.exclude(**{field_name: ''}).values_list(
+                'pk', field_name, derivatives_field(field_name)
+            ).iterator()
+            for pk, source, derivatives in rows:
+                if force or (derivatives or {}).get('source') != source:
+                    yield model, pk, field_name, source
+
+    def handle(self, *args, **options):
+        jobs = list(self.pending(options['force']))
+        self.stdout.write(f'{len(jobs)} images to process with {options["workers"]} workers')
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(render_derivatives, job[3]): job for job in jobs}
+            for future in as_completed(futures):
+                model, pk, field_name, source = futures[future]
+                try:
+                    derivatives = future.result()
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f'{model._meta.label} {pk} ({source}): {exc}')
+                    continue
+                if store_derivatives(model, pk, field_name, derivatives):
+                    done += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{done} images updated, {failed} failed'))
@@ -0,0 +1,110 @@
+"""
+Benchmark cache invalidation under write load: KEYS scans against
+generation counters.
+
+Fills Redis with --keys filler entries (plus a few "listing" entries
+that writers invalidate and refill), then runs a reader that times GETs
+of a hot key for --seconds while --writers threads invalidate as fast as
+they can, in three phases:
+- idle: no writers
+- keys scan: KEYS on a pattern, then DEL of the matches, as
+  invalidate_cache_pattern used to do. KEYS walks the whole keyspace
+  and blocks every other client meanwhile.
+- generation: apps.core.utils.bump_cache_generations, one pipelined
+  INCR per namespace
+Everything is written under a bench_cache prefix and removed (with
+SCAN) at the end.
+"""
+import statistics
+import threading
+import time as clock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from apps.core.utils import bump_cache_generations
+
+PREFIX = 'bench_cache'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Redis read latency while caches are invalidated by KEYS scans or generation bumps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=200000)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        conn = get_redis_connection('default')
+        try:
+            self.seed(conn, options['keys'])
+            for label, invalidate in [('idle', None), ('keys scan', self.scan), ('generation', self.bump)]:
+                latencies, writes = self.run(invalidate, options['writers'], options['seconds'])
+                latencies.sort()
+                self.stdout.write(
+                    f'{label:>10}  {writes:>7} invalidations  '
+                    f'p50 {statistics.median(latencies) * 1000:6.2f} ms  '
+                    f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms  '
+                    f'max {latencies[-1] * 1000:7.2f} ms  {len(latencies):>7} reads'
+                )
+        finally:
+            self.cleanup(conn)
+
+    def seed(self, conn, count):
+        started = clock.perf_counter()
+        pipe = conn.pipeline(transaction=False)
+        for i in range(count):
+            pipe.set(cache.make_key(f'{PREFIX}:filler_{i}'), i, ex=3600)
+            if i % 10000 == 9999:
+                pipe.execute()
+        pipe.execute()
+        cache.set(f'{PREFIX}:hot', 'x', 3600)
+        self.stdout.write(f'seeded {count} keys in {clock.perf_counter() - started:.1f} s')
+
+    def run(self, invalidate, writers, seconds):
+        stop = threading.Event()
+        latencies, writes = [], []
+
+        def read():
+            while not stop.is_set():
+                started = clock.perf_counter()
+                cache.get(f'{PREFIX}:hot')
+                latencies.append(clock.perf_counter() - started)
+
+        def write(worker):
+            conn = get_redis_connection('default')
+            done = 0
+            while not stop.is_set():
+                invalidate(conn, worker)
+                done += 1
+            writes.append(done)
+
+        threads = [threading.Thread(target=read)]
+        if invalidate:
+            threads += [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+        for thread in threads:
+            thread.start()
+        clock.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return latencies, sum(writes)
+
+    @staticmethod
+    def scan(conn, worker):
+        keys = conn.keys(cache.make_key(f'{PREFIX}:list_{worker}_*'))
+        if keys:
+            conn.delete(*keys)
+        cache.set_many({f'{PREFIX}:list_{worker}_{page}': page for page in range(5)}, 3600)
+
+    @staticmethod
+    def bump(conn, worker):
+        bump_cache_generations([f'{PREFIX}_catalog', f'{PREFIX}_feedback_{worker}'])
+
+    def cleanup(self, conn):
+        keys = list(conn.scan_iter(cache.make_key(f'{PREFIX}*'), count=10000))
+        keys += list(conn.scan_iter(cache.make_key(f'generation:{PREFIX}*')))
+        for start in range(0, len(keys), 10000):
+            conn.delete(*keys[start:start + 10000])
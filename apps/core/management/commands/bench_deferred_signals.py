@@ -0,0 +1,130 @@
+"""
+Benchmark per-row signal side effects against deferred_signals().
+
+Creates --salons salons with --stylists stylists each and --rows
+completed and pending appointments (bulk, no signals) inside a
+transaction that is rolled back at the end, then times two bulk
+operations, each once with the per-row handlers and once inside
+apps.core.deferred.deferred_signals(), rolled back to a savepoint in
+between:
+- rate: Rating.objects.create for every completed appointment
+- confirm: load and save every pending appointment as confirmed
+Leaderboard updates and notifications wait for on_commit, so they are
+not part of either timing.
+"""
+import random
+import time as clock
+from contextlib import nullcontext
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.accounts.models import CustomerProfile, SalonManagerProfile, StylistProfile
+from apps.appointments.models import Appointment
+from apps.core.deferred import deferred_signals
+from apps.ratings.models import Rating
+from apps.salons.models import Salon, Service
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk writes with per-row and deferred signal side effects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--salons', type=int, default=20)
+        parser.add_argument('--stylists', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                for label, operation in [('rate', self.rate), ('confirm', self.confirm)]:
+                    for mode, context in [('per row', nullcontext), ('deferred', deferred_signals)]:
+                        savepoint = transaction.savepoint()
+                        queries = []
+                        with connection.execute_wrapper(self.counter(queries)):
+                            started = clock.perf_counter()
+                            with context():
+                                operation()
+                            elapsed = clock.perf_counter() - started
+                        transaction.savepoint_rollback(savepoint)
+                        self.stdout.write(
+                            f'{label:>8} {mode:<9} {options["rows"]:>6} rows  {elapsed:7.2f} s  '
+                            f'{len(queries):>6} queries'
+                        )
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def counter(queries):
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+        return count
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        started = clock.perf_counter()
+
+        customer_user = User.objects.create_user(phone_number='09399997000', password='x', user_type='customer')
+        customer = CustomerProfile.objects.create(
+            user=customer_user, first_name='مشتری', last_name='بنچمارک',
+            gender='male', date_of_birth=date(1995, 1, 1)
+        )
+        stylists, services = [], {}
+        for s in range(options['salons']):
+            user = User.objects.create_user(phone_number=f'09399997{s + 1:03d}', password='x',
+                                            user_type='salon_manager')
+            manager = SalonManagerProfile.objects.create(
+                user=user, salon_name='بنچمارک', salon_address='تهران',
+                salon_gender_type='male', is_approved=True
+            )
+            salon = Salon.objects.create(manager=manager, name=f'سالن {s}', address='تهران', gender_type='male')
+            services[salon.id] = Service.objects.create(
+                salon=salon, service_type='haircut', price=100000, duration_minutes=30
+            )
+            for t in range(options['stylists']):
+                user = User.objects.create_user(
+                    phone_number=f'0939998{s:02d}{t:02d}', password='x', user_type='stylist'
+                )
+                stylists.append(StylistProfile.objects.create(
+                    user=user, salon=salon, first_name='آرایشگر', last_name=f'{t}', is_temporary=False
+                ))
+
+        # One slot per (stylist, day, hour); completed ones in the past, pending ones ahead
+        today = date.today()
+        appointments = []
+        for status, sign in [('completed', -1), ('pending', 1)]:
+            for i in range(options['rows']):
+                stylist = stylists[i % len(stylists)]
+                slot = i // len(stylists)
+                appointments.append(Appointment(
+                    customer=customer, stylist=stylist, service=services[stylist.salon_id], status=status,
+                    appointment_date=today + sign * timedelta(days=1 + slot // 10),
+                    appointment_time=time(8 + slot % 10, 0),
+                ))
+        Appointment.objects.bulk_create(appointments, batch_size=2000)
+        self.values = [rng.randint(1, 5) for _ in range(options['rows'])]
+        self.stdout.write(f'seeded {len(appointments)} appointments in {clock.perf_counter() - started:.1f} s')
+
+    def rate(self):
+        completed = Appointment.objects.filter(status='completed').select_related('customer', 'stylist')
+        for appointment, value in zip(completed.order_by('id'), self.values):
+            Rating.objects.create(
+                customer=appointment.customer, stylist=appointment.stylist, appointment=appointment, rating=value
+            )
+
+    def confirm(self):
+        for appointment in Appointment.objects.filter(status='pending').order_by('id'):
+            appointment.status = 'confirmed'
+            appointment.save()
@@ -15,3 +15,34 @@ class TimeStampedModel(models.Model):
     class Meta:
         abstract = True
         ordering = ['-created_at']
+
+
+class RatingAggregatesModel(models.Model):
+    """
+    Abstract base model with denormalized rating totals: the sum, the count
+    and how many ratings of each value (1-5).
+
+    Maintained incrementally with F() updates by apps.ratings.aggregates
+    in the same transaction as the rating write; reconcile_rating_aggregates
+    recomputes them from the ratings table.
+    """
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name="مجموع امتیازها")
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="تعداد امتیازها")
+    ratings_1 = models.PositiveIntegerField(default=0, editable=False, verbose_name="امتیازهای ۱")
+    ratings_2 = models.PositiveIntegerField(default=0, editable=False, verbose_name="امتیازهای ۲")
+    ratings_3 = models.PositiveIntegerField(default=0, editable=False, verbose_name="امتیازهای ۳")
+    ratings_4 = models.PositiveIntegerField(default=0, editable=False, verbose_name="امتیازهای ۴")
+    ratings_5 = models.PositiveIntegerField(default=0, editable=False, verbose_name="امتیازهای ۵")
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rating_average(self):
+        """Mean rating, 0 without ratings."""
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else 0
+
+    @property
+    def rating_histogram(self):
+        """{rating value: number of ratings} for 1-5."""
+        return {value: getattr(self, f'ratings_{value}') for value in range(1, 6)}
@@ -0,0 +1,82 @@
+"""
+Persian-aware text search helpers.
+
+Searchable text is normalized once, on write, into dedicated columns
+(Salon.search_name/search_document, Review.search_text) that carry
+trigram GIN indexes. Queries are normalized the same way and matched
+with LIKE '%term%', which the trigram index answers without scanning,
+so search never applies functions to the stored columns at query time.
+
+Normalization folds the variants people actually type:
+- Arabic ي/ى/ك and ة/ۀ to Persian ی/ک/ه, and آ/أ/إ to ا
+- Persian and Arabic digits to ASCII
+- ZWNJ and other joiners/direction marks dropped, so "می‌خواهم" and
+  "میخواهم" are the same word (and "می خواهم" still matches term by term)
+- tatweel and Arabic diacritics removed, whitespace collapsed, lowercased
+"""
+import re
+from typing import List
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+CHARACTER_MAP = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه',
+    'آ': 'ا', 'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u200c': None, '\u200d': None, '\u200e': None, '\u200f': None, '\u00a0': ' ',
+})
+
+DIGITS_TO_ASCII = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+# Tatweel and Arabic diacritics (fathatan .. sukun, superscript alef)
+_IGNORED = re.compile('[\u0640\u064b-\u065f\u0670]')
+_SPACES = re.compile(r'\s+')
+
+MIN_TERM_LENGTH = 2
+MAX_TERMS = 5
+
+
+def normalize_persian(text: str) -> str:
+    """Fold a text into the canonical form stored in search columns."""
+    if not text:
+        return ''
+    text = text.translate(CHARACTER_MAP).translate(DIGITS_TO_ASCII)
+    text = _IGNORED.sub('', text)
+    return _SPACES.sub(' ', text).strip().lower()
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user query into normalized terms, dropping ones too short to index."""
+    terms = [term for term in normalize_persian(query).split(' ') if len(term) >= MIN_TERM_LENGTH]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def match_all_terms(terms: List[str], field: str) -> Q:
+    """Every term must occur in the search column (each is an index-backed LIKE)."""
+    condition = Q()
+    for term in terms:
+        condition &= Q(**{f'{field}__contains': term})
+    return condition
+
+
+def rank_terms(terms: List[str], weighted_fields: List[tuple]):
+    """
+    Score rows by where each term matches.
+
+    weighted_fields is [(field, weight_if_prefix, weight_if_contained)];
+    for each term the best matching field counts, and the scores of all
+    terms are summed. Only rows that already passed match_all_terms are
+    ranked, so this never drives the scan.
+    """
+    score = Value(0)
+    for term in terms:
+        whens = []
+        for field, prefix_weight, contained_weight in weighted_fields:
+            whens.append(When(Q(**{f'{field}__startswith': term}), then=Value(prefix_weight)))
+            whens.append(When(Q(**{f'{field}__contains': f' {term}'}), then=Value(contained_weight + 1)))
+            whens.append(When(Q(**{f'{field}__contains': term}), then=Value(contained_weight)))
+        score = score + Coalesce(Case(*whens, output_field=IntegerField()), Value(0))
+    return score
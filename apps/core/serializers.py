@@ -0,0 +1,23 @@
+"""
+Shared REST Framework serializer fields.
+"""
+from rest_framework import serializers
+
+from .images import derivative_urls
+
+
+class ImageDerivativesField(serializers.Field):
+    """
+    Read-only URLs of an image field's resized copies:
+    {'thumb': {'webp': url, 'jpeg': url}, 'card': {...}, 'full': {...}},
+    or null until they have been rendered (clients fall back to the original).
+
+    Usage: photo_sizes = ImageDerivativesField(source='photo_derivatives')
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return derivative_urls(value, self.context.get('request'))
@@ -0,0 +1,33 @@
+"""
+Queue image derivative rendering when a registered image field changes.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import Signal
+
+from .images import IMAGE_FIELDS, needs_derivatives
+
+# Sent by the derivative task after it stored new derivatives with a
+# queryset update (so no post_save); arguments: pk, field_name, derivatives
+derivatives_ready = Signal()
+
+
+def queue_derivatives(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .tasks import generate_image_derivatives
+
+    label = sender._meta.label
+    for model_label, field_name in IMAGE_FIELDS:
+        if model_label == label and needs_derivatives(instance, field_name):
+            transaction.on_commit(
+                lambda pk=instance.pk, field_name=field_name: generate_image_derivatives.delay(label, pk, field_name)
+            )
+
+
+def connect_image_signals():
+    for model_label in {label for label, _ in IMAGE_FIELDS}:
+        post_save.connect(
+            queue_derivatives, sender=apps.get_model(model_label), dispatch_uid=f'image_derivatives:{model_label}'
+        )
@@ -0,0 +1,40 @@
+"""
+Celery tasks for shared infrastructure.
+"""
+import logging
+
+from celery import shared_task
+from django.apps import apps
+
+from .images import derivatives_field, render_derivatives
+from .signals import derivatives_ready
+
+logger = logging.getLogger(__name__)
+
+
+def store_derivatives(model, pk, field_name: str, derivatives: dict) -> bool:
+    """
+    Save rendered derivatives on a row, unless its image was replaced in
+    the meantime (the newer upload has its own task queued).
+    """
+    updated = model.objects.filter(pk=pk, **{field_name: derivatives['source']}).update(
+        **{derivatives_field(field_name): derivatives}
+    )
+    if updated:
+        derivatives_ready.send(sender=model, pk=pk, field_name=field_name, derivatives=derivatives)
+    return bool(updated)
+
+
+@shared_task(ignore_result=True)
+def generate_image_derivatives(model_label: str, pk, field_name: str):
+    """Render the resized copies of one row's image field."""
+    model = apps.get_model(model_label)
+    source = model.objects.filter(pk=pk).values_list(field_name, flat=True).first()
+    if not source:
+        return
+    try:
+        derivatives = render_derivatives(source)
+    except OSError:
+        logger.exception('Cannot render derivatives of %s %s.%s (%s)', model_label, pk, field_name, source)
+        return
+    store_derivatives(model, pk, field_name, derivatives)
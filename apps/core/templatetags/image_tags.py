@@ -0,0 +1,19 @@
+"""
+Template access to resized photo copies (apps.core.images).
+"""
+from django import template
+
+from apps.core.images import derivative_url
+
+register = template.Library()
+
+
+@register.filter
+def derivative(derivatives, spec):
+    """
+    URL of one derivative, '' until rendered.
+
+    {{ salon.photo_derivatives|derivative:"card.webp" }}
+    """
+    size, _, fmt = spec.partition('.')
+    return derivative_url(derivatives, size, fmt or 'webp') or ''
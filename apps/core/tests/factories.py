@@ -0,0 +1,75 @@
+"""
+Shared fixtures for the tests of every app.
+"""
+from datetime import date, time
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.accounts.models import CustomerProfile, SalonManagerProfile, StylistProfile
+from apps.appointments.models import Appointment
+from apps.salons.models import Salon, Service, WorkingHours
+
+User = get_user_model()
+
+_phone_counter = count(1)
+
+
+def next_phone():
+    """Return a unique valid Iranian phone number."""
+    return f'0935{next(_phone_counter):07d}'
+
+
+class FixturesMixin:
+    """Factory helpers for salons, their stylists, services and hours, customers and bookings."""
+
+    def make_customer(self, gender='male'):
+        user = User.objects.create_user(phone_number=next_phone(), password='pass123', user_type='customer')
+        return CustomerProfile.objects.create(
+            user=user,
+            first_name='مشتری',
+            last_name='تست',
+            selfie_photo=SimpleUploadedFile("photo.jpg", b"content", content_type="image/jpeg"),
+            gender=gender,
+            date_of_birth=date(1995, 5, 10)
+        )
+
+    def make_salon(self, gender='male', **fields):
+        user = User.objects.create_user(phone_number=next_phone(), password='pass123', user_type='salon_manager')
+        manager = SalonManagerProfile.objects.create(
+            user=user,
+            salon_name='سالن',
+            salon_address='تهران',
+            salon_gender_type=gender,
+            is_approved=True
+        )
+        fields.setdefault('name', 'سالن')
+        fields.setdefault('address', 'تهران')
+        return Salon.objects.create(manager=manager, gender_type=gender, **fields)
+
+    def make_stylist(self, salon, **fields):
+        user = User.objects.create_user(phone_number=next_phone(), password='pass123', user_type='stylist')
+        fields.setdefault('first_name', 'آرایشگر')
+        fields.setdefault('last_name', 'تست')
+        fields.setdefault('is_temporary', False)
+        return StylistProfile.objects.create(user=user, salon=salon, **fields)
+
+    def make_service(self, salon, duration=30, **fields):
+        fields.setdefault('service_type', 'haircut')
+        fields.setdefault('price', 100000)
+        return Service.objects.create(salon=salon, duration_minutes=duration, **fields)
+
+    def open_all_week(self, salon, start=time(9, 0), end=time(18, 0)):
+        for day in range(7):
+            WorkingHours.objects.create(salon=salon, day_of_week=day, start_time=start, end_time=end)
+
+    def book(self, customer, stylist, service, on_date, at, status='confirmed'):
+        return Appointment.objects.create(
+            customer=customer,
+            stylist=stylist,
+            service=service,
+            appointment_date=on_date,
+            appointment_time=at,
+            status=status
+        )
@@ -0,0 +1,119 @@
+"""
+Tests for generation-based cache namespaces.
+"""
+from contextlib import contextmanager
+from datetime import date, time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from redis.client import Pipeline, Redis
+from rest_framework.test import APIClient
+
+from apps.core.deferred import deferred_signals
+from apps.core.utils import (
+    SALON_CATALOG, bump_cache_generation, bump_cache_generations, get_cache_generation,
+    get_cache_generations, invalidate_salon_cache, namespaced_key, salon_namespace, stylist_namespace,
+)
+from apps.ratings.models import Rating
+from .factories import FixturesMixin
+
+
+@contextmanager
+def redis_round_trips():
+    """Record every command sent to Redis; a pipeline counts as one round trip of several commands."""
+    trips = []
+    send, flush = Redis.execute_command, Pipeline.execute
+
+    def execute_command(self, *args, **options):
+        trips.append([args[0]])
+        return send(self, *args, **options)
+
+    def execute(self, *args, **kwargs):
+        trips.append([command[0][0] for command in self.command_stack])
+        return flush(self, *args, **kwargs)
+
+    with mock.patch.object(Redis, 'execute_command', execute_command), mock.patch.object(Pipeline, 'execute', execute):
+        yield trips
+
+
+class CacheGenerationsTestCase(FixturesMixin, TestCase):
+    """Test that invalidation is an INCR per namespace, pipelined, and never scans keys."""
+
+    def setUp(self):
+        self.conn = get_redis_connection('default')
+        self.names = ['test_ns_a', 'test_ns_b']
+        self.conn.delete(*[cache.make_key(f'generation:{name}') for name in self.names])
+
+    def test_bump_makes_old_entries_unreachable(self):
+        key = namespaced_key('test_ns_a', 'page-1')
+        cache.set(key, 'old')
+
+        generation = bump_cache_generation('test_ns_a')
+
+        self.assertEqual(get_cache_generation('test_ns_a'), generation)
+        self.assertNotEqual(namespaced_key('test_ns_a', 'page-1'), key)
+        self.assertIsNone(cache.get(namespaced_key('test_ns_a', 'page-1')))
+
+    def test_lost_counter_never_reuses_a_generation(self):
+        for _ in range(3):
+            bump_cache_generation('test_ns_a')
+        before = get_cache_generation('test_ns_a')
+
+        self.conn.delete(cache.make_key('generation:test_ns_a'))
+
+        self.assertGreater(get_cache_generation('test_ns_a'), before)
+
+    def test_many_namespaces_in_one_round_trip(self):
+        bump_cache_generation('test_ns_a')
+
+        with redis_round_trips() as trips:
+            generations = get_cache_generations(self.names)
+        # One MGET, then one pipeline starting the counter that did not exist
+        self.assertEqual(trips, [['MGET'], ['SET', 'GET']])
+
+        with redis_round_trips() as trips:
+            bumped = bump_cache_generations(self.names)
+        self.assertEqual(trips, [['SET', 'INCRBY', 'SET', 'INCRBY']])
+        self.assertEqual(bumped, {name: generations[name] + 1 for name in self.names})
+
+    def test_deferred_bumps_share_one_pipeline(self):
+        with redis_round_trips() as trips:
+            with deferred_signals():
+                for salon_id in (1, 2, 2, 3):
+                    invalidate_salon_cache(salon_id)
+                self.assertEqual(trips, [])
+
+        self.assertEqual(len(trips), 1)
+        self.assertEqual(trips[0].count('INCRBY'), 4)
+
+    def test_rating_write_never_scans_keys(self):
+        salon = self.make_salon()
+        stylist = self.make_stylist(salon)
+        customer = self.make_customer()
+        appointment = self.book(customer, stylist, self.make_service(salon), date(2026, 1, 1), time(10, 0),
+                                status='completed')
+        before = get_cache_generations([SALON_CATALOG, salon_namespace(salon.id), stylist_namespace(stylist.id)])
+
+        with redis_round_trips() as trips:
+            Rating.objects.create(customer=customer, stylist=stylist, appointment=appointment, rating=5)
+
+        commands = [command for trip in trips for command in trip]
+        self.assertNotIn('KEYS', commands)
+        self.assertNotIn('SCAN', commands)
+        after = get_cache_generations(before)
+        self.assertTrue(all(after[name] > before[name] for name in before))
+
+    def test_salon_list_refreshes_after_a_change(self):
+        salon = self.make_salon(name='قدیمی')
+        self.make_service(salon)
+        client = APIClient()
+        url = reverse('salons:api_salon_list')
+
+        self.assertIn('قدیمی', [card['name'] for card in client.get(url).data['results']])
+        salon.name = 'جدید'
+        salon.save()
+
+        self.assertIn('جدید', [card['name'] for card in client.get(url).data['results']])
@@ -0,0 +1,149 @@
+"""
+Tests for coalescing signal side effects of bulk writes.
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from apps.core.deferred import deferrable, deferrable_batch, deferred_signals, deferring
+from apps.ratings.leaderboards import AUDIENCES, board_key, top
+from apps.ratings.models import Rating
+from apps.salons.dashboard import DASHBOARD_CACHE_KEY
+from apps.salons.models import Salon
+from .factories import FixturesMixin
+
+calls = []
+
+
+@deferrable
+def record(name):
+    calls.append(name)
+
+
+@deferrable_batch
+def record_ids(kind, ids):
+    calls.append((kind, sorted(ids)))
+
+
+class DeferredSignalsTestCase(FixturesMixin, TestCase):
+    """Test the deferral primitives and the handlers that use them."""
+
+    def setUp(self):
+        calls.clear()
+        get_redis_connection('default').delete(
+            *[board_key(kind, gender) for kind in ('salons', 'stylists') for gender in AUDIENCES]
+        )
+        self.salon = self.make_salon()
+        self.stylists = [self.make_stylist(self.salon) for _ in range(3)]
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+
+    def completed(self, count):
+        appointments = []
+        for i in range(count):
+            stylist = self.stylists[i % len(self.stylists)]
+            appointments.append(self.book(self.customer, stylist, self.service, date(2026, 1, 1) + timedelta(days=i),
+                                          time(10, 0), status='completed'))
+        return appointments
+
+    def test_calls_coalesce_until_the_outermost_block_exits(self):
+        with deferred_signals():
+            record('a')
+            with deferred_signals():
+                record('b')
+                record('a')
+                record_ids('x', [1, 2])
+            self.assertEqual(calls, [])
+            record_ids('x', [2, 3])
+            record_ids('y', [1])
+            self.assertTrue(deferring())
+
+        self.assertFalse(deferring())
+        self.assertEqual(calls, ['a', 'b', ('x', [1, 2, 3]), ('y', [1])])
+        record('a')
+        self.assertEqual(calls[-1], 'a')
+
+    def test_effects_run_when_the_block_raises(self):
+        with self.assertRaises(ValueError):
+            with deferred_signals():
+                record('a')
+                raise ValueError
+        self.assertEqual(calls, ['a'])
+
+    def test_decorator(self):
+        @deferred_signals()
+        def bulk():
+            record('a')
+            record('a')
+            self.assertEqual(calls, [])
+
+        bulk()
+        self.assertEqual(calls, ['a'])
+
+    def test_ratings_are_recounted_once_per_salon(self):
+        appointments = self.completed(30)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with deferred_signals():
+                for appointment in appointments:
+                    Rating.objects.create(customer=self.customer, stylist=appointment.stylist,
+                                          appointment=appointment, rating=4)
+                Rating.objects.filter(appointment=appointments[0]).get().delete()
+                self.assertEqual(Salon.objects.get(pk=self.salon.pk).rating_count, 0)
+
+        self.salon.refresh_from_db()
+        self.assertEqual(self.salon.rating_count, 29)
+        self.assertEqual(self.salon.rating_sum, 116)
+        self.assertEqual(self.salon.total_ratings, 29)
+        self.stylists[1].refresh_from_db()
+        self.assertEqual(self.stylists[1].rating_count, 10)
+        self.assertEqual([pk for pk, _ in top('salons')], [self.salon.id])
+        self.assertEqual(len(top('stylists')), 3)
+
+    def test_bulk_rating_cost_is_one_insert_per_row(self):
+        appointments = self.completed(20)
+
+        # The inserts, then one recount (savepoint, grouped query, read and
+        # bulk update per level, version bump, release) and one dashboard lookup
+        with self.assertNumQueries(20 + 10):
+            with deferred_signals():
+                for appointment in appointments:
+                    Rating.objects.create(customer=self.customer, stylist=appointment.stylist,
+                                          appointment=appointment, rating=5)
+
+    def test_dashboard_dropped_once(self):
+        key = DASHBOARD_CACHE_KEY.format(manager_id=self.salon.manager_id)
+        cache.set(key, {'date': 'cached'})
+        appointments = self.completed(5)
+        cache.set(key, {'date': 'cached'})
+
+        with mock.patch('django.core.cache.cache.delete_many', wraps=cache.delete_many) as delete_many:
+            with deferred_signals():
+                for appointment in appointments:
+                    appointment.status = 'cancelled'
+                    appointment.save()
+                self.assertIsNotNone(cache.get(key))
+
+        self.assertIsNone(cache.get(key))
+        dashboard_deletes = [call for call in delete_many.call_args_list if key in call.args[0]]
+        self.assertEqual(len(dashboard_deletes), 1)
+
+    def test_loaded_appointment_knows_its_status(self):
+        appointment = self.book(self.customer, self.stylists[0], self.service, date(2026, 2, 1), time(10, 0),
+                                status='pending')
+        appointment.refresh_from_db()
+        appointment.status = 'confirmed'
+
+        # The UPDATE and the dashboard lookup; no re-read of the row
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(2):
+                appointment.save()
+        self.assertEqual(appointment._previous_status, 'pending')
+        self.assertEqual(len(callbacks), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            appointment.save()
+        self.assertEqual(callbacks, [])
@@ -0,0 +1,137 @@
+"""
+Tests for the resized photo derivatives.
+"""
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.core.images import render_derivatives
+from apps.core.tasks import generate_image_derivatives, store_derivatives
+from apps.salons.models import Salon
+from .factories import FixturesMixin
+
+ORIENTATION = 0x0112
+GPS_IFD = 0x8825
+
+
+def jpeg_bytes(size=(2000, 1000), rotated=False):
+    """A landscape JPEG carrying GPS EXIF, optionally tagged 'rotate 90° clockwise'."""
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'
+    exif[GPS_IFD] = {1: 'N', 2: (35.0, 42.0, 0.0)}
+    if rotated:
+        exif[ORIENTATION] = 6
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class ImageDerivativesTestCase(FixturesMixin, TestCase):
+    """Test rendering, storage, queuing and exposure of photo derivatives."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def upload(self, data=None, name='photo.jpg'):
+        return SimpleUploadedFile(name, data or jpeg_bytes(), content_type='image/jpeg')
+
+    def open(self, name):
+        with default_storage.open(name) as file:
+            image = Image.open(io.BytesIO(file.read()))
+            image.load()
+        return image
+
+    def test_sizes_and_formats(self):
+        source = default_storage.save('salon_photos/a.jpg', self.upload())
+
+        sizes = render_derivatives(source)['sizes']
+
+        self.assertEqual(self.open(sizes['thumb']['webp']).size, (160, 160))
+        self.assertEqual(self.open(sizes['card']['jpeg']).size, (480, 360))
+        self.assertEqual(self.open(sizes['full']['webp']).size, (1280, 640))
+        self.assertEqual(self.open(sizes['full']['webp']).format, 'WEBP')
+        self.assertEqual(self.open(sizes['full']['jpeg']).format, 'JPEG')
+
+    def test_orientation_applied_and_metadata_stripped(self):
+        source = default_storage.save('salon_photos/a.jpg', self.upload(jpeg_bytes(rotated=True)))
+
+        sizes = render_derivatives(source)['sizes']
+
+        for fmt in ('webp', 'jpeg'):
+            image = self.open(sizes['full'][fmt])
+            self.assertEqual(image.size, (640, 1280))
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_names_follow_content(self):
+        first = default_storage.save('salon_photos/a.jpg', self.upload())
+        copy = default_storage.save('salon_photos/b.jpg', self.upload())
+        other = default_storage.save('salon_photos/c.jpg', self.upload(jpeg_bytes(size=(900, 900))))
+
+        self.assertEqual(render_derivatives(first)['sizes'], render_derivatives(copy)['sizes'])
+        self.assertNotEqual(render_derivatives(first)['sizes'], render_derivatives(other)['sizes'])
+
+    def test_save_queues_task_after_commit(self):
+        with mock.patch.object(generate_image_derivatives, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                salon = self.make_salon(photo=self.upload())
+                delay.assert_not_called()
+        delay.assert_called_once_with('salons.Salon', salon.pk, 'photo')
+
+        generate_image_derivatives('salons.Salon', salon.pk, 'photo')
+        salon.refresh_from_db()
+        self.assertEqual(salon.photo_derivatives['source'], salon.photo.name)
+
+        # Saving again without a new photo queues nothing
+        with mock.patch.object(generate_image_derivatives, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                salon.save()
+        delay.assert_not_called()
+
+    def test_replaced_photo_keeps_newer_upload(self):
+        salon = self.make_salon(photo=self.upload())
+        stale = render_derivatives(salon.photo.name)
+        salon.photo = self.upload(jpeg_bytes(size=(800, 600)), name='new.jpg')
+        salon.save()
+
+        self.assertFalse(store_derivatives(Salon, salon.pk, 'photo', stale))
+        self.assertEqual(Salon.objects.get(pk=salon.pk).photo_derivatives, {})
+
+    def test_ready_derivatives_refresh_cards(self):
+        salon = self.make_salon(photo=self.upload())
+        version = Salon.objects.get(pk=salon.pk).version
+
+        generate_image_derivatives('salons.Salon', salon.pk, 'photo')
+
+        self.assertEqual(Salon.objects.get(pk=salon.pk).version, version + 1)
+
+    def test_serializers_expose_urls(self):
+        salon = self.make_salon(photo=self.upload())
+        url = reverse('salons:api_salon_detail', args=[salon.pk])
+        self.assertIsNone(APIClient().get(url).data['photo_sizes'])
+
+        generate_image_derivatives('salons.Salon', salon.pk, 'photo')
+
+        sizes = APIClient().get(url).data['photo_sizes']
+        self.assertTrue(sizes['card']['webp'].startswith('http://testserver/media/derived/'))
+        self.assertTrue(sizes['thumb']['jpeg'].endswith('-thumb.jpg'))
+
+    def test_unreadable_upload_is_skipped(self):
+        customer = self.make_customer()
+
+        with self.assertLogs('apps.core.tasks', 'ERROR'):
+            generate_image_derivatives('accounts.CustomerProfile', customer.pk, 'selfie_photo')
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.selfie_photo_derivatives, {})
@@ -0,0 +1,122 @@
+"""
+Tests for the process-local cache tier and its pub/sub invalidation.
+"""
+import json
+import time
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from apps.chat.models import FAQ
+from apps.chat.services.faq_matcher import FAQMatcher
+from apps.core.local_cache import CHANNEL, LocalCache, listening
+from apps.salons.models import WorkingHours
+from apps.salons.schedules import get_salon_schedules
+from .factories import FixturesMixin
+
+
+class LocalCacheTestCase(FixturesMixin, TestCase):
+    """Test the LRU bounds, invalidation across processes and the cached schedules and FAQs."""
+
+    def setUp(self):
+        self.assertTrue(listening(timeout=2))
+        self.loads = []
+
+    def local(self, **limits):
+        limits.setdefault('ttl', 60)
+        limits.setdefault('max_entries', 100)
+        limits.setdefault('max_bytes', 1024 * 1024)
+        return LocalCache(f'test_{uuid.uuid4().hex[:8]}', **limits)
+
+    def load_many(self, keys):
+        self.loads.append(sorted(keys))
+        return {key: f'value {key}' for key in keys}
+
+    def test_misses_load_once(self):
+        local = self.local()
+
+        self.assertEqual(local.get_many([1, 2], self.load_many), {1: 'value 1', 2: 'value 2'})
+        self.assertEqual(local.get_many([2, 3], self.load_many), {2: 'value 2', 3: 'value 3'})
+        self.assertEqual(local.get(1, lambda: 'reloaded'), 'value 1')
+
+        self.assertEqual(self.loads, [[1, 2], [3]])
+
+    def test_entries_and_bytes_are_bounded(self):
+        local = self.local(max_entries=3)
+        local.get_many([1, 2, 3], self.load_many)
+        local.get(1, lambda: None)
+        local.get(4, lambda: 'value 4')
+
+        # 2 was the least recently used
+        self.assertEqual(local.get_many([1, 2, 3, 4], self.load_many)[2], 'value 2')
+        self.assertEqual(self.loads[-1], [2])
+        self.assertEqual(local.info()['entries'], 3)
+
+        small = self.local(max_bytes=300)
+        small.get_many(range(3), lambda keys: {key: 'x' * 100 for key in keys})
+        small.get('huge', lambda: 'x' * 1000)
+        self.assertLessEqual(small.info()['bytes'], 300)
+        self.assertEqual(small.info()['entries'], 2)
+
+    def test_expired_entries_reload(self):
+        local = self.local(ttl=0)
+        local.get(1, lambda: 'old')
+
+        self.assertEqual(local.get(1, lambda: 'new'), 'new')
+
+    def test_invalidation_from_another_process(self):
+        local = self.local()
+        local.get_many([1, 2], self.load_many)
+
+        get_redis_connection('default').publish(cache.make_key(CHANNEL), json.dumps({
+            'origin': 'another process', 'namespace': local.namespace, 'keys': [1],
+        }))
+        deadline = time.monotonic() + 2
+        while local.info()['entries'] == 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        local.get_many([1, 2], self.load_many)
+        self.assertEqual(self.loads, [[1, 2], [1]])
+
+    def test_invalidated_while_loading_is_not_kept(self):
+        local = self.local()
+
+        def load():
+            local.invalidate([1])
+            return 'loaded before the change'
+
+        self.assertEqual(local.get(1, load), 'loaded before the change')
+        self.assertEqual(local.get(1, lambda: 'current'), 'current')
+
+    def test_schedules_are_read_from_the_process(self):
+        salon = self.make_salon()
+        self.open_all_week(salon)
+        get_salon_schedules([salon.id])
+
+        with mock.patch('apps.salons.schedules.cache.get_many') as get_many, self.assertNumQueries(0):
+            schedule = get_salon_schedules([salon.id])[salon.id]
+        get_many.assert_not_called()
+        self.assertEqual(schedule['salon'][0], [(540, 1080)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkingHours.objects.filter(salon=salon, day_of_week=0).get().delete()
+        self.assertEqual(get_salon_schedules([salon.id])[salon.id]['salon'].get(0), None)
+
+    def test_faqs_are_matched_without_queries(self):
+        faq = FAQ.objects.create(question='ساعت کاری سالن چیست؟', answer='۹ تا ۱۸', keywords=['ساعت', 'کاری'])
+        matcher = FAQMatcher()
+        self.assertEqual(matcher.find_match('ساعت کاری سالن چیست؟')[0], faq)
+
+        with self.assertNumQueries(1):
+            match, _ = matcher.find_match('ساعت کاری')
+            matcher.increment_view_count(match)
+        self.assertEqual(match, faq)
+
+        faq.refresh_from_db()
+        self.assertEqual(faq.view_count, 1)
+        faq.is_active = False
+        faq.save()
+        self.assertEqual(matcher.find_match('ساعت کاری سالن چیست؟'), (None, 0))
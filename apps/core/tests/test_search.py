@@ -0,0 +1,20 @@
+"""
+Tests for Persian text normalization used by search.
+"""
+from django.test import SimpleTestCase
+
+from apps.core.search import normalize_persian, search_terms
+
+
+class NormalizePersianTestCase(SimpleTestCase):
+    """Test the normalization applied to search columns and queries."""
+
+    def test_arabic_letters_and_digits(self):
+        self.assertEqual(normalize_persian('كوتاهي مو ۱۲٣'), 'کوتاهی مو 123')
+
+    def test_zwnj_and_diacritics(self):
+        self.assertEqual(normalize_persian('می‌خواهم  مُــو'), 'میخواهم مو')
+        self.assertEqual(normalize_persian('آرایشگاه'), normalize_persian('ارایشگاه'))
+
+    def test_short_terms_are_dropped(self):
+        self.assertEqual(search_terms('a  سالن سالن'), ['سالن'])
@@ -0,0 +1,131 @@
+"""
+Tests for the stampede-safe cache helper.
+"""
+import threading
+import time
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework.test import APIClient
+
+from apps.core import caching
+from apps.core.caching import cache_stats, cached, get_or_compute
+from .factories import next_phone
+
+User = get_user_model()
+
+
+class StampedeCacheTestCase(TestCase):
+    """Test single-flight recomputation, early refresh, stale serving and the counters."""
+
+    def setUp(self):
+        self.key = f'test_stampede:{uuid.uuid4().hex}'
+        self.name = f'test_{uuid.uuid4().hex[:8]}'
+        self.calls = []
+
+    def tearDown(self):
+        conn = get_redis_connection('default')
+        fields = [field for field in conn.hkeys(cache.make_key(caching.CACHE_STATS_KEY))
+                  if field.decode().startswith(f'{self.name}:')]
+        if fields:
+            conn.hdel(cache.make_key(caching.CACHE_STATS_KEY), *fields)
+
+    def compute(self, value='fresh', delay=0):
+        def build():
+            self.calls.append(value)
+            time.sleep(delay)
+            return value
+        return build
+
+    def stats(self):
+        return cache_stats().get(self.name, {})
+
+    def test_miss_computes_and_caches(self):
+        self.assertIsNone(get_or_compute(self.key, self.compute(None), name=self.name))
+        self.assertIsNone(get_or_compute(self.key, self.compute('again'), name=self.name))
+
+        self.assertEqual(self.calls, [None])
+        self.assertEqual(self.stats(), {'miss': 1, 'recompute': 1, 'hit': 1})
+
+    def test_concurrent_misses_compute_once(self):
+        results = []
+
+        def read():
+            results.append(get_or_compute(self.key, self.compute(delay=0.3), name=self.name))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, ['fresh'])
+        self.assertEqual(results, ['fresh'] * 8)
+        self.assertEqual(self.stats(), {'miss': 8, 'recompute': 1, 'wait': 7})
+
+    def test_expired_value_served_while_another_process_refreshes(self):
+        cache.set(self.key, ('old', time.time() - 1, 0.01), 60)
+        lock = cache.lock(f'lock:{self.key}', timeout=5)
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            value = get_or_compute(self.key, self.compute(), stale=60, name=self.name)
+        finally:
+            lock.release()
+
+        self.assertEqual(value, 'old')
+        self.assertEqual(self.calls, [])
+        self.assertEqual(get_or_compute(self.key, self.compute(), stale=60, name=self.name), 'fresh')
+        self.assertEqual(self.stats(), {'stale': 2, 'recompute': 1})
+
+    def test_early_refresh_before_expiry(self):
+        # Expires in a second, but the last computation took ten
+        cache.set(self.key, ('old', time.time() + 1, 10), 60)
+
+        self.assertEqual(get_or_compute(self.key, self.compute(), beta=0, name=self.name), 'old')
+        with mock.patch('apps.core.caching.random.random', return_value=0.5):
+            self.assertEqual(get_or_compute(self.key, self.compute(), name=self.name), 'fresh')
+
+        self.assertEqual(self.stats(), {'hit': 2, 'early': 1, 'recompute': 1})
+
+    def test_waiter_computes_after_timeout(self):
+        lock = cache.lock(f'lock:{self.key}', timeout=5)
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            with mock.patch.object(caching, 'WAIT_TIMEOUT', 0.1):
+                value = get_or_compute(self.key, self.compute(), name=self.name)
+        finally:
+            lock.release()
+
+        self.assertEqual(value, 'fresh')
+        self.assertEqual(self.stats(), {'miss': 1, 'timeout': 1, 'recompute': 1})
+
+    def test_decorator(self):
+        @cached(lambda salon_id: f'{self.key}:{salon_id}', timeout=60, name=self.name)
+        def summary(salon_id):
+            self.calls.append(salon_id)
+            return {'salon': salon_id}
+
+        self.assertEqual(summary(3), {'salon': 3})
+        self.assertEqual(summary(3), {'salon': 3})
+        self.assertEqual(summary(4), {'salon': 4})
+        self.assertEqual(summary.uncached(3), {'salon': 3})
+
+        self.assertEqual(self.calls, [3, 4, 3])
+        self.assertEqual(self.stats(), {'miss': 2, 'recompute': 2, 'hit': 1})
+
+    def test_stats_endpoint_for_site_admins(self):
+        get_or_compute(self.key, self.compute(), name=self.name)
+        client = APIClient()
+        url = reverse('accounts:api_admin_cache_stats')
+
+        self.assertEqual(client.get(url).status_code, 403)
+        client.force_authenticate(User.objects.create_user(phone_number=next_phone(), password='x',
+                                                           user_type='site_admin'))
+        response = client.get(url)
+
+        self.assertEqual(response.data[self.name], {'miss': 1, 'recompute': 1})
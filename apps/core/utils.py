@@ -5,6 +5,10 @@ from django.core.cache import cache
 from typing import Optional, Any
 import hashlib
 import json
+import time
+
+from .caching import get_or_compute
+from .deferred import deferrable_batch
 
 
 def generate_cache_key(*args, **kwargs) -> str:
@@ -30,6 +34,9 @@ def get_cached_or_set(key: str, callable_func, timeout: int = 300) -> Any:
     """
     Get value from cache or set it by calling the provided function.
     
+    Only one process recomputes an expired key at a time (see
+    apps.core.caching.get_or_compute).
+    
     Args:
         key: Cache key
         callable_func: Function to call if cache miss
@@ -38,31 +45,148 @@ def get_cached_or_set(key: str, callable_func, timeout: int = 300) -> Any:
     Returns:
         Cached or computed value
     """
-    value = cache.get(key)
-    if value is None:
-        value = callable_func()
-        cache.set(key, value, timeout)
-    return value
+    return get_or_compute(key, callable_func, timeout)
+
+
+# Namespaces whose generation is embedded in cache keys (see namespaced_key)
+SALON_CATALOG = 'salon_catalog'
+
+
+def salon_namespace(salon_id: int) -> str:
+    """Namespace of a salon's public ratings and reviews pages."""
+    return f'salon_feedback_{salon_id}'
+
+
+def stylist_namespace(stylist_id: int) -> str:
+    """Namespace of a stylist's public ratings and reviews pages."""
+    return f'stylist_feedback_{stylist_id}'
 
 
-def invalidate_cache_pattern(pattern: str) -> int:
+def _generation_key(name: str) -> str:
+    return cache.make_key(f'generation:{name}')
+
+
+def _initial_generation() -> int:
     """
-    Invalidate all cache keys matching a pattern.
+    First generation of a namespace (or of one whose counter was evicted).
+    
+    Counting from the clock in microseconds rather than from 1 means a
+    lost counter never restarts at a generation whose entries still exist:
+    every bump is a round trip to Redis, which takes longer than that.
+    """
+    return int(time.time() * 1_000_000)
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def get_cache_generations(names) -> dict:
+    """
+    Current generations of several cache namespaces in one round trip
+    (plus one pipeline to start the counters that do not exist yet).
+    
+    Cache keys that embed the generation become unreachable once it is
+    bumped, so a whole family of entries is invalidated with one INCR
+    and without scanning keys. Stale entries simply expire.
     
     Args:
-        pattern: Pattern to match (e.g., 'salon_*')
+        names: Namespace names (e.g., ['salon_catalog', 'salon_feedback_4'])
     
     Returns:
-        Number of keys deleted
+        dict: {name: generation}
     """
-    # Note: This requires django-redis backend
-    from django_redis import get_redis_connection
-    conn = get_redis_connection("default")
+    names = list(dict.fromkeys(names))
+    conn = _redis()
+    values = conn.mget([_generation_key(name) for name in names])
+    generations = {name: int(value) for name, value in zip(names, values) if value is not None}
+    missing = [name for name in names if name not in generations]
+    if missing:
+        pipe = conn.pipeline(transaction=False)
+        for name in missing:
+            pipe.set(_generation_key(name), _initial_generation(), nx=True)
+        for name in missing:
+            pipe.get(_generation_key(name))
+        values = pipe.execute()[len(missing):]
+        generations.update((name, int(value)) for name, value in zip(missing, values))
+    return generations
+
+
+def get_cache_generation(name: str) -> int:
+    """
+    Return the current generation number of a cache namespace.
+    
+    Args:
+        name: Namespace name (e.g., 'salon_catalog')
+    
+    Returns:
+        int: Current generation
+    """
+    return get_cache_generations([name])[name]
+
+
+def namespaced_key(name: str, key: str) -> str:
+    """
+    Cache key of an entry in a namespace, embedding its current generation.
+    
+    Args:
+        name: Namespace name
+        key: Key of the entry within the namespace
     
-    keys = conn.keys(f"salon:{pattern}")
-    if keys:
-        return conn.delete(*keys)
-    return 0
+    Returns:
+        str: '<name>:<generation>:<key>'
+    """
+    return f'{name}:{get_cache_generation(name)}:{key}'
+
+
+@deferrable_batch
+def bump_cache_generations(names) -> dict:
+    """
+    Invalidate every entry of several namespaces: one pipelined INCR each.
+    
+    Inside deferred_signals() the names of all calls are merged and
+    bumped together when the block exits.
+    
+    Args:
+        names: Namespace names
+    
+    Returns:
+        dict: {name: new generation} (None when deferred)
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    pipe = _redis().pipeline(transaction=False)
+    for name in names:
+        # A missing counter starts from the clock, then moves past it
+        pipe.set(_generation_key(name), _initial_generation(), nx=True)
+        pipe.incr(_generation_key(name))
+    return dict(zip(names, pipe.execute()[1::2]))
+
+
+def bump_cache_generation(name: str) -> Optional[int]:
+    """
+    Invalidate every entry of a cache namespace by bumping its generation.
+    
+    Args:
+        name: Namespace name
+    
+    Returns:
+        int: The new generation (None when deferred)
+    """
+    generations = bump_cache_generations([name])
+    return generations[name] if generations else None
+
+
+def invalidate_salon_caches(salon_ids) -> None:
+    """
+    Invalidate the salon listings and the feedback pages of some salons.
+    
+    Args:
+        salon_ids: IDs of the salons
+    """
+    bump_cache_generations([SALON_CATALOG] + [salon_namespace(salon_id) for salon_id in salon_ids if salon_id])
 
 
 def invalidate_salon_cache(salon_id: int) -> None:
@@ -72,9 +196,7 @@ def invalidate_salon_cache(salon_id: int) -> None:
     Args:
         salon_id: ID of the salon
     """
-    cache.delete(f'salon_detail_{salon_id}')
-    cache.delete(f'salon_rating_{salon_id}')
-    invalidate_cache_pattern(f'salon_list_*')
+    invalidate_salon_caches([salon_id])
 
 
 def invalidate_stylist_cache(stylist_id: int) -> None:
@@ -84,5 +206,5 @@ def invalidate_stylist_cache(stylist_id: int) -> None:
     Args:
         stylist_id: ID of the stylist
     """
-    cache.delete(f'stylist_rating_{stylist_id}')
-    cache.delete(f'stylist_availability_{stylist_id}_*')
+    if stylist_id:
+        bump_cache_generations([stylist_namespace(stylist_id)])
@@ -1,10 +1,13 @@
 """Admin configuration for ratings app."""
 from django.contrib import admin
+
+from apps.core.admin import DeferredSignalsAdminMixin
 from .models import Rating, Review
+from .moderation import set_reviews_approved
 
 
 @admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
+class RatingAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     list_display = ['stylist', 'rating', 'get_salon', 'created_at']
     list_filter = ['rating', 'created_at']
     search_fields = ['stylist__first_name', 'stylist__last_name']
@@ -16,14 +19,25 @@ class RatingAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     list_display = ['stylist', 'get_salon', 'is_approved', 'created_at']
     list_filter = ['is_approved', 'created_at']
     search_fields = ['text', 'stylist__first_name']
     readonly_fields = ['customer', 'stylist', 'appointment', 'created_at']
     
     fields = ['stylist', 'text', 'is_approved', 'created_at']
+    actions = ['approve_reviews', 'reject_reviews']
     
     def get_salon(self, obj):
         return obj.salon.name
     get_salon.short_description = 'سالن'
+    
+    def approve_reviews(self, request, queryset):
+        updated = set_reviews_approved(queryset, True)
+        self.message_user(request, f'{updated} نظر تأیید شد')
+    approve_reviews.short_description = 'تأیید نظرات انتخاب شده'
+    
+    def reject_reviews(self, request, queryset):
+        updated = set_reviews_approved(queryset, False)
+        self.message_user(request, f'{updated} نظر رد شد')
+    reject_reviews.short_description = 'رد نظرات انتخاب شده'
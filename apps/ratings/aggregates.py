@@ -0,0 +1,163 @@
+"""
+Denormalized rating aggregates of stylists and salons.
+
+Every rating write adjusts the sum, count and histogram column of its
+stylist and of the stylist's salon with F() increments, so the totals are
+never re-aggregated on the write path:
+
+    UPDATE stylist SET rating_sum = rating_sum + 4, rating_count = rating_count + 1,
+                       ratings_4 = ratings_4 + 1 WHERE id = ...
+
+The salon's UPDATE also sets average_rating/total_ratings (still used for
+ordering and filtering) from the same row values and bumps its version so
+the page fragments refresh. Rating.save wraps the write and the
+increments in one transaction; deletes (also cascaded ones) already run
+inside the deletion's transaction.
+
+Inside apps.core.deferred.deferred_signals() the increments are skipped
+and each touched salon is recounted once at the end of the block instead
+(one grouped query per level, however many ratings were written).
+
+Writes that bypass signals (queryset update/bulk_create, raw SQL, a
+stylist moving to another salon) can make the totals drift;
+reconcile_rating_aggregates recomputes them from the ratings table.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+
+from apps.accounts.models import StylistProfile
+from apps.core.deferred import deferrable_batch, deferring
+from apps.salons.models import Salon
+from .models import Rating
+
+RATING_VALUES = range(1, 6)
+AGGREGATE_FIELDS = ['rating_sum', 'rating_count'] + [f'ratings_{value}' for value in RATING_VALUES]
+
+
+def rating_increments(value: int, sign: int) -> dict:
+    """update() kwargs adding (sign=1) or removing (sign=-1) one rating."""
+    return {
+        'rating_sum': F('rating_sum') + sign * value,
+        'rating_count': F('rating_count') + sign,
+        f'ratings_{value}': F(f'ratings_{value}') + sign,
+    }
+
+
+def apply_rating(stylist_id, salon_id, value: int, sign: int) -> None:
+    """Add or remove one rating of a stylist (and their salon) in the aggregates."""
+    StylistProfile.objects.filter(pk=stylist_id).update(**rating_increments(value, sign))
+    if not salon_id:
+        return
+    new_count = F('rating_count') + sign
+    new_sum = F('rating_sum') + sign * value
+    Salon.objects.filter(pk=salon_id).update(
+        **rating_increments(value, sign),
+        total_ratings=new_count,
+        # Right-hand sides read the row as it was before this UPDATE
+        average_rating=Case(
+            When(rating_count=-sign, then=Value(Decimal('0'))),
+            default=new_sum * Decimal('1.0') / new_count,
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+        version=F('version') + 1,
+    )
+
+
+def _salon_of(rating: Rating, stylist_id):
+    """Salon of the rating's stylist, or of the stylist it was counted for before."""
+    if stylist_id == rating.stylist_id:
+        return rating.stylist.salon_id
+    return StylistProfile.objects.filter(pk=stylist_id).values_list('salon_id', flat=True).first()
+
+
+def _count(rating: Rating, stylist_id, value: int, sign: int) -> None:
+    """apply_rating, or a recount of the salon at the end of a deferred block."""
+    salon_id = _salon_of(rating, stylist_id)
+    if salon_id and deferring():
+        recount_salon_ratings([salon_id])
+    else:
+        apply_rating(stylist_id, salon_id, value, sign)
+
+
+def rating_saved(rating: Rating, created: bool) -> None:
+    """Move a saved rating's contribution from its previous (stylist, value) to the current one."""
+    current = (rating.stylist_id, rating.rating)
+    previous = None if created else rating._counted
+    if previous == current:
+        return
+    if previous is not None:
+        stylist_id, value = previous
+        _count(rating, stylist_id, value, -1)
+    _count(rating, rating.stylist_id, rating.rating, 1)
+    rating._counted = current
+
+
+def rating_deleted(rating: Rating) -> None:
+    """Remove a deleted rating's contribution."""
+    stylist_id, value = rating._counted or (rating.stylist_id, rating.rating)
+    _count(rating, stylist_id, value, -1)
+    rating._counted = None
+
+
+def _aggregates(group_by: str, **filters) -> dict:
+    """{group id: {field: value}} computed from the ratings table in one query."""
+    rows = Rating.objects.filter(**filters).values(group_by).order_by().annotate(
+        rating_sum=Sum('rating'),
+        rating_count=Count('id'),
+        **{f'ratings_{value}': Count('id', filter=Q(rating=value)) for value in RATING_VALUES},
+    )
+    return {row.pop(group_by): row for row in rows}
+
+
+def _salon_totals(values: dict) -> dict:
+    """average_rating/total_ratings as apply_rating stores them (Postgres rounds half up)."""
+    count = values['rating_count']
+    average = Decimal(values['rating_sum']) / count if count else Decimal('0')
+    return {'total_ratings': count, 'average_rating': average.quantize(Decimal('0.01'), ROUND_HALF_UP)}
+
+
+def _reconcile(queryset, computed: dict, totals=None) -> list:
+    """Bulk-update the rows of queryset whose stored aggregates differ from computed; returns their ids."""
+    empty = dict.fromkeys(AGGREGATE_FIELDS, 0)
+    fields = AGGREGATE_FIELDS + (list(totals(empty)) if totals else [])
+    drifted = []
+    for obj in queryset.only(*fields):
+        values = computed.get(obj.pk, empty)
+        if totals:
+            values = {**values, **totals(values)}
+        if any(getattr(obj, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(obj, field, value)
+            drifted.append(obj)
+    queryset.model.objects.bulk_update(drifted, fields, batch_size=500)
+    return [obj.pk for obj in drifted]
+
+
+def reconcile_rating_aggregates(salon_ids=None) -> dict:
+    """
+    Recompute the aggregates of all stylists and salons (or of the given
+    salons and their stylists) with one grouped query per level; returns
+    how many rows had drifted.
+    """
+    stylists = StylistProfile.objects.all()
+    salons = Salon.objects.all()
+    stylist_filter, salon_filter = {}, {}
+    if salon_ids is not None:
+        stylists = stylists.filter(salon_id__in=salon_ids)
+        salons = salons.filter(pk__in=salon_ids)
+        stylist_filter = salon_filter = {'stylist__salon_id__in': salon_ids}
+
+    with transaction.atomic():
+        drifted_stylists = _reconcile(stylists, _aggregates('stylist_id', **stylist_filter))
+        drifted_salons = _reconcile(salons, _aggregates('stylist__salon_id', **salon_filter), _salon_totals)
+        if drifted_salons:
+            Salon.objects.filter(pk__in=drifted_salons).bump_version()
+    return {'stylists': len(drifted_stylists), 'salons': len(drifted_salons)}
+
+
+@deferrable_batch
+def recount_salon_ratings(salon_ids) -> None:
+    """Recompute the aggregates of some salons and their stylists."""
+    reconcile_rating_aggregates(salon_ids=list(set(salon_ids)))
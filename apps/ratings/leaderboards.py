@@ -0,0 +1,160 @@
+"""
+Top-rated salon and stylist leaderboards in Redis sorted sets.
+
+One sorted set per kind (salons, stylists) and audience (male, female
+and all), holding the ids of approved salons (and their active stylists) that
+have ratings, scored by a Bayesian average:
+
+    score = (PRIOR_WEIGHT * PRIOR_MEAN + rating_sum) / (PRIOR_WEIGHT + rating_count)
+
+i.e. every entry starts with PRIOR_WEIGHT virtual ratings of PRIOR_MEAN,
+so two 5-star votes give 3.93 while a hundred 4.8s stay near 4.8. The
+prior is a fixed constant (not the live global mean) so one rating only
+ever rescores its own stylist and salon.
+
+Entries are rewritten after each committed rating, salon, stylist or
+approval change (see apps.ratings.signals) and account (de)activation and read with ZREVRANGE, so
+serving a leaderboard never sorts the salon table. rebuild_leaderboards
+recreates all of them from the stored rating aggregates.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from apps.accounts.models import StylistProfile
+from apps.core.deferred import deferrable_batch
+from apps.salons.models import Salon
+
+PRIOR_MEAN = 3.5
+PRIOR_WEIGHT = 5
+AUDIENCES = ('male', 'female', None)
+REBUILD_BATCH_SIZE = 1000
+
+
+def bayesian_score(rating_sum: int, rating_count: int) -> float:
+    return (PRIOR_WEIGHT * PRIOR_MEAN + rating_sum) / (PRIOR_WEIGHT + rating_count)
+
+
+def board_key(kind: str, gender=None) -> str:
+    """Redis key of a leaderboard ('salons' or 'stylists'; gender None = everyone)."""
+    return cache.make_key(f'leaderboard:{kind}:{gender or "all"}')
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _salon_rows(**filters):
+    """(id, gender, score) of the approved, rated salons matching filters."""
+    rows = Salon.objects.filter(manager__is_approved=True, rating_count__gt=0, **filters).values_list(
+        'pk', 'gender_type', 'rating_sum', 'rating_count'
+    )
+    return ((pk, gender, bayesian_score(total, count)) for pk, gender, total, count in rows.iterator())
+
+
+def _stylist_rows(**filters):
+    """(id, gender of their salon, score) of the rated, active stylists of approved salons."""
+    rows = StylistProfile.objects.filter(
+        salon__manager__is_approved=True, user__is_active=True, rating_count__gt=0, **filters
+    ).values_list('pk', 'salon__gender_type', 'rating_sum', 'rating_count')
+    return ((pk, gender, bayesian_score(total, count)) for pk, gender, total, count in rows.iterator())
+
+
+ROWS = {'salons': _salon_rows, 'stylists': _stylist_rows}
+
+
+def update_entries(kind: str, ids) -> None:
+    """Rewrite the entries of some salons or stylists from the database (1 query, 1 round trip)."""
+    ids = [pk for pk in ids if pk]
+    if not ids:
+        return
+    pipe = _redis().pipeline()
+    for gender in AUDIENCES:
+        pipe.zrem(board_key(kind, gender), *ids)
+    for pk, gender, score in ROWS[kind](pk__in=ids):
+        pipe.zadd(board_key(kind, gender), {pk: score})
+        pipe.zadd(board_key(kind), {pk: score})
+    pipe.execute()
+
+
+@deferrable_batch
+def update_entries_on_commit(kind: str, ids) -> None:
+    """update_entries once the surrounding transaction has committed."""
+    ids = list(ids)
+    transaction.on_commit(lambda: update_entries(kind, ids))
+
+
+def _update_salon_leaderboards(salon_ids):
+    """A salon's gender or approval also decides where its stylists are listed."""
+    update_entries('salons', salon_ids)
+    update_entries('stylists', StylistProfile.objects.filter(salon_id__in=salon_ids).values_list('pk', flat=True))
+
+
+@deferrable_batch
+def update_salon_leaderboards_on_commit(salon_ids):
+    """Rescore some salons and all their stylists once the write commits."""
+    salon_ids = list(salon_ids)
+    transaction.on_commit(lambda: _update_salon_leaderboards(salon_ids))
+
+
+@deferrable_batch
+def update_manager_leaderboards_on_commit(manager_ids):
+    """Rescore every salon (and stylist) of some managers once the write commits."""
+    manager_ids = list(manager_ids)
+    transaction.on_commit(lambda: _update_salon_leaderboards(
+        list(Salon.objects.filter(manager_id__in=manager_ids).values_list('pk', flat=True))
+    ))
+
+
+@deferrable_batch
+def update_user_leaderboards_on_commit(user_ids):
+    """Rescore the stylists among some users (activated or deactivated) once the write commits."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: update_entries(
+        'stylists', list(StylistProfile.objects.filter(user_id__in=user_ids).values_list('pk', flat=True))
+    ))
+
+
+def top(kind: str, gender=None, limit: int = 10):
+    """[(id, score)] best first, an O(log n + limit) range read."""
+    return [
+        (int(pk), score)
+        for pk, score in _redis().zrevrange(board_key(kind, gender), 0, limit - 1, withscores=True)
+    ]
+
+
+def _fill(conn, keys: dict, batch: list) -> None:
+    pipe = conn.pipeline(transaction=False)
+    for pk, gender, score in batch:
+        pipe.zadd(keys[gender], {pk: score})
+        pipe.zadd(keys[None], {pk: score})
+    pipe.execute()
+
+
+def rebuild_leaderboards() -> dict:
+    """Recreate every leaderboard from the database; returns entries per board."""
+    conn = _redis()
+    sizes = {}
+    for kind, rows in ROWS.items():
+        temporary = {gender: board_key(kind, gender) + ':rebuild' for gender in AUDIENCES}
+        conn.delete(*temporary.values())
+        batch, filled = [], set()
+        for row in rows():
+            batch.append(row)
+            filled.update((row[1], None))
+            if len(batch) == REBUILD_BATCH_SIZE:
+                _fill(conn, temporary, batch)
+                batch = []
+        if batch:
+            _fill(conn, temporary, batch)
+
+        # Swap the new sets in atomically; readers never see a partial board
+        pipe = conn.pipeline()
+        for gender in AUDIENCES:
+            pipe.delete(board_key(kind, gender))
+            if gender in filled:
+                pipe.rename(temporary[gender], board_key(kind, gender))
+        pipe.execute()
+        for gender in AUDIENCES:
+            sizes[f'{kind}:{gender or "all"}'] = conn.zcard(board_key(kind, gender))
+    return sizes
@@ -0,0 +1,17 @@
+"""
+Recreate the Redis salon and stylist leaderboards from the database,
+e.g. after a Redis flush, a reconcile_rating_aggregates run or a change
+of the Bayesian prior.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ratings.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the top-rated salon and stylist leaderboards'
+
+    def handle(self, *args, **options):
+        for board, size in rebuild_leaderboards().items():
+            self.stdout.write(f'{board}: {size}')
+        self.stdout.write(self.style.SUCCESS('Leaderboards rebuilt'))
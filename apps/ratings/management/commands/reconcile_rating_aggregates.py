@@ -0,0 +1,25 @@
+"""
+Recompute the denormalized rating aggregates of stylists and salons from
+the ratings table and fix rows that drifted (e.g. after bulk imports,
+manual SQL or stylists moving between salons).
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.utils import bump_cache_generation
+from apps.ratings.aggregates import reconcile_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute stylist and salon rating sums, counts and histograms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salon', type=int, action='append', dest='salon_ids',
+                            help='Only this salon and its stylists (repeatable)')
+
+    def handle(self, *args, **options):
+        drifted = reconcile_rating_aggregates(salon_ids=options['salon_ids'])
+        if drifted['salons']:
+            bump_cache_generation('salon_catalog')
+        self.stdout.write(self.style.SUCCESS(
+            f"{drifted['stylists']} stylists and {drifted['salons']} salons corrected"
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:51
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from apps.core.search import normalize_persian
+
+
+def build_search_text(apps, schema_editor):
+    Review = apps.get_model('ratings', 'Review')
+    batch = []
+    for review in Review.objects.only('text').iterator(chunk_size=2000):
+        review.search_text = normalize_persian(review.text)
+        batch.append(review)
+        if len(batch) == 2000:
+            Review.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Review.objects.bulk_update(batch, ['search_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+        ('appointments', '0006_visit'),
+        ('ratings', '0001_initial'),
+        # Creates the pg_trgm extension the index needs
+        ('salons', '0013_salon_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(build_search_text, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='review_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
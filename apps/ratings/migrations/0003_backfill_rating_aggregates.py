@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def aggregate(Rating, outer_field, **aggregate_kwargs):
+    """Correlated subquery of one aggregate over the ratings of the outer row."""
+    (name, expression), = aggregate_kwargs.items()
+    return Coalesce(Subquery(
+        Rating.objects.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field)
+        .annotate(**{name: expression}).values(name),
+        output_field=IntegerField()
+    ), Value(0))
+
+
+def columns(Rating, outer_field):
+    values = {
+        'rating_sum': aggregate(Rating, outer_field, total=Sum('rating')),
+        'rating_count': aggregate(Rating, outer_field, total=Count('id')),
+    }
+    for value in range(1, 6):
+        values[f'ratings_{value}'] = aggregate(Rating, outer_field, total=Count('id', filter=Q(rating=value)))
+    return values
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Rating = apps.get_model('ratings', 'Rating')
+    apps.get_model('accounts', 'StylistProfile').objects.update(**columns(Rating, 'stylist'))
+    apps.get_model('salons', 'Salon').objects.update(**columns(Rating, 'stylist__salon'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_rating_aggregates'),
+        ('ratings', '0002_review_search'),
+        ('salons', '0017_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_rating_aggregates'),
+        ('appointments', '0006_visit'),
+        ('ratings', '0003_backfill_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['stylist', '-created_at', '-id'], name='rating_stylist_recent_idx'),
+        ),
+    ]
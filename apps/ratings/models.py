@@ -1,9 +1,11 @@
 """
 Rating and Review models with anonymous display.
 """
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.core.models import TimeStampedModel
+from apps.core.search import normalize_persian
 from apps.accounts.models import CustomerProfile, StylistProfile
 from apps.salons.models import Salon
 from apps.appointments.models import Appointment
@@ -58,11 +60,29 @@ class Rating(TimeStampedModel):
         indexes = [
             models.Index(fields=['stylist', 'rating']),
             models.Index(fields=['created_at']),
+            # Cursor pages of a stylist's ratings, newest first
+            models.Index(fields=['stylist', '-created_at', '-id'], name='rating_stylist_recent_idx'),
         ]
     
     def __str__(self):
         return f"امتیاز {self.rating} - {self.stylist.full_name}"
     
+    # (stylist_id, rating) this row is counted under in the rating
+    # aggregates; None while unsaved (see apps.ratings.aggregates)
+    _counted = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'stylist_id' in instance.__dict__ and 'rating' in instance.__dict__:
+            instance._counted = (instance.stylist_id, instance.rating)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # The post_save handler updates the aggregates inside this transaction
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+    
     @property
     def salon(self):
         """Get salon through stylist."""
@@ -97,6 +117,7 @@ class Review(TimeStampedModel):
     )
     
     text = models.TextField(verbose_name="متن نظر")
+    search_text = models.TextField(blank=True, editable=False)
     
     # Admin moderation
     is_approved = models.BooleanField(default=True, verbose_name="تأیید شده")
@@ -116,11 +137,20 @@ class Review(TimeStampedModel):
         
         indexes = [
             models.Index(fields=['stylist', 'is_approved', '-created_at']),
+            GinIndex(fields=['search_text'], name='review_search_trgm', opclasses=['gin_trgm_ops']),
         ]
     
     def __str__(self):
         return f"نظر برای {self.stylist.full_name}"
     
+    def save(self, *args, **kwargs):
+        # Keep the normalized text in step with the text
+        self.search_text = normalize_persian(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+    
     @property
     def salon(self):
         """Get salon through stylist."""
@@ -0,0 +1,42 @@
+"""
+Bulk review moderation.
+
+Approving or rejecting any number of reviews is one UPDATE of the rows
+whose flag actually changes, followed by one pass of cache invalidation
+per affected stylist and salon and one notification job for the
+customers, instead of a save(), its signals and a message per review.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.chat.tasks import notify_moderation_on_commit
+from apps.core.deferred import deferred_signals
+from apps.core.utils import invalidate_salon_cache, invalidate_stylist_cache
+from apps.salons.dashboard import invalidate_dashboards_for_salons
+from .models import Review
+
+
+def set_reviews_approved(reviews, approved: bool) -> int:
+    """Approve (or reject) the reviews of a queryset; returns how many changed."""
+    with deferred_signals():
+        with transaction.atomic():
+            # Lock the rows to change, so the ids invalidated and notified
+            # below are exactly the ones the update changes
+            rows = list(
+                reviews.exclude(is_approved=approved).select_for_update(of=('self',)).order_by('pk')
+                .values_list('pk', 'stylist_id', 'stylist__salon_id')
+            )
+            if not rows:
+                return 0
+            ids = [pk for pk, _, _ in rows]
+            updated = Review.objects.filter(pk__in=ids).update(
+                is_approved=approved, updated_at=timezone.now()
+            )
+            for stylist_id in {stylist_id for _, stylist_id, _ in rows}:
+                invalidate_stylist_cache(stylist_id)
+            salon_ids = {salon_id for _, _, salon_id in rows}
+            for salon_id in salon_ids:
+                invalidate_salon_cache(salon_id)
+            invalidate_dashboards_for_salons(salon_ids)
+            notify_moderation_on_commit('reviews_approved' if approved else 'reviews_rejected', ids)
+    return updated
@@ -34,37 +34,29 @@ class AnonymousReviewSerializer(serializers.ModelSerializer):
 
 class MyRatingSerializer(serializers.ModelSerializer):
     """
-    Serializer for customer's own ratings.
+    Serializer for customer's own ratings, each with its review (if any).
     Includes all fields for customer to view their submissions.
+    
+    Expects stylist__salon and appointment__review to be select_related.
     """
     stylist_name = serializers.CharField(source='stylist.full_name', read_only=True)
     salon_name = serializers.CharField(source='stylist.salon.name', read_only=True)
     appointment_date = serializers.DateField(source='appointment.appointment_date', read_only=True)
+    review = serializers.SerializerMethodField()
     
     class Meta:
         model = Rating
         fields = [
             'id', 'stylist_name', 'salon_name', 'rating',
-            'appointment_date', 'created_at'
+            'appointment_date', 'review', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
-
-
-class MyReviewSerializer(serializers.ModelSerializer):
-    """
-    Serializer for customer's own reviews.
-    """
-    stylist_name = serializers.CharField(source='stylist.full_name', read_only=True)
-    salon_name = serializers.CharField(source='stylist.salon.name', read_only=True)
-    appointment_date = serializers.DateField(source='appointment.appointment_date', read_only=True)
     
-    class Meta:
-        model = Review
-        fields = [
-            'id', 'stylist_name', 'salon_name', 'text',
-            'appointment_date', 'is_approved', 'created_at'
-        ]
-        read_only_fields = ['id', 'is_approved', 'created_at']
+    def get_review(self, obj):
+        review = getattr(obj.appointment, 'review', None)
+        if review is None:
+            return None
+        return {'id': review.id, 'text': review.text, 'is_approved': review.is_approved}
 
 
 class SubmitRatingSerializer(serializers.Serializer):
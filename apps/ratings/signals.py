@@ -1,10 +1,43 @@
 """
-Signal handlers for rating/review cache invalidation.
+Signal handlers for rating aggregates, leaderboards and rating/review
+cache invalidation.
+
+Inside apps.core.deferred.deferred_signals() the work is coalesced per
+salon and stylist and done once when the block exits.
 """
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from .aggregates import rating_deleted, rating_saved
+from .leaderboards import (
+    update_entries_on_commit, update_manager_leaderboards_on_commit, update_salon_leaderboards_on_commit,
+)
 from .models import Rating, Review
+from apps.accounts.models import SalonManagerProfile, StylistProfile
+from apps.core.deferred import deferring
 from apps.core.utils import invalidate_salon_cache, invalidate_stylist_cache
+from apps.salons.dashboard import invalidate_dashboard_for_salon, invalidate_manager_dashboard
+from apps.salons.models import Salon
+
+
+@receiver(post_save, sender=Rating)
+def update_aggregates_on_rating_save(sender, instance, created, raw=False, **kwargs):
+    """Increment the stylist and salon rating totals (inside Rating.save's transaction)."""
+    if not raw:
+        rating_saved(instance, created)
+
+
+@receiver(post_delete, sender=Rating)
+def update_aggregates_on_rating_delete(sender, instance, **kwargs):
+    """Decrement the totals (inside the deletion's transaction)."""
+    rating_deleted(instance)
+
+
+def invalidate_rating_dashboard(instance):
+    """Per row the stylist's salon is usually loaded already; in bulk, one lookup for all salons."""
+    if deferring():
+        invalidate_dashboard_for_salon(instance.stylist.salon_id)
+    else:
+        invalidate_manager_dashboard(instance.stylist.salon.manager_id)
 
 
 @receiver(post_save, sender=Rating)
@@ -12,22 +45,47 @@ from apps.core.utils import invalidate_salon_cache, invalidate_stylist_cache
 def invalidate_rating_caches(sender, instance, **kwargs):
     """
     Invalidate salon and stylist rating caches when rating changes.
-    Also update salon's cached rating.
     """
     # Invalidate stylist cache
-    invalidate_stylist_cache(instance.stylist.id)
-    
-    # Invalidate and update salon cache
-    salon = instance.stylist.salon
-    invalidate_salon_cache(salon.id)
+    invalidate_stylist_cache(instance.stylist_id)
     
-    # Update salon's cached rating (average of all stylist ratings)
-    salon.update_rating_cache()
+    # Invalidate salon cache (including the listings: the aggregates are
+    # updated with a queryset update, which sends no Salon signals)
+    salon_id = instance.stylist.salon_id
+    invalidate_salon_cache(salon_id)
+    invalidate_rating_dashboard(instance)
 
 
 @receiver(post_save, sender=Review)
 @receiver(post_delete, sender=Review)
 def invalidate_review_caches(sender, instance, **kwargs):
     """Invalidate caches when reviews change."""
-    invalidate_stylist_cache(instance.stylist.id)
-    invalidate_salon_cache(instance.stylist.salon.id)
+    invalidate_stylist_cache(instance.stylist_id)
+    invalidate_salon_cache(instance.stylist.salon_id)
+    invalidate_rating_dashboard(instance)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def update_leaderboards_on_rating_change(sender, instance, **kwargs):
+    """Rescore the rated stylist and their salon once the write commits."""
+    update_entries_on_commit('stylists', [instance.stylist_id])
+    update_entries_on_commit('salons', [instance.stylist.salon_id])
+
+
+@receiver(post_save, sender=Salon)
+@receiver(post_delete, sender=Salon)
+def update_leaderboards_on_salon_change(sender, instance, **kwargs):
+    update_salon_leaderboards_on_commit([instance.pk])
+
+
+@receiver(post_save, sender=SalonManagerProfile)
+def update_leaderboards_on_approval(sender, instance, **kwargs):
+    update_manager_leaderboards_on_commit([instance.pk])
+
+
+@receiver(post_save, sender=StylistProfile)
+@receiver(post_delete, sender=StylistProfile)
+def update_leaderboards_on_stylist_change(sender, instance, **kwargs):
+    """Stylists move between salons; deleted ones leave the boards."""
+    update_entries_on_commit('stylists', [instance.pk])
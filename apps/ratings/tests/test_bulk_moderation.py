@@ -0,0 +1,107 @@
+"""
+Tests for the bulk review moderation endpoint.
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.chat.tasks import moderation_chat_ids
+from apps.core.utils import get_cache_generation
+from apps.ratings.models import Review
+from apps.core.tests.factories import FixturesMixin, next_phone
+
+User = get_user_model()
+
+DELAY = 'apps.chat.tasks.send_moderation_notifications.delay'
+
+
+class BulkReviewModerationTestCase(FixturesMixin, TestCase):
+    """Test set-based review updates, batched invalidation and one notification job."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(phone_number=next_phone(), password='x', user_type='site_admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.salon = self.make_salon()
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.customer.telegram_chat_id = '1001'
+        self.customer.save()
+        self.day = date(2026, 1, 1)
+
+    def review(self, stylist, approved=False):
+        self.day += timedelta(days=1)
+        appointment = self.book(self.customer, stylist, self.service, self.day, time(10, 0), status='completed')
+        return Review.objects.create(customer=self.customer, stylist=stylist, appointment=appointment,
+                                     text='خوب', is_approved=approved)
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), data, format='json')
+
+    def test_approve_reviews_by_ids(self):
+        stylists = [self.make_stylist(self.salon) for _ in range(3)]
+        reviews = [self.review(stylist) for stylist in stylists for _ in range(4)]
+        already = self.review(stylists[0], approved=True)
+        generation = get_cache_generation(f'stylist_feedback_{stylists[1].id}')
+
+        with mock.patch(DELAY) as delay, self.captureOnCommitCallbacks(execute=True):
+            # Savepoint, select, update, release, one dashboard lookup; nothing per review
+            with self.assertNumQueries(5):
+                response = self.post('ratings:api_admin_bulk_reviews', {
+                    'action': 'approve', 'ids': [review.id for review in reviews] + [already.id],
+                })
+
+        self.assertEqual(response.data['updated'], 12)
+        self.assertEqual(Review.objects.filter(is_approved=True).count(), 13)
+        self.assertGreater(get_cache_generation(f'stylist_feedback_{stylists[1].id}'), generation)
+        delay.assert_called_once()
+        event, ids = delay.call_args.args
+        self.assertEqual(event, 'reviews_approved')
+        self.assertEqual(sorted(ids), sorted(review.id for review in reviews))
+        self.assertEqual(moderation_chat_ids(event, ids), {'1001'})
+
+    def test_reject_reviews_by_filter(self):
+        stylist = self.make_stylist(self.salon)
+        other_salon = self.make_salon()
+        other = self.make_stylist(other_salon)
+        self.review(stylist, approved=True)
+        self.review(stylist, approved=True)
+        kept = self.review(other, approved=True)
+
+        with mock.patch(DELAY) as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.post('ratings:api_admin_bulk_reviews', {
+                'action': 'reject', 'filter': {'salon_id': self.salon.id, 'is_approved': True},
+            })
+
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(list(Review.objects.filter(is_approved=True)), [kept])
+        self.assertEqual(delay.call_args.args[0], 'reviews_rejected')
+
+    def test_nothing_to_change_queues_nothing(self):
+        review = self.review(self.make_stylist(self.salon), approved=True)
+
+        with mock.patch(DELAY) as delay, self.captureOnCommitCallbacks(execute=True):
+            response = self.post('ratings:api_admin_bulk_reviews', {'action': 'approve', 'ids': [review.id]})
+
+        self.assertEqual(response.data['updated'], 0)
+        delay.assert_not_called()
+
+    def test_invalid_selection(self):
+        cases = [
+            {'action': 'approve'},
+            {'action': 'approve', 'ids': [1], 'filter': {'salon_id': 1}},
+            {'action': 'approve', 'ids': ['1']},
+            {'action': 'approve', 'filter': {}},
+            {'action': 'approve', 'filter': {'text': 'بد'}},
+            {'action': 'approve', 'filter': {'created_before': 'دیروز'}},
+            {'action': 'delete', 'ids': [1]},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                response = self.post('ratings:api_admin_bulk_reviews', data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
@@ -0,0 +1,95 @@
+"""
+Tests for the Redis top-rated salon and stylist leaderboards.
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework.test import APIClient
+
+from apps.ratings.leaderboards import AUDIENCES, bayesian_score, board_key, rebuild_leaderboards, top
+from apps.ratings.models import Rating
+from apps.core.tests.factories import FixturesMixin
+
+
+class LeaderboardsTestCase(FixturesMixin, TestCase):
+    """Test Bayesian ranking, incremental updates, the rebuild and the endpoint."""
+
+    def setUp(self):
+        get_redis_connection('default').delete(
+            *[board_key(kind, gender) for kind in ('salons', 'stylists') for gender in AUDIENCES]
+        )
+        self.customer = self.make_customer()
+        self.day = date(2026, 1, 1)
+
+    def make_rated_salon(self, ratings, gender='male', **fields):
+        salon = self.make_salon(gender, **fields)
+        stylist = self.make_stylist(salon)
+        service = self.make_service(salon)
+        self.rate(stylist, service, ratings)
+        return salon, stylist
+
+    def rate(self, stylist, service, ratings):
+        with self.captureOnCommitCallbacks(execute=True):
+            for value in ratings:
+                self.day += timedelta(days=1)
+                appointment = self.book(self.customer, stylist, service, self.day, time(10, 0), status='completed')
+                Rating.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, rating=value)
+
+    def test_few_perfect_votes_do_not_dominate(self):
+        newcomer, _ = self.make_rated_salon([5, 5])
+        veteran, _ = self.make_rated_salon([5] * 12 + [4] * 8)
+
+        self.assertEqual([pk for pk, _ in top('salons', 'male')], [veteran.id, newcomer.id])
+        self.assertAlmostEqual(dict(top('salons'))[newcomer.id], bayesian_score(10, 2))
+
+    def test_boards_per_gender(self):
+        male, _ = self.make_rated_salon([4])
+        female, stylist = self.make_rated_salon([5], gender='female')
+
+        self.assertEqual([pk for pk, _ in top('salons', 'male')], [male.id])
+        self.assertEqual([pk for pk, _ in top('stylists', 'female')], [stylist.id])
+        self.assertEqual([pk for pk, _ in top('salons')], [female.id, male.id])
+
+    def test_delete_and_approval_update_entries(self):
+        salon, stylist = self.make_rated_salon([5])
+        rating = Rating.objects.get(stylist=stylist)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rating.delete()
+        self.assertEqual(top('stylists'), [])
+
+        self.rate(stylist, self.make_service(salon, service_type='shave'), [4])
+        with self.captureOnCommitCallbacks(execute=True):
+            salon.manager.is_approved = False
+            salon.manager.save()
+        self.assertEqual(top('salons'), [])
+        self.assertEqual(top('stylists'), [])
+
+    def test_rebuild_matches_incremental(self):
+        self.make_rated_salon([5, 3])
+        self.make_rated_salon([4, 4, 4], gender='female')
+        incremental = {kind: top(kind, limit=50) for kind in ('salons', 'stylists')}
+
+        sizes = rebuild_leaderboards()
+
+        self.assertEqual({kind: top(kind, limit=50) for kind in ('salons', 'stylists')}, incremental)
+        self.assertEqual(sizes['salons:female'], 1)
+        self.assertEqual(sizes['salons:all'], 2)
+
+    def test_endpoint(self):
+        low, _ = self.make_rated_salon([3, 3], name='معمولی')
+        high, stylist = self.make_rated_salon([5, 5, 5], name='عالی')
+        self.make_rated_salon([5], gender='female')
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        # Salon cards and stylists; the ranking comes from Redis
+        with self.assertNumQueries(2):
+            data = client.get(reverse('salons:api_salon_top')).data
+
+        self.assertEqual([salon['name'] for salon in data['salons']], ['عالی', 'معمولی'])
+        self.assertEqual(data['stylists'][0]['id'], stylist.id)
+        self.assertEqual(data['stylists'][0]['total_ratings'], 3)
+        self.assertEqual(len(APIClient().get(reverse('salons:api_salon_top')).data['salons']), 3)
@@ -0,0 +1,116 @@
+"""
+Tests for the incremental stylist and salon rating aggregates.
+"""
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.accounts.models import StylistProfile
+from apps.ratings.aggregates import reconcile_rating_aggregates
+from apps.ratings.models import Rating
+from apps.salons.models import Salon
+from apps.core.tests.factories import FixturesMixin
+
+
+class RatingAggregatesTestCase(FixturesMixin, TestCase):
+    """Test F() maintenance of sums, counts and histograms and the reconcile pass."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.ali = self.make_stylist(self.salon)
+        self.reza = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.hour = 8
+
+    def rate(self, stylist, value):
+        self.hour += 1
+        appointment = self.book(self.customer, stylist, self.service, date(2026, 1, 1), time(self.hour, 0),
+                                status='completed')
+        return Rating.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, rating=value)
+
+    def assertAggregates(self, obj, rating_sum, histogram):
+        obj.refresh_from_db()
+        self.assertEqual(obj.rating_sum, rating_sum)
+        self.assertEqual(obj.rating_count, sum(histogram.values()))
+        self.assertEqual(obj.rating_histogram, {value: histogram.get(value, 0) for value in range(1, 6)})
+
+    def test_create(self):
+        self.rate(self.ali, 5)
+        self.rate(self.ali, 4)
+        self.rate(self.reza, 2)
+
+        self.assertAggregates(self.ali, 9, {5: 1, 4: 1})
+        self.assertAggregates(self.reza, 2, {2: 1})
+        self.assertAggregates(self.salon, 11, {5: 1, 4: 1, 2: 1})
+        self.assertEqual(self.salon.average_rating, Decimal('3.67'))
+        self.assertEqual(self.salon.total_ratings, 3)
+        self.assertEqual(self.ali.rating_average, 4.5)
+
+    def test_change_value_and_stylist(self):
+        rating = self.rate(self.ali, 5)
+
+        rating.rating = 3
+        rating.save()
+        self.assertAggregates(self.ali, 3, {3: 1})
+
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.stylist = self.reza
+        rating.save()
+        self.assertAggregates(self.ali, 0, {})
+        self.assertAggregates(self.reza, 3, {3: 1})
+        self.assertAggregates(self.salon, 3, {3: 1})
+
+    def test_resave_does_not_double_count(self):
+        rating = self.rate(self.ali, 4)
+        rating.save()
+        Rating.objects.get(pk=rating.pk).save()
+
+        self.assertAggregates(self.ali, 4, {4: 1})
+
+    def test_delete_and_cascade(self):
+        first = self.rate(self.ali, 5)
+        second = self.rate(self.ali, 1)
+
+        first.delete()
+        self.assertAggregates(self.salon, 1, {1: 1})
+        self.assertEqual(self.salon.average_rating, Decimal('1.00'))
+
+        second.appointment.delete()
+        self.assertAggregates(self.salon, 0, {})
+        self.assertEqual(self.salon.average_rating, 0)
+
+    def test_rating_write_does_not_aggregate(self):
+        appointment = self.book(self.customer, self.ali, self.service, date(2026, 1, 1), time(12, 0), 'completed')
+        # Insert, stylist update and salon update; no aggregate over the ratings
+        with self.assertNumQueries(3):
+            Rating.objects.create(customer=self.customer, stylist=self.ali, appointment=appointment, rating=4)
+
+    def test_reconcile_repairs_drift(self):
+        self.rate(self.ali, 5)
+        self.rate(self.reza, 4)
+        StylistProfile.objects.filter(pk=self.ali.pk).update(rating_sum=0, ratings_5=7)
+        Salon.objects.filter(pk=self.salon.pk).update(rating_count=0, average_rating=1)
+
+        self.assertEqual(reconcile_rating_aggregates(), {'stylists': 1, 'salons': 1})
+        self.assertAggregates(self.ali, 5, {5: 1})
+        self.assertAggregates(self.salon, 9, {5: 1, 4: 1})
+        self.assertEqual(self.salon.average_rating, Decimal('4.50'))
+
+        call_command('reconcile_rating_aggregates', stdout=StringIO())
+        self.assertEqual(reconcile_rating_aggregates(), {'stylists': 0, 'salons': 0})
+
+    def test_stylist_ratings_endpoint_reads_aggregates(self):
+        self.rate(self.ali, 5)
+        self.rate(self.ali, 2)
+        self.client.force_login(self.customer.user)
+
+        response = self.client.get(reverse('ratings:api_stylist_ratings', args=[self.ali.id]))
+
+        self.assertEqual(response.data['average_rating'], 3.5)
+        self.assertEqual(response.data['total_ratings'], 2)
+        self.assertEqual(response.data['rating_histogram'], {1: 0, 2: 1, 3: 0, 4: 0, 5: 1})
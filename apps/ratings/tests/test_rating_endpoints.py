@@ -0,0 +1,117 @@
+"""
+Tests for the public rating/review endpoints and the customer's own list.
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.utils import bump_cache_generation
+from apps.ratings.models import Rating, Review
+from apps.core.tests.factories import FixturesMixin
+
+
+class RatingEndpointsTestCase(FixturesMixin, TestCase):
+    """Test summaries, cursor pages, query counts and caching."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.day = date(2026, 1, 1)
+        bump_cache_generation(f'stylist_feedback_{self.stylist.id}')
+        bump_cache_generation(f'salon_feedback_{self.salon.id}')
+        self.client = APIClient()
+
+    def rate(self, count, value=4, review=None, approved=True, stylist=None):
+        stylist = stylist or self.stylist
+        for _ in range(count):
+            self.day += timedelta(days=1)
+            appointment = self.book(self.customer, stylist, self.service, self.day, time(10, 0), status='completed')
+            Rating.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, rating=value)
+            if review:
+                Review.objects.create(customer=self.customer, stylist=stylist, appointment=appointment,
+                                      text=review, is_approved=approved)
+
+    def test_stylist_ratings_summary_and_cursor(self):
+        self.rate(15, value=5)
+        self.rate(10, value=2)
+        url = reverse('ratings:api_stylist_ratings', args=[self.stylist.id])
+
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+
+        self.assertEqual(first['total_ratings'], 25)
+        self.assertEqual(first['average_rating'], 3.8)
+        self.assertEqual(first['rating_histogram'], {1: 0, 2: 10, 3: 0, 4: 0, 5: 15})
+        self.assertEqual(len(first['ratings']), 20)
+        self.assertEqual([r['rating'] for r in first['ratings'][:10]], [2] * 10)
+        self.assertEqual(len(second['ratings']), 5)
+        self.assertIsNone(second['next'])
+        self.assertNotIn('customer', first['ratings'][0])
+
+    def test_read_cost_does_not_grow(self):
+        url = reverse('ratings:api_stylist_ratings', args=[self.stylist.id])
+        self.rate(25)
+        # Stylist and one page; no count, no aggregate
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        self.rate(60)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_public_and_cached(self):
+        self.rate(3, review='خوب بود')
+        url = reverse('ratings:api_stylist_reviews', args=[self.stylist.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+
+        # Only the stylist lookup; the page itself comes from cache
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.client.get(url).data['reviews']), 3)
+
+        self.rate(1, review='عالی')
+        self.assertEqual(len(self.client.get(url).data['reviews']), 4)
+
+    def test_salon_reviews_only_approved(self):
+        other = self.make_stylist(self.salon)
+        self.rate(2, review='خوب', stylist=self.stylist)
+        self.rate(2, review='بد', approved=False, stylist=other)
+        self.rate(3, review='متوسط', value=3, stylist=other)
+        url = reverse('ratings:api_salon_reviews', args=[self.salon.id])
+
+        with self.assertNumQueries(2):
+            data = self.client.get(url).data
+
+        self.assertEqual(len(data['reviews']), 5)
+        self.assertNotIn('بد', {review['text'] for review in data['reviews']})
+        self.assertEqual(data['total_ratings'], 7)
+
+    def test_my_reviews(self):
+        self.rate(3, review='خوب بود')
+        self.rate(2)
+        self.client.force_authenticate(self.customer.user)
+        url = reverse('ratings:api_my_reviews')
+
+        # One page with stylist, salon, appointment and review joined
+        with self.assertNumQueries(1):
+            data = self.client.get(url).data
+
+        self.assertEqual(len(data['ratings']), 5)
+        self.assertIsNone(data['ratings'][0]['review'])
+        self.assertEqual(data['ratings'][-1]['review']['text'], 'خوب بود')
+        self.assertEqual(data['ratings'][0]['salon_name'], self.salon.name)
+
+    def test_unknown_stylist(self):
+        with mock.patch('apps.ratings.views.get_or_compute') as get_or_compute:
+            response = self.client.get(reverse('ratings:api_stylist_ratings', args=[999999]))
+
+        self.assertEqual(response.status_code, 404)
+        get_or_compute.assert_not_called()
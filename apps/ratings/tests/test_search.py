@@ -0,0 +1,46 @@
+"""
+Tests for Persian-aware review search.
+"""
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.ratings.models import Review
+from apps.core.tests.factories import FixturesMixin
+
+
+class ReviewSearchTestCase(FixturesMixin, TestCase):
+    """Test the manager review search endpoint."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.stylist = self.make_stylist(self.salon)
+        self.service = self.make_service(self.salon)
+        self.customer = self.make_customer()
+        self.client = APIClient()
+        self.client.force_authenticate(self.salon.manager.user)
+        self.url = reverse('ratings:api_manager_review_search')
+
+    def review(self, stylist, text, at):
+        appointment = self.book(self.customer, stylist, self.service, date(2024, 1, 1), at, status='completed')
+        return Review.objects.create(customer=self.customer, stylist=stylist, appointment=appointment, text=text)
+
+    def test_finds_only_own_salon_reviews(self):
+        own = self.review(self.stylist, 'برخورد پرسنل بسيار حرفه‌ای بود', time(10, 0))
+        self.review(self.make_stylist(self.make_salon()), 'برخورد حرفه ای', time(11, 0))
+
+        response = self.client.get(self.url, {'q': 'حرفه ای'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([review['id'] for review in response.data['results']], [own.id])
+
+    def test_search_text_follows_edits(self):
+        review = self.review(self.stylist, 'معمولی', time(10, 0))
+        review.text = 'عالي بود'
+        review.save(update_fields=['text'])
+
+        response = self.client.get(self.url, {'q': 'عالی'})
+
+        self.assertEqual(response.data['count'], 1)
@@ -11,4 +11,6 @@ urlpatterns = [
     path('api/stylist/<int:stylist_id>/reviews/', views.stylist_reviews, name='api_stylist_reviews'),
     path('api/salon/<int:salon_id>/reviews/', views.salon_reviews, name='api_salon_reviews'),
     path('api/my-reviews/', views.my_reviews, name='api_my_reviews'),
+    path('api/manager/reviews/search/', views.manager_review_search, name='api_manager_review_search'),
+    path('api/admin/reviews/bulk/', views.admin_bulk_reviews, name='api_admin_bulk_reviews'),
 ]
@@ -4,17 +4,36 @@ Views for ratings and reviews with anonymous display.
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 
 from .models import Rating, Review
+from .moderation import set_reviews_approved
 from .serializers import (
     AnonymousRatingSerializer, AnonymousReviewSerializer,
-    MyRatingSerializer, MyReviewSerializer, SubmitRatingSerializer
+    MyRatingSerializer, SubmitRatingSerializer
 )
 from apps.accounts.models import StylistProfile
+from apps.core.bulk import BulkSelectionError, select_targets
+from apps.core.caching import get_or_compute
+from apps.core.search import MIN_TERM_LENGTH, match_all_terms, rank_terms, search_terms
+from apps.core.utils import generate_cache_key, namespaced_key, salon_namespace, stylist_namespace
 from apps.salons.models import Salon
-from apps.accounts.permissions import IsCustomer
+from apps.accounts.permissions import IsCustomer, IsSalonManager, IsSiteAdmin
+
+FEEDBACK_CACHE_TIMEOUT = 60
+
+# Filter names accepted by the bulk review endpoint
+REVIEW_BULK_FILTERS = {
+    'stylist_id': 'stylist_id',
+    'salon_id': 'stylist__salon_id',
+    'customer_id': 'customer_id',
+    'is_approved': 'is_approved',
+    'created_after': 'created_at__gte',
+    'created_before': 'created_at__lt',
+}
 
 
 @api_view(['POST'])
@@ -44,102 +63,197 @@ def submit_rating(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class FeedbackCursorPagination(CursorPagination):
+    """
+    Newest first, keyed on created_at: every page is an index range scan,
+    with no COUNT and no OFFSET, however many ratings there are.
+    """
+    page_size = 20
+    ordering = ('-created_at', '-id')
+
+
+def rating_summary(obj):
+    """Average, count and star histogram from the stored aggregates of a stylist or salon."""
+    return {
+        'average_rating': obj.rating_average,
+        'total_ratings': obj.rating_count,
+        'rating_histogram': obj.rating_histogram,
+    }
+
+
+def public_feedback_response(request, namespace, build):
+    """
+    Serve a public ratings/reviews page from cache.
+    
+    Pages are cached in the stylist's/salon's namespace, whose generation
+    rating and review writes bump, and are marked cacheable by browsers
+    and shared caches for FEEDBACK_CACHE_TIMEOUT seconds. Callers look the
+    stylist/salon up first, so a missing one is a plain 404 and only built
+    pages reach the cache.
+    """
+    key = namespaced_key(namespace, generate_cache_key(
+        request.path, request.get_host(), request.query_params.get('cursor')
+    ))
+    response = Response(get_or_compute(key, build, FEEDBACK_CACHE_TIMEOUT, name='public_feedback'))
+    patch_cache_control(response, public=True, max_age=FEEDBACK_CACHE_TIMEOUT)
+    return response
+
+
+def paginated(request, queryset, serializer_class, key):
+    """One cursor page of queryset as {key: [...], 'next': url, 'previous': url}."""
+    paginator = FeedbackCursorPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    return {
+        key: serializer_class(page, many=True).data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+    }
+
+
 @api_view(['GET'])
+@permission_classes([AllowAny])
 def stylist_ratings(request, stylist_id):
     """
-    Get anonymous ratings for a stylist.
+    Get anonymous ratings for a stylist, newest first.
     
-    GET /ratings/api/stylist/<id>/ratings/
+    GET /ratings/api/stylist/<id>/ratings/?cursor=<cursor>
     """
     stylist = get_object_or_404(StylistProfile, id=stylist_id)
-    ratings = Rating.objects.filter(stylist=stylist).order_by('-created_at')
-    
-    serializer = AnonymousRatingSerializer(ratings, many=True)
     
-    # Calculate average
-    if ratings.exists():
-        avg_rating = sum(r.rating for r in ratings) / len(ratings)
-    else:
-        avg_rating = 0
+    def build():
+        ratings = Rating.objects.filter(stylist=stylist).select_related('stylist')
+        return {
+            'stylist_id': stylist_id,
+            'stylist_name': stylist.full_name,
+            **rating_summary(stylist),
+            **paginated(request, ratings, AnonymousRatingSerializer, 'ratings'),
+        }
     
-    return Response({
-        'stylist_id': stylist_id,
-        'stylist_name': stylist.full_name,
-        'average_rating': round(avg_rating, 2),
-        'total_ratings': ratings.count(),
-        'ratings': serializer.data
-    })
+    return public_feedback_response(request, stylist_namespace(stylist_id), build)
 
 
 @api_view(['GET'])
+@permission_classes([AllowAny])
 def stylist_reviews(request, stylist_id):
     """
-    Get anonymous reviews for a stylist.
+    Get anonymous reviews for a stylist, newest first.
     
-    GET /ratings/api/stylist/<id>/reviews/
+    GET /ratings/api/stylist/<id>/reviews/?cursor=<cursor>
     """
     stylist = get_object_or_404(StylistProfile, id=stylist_id)
-    reviews = Review.objects.filter(
-        stylist=stylist,
-        is_approved=True
-    ).order_by('-created_at')
     
-    serializer = AnonymousReviewSerializer(reviews, many=True)
+    def build():
+        reviews = Review.objects.filter(stylist=stylist, is_approved=True).select_related('stylist')
+        return {
+            'stylist_id': stylist_id,
+            'stylist_name': stylist.full_name,
+            **rating_summary(stylist),
+            **paginated(request, reviews, AnonymousReviewSerializer, 'reviews'),
+        }
     
-    return Response({
-        'stylist_id': stylist_id,
-        'stylist_name': stylist.full_name,
-        'total_reviews': reviews.count(),
-        'reviews': serializer.data
-    })
+    return public_feedback_response(request, stylist_namespace(stylist_id), build)
 
 
 @api_view(['GET'])
+@permission_classes([AllowAny])
 def salon_reviews(request, salon_id):
     """
-    Get all anonymous reviews for a salon (from all its stylists).
+    Get all anonymous reviews for a salon (from all its stylists), newest first.
     
-    GET /ratings/api/salon/<id>/reviews/
+    GET /ratings/api/salon/<id>/reviews/?cursor=<cursor>
     """
     salon = get_object_or_404(Salon, id=salon_id)
     
-    # Get all reviews for stylists in this salon
-    reviews = Review.objects.filter(
-        stylist__salon=salon,
-        is_approved=True
-    ).order_by('-created_at')
-    
-    serializer = AnonymousReviewSerializer(reviews, many=True)
+    def build():
+        reviews = Review.objects.filter(stylist__salon=salon, is_approved=True).select_related('stylist')
+        return {
+            'salon_id': salon_id,
+            'salon_name': salon.name,
+            **rating_summary(salon),
+            **paginated(request, reviews, AnonymousReviewSerializer, 'reviews'),
+        }
     
-    return Response({
-        'salon_id': salon_id,
-        'salon_name': salon.name,
-        'average_rating': float(salon.average_rating),
-        'total_ratings': salon.total_ratings,
-        'total_reviews': reviews.count(),
-        'reviews': serializer.data
-    })
+    return public_feedback_response(request, salon_namespace(salon_id), build)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsCustomer])
 def my_reviews(request):
     """
-    Get current customer's own ratings and reviews.
+    Get current customer's own ratings (with their reviews), newest first.
     
-    GET /ratings/api/my-reviews/
+    GET /ratings/api/my-reviews/?cursor=<cursor>
     """
     customer = request.user.customer_profile
     
-    ratings = Rating.objects.filter(customer=customer).order_by('-created_at')
-    reviews = Review.objects.filter(customer=customer).order_by('-created_at')
+    ratings = Rating.objects.filter(customer=customer).select_related(
+        'stylist__salon', 'appointment__review'
+    )
+    
+    return Response(paginated(request, ratings, MyRatingSerializer, 'ratings'))
+
+
+@api_view(['GET'])
+@permission_classes([IsSalonManager])
+def manager_review_search(request):
+    """
+    Search the reviews of the manager's salons (including unapproved ones).
+    
+    GET /ratings/api/manager/reviews/search/?q=<text>&salon_id=<id>&page=<n>
+    Every word of q must occur in the review; reviews where the words
+    start a word rank first, then the newest.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    terms = search_terms(request.query_params.get('q', ''))
+    if not terms:
+        return Response(
+            {'error': f'عبارت جستجو باید حداقل {MIN_TERM_LENGTH} حرف باشد'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    reviews = Review.objects.filter(
+        match_all_terms(terms, 'search_text'),
+        stylist__salon__manager=manager_profile
+    )
+    if request.query_params.get('salon_id'):
+        reviews = reviews.filter(stylist__salon_id=request.query_params['salon_id'])
+    reviews = reviews.select_related('stylist').annotate(
+        search_rank=rank_terms(terms, [('search_text', 2, 1)])
+    ).order_by('-search_rank', '-created_at', '-id')
+    
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(reviews, request)
+    serializer = AnonymousReviewSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['POST'])
+@permission_classes([IsSiteAdmin])
+def admin_bulk_reviews(request):
+    """
+    Approve or reject many reviews at once.
     
-    ratings_serializer = MyRatingSerializer(ratings, many=True)
-    reviews_serializer = MyReviewSerializer(reviews, many=True)
+    POST /ratings/api/admin/reviews/bulk/
+    {"action": "approve" | "reject", "ids": [...]} or
+    {"action": ..., "filter": {"salon_id": 4, "created_before": "2026-01-01", ...}}
+    """
+    action = request.data.get('action')
+    if action not in ('approve', 'reject'):
+        return Response({'error': 'عملیات باید approve یا reject باشد'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        reviews = select_targets(Review.objects.all(), request.data, REVIEW_BULK_FILTERS)
+    except BulkSelectionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    updated = set_reviews_approved(reviews, action == 'approve')
     return Response({
-        'ratings_count': ratings.count(),
-        'reviews_count': reviews.count(),
-        'ratings': ratings_serializer.data,
-        'reviews': reviews_serializer.data
-    })
+        'message': f'{updated} نظر {"تأیید" if action == "approve" else "رد"} شد',
+        'updated': updated,
+    }, status=status.HTTP_200_OK)
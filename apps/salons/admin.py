@@ -1,21 +1,32 @@
 """Admin configuration for salons app."""
 from django.contrib import admin
-from .models import Salon, Service, WorkingHours
+
+from apps.core.admin import DeferredSignalsAdminMixin
+from .models import Salon, SalonResource, ScheduleException, Service, WorkingHours
 
 
 @admin.register(Salon)
-class SalonAdmin(admin.ModelAdmin):
+class SalonAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'manager', 'gender_type', 'average_rating', 'total_ratings', 'created_at']
     list_filter = ['gender_type', 'created_at']
     search_fields = ['name', 'address', 'manager__salon_name']
     readonly_fields = ['average_rating', 'total_ratings', 'created_at', 'updated_at']
+    ordering = ['-created_at']
+
+
+@admin.register(SalonResource)
+class SalonResourceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'salon', 'capacity', 'is_active']
+    list_filter = ['is_active']
+    search_fields = ['name', 'salon__name']
 
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     list_display = ['get_name', 'salon', 'stylist', 'price', 'is_active']
     list_filter = ['service_type', 'is_active', 'salon__gender_type']
     search_fields = ['custom_name', 'salon__name']
+    filter_horizontal = ['required_resources']
     
     def get_name(self, obj):
         return obj.custom_name if obj.custom_name else obj.get_service_type_display()
@@ -23,10 +34,21 @@ class ServiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(WorkingHours)
-class WorkingHoursAdmin(admin.ModelAdmin):
+class WorkingHoursAdmin(DeferredSignalsAdminMixin, admin.ModelAdmin):
     list_display = ['get_entity', 'day_of_week', 'start_time', 'end_time', 'is_active']
     list_filter = ['day_of_week', 'is_active']
     
     def get_entity(self, obj):
         return obj.salon.name if obj.salon else obj.stylist.full_name
     get_entity.short_description = 'سالن/آرایشگر'
+
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ['get_entity', 'start_date', 'end_date', 'start_time', 'end_time', 'reason']
+    list_filter = ['start_date']
+    search_fields = ['reason', 'salon__name', 'stylist__first_name', 'stylist__last_name']
+    
+    def get_entity(self, obj):
+        return obj.salon.name if obj.salon else obj.stylist.full_name
+    get_entity.short_description = 'سالن/آرایشگر'
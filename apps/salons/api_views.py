@@ -1,32 +1,218 @@
-from rest_framework import generics, permissions
-from .models import Salon
-from .serializers import SalonSerializer
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Min, Prefetch, Q
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from apps.accounts.models import StylistProfile
+from apps.core.caching import get_or_compute
+from apps.core.search import MIN_TERM_LENGTH, search_terms
+from apps.core.utils import SALON_CATALOG, generate_cache_key, namespaced_key
+from apps.ratings.leaderboards import top
+from .filters import (
+    apply_base_filters, apply_facet_filters, cache_key_parts, facet_counts, parse_salon_filters,
+)
+from .geo import MAX_RADIUS_KM, nearest
+from .models import Salon, Service
+from .search import search_salons
+from .serializers import NearbySalonSerializer, SalonListSerializer, SalonSerializer, TopStylistSerializer
+
+SALON_LIST_CACHE_TIMEOUT = 300
+SALON_LIST_CACHE_STALE = 60
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 50
+TOP_DEFAULT_LIMIT = 10
+TOP_MAX_LIMIT = 50
+
 
 class SalonListAPIView(generics.ListAPIView):
     """
     API endpoint to list approved salons.
     Supports filtering by gender for logged-in customers.
+
+    Optional filters (see apps.salons.filters): service_type, min_price,
+    max_price, min_rating, open_now=1 or open_at=<ISO datetime>.
+    Each page comes with facet counts per service type and rating bucket.
+
+    Each page is one query (plus the count and one aggregate query for the
+    facets): minimum price and service types are aggregated in SQL. Pages
+    are cached per gender, filters and page, under the 'salon_catalog'
+    generation that salon, service and approval changes bump.
     """
-    serializer_class = SalonSerializer
+    serializer_class = SalonListSerializer
     permission_classes = [permissions.AllowAny] # Allow browsing without login (optional)
 
-    def get_queryset(self):
-        queryset = Salon.objects.approved()
-        
-        # Gender filtering if user is authenticated customer
+    def get_gender(self):
         if self.request.user.is_authenticated and self.request.user.user_type == 'customer':
             try:
-                gender = self.request.user.customer_profile.gender
-                queryset = queryset.for_gender(gender)
+                return self.request.user.customer_profile.gender
             except AttributeError:
                 pass
-                
-        return queryset
+        return None
+
+    def get_filters(self):
+        """Parsed listing filters; raises ValueError on bad parameters."""
+        if not hasattr(self, '_filters'):
+            self._filters = parse_salon_filters(self.request.query_params)
+        return self._filters
+
+    def get_base_queryset(self):
+        """Approved salons for the customer's gender, with the non-facet filters."""
+        queryset = Salon.objects.approved()
+
+        # Gender filtering if user is authenticated customer
+        gender = self.get_gender()
+        if gender:
+            queryset = queryset.for_gender(gender)
+
+        return apply_base_filters(queryset, self.get_filters())
+
+    def annotate_cards(self, queryset):
+        """Minimum price and service types of each salon, for SalonListSerializer."""
+        active = Q(services__is_active=True)
+        return queryset.annotate(
+            min_price=Min('services__price', filter=active),
+            active_service_types=ArrayAgg('services__service_type', filter=active, distinct=True),
+        )
+
+    def get_queryset(self):
+        queryset = apply_facet_filters(self.get_base_queryset(), self.get_filters())
+        return self.annotate_cards(queryset).order_by('-average_rating', '-created_at', 'id')
+
+    def list(self, request, *args, **kwargs):
+        try:
+            filters = self.get_filters()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        key = namespaced_key(SALON_CATALOG, generate_cache_key(
+            request.get_host(), self.get_gender(), cache_key_parts(filters),
+            request.query_params.get('page', '1')
+        ))
+
+        def build():
+            data = super(SalonListAPIView, self).list(request, *args, **kwargs).data
+            data['facets'] = facet_counts(self.get_base_queryset(), filters)
+            return data
+
+        return Response(get_or_compute(key, build, SALON_LIST_CACHE_TIMEOUT, stale=SALON_LIST_CACHE_STALE,
+                                       name='salon_list'))
+
+
+class SalonSearchAPIView(SalonListAPIView):
+    """
+    Search approved salons by name, neighborhood (address), stylist or service.
+
+    GET /salons/api/search/?q=<text>&page=<n>
+    Every word of q must match; results are ranked by where the words
+    matched (name first), then by rating. Takes the same filters as the
+    list, without facets. Not cached: queries are too varied to be worth
+    it and each one is a single indexed lookup.
+    """
+
+    def get_terms(self):
+        return search_terms(self.request.query_params.get('q', ''))
+
+    def get_queryset(self):
+        return search_salons(super().get_queryset(), self.get_terms()).order_by(
+            '-search_rank', '-average_rating', 'id'
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.get_terms():
+            return Response(
+                {'error': f'عبارت جستجو باید حداقل {MIN_TERM_LENGTH} حرف باشد'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            self.get_filters()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return generics.ListAPIView.list(self, request, *args, **kwargs)
+
+
+class SalonNearbyAPIView(SalonListAPIView):
+    """
+    Approved salons near a point, nearest first.
+
+    GET /salons/api/nearby/?lat=<deg>&lng=<deg>[&radius_km=<km>][&limit=<n>]
+    With radius_km, every salon within it (up to limit); without it, the
+    `limit` nearest salons within MAX_RADIUS_KM. Composes with the
+    customer's gender filter and the list filters. Not cached: the point
+    is different for every caller.
+    """
+    serializer_class = NearbySalonSerializer
+    pagination_class = None
+
+    def parse_params(self):
+        params = self.request.query_params
+        try:
+            latitude = float(params['lat'])
+            longitude = float(params['lng'])
+            radius_km = float(params['radius_km']) if params.get('radius_km') else None
+            limit = int(params.get('limit', NEARBY_DEFAULT_LIMIT))
+        except (KeyError, ValueError):
+            raise ValueError('پارامترهای lat و lng الزامی و عددی هستند')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError('مختصات نامعتبر است')
+        if radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValueError(f'شعاع باید بین 0 و {MAX_RADIUS_KM} کیلومتر باشد')
+        self.get_filters()
+        return latitude, longitude, radius_km, min(max(limit, 1), NEARBY_MAX_LIMIT)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            latitude, longitude, radius_km, limit = self.parse_params()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        if radius_km is None:
+            salons = nearest(queryset, latitude, longitude, limit)
+        else:
+            salons = list(queryset.near(latitude, longitude, radius_km)[:limit])
+        return Response(self.get_serializer(salons, many=True).data)
+
+
+class TopRatedAPIView(SalonListAPIView):
+    """
+    Best salons and stylists for the customer's gender (everyone's when
+    not logged in as a customer).
+
+    GET /salons/api/top/[?limit=<n>]
+    Ranked by the Bayesian-adjusted rating kept in the Redis leaderboards
+    (apps.ratings.leaderboards): a range read there, then one query for
+    the salon cards and one for the stylists, whatever the table sizes.
+    """
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', TOP_DEFAULT_LIMIT)), 1), TOP_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'پارامتر limit باید عدد باشد'}, status=status.HTTP_400_BAD_REQUEST)
+        gender = self.get_gender()
+
+        salon_scores = dict(top('salons', gender, limit))
+        salons = self.annotate_cards(Salon.objects.approved().filter(pk__in=salon_scores))
+        stylist_scores = dict(top('stylists', gender, limit))
+        stylists = StylistProfile.objects.filter(pk__in=stylist_scores, user__is_active=True).select_related('salon')
+
+        def ranked(objects, scores):
+            return sorted(objects, key=lambda obj: -scores[obj.pk])
+
+        return Response({
+            'salons': self.get_serializer(ranked(salons, salon_scores), many=True).data,
+            'stylists': TopStylistSerializer(ranked(stylists, stylist_scores), many=True).data,
+        })
+
 
 class SalonDetailAPIView(generics.RetrieveAPIView):
     """
     API endpoint for salon details.
     """
-    queryset = Salon.objects.approved()
+    queryset = Salon.objects.approved().select_related('manager__user').prefetch_related(
+        Prefetch('services', queryset=Service.objects.select_related('stylist')),
+        Prefetch('stylists', queryset=StylistProfile.objects.all()),
+    )
     serializer_class = SalonSerializer
     permission_classes = [permissions.AllowAny]
@@ -5,3 +5,7 @@ class SalonsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.salons'
     verbose_name = 'سالن‌ها و خدمات'  # Salons and Services
+    
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.salons.signals  # noqa
@@ -0,0 +1,150 @@
+"""
+Manager dashboard: everything the dashboard shows for a manager's salons
+in one response.
+
+The payload is built with a fixed number of queries however many salons,
+stylists or appointments the manager has:
+1. salons, with pending and today's appointment counts as subqueries
+2. stylists (prefetch)
+3. services (prefetch, with their stylist)
+4. the services' required resources (prefetch)
+5. today's appointments of all salons
+6. the latest ratings of every salon (a window function caps them per salon)
+It is cached per manager for DASHBOARD_CACHE_TIMEOUT seconds and dropped
+by signals when salons, stylists, services, appointments or ratings of
+the manager change. Today's opening hours are not part of the cached
+payload: they are read on every request from the compiled schedules
+(one cache round trip), which have their own invalidation.
+"""
+from collections import defaultdict
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from apps.accounts.models import StylistProfile
+from apps.appointments.models import Appointment
+from apps.appointments.scheduling import minutes_to_time, persian_weekday
+from apps.core.deferred import deferrable_batch
+from apps.ratings.models import Rating
+from .management_serializers import DashboardSalonSerializer
+from .models import Salon, Service
+from .schedules import get_salon_schedules
+
+DASHBOARD_CACHE_KEY = 'manager_dashboard:{manager_id}'
+DASHBOARD_CACHE_TIMEOUT = 60
+RECENT_RATINGS = 5
+
+
+def _appointment_count(**filters):
+    """Subquery counting a salon's appointments matching filters."""
+    return Coalesce(Subquery(
+        Appointment.objects.filter(stylist__salon=OuterRef('pk'), **filters)
+        .order_by().values('stylist__salon').annotate(count=Count('id')).values('count'),
+        output_field=IntegerField()
+    ), Value(0))
+
+
+def build_manager_dashboard(manager) -> dict:
+    """Assemble the dashboard of a manager (uncached)."""
+    today = timezone.localdate()
+    salons = list(
+        Salon.objects.filter(manager=manager).annotate(
+            pending_count=_appointment_count(status='pending', appointment_date__gte=today),
+            today_count=_appointment_count(appointment_date=today, status__in=['pending', 'confirmed']),
+        ).prefetch_related(
+            Prefetch('stylists', queryset=StylistProfile.objects.order_by('first_name', 'last_name')),
+            Prefetch('services', queryset=Service.objects.select_related('stylist').prefetch_related(
+                'required_resources'
+            ).order_by('service_type', 'id')),
+        ).order_by('created_at')
+    )
+    salon_ids = [salon.id for salon in salons]
+
+    appointments = defaultdict(list)
+    for appointment in Appointment.objects.filter(
+        stylist__salon_id__in=salon_ids, appointment_date=today
+    ).exclude(status='cancelled').select_related(
+        'customer', 'stylist', 'service'
+    ).order_by('appointment_time'):
+        appointments[appointment.stylist.salon_id].append(appointment)
+
+    ratings = defaultdict(list)
+    for rating in Rating.objects.filter(stylist__salon_id__in=salon_ids).annotate(
+        salon_id=F('stylist__salon_id'),
+        position=Window(RowNumber(), partition_by=F('stylist__salon_id'), order_by=F('created_at').desc()),
+    ).filter(position__lte=RECENT_RATINGS).select_related('stylist', 'appointment__review').order_by('-created_at'):
+        ratings[rating.salon_id].append(rating)
+
+    return {
+        'date': today.isoformat(),
+        'salons': DashboardSalonSerializer(salons, many=True, context={
+            'appointments': appointments,
+            'ratings': ratings,
+        }).data,
+    }
+
+
+def add_today_hours(data: dict) -> dict:
+    """Fill in each salon's opening windows for the dashboard's day."""
+    weekday = persian_weekday(date.fromisoformat(data['date']))
+    schedules = get_salon_schedules(salon['id'] for salon in data['salons'])
+    for salon in data['salons']:
+        salon['today_hours'] = [
+            {'start': minutes_to_time(start).strftime('%H:%M'), 'end': minutes_to_time(end).strftime('%H:%M')}
+            for start, end in schedules[salon['id']]['salon'].get(weekday, [])
+        ]
+    return data
+
+
+def get_manager_dashboard(manager) -> dict:
+    """Cached dashboard of a manager; rebuilt after invalidation or at midnight."""
+    key = DASHBOARD_CACHE_KEY.format(manager_id=manager.id)
+    data = cache.get(key)
+    if data is None or data['date'] != timezone.localdate().isoformat():
+        data = build_manager_dashboard(manager)
+        cache.set(key, data, DASHBOARD_CACHE_TIMEOUT)
+    return add_today_hours(data)
+
+
+@deferrable_batch
+def invalidate_manager_dashboards(manager_ids) -> None:
+    """Drop the cached dashboards of several managers in one round trip."""
+    keys = [DASHBOARD_CACHE_KEY.format(manager_id=manager_id) for manager_id in set(manager_ids) if manager_id]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_manager_dashboard(manager_id) -> None:
+    """Drop the cached dashboard of a manager."""
+    invalidate_manager_dashboards([manager_id])
+
+
+@deferrable_batch
+def invalidate_dashboards_for_salons(salon_ids) -> None:
+    """Drop the dashboards of the managers owning some salons."""
+    salon_ids = [salon_id for salon_id in set(salon_ids) if salon_id]
+    if salon_ids:
+        invalidate_manager_dashboards(Salon.objects.filter(pk__in=salon_ids).values_list('manager_id', flat=True))
+
+
+def invalidate_dashboard_for_salon(salon_id) -> None:
+    """Drop the dashboard of the manager owning a salon."""
+    invalidate_dashboards_for_salons([salon_id])
+
+
+@deferrable_batch
+def invalidate_dashboards_for_stylists(stylist_ids) -> None:
+    """Drop the dashboards of the managers owning some stylists' salons."""
+    stylist_ids = [stylist_id for stylist_id in set(stylist_ids) if stylist_id]
+    if stylist_ids:
+        invalidate_manager_dashboards(
+            StylistProfile.objects.filter(pk__in=stylist_ids).values_list('salon__manager_id', flat=True)
+        )
+
+
+def invalidate_dashboard_for_stylist(stylist_id) -> None:
+    """Drop the dashboard of the manager owning a stylist's salon."""
+    invalidate_dashboards_for_stylists([stylist_id])
@@ -0,0 +1,180 @@
+"""
+Salon listing filters and facet counts.
+
+Filters are parsed from query parameters into a plain dict:
+
+    service_type, min_price, max_price  a salon offering a matching active service
+    min_rating                          average_rating at least this
+    open_at / open_now                  a salon-wide working window covers the
+                                        moment and no salon closure does
+
+The service and rating filters are the faceted dimensions. facet_counts()
+answers the facet panel in one aggregate query: salons are joined to their
+services once and counted with conditional COUNT(DISTINCT), each facet
+applying every filter except its own, so picking a service type still
+shows the counts of the other types.
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.appointments.scheduling import persian_weekday
+from .models import ScheduleException, Service, WorkingHours
+
+SERVICE_TYPE_LABELS = dict(Service.ALL_SERVICE_TYPES)
+
+# "n stars and up" buckets of the rating facet
+RATING_BUCKETS = [4, 3, 2, 1]
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def parse_salon_filters(params) -> dict:
+    """Read the filters from query parameters, raising ValueError with a user-facing message."""
+    filters = {}
+
+    service_type = params.get('service_type')
+    if service_type:
+        if service_type not in SERVICE_TYPE_LABELS:
+            raise ValueError('نوع خدمت نامعتبر است')
+        filters['service_type'] = service_type
+
+    for name in ('min_price', 'max_price'):
+        if params.get(name):
+            try:
+                filters[name] = Decimal(params[name])
+            except InvalidOperation:
+                raise ValueError('محدوده قیمت نامعتبر است')
+            if filters[name] < 0:
+                raise ValueError('محدوده قیمت نامعتبر است')
+    if filters.get('min_price') is not None and filters.get('max_price') is not None \
+            and filters['min_price'] > filters['max_price']:
+        raise ValueError('حداقل قیمت نباید از حداکثر قیمت بیشتر باشد')
+
+    if params.get('min_rating'):
+        try:
+            filters['min_rating'] = Decimal(params['min_rating'])
+        except InvalidOperation:
+            raise ValueError('حداقل امتیاز نامعتبر است')
+        if not 0 <= filters['min_rating'] <= 5:
+            raise ValueError('حداقل امتیاز باید بین 0 و 5 باشد')
+
+    if params.get('open_at'):
+        try:
+            moment = datetime.fromisoformat(params['open_at'])
+        except ValueError:
+            raise ValueError('زمان نامعتبر است (قالب: 2025-01-01T18:30)')
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        filters['open_at'] = moment
+    elif params.get('open_now', '').lower() in TRUE_VALUES:
+        filters['open_at'] = timezone.now()
+    if 'open_at' in filters:
+        filters['open_at'] = timezone.localtime(filters['open_at']).replace(second=0, microsecond=0)
+
+    return filters
+
+
+def cache_key_parts(filters: dict) -> tuple:
+    """Filters as a stable, hashable tuple for listing cache keys."""
+    return tuple(sorted((name, str(value)) for name, value in filters.items()))
+
+
+def offers_service(service_type=None, min_price=None, max_price=None):
+    """Condition: the salon has an active service of the type within the price range."""
+    services = Service.objects.filter(salon=OuterRef('pk'), is_active=True)
+    if service_type:
+        services = services.filter(service_type=service_type)
+    if min_price is not None:
+        services = services.filter(price__gte=min_price)
+    if max_price is not None:
+        services = services.filter(price__lte=max_price)
+    return Exists(services)
+
+
+def open_at(moment: datetime):
+    """
+    Condition: the salon is open at a (local) moment.
+
+    The same rule the compiled schedule applies to the salon's own windows
+    (apps.salons.schedules), expressed in SQL so it can filter and count a
+    whole listing: an active salon-wide window contains the time on that
+    weekday, and no salon closure covers it.
+    """
+    on_date, at = moment.date(), moment.time()
+    windows = WorkingHours.objects.filter(
+        salon=OuterRef('pk'), stylist__isnull=True, is_active=True,
+        day_of_week=persian_weekday(on_date), start_time__lte=at, end_time__gt=at
+    )
+    closures = ScheduleException.objects.filter(
+        salon=OuterRef('pk'), start_date__lte=on_date, end_date__gte=on_date
+    ).filter(Q(start_time__isnull=True) | Q(start_time__lte=at, end_time__gt=at))
+    return Exists(windows) & ~Exists(closures)
+
+
+def _service_condition(filters: dict) -> Q:
+    if not any(filters.get(name) is not None for name in ('service_type', 'min_price', 'max_price')):
+        return Q()
+    return Q(offers_service(filters.get('service_type'), filters.get('min_price'), filters.get('max_price')))
+
+
+def _rating_condition(filters: dict) -> Q:
+    if filters.get('min_rating') is None:
+        return Q()
+    return Q(average_rating__gte=filters['min_rating'])
+
+
+def apply_base_filters(queryset, filters: dict):
+    """Apply the filters that are not facets (currently the opening time)."""
+    if 'open_at' in filters:
+        queryset = queryset.filter(open_at(filters['open_at']))
+    return queryset
+
+
+def apply_facet_filters(queryset, filters: dict):
+    """Apply the service and rating filters."""
+    return queryset.filter(_service_condition(filters) & _rating_condition(filters))
+
+
+def facet_counts(queryset, filters: dict) -> dict:
+    """
+    Salons per service type and per rating bucket, in one query.
+
+    queryset is the listing with only the base filters applied. Each
+    service type counts salons offering it (within the price range) that
+    pass the rating filter; each rating bucket counts salons at or above
+    it that pass the service filter.
+    """
+    rating = _rating_condition(filters)
+    service = _service_condition(filters)
+    price = Q()
+    if filters.get('min_price') is not None:
+        price &= Q(services__price__gte=filters['min_price'])
+    if filters.get('max_price') is not None:
+        price &= Q(services__price__lte=filters['max_price'])
+
+    aggregates = {
+        f'service_{code}': Count(
+            'id', distinct=True,
+            filter=Q(services__service_type=code, services__is_active=True) & price & rating
+        )
+        for code in SERVICE_TYPE_LABELS
+    }
+    aggregates.update({
+        f'rating_{bucket}': Count('id', distinct=True, filter=Q(average_rating__gte=bucket) & service)
+        for bucket in RATING_BUCKETS
+    })
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    service_types = [
+        {'service_type': code, 'display': label, 'count': counts[f'service_{code}']}
+        for code, label in SERVICE_TYPE_LABELS.items()
+        if counts[f'service_{code}']
+    ]
+    service_types.sort(key=lambda facet: (-facet['count'], facet['service_type']))
+    return {
+        'service_types': service_types,
+        'ratings': [{'min_rating': bucket, 'count': counts[f'rating_{bucket}']} for bucket in RATING_BUCKETS],
+    }
@@ -0,0 +1,95 @@
+"""
+Distance queries on Salon.latitude/longitude without PostGIS.
+
+A radius query is answered in two steps:
+1. a bounding box around the point, a plain range filter that the
+   (latitude, longitude) B-tree index answers without touching most rows;
+2. the exact great-circle (haversine) distance, computed in SQL only for
+   rows inside the box, which also filters the box corners out and
+   orders the result.
+
+Nearest-N queries grow the radius until N salons are found, so they
+never fall back to computing the distance to every salon.
+"""
+import math
+from typing import Tuple
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# nearest(): first search radius, and the radius after which it gives up
+INITIAL_RADIUS_KM = 2
+MAX_RADIUS_KM = 50
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) enclosing the circle.
+
+    The longitude span widens with latitude; near a pole the circle covers
+    every longitude. Longitudes may run past +-180 when the circle crosses
+    the antimeridian; box_filter() wraps them.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    lat = math.radians(latitude)
+    min_lat, max_lat = lat - angular, lat + angular
+    if min_lat <= -math.pi / 2 or max_lat >= math.pi / 2:
+        return math.degrees(max(min_lat, -math.pi / 2)), math.degrees(min(max_lat, math.pi / 2)), -180.0, 180.0
+    delta_lng = math.asin(math.sin(angular) / math.cos(lat))
+    return (
+        math.degrees(min_lat), math.degrees(max_lat),
+        longitude - math.degrees(delta_lng), longitude + math.degrees(delta_lng),
+    )
+
+
+def box_filter(latitude: float, longitude: float, radius_km: float) -> Q:
+    """Index-friendly range condition for the bounding box."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    condition = Q(latitude__range=(min_lat, max_lat))
+    if min_lng < -180:
+        return condition & (Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return condition & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return condition & Q(longitude__range=(min_lng, max_lng))
+
+
+def haversine_km(latitude: float, longitude: float):
+    """SQL expression for the great-circle distance from the point to each row."""
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    half_chord = (
+        Power(Sin((Radians(F('latitude')) - Value(lat)) / 2), 2)
+        + Value(math.cos(lat)) * Cos(Radians(F('latitude')))
+        * Power(Sin((Radians(F('longitude')) - Value(lng)) / 2), 2)
+    )
+    # Rounding can push half_chord a hair over 1 for antipodal points
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(half_chord, Value(1.0), output_field=FloatField())))
+
+
+def within_radius(queryset, latitude: float, longitude: float, radius_km: float):
+    """Rows within radius_km, annotated with distance_km and ordered nearest first."""
+    return queryset.filter(
+        box_filter(latitude, longitude, radius_km)
+    ).annotate(
+        distance_km=haversine_km(latitude, longitude)
+    ).filter(
+        distance_km__lte=radius_km
+    ).order_by('distance_km', 'id')
+
+
+def nearest(queryset, latitude: float, longitude: float, limit: int, max_radius_km: float = MAX_RADIUS_KM):
+    """
+    The `limit` rows closest to the point (within max_radius_km), as a list.
+
+    Starts with a small circle and doubles it until it holds `limit` rows.
+    Whatever lies outside a circle is farther than everything inside it,
+    so the first circle that fills up holds exactly the nearest rows.
+    """
+    radius = min(INITIAL_RADIUS_KM, max_radius_km)
+    while True:
+        rows = list(within_radius(queryset, latitude, longitude, radius)[:limit])
+        if len(rows) >= limit or radius >= max_radius_km:
+            return rows
+        radius = min(radius * 2, max_radius_km)
@@ -0,0 +1,293 @@
+"""
+Bulk import of stylists and services from CSV or XLSX files.
+
+Rows are streamed from the upload and handled in batches. Each batch is
+validated with one query for existing phone numbers, password hashing
+runs in a thread pool (PBKDF2 releases the GIL), and users, profiles and
+services are written with bulk_create. Rows that fail validation are
+skipped and reported back with their row number, so the manager can fix
+the file and upload only the failed rows again.
+
+Columns (header row required, order free):
+
+    stylists: phone_number, first_name, last_name, gender, password
+    services: service_type, custom_name, price, duration_minutes,
+              stylist_phone, is_active
+"""
+import csv
+import io
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from apps.accounts.models import StylistProfile
+from apps.accounts.validators import validate_iranian_phone
+from apps.core.deferred import deferred_signals
+from apps.core.search import DIGITS_TO_ASCII
+from apps.core.utils import bump_cache_generation
+from .dashboard import invalidate_manager_dashboard
+from .models import Salon, Service
+from .schedules import invalidate_salon_schedule
+from .search import refresh_salon_search
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+REPORT_CACHE_KEY = 'import_report:{token}'
+REPORT_TIMEOUT = 60 * 60
+
+Row = Tuple[int, Dict[str, str]]
+RowError = Tuple[int, str, str]
+
+
+class ImportFileError(Exception):
+    """The upload cannot be read at all (bad format, missing columns)."""
+
+
+def _cell(value) -> str:
+    """Normalize a cell to a stripped string with ASCII digits."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().translate(DIGITS_TO_ASCII)
+
+
+def read_rows(upload, required: Tuple[str, ...]) -> Iterator[Row]:
+    """
+    Yield (row_number, {column: value}) from an uploaded CSV or XLSX file.
+
+    Row numbers are the ones a spreadsheet shows, so the header is row 1.
+    Blank rows are skipped.
+    """
+    name = (upload.name or '').lower()
+    if name.endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("پشتیبانی از فایل اکسل نصب نشده است؛ فایل CSV ارسال کنید")
+        try:
+            sheet = load_workbook(upload, read_only=True, data_only=True).active
+        except Exception:
+            raise ImportFileError("فایل اکسل قابل خواندن نیست")
+        lines = sheet.iter_rows(values_only=True)
+    elif name.endswith('.csv'):
+        lines = csv.reader(io.TextIOWrapper(upload.file, encoding='utf-8-sig'))
+    else:
+        raise ImportFileError("فقط فایل‌های CSV و XLSX پشتیبانی می‌شوند")
+
+    try:
+        header = [_cell(value).lower() for value in next(lines)]
+    except (StopIteration, UnicodeDecodeError):
+        raise ImportFileError("فایل خالی یا نامعتبر است")
+    missing = [column for column in required if column not in header]
+    if missing:
+        raise ImportFileError(f"ستون‌های الزامی وجود ندارند: {', '.join(missing)}")
+
+    try:
+        for number, values in enumerate(lines, start=2):
+            row = {column: _cell(value) for column, value in zip(header, values) if column}
+            if any(row.values()):
+                yield number, row
+    except UnicodeDecodeError:
+        raise ImportFileError("فایل باید با کدگذاری UTF-8 ذخیره شده باشد")
+
+
+def _batches(rows: Iterator[Row]) -> Iterator[List[Row]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash each row's password with its own salt, in parallel.
+
+    Rows sharing the manager's default password still get distinct
+    hashes, so a database dump doesn't reveal which accounts share one.
+    """
+    if len(passwords) <= 1 or HASH_WORKERS == 1:
+        return [make_password(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+@deferred_signals()
+def import_stylists(salon, rows: Iterator[Row], default_password: str = '',
+                    dry_run: bool = False) -> dict:
+    """
+    Create stylist accounts for a salon from rows.
+
+    Per batch: one query for phone numbers already registered, the
+    hashing pool, then one bulk_create for users and one for profiles.
+    """
+    genders = {code for code, _ in StylistProfile.GENDER_CHOICES}
+    errors: List[RowError] = []
+    seen = set()
+    created = total = 0
+
+    for batch in _batches(rows):
+        total += len(batch)
+        valid = []
+        for number, row in batch:
+            try:
+                phone = validate_iranian_phone(row.get('phone_number', ''))
+            except ValidationError as e:
+                errors.append((number, 'phone_number', e.messages[0]))
+                continue
+            if phone in seen:
+                errors.append((number, 'phone_number', "این شماره تلفن در فایل تکراری است"))
+                continue
+            seen.add(phone)
+            gender = row.get('gender', '')
+            if gender and gender not in genders:
+                errors.append((number, 'gender', "جنسیت باید male یا female باشد"))
+                continue
+            password = row.get('password') or default_password
+            if not password:
+                errors.append((number, 'password', "رمز عبور الزامی است"))
+                continue
+            valid.append((number, phone, row, password))
+
+        taken = set(User.objects.filter(
+            phone_number__in=[phone for _, phone, _, _ in valid]
+        ).values_list('phone_number', flat=True))
+        if taken:
+            errors.extend(
+                (number, 'phone_number', "این شماره تلفن قبلاً ثبت شده است")
+                for number, phone, _, _ in valid if phone in taken
+            )
+            valid = [item for item in valid if item[1] not in taken]
+        if dry_run or not valid:
+            created += len(valid)
+            continue
+
+        hashes = _hash_passwords([password for _, _, _, password in valid])
+        users = [
+            User(phone_number=phone, username=phone, user_type='stylist', password=password_hash)
+            for (_, phone, _, _), password_hash in zip(valid, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                StylistProfile.objects.bulk_create([
+                    StylistProfile(
+                        user=user,
+                        salon=salon,
+                        first_name=row.get('first_name', '')[:50],
+                        last_name=row.get('last_name', '')[:50],
+                        gender=row.get('gender', ''),
+                    )
+                    for user, (_, _, row, _) in zip(users, valid)
+                ])
+        except IntegrityError:
+            # Someone registered one of the numbers since the check above
+            errors.extend(
+                (number, 'phone_number', "ثبت همزمان این شماره؛ دوباره تلاش کنید")
+                for number, _, _, _ in valid
+            )
+            continue
+        created += len(valid)
+
+    if created and not dry_run:
+        invalidate_salon_schedule(salon.id)
+        invalidate_manager_dashboard(salon.manager_id)
+        Salon.objects.filter(pk=salon.id).bump_version()
+        refresh_salon_search([salon.id])
+    return {'total': total, 'created': created, 'errors': errors}
+
+
+@deferred_signals()
+def import_services(salon, rows: Iterator[Row], dry_run: bool = False) -> dict:
+    """
+    Create services for a salon from rows.
+
+    stylist_phone, when given, must belong to a stylist of the salon;
+    those are looked up once for the whole file.
+    """
+    allowed = {code for code, _ in Service.MALE_SERVICE_TYPES}
+    if salon.gender_type != 'male':
+        allowed |= {code for code, _ in Service.FEMALE_SERVICE_TYPES}
+    stylists = dict(salon.stylists.values_list('user__phone_number', 'id'))
+    errors: List[RowError] = []
+    created = total = 0
+
+    for batch in _batches(rows):
+        total += len(batch)
+        services = []
+        for number, row in batch:
+            service_type = row.get('service_type', '')
+            if service_type not in allowed:
+                errors.append((number, 'service_type', "نوع خدمت برای این سالن مجاز نیست"))
+                continue
+            try:
+                price = int(row.get('price', ''))
+                duration = int(row.get('duration_minutes') or 30)
+            except ValueError:
+                errors.append((number, 'price', "قیمت و مدت زمان باید عدد باشند"))
+                continue
+            if price < 0 or duration <= 0:
+                errors.append((number, 'price', "قیمت و مدت زمان باید مثبت باشند"))
+                continue
+            stylist_id = None
+            if row.get('stylist_phone'):
+                stylist_id = stylists.get(row['stylist_phone'])
+                if stylist_id is None:
+                    errors.append((number, 'stylist_phone', "این آرایشگر در این سالن کار نمی‌کند"))
+                    continue
+            services.append(Service(
+                salon=salon,
+                stylist_id=stylist_id,
+                service_type=service_type,
+                custom_name=row.get('custom_name', '')[:100],
+                price=price,
+                duration_minutes=duration,
+                is_active=row.get('is_active', '').lower() not in ('0', 'false', 'no', 'خیر'),
+            ))
+        if services and not dry_run:
+            Service.objects.bulk_create(services)
+        created += len(services)
+
+    if created and not dry_run:
+        bump_cache_generation('salon_catalog')
+        invalidate_manager_dashboard(salon.manager_id)
+        Salon.objects.filter(pk=salon.id).bump_version()
+        refresh_salon_search([salon.id])
+    return {'total': total, 'created': created, 'errors': errors}
+
+
+def store_error_report(manager_id: int, errors: List[RowError]) -> Optional[str]:
+    """Keep a CSV of row errors in the cache for an hour and return its token."""
+    if not errors:
+        return None
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['row', 'column', 'error'])
+    writer.writerows(errors)
+    token = uuid.uuid4().hex
+    cache.set(
+        REPORT_CACHE_KEY.format(token=token),
+        {'manager_id': manager_id, 'csv': output.getvalue()},
+        REPORT_TIMEOUT
+    )
+    return token
+
+
+def load_error_report(manager_id: int, token: str) -> Optional[str]:
+    """Return a stored error report if it belongs to this manager."""
+    report = cache.get(REPORT_CACHE_KEY.format(token=token))
+    if report and report['manager_id'] == manager_id:
+        return report['csv']
+    return None
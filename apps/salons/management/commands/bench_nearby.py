@@ -0,0 +1,117 @@
+"""
+Benchmark nearby salon queries on synthetic data.
+
+Creates --salons salons (half clustered around Tehran, the rest spread
+over Iran) inside a transaction that is rolled back at the end, runs
+ANALYZE, then times, for a few points:
+- within-radius with the bounding-box prefilter (Salon.objects.near)
+- the same radius computing haversine for every salon (no prefilter)
+- nearest-N with the expanding radius (apps.salons.geo.nearest)
+and prints the scan Postgres chose for each.
+"""
+import random
+import statistics
+import time as clock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.accounts.models import SalonManagerProfile
+from apps.salons.geo import haversine_km, nearest
+from apps.salons.models import Salon, Service
+
+User = get_user_model()
+
+TEHRAN = (35.70, 51.40)
+IRAN = ((25.0, 39.5), (44.0, 63.0))
+POINTS = {
+    'vanak': (35.7575, 51.4100),
+    'karaj': (35.8400, 50.9391),
+    'mashhad': (36.2970, 59.6062),
+    'desert': (33.0, 56.0),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bounding-box + haversine salon distance queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salons', type=int, default=50000)
+        parser.add_argument('--radius', type=float, default=5)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                self.bench(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        started = clock.perf_counter()
+
+        user = User.objects.create_user(phone_number='09399998003', password='x', user_type='salon_manager')
+        manager = SalonManagerProfile.objects.create(
+            user=user, salon_name='بنچمارک', salon_address='تهران',
+            salon_gender_type='male', is_approved=True
+        )
+        for start in range(0, options['salons'], 5000):
+            batch = []
+            for i in range(start, min(start + 5000, options['salons'])):
+                if i % 2:
+                    latitude, longitude = rng.gauss(TEHRAN[0], 0.08), rng.gauss(TEHRAN[1], 0.12)
+                else:
+                    latitude, longitude = rng.uniform(*IRAN[0]), rng.uniform(*IRAN[1])
+                batch.append(Salon(
+                    manager=manager, name=f'سالن {i}', address='ایران',
+                    gender_type=rng.choice(['male', 'female']),
+                    latitude=latitude, longitude=longitude,
+                ))
+            salons = Salon.objects.bulk_create(batch)
+            Service.objects.bulk_create([
+                Service(salon=salon, service_type=rng.choice(['haircut', 'shave', 'beard_trim']), price=100000)
+                for salon in salons
+            ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE salons_salon')
+            cursor.execute('ANALYZE salons_service')
+        self.stdout.write(f'seeded {options["salons"]} salons in {clock.perf_counter() - started:.1f} s')
+
+    def bench(self, options):
+        radius, limit = options['radius'], options['limit']
+        male = Salon.objects.filter(gender_type='male').offering('haircut')
+        for name, (latitude, longitude) in POINTS.items():
+            boxed = male.near(latitude, longitude, radius)[:limit]
+            full_scan = male.annotate(
+                distance_km=haversine_km(latitude, longitude)
+            ).filter(distance_km__lte=radius).order_by('distance_km', 'id')[:limit]
+            cases = [
+                ('box+haversine', lambda: list(boxed.all()), boxed),
+                ('haversine only', lambda: list(full_scan.all()), full_scan),
+                (f'nearest {limit}', lambda: nearest(male, latitude, longitude, limit), None),
+            ]
+            for label, run, queryset in cases:
+                samples = []
+                for _ in range(options['iterations']):
+                    started = clock.perf_counter()
+                    found = len(run())
+                    samples.append((clock.perf_counter() - started) * 1000)
+                scan = ''
+                if queryset is not None:
+                    plan = queryset.explain().splitlines()
+                    scan = next((line.strip() for line in plan if 'Scan' in line), plan[0])
+                self.stdout.write(
+                    f'{name:>8} {label:<15} {found:>3} rows  median {statistics.median(samples):7.2f} ms  '
+                    f'p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.2f} ms  {scan}'
+                )
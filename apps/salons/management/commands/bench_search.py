@@ -0,0 +1,153 @@
+"""
+Benchmark Persian salon and review search on synthetic data.
+
+Creates --salons salons spread over --managers managers and --reviews
+reviews (each with its own appointment) inside a transaction that is
+rolled back at the end, runs ANALYZE, then times the public salon search
+and one manager's review search for a few queries and prints the scan
+Postgres chose for each.
+"""
+import random
+import statistics
+import time as clock
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.accounts.models import CustomerProfile, SalonManagerProfile, StylistProfile
+from apps.appointments.models import Appointment
+from apps.core.search import match_all_terms, normalize_persian, rank_terms, search_terms
+from apps.ratings.models import Review
+from apps.salons.models import Salon, Service
+from apps.salons.search import refresh_salon_search, search_salons
+
+User = get_user_model()
+
+WORDS = [
+    'عالی', 'خوب', 'تمیز', 'حرفه‌ای', 'برخورد', 'قیمت', 'مناسب', 'کوتاهی', 'رنگ', 'مو',
+    'اصلاح', 'ریش', 'ناخن', 'آرایش', 'سریع', 'دقیق', 'شلوغ', 'دیر', 'انتظار', 'راضی',
+    'پیشنهاد', 'میکنم', 'فضای', 'دلنشین', 'پرسنل', 'مودب', 'گران', 'ارزان', 'کیفیت', 'بالا',
+]
+AREAS = ['ونک', 'تجریش', 'سعادت‌آباد', 'پونک', 'نارمک', 'تهرانپارس', 'جردن', 'یوسف‌آباد', 'شهرک غرب', 'پاسداران']
+QUERIES = ['كوتاهي', 'رنگ مو', 'تجریش', 'حرفه ای', 'قیمت مناسب']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark trigram-indexed salon and review search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salons', type=int, default=2000)
+        parser.add_argument('--managers', type=int, default=50)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                manager = self.seed(options)
+                self.bench(manager, options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        started = clock.perf_counter()
+
+        manager_users = User.objects.bulk_create([
+            User(phone_number=f'0937{i:07d}', username=f'0937{i:07d}', user_type='salon_manager')
+            for i in range(options['managers'])
+        ])
+        managers = SalonManagerProfile.objects.bulk_create([
+            SalonManagerProfile(
+                user=user, salon_name='بنچمارک', salon_address='تهران',
+                salon_gender_type='male', is_approved=True
+            )
+            for user in manager_users
+        ])
+        names = [f'آرایشگاه {rng.choice(WORDS)} {i}' for i in range(options['salons'])]
+        salons = Salon.objects.bulk_create([
+            Salon(
+                manager=managers[i % len(managers)], gender_type='male',
+                name=name, search_name=normalize_persian(name),
+                address=f'تهران، {rng.choice(AREAS)}، پلاک {i}',
+            )
+            for i, name in enumerate(names)
+        ])
+        users = User.objects.bulk_create([
+            User(phone_number=f'0938{i:07d}', username=f'0938{i:07d}', user_type='stylist')
+            for i in range(len(salons))
+        ])
+        stylists = StylistProfile.objects.bulk_create([
+            StylistProfile(user=user, salon=salon, first_name=rng.choice(WORDS), last_name='تست')
+            for user, salon in zip(users, salons)
+        ])
+        services = Service.objects.bulk_create([
+            Service(salon=salon, service_type=rng.choice(['haircut', 'shave', 'beard_trim']), price=100000)
+            for salon in salons
+        ])
+        refresh_salon_search(salon.id for salon in salons)
+
+        customer_user = User.objects.create_user(phone_number='09399998002', password='x', user_type='customer')
+        customer = CustomerProfile.objects.create(
+            user=customer_user, first_name='مشتری', last_name='بنچمارک',
+            gender='male', date_of_birth=date(1995, 1, 1)
+        )
+        first_day = date.today() - timedelta(days=3650)
+        reviews = []
+        for start in range(0, options['reviews'], 5000):
+            count = min(5000, options['reviews'] - start)
+            picks = [rng.randrange(len(stylists)) for _ in range(count)]
+            appointments = Appointment.objects.bulk_create([
+                Appointment(
+                    customer=customer, stylist=stylists[pick], service=services[pick],
+                    appointment_date=first_day + timedelta(days=(start + i) // 30),
+                    appointment_time=time(9 + i % 9, 0), status='completed'
+                )
+                for i, pick in enumerate(picks)
+            ])
+            batch = []
+            for appointment in appointments:
+                text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 25)))
+                batch.append(Review(
+                    customer=customer, stylist=appointment.stylist, appointment=appointment,
+                    text=text, search_text=normalize_persian(text)
+                ))
+            reviews += Review.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE salons_salon')
+            cursor.execute('ANALYZE ratings_review')
+        self.stdout.write(
+            f'seeded {len(salons)} salons and {len(reviews)} reviews in {clock.perf_counter() - started:.1f} s'
+        )
+        return managers[0]
+
+    def bench(self, manager, iterations):
+        for query in QUERIES:
+            terms = search_terms(query)
+            salons = search_salons(Salon.objects.all(), terms).order_by('-search_rank', '-average_rating')[:20]
+            reviews = Review.objects.filter(
+                match_all_terms(terms, 'search_text'), stylist__salon__manager=manager
+            ).annotate(
+                search_rank=rank_terms(terms, [('search_text', 2, 1)])
+            ).order_by('-search_rank', '-created_at')[:20]
+            for label, queryset in (('salons', salons), ('reviews', reviews)):
+                samples = []
+                for _ in range(iterations):
+                    started = clock.perf_counter()
+                    list(queryset.all())
+                    samples.append((clock.perf_counter() - started) * 1000)
+                plan = queryset.explain().splitlines()
+                scan = next((line.strip() for line in plan if 'Scan' in line), plan[0])
+                self.stdout.write(
+                    f'{label:>8} {query!r:<16} median {statistics.median(samples):7.2f} ms  '
+                    f'p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.2f} ms  {scan}'
+                )
@@ -4,16 +4,33 @@ API Views for Salon Management (Manager Dashboard).
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.contrib.auth import get_user_model
-from .models import Salon, Service, WorkingHours
+from .models import Salon, SalonResource, ScheduleException, Service, WorkingHours
 from apps.accounts.models import StylistProfile
+from apps.appointments.scheduling import find_exception_conflicts
+from apps.appointments.serializers import AppointmentSerializer
+from apps.core.deferred import deferred_signals
+from apps.core.utils import invalidate_salon_caches
 from .management_serializers import (
+    SalonCopySerializer,
     SalonManagementSerializer,
+    SalonResourceSerializer,
+    ScheduleExceptionSerializer,
     ServiceSerializer,
+    WeeklyScheduleSerializer,
     WorkingHoursSerializer
 )
+from .importers import (
+    ImportFileError, import_services, import_stylists, load_error_report,
+    read_rows, store_error_report
+)
+from .dashboard import get_manager_dashboard, invalidate_manager_dashboard
+from .schedules import invalidate_once, sync_working_hours
+from .search import refresh_salon_search
 from apps.accounts.permissions import IsSalonManager
 
 User = get_user_model()
@@ -38,7 +55,10 @@ def api_manager_salons(request):
         )
 
     if request.method == 'GET':
-        salons = manager_profile.salons.all()
+        salons = manager_profile.salons.prefetch_related(
+            Prefetch('services', queryset=Service.objects.select_related('stylist').prefetch_related('required_resources')),
+            'working_hours', 'resources', 'stylists'
+        ).order_by('created_at')
         serializer = SalonManagementSerializer(salons, many=True)
         return Response(serializer.data)
 
@@ -52,6 +72,28 @@ def api_manager_salons(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsSalonManager])
+def api_manager_dashboard(request):
+    """
+    Everything the manager dashboard shows, for every owned salon.
+
+    GET /salons/api/manager/dashboard/
+    Per salon: summary, stylists, services, today's opening hours and
+    appointments, pending count and recent ratings. Built with a fixed
+    number of queries and cached briefly (see apps.salons.dashboard).
+    """
+    try:
+        manager_profile = request.user.manager_profile
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    return Response(get_manager_dashboard(manager_profile))
+
+
 @api_view(['GET', 'PATCH', 'DELETE'])
 @permission_classes([IsSalonManager])
 def api_manager_salon_detail(request, salon_id):
@@ -82,8 +124,10 @@ def api_manager_salon_detail(request, salon_id):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        # Delete salon (manager owns it via FK)
-        salon.delete()
+        # Delete salon (manager owns it via FK); the cascade touches
+        # stylists, services, hours, appointments and ratings row by row
+        with deferred_signals():
+            salon.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -205,6 +249,383 @@ def api_manager_stylist_detail(request, stylist_id):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST'])
+@permission_classes([IsSalonManager])
+def api_manager_import(request, salon_id, kind):
+    """
+    Bulk import stylists or services from an uploaded CSV/XLSX file.
+    
+    Valid rows are created and invalid ones are skipped; the response
+    lists them and, when there are any, gives a token for downloading the
+    error report as CSV. ?dry_run=1 only validates. Stylist rows without
+    a password use the "default_password" form field.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        salon = get_object_or_404(Salon, id=salon_id, manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'error': 'فایل ارسال نشده است'}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = request.query_params.get('dry_run') in ('1', 'true')
+
+    try:
+        if kind == 'stylists':
+            result = import_stylists(
+                salon,
+                read_rows(upload, required=('phone_number',)),
+                default_password=request.data.get('default_password', ''),
+                dry_run=dry_run
+            )
+        else:
+            result = import_services(
+                salon,
+                read_rows(upload, required=('service_type', 'price')),
+                dry_run=dry_run
+            )
+    except ImportFileError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    errors = result['errors']
+    return Response({
+        'total': result['total'],
+        'created': result['created'],
+        'dry_run': dry_run,
+        'errors': [{'row': row, 'column': column, 'error': message} for row, column, message in errors],
+        'error_report': store_error_report(manager_profile.id, errors),
+    }, status=status.HTTP_201_CREATED if result['created'] and not dry_run else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsSalonManager])
+def api_manager_import_report(request, token):
+    """
+    Download the row-level error report of an import as CSV.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    report = load_error_report(manager_profile.id, token)
+    if report is None:
+        return Response({'error': 'گزارش یافت نشد یا منقضی شده است'}, status=status.HTTP_404_NOT_FOUND)
+    response = HttpResponse('\ufeff' + report, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="import-errors-{token[:8]}.csv"'
+    return response
+
+
+# ============================================================================
+# RESOURCE MANAGEMENT (chairs, rooms)
+# ============================================================================
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsSalonManager])
+def api_manager_salon_resources(request, salon_id):
+    """
+    List all shared resources of a salon or create a new one.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        salon = get_object_or_404(Salon, id=salon_id, manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        serializer = SalonResourceSerializer(salon.resources.all(), many=True)
+        return Response(serializer.data)
+
+    elif request.method == 'POST':
+        serializer = SalonResourceSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(salon=salon)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsSalonManager])
+def api_manager_resource_detail(request, resource_id):
+    """
+    Get, update, or delete a specific salon resource.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        resource = get_object_or_404(SalonResource, id=resource_id, salon__manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        serializer = SalonResourceSerializer(resource)
+        return Response(serializer.data)
+
+    elif request.method == 'PATCH':
+        serializer = SalonResourceSerializer(resource, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    elif request.method == 'DELETE':
+        resource.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ============================================================================
+# CLOSURES, HOLIDAYS AND TIME OFF
+# ============================================================================
+
+def _exception_response(request, exception, response_status=status.HTTP_200_OK):
+    """Serialize an exception, with its conflicting bookings when ?conflicts=1."""
+    data = ScheduleExceptionSerializer(exception).data
+    if request.query_params.get('conflicts') in ('1', 'true'):
+        data['conflicts'] = AppointmentSerializer(find_exception_conflicts(exception), many=True).data
+    return Response(data, status=response_status)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsSalonManager])
+def api_manager_schedule_exceptions(request, salon_id):
+    """
+    List closures and stylist time off of a salon, or add one.
+    
+    POST ?conflicts=1 also lists the active bookings the new exception
+    overlaps, so the manager can reschedule or cancel them.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        salon = get_object_or_404(Salon, id=salon_id, manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        exceptions = ScheduleException.objects.filter(
+            Q(salon=salon) | Q(stylist__salon=salon)
+        ).select_related('stylist')
+        serializer = ScheduleExceptionSerializer(exceptions, many=True)
+        return Response(serializer.data)
+
+    elif request.method == 'POST':
+        serializer = ScheduleExceptionSerializer(data=request.data, context={'salon': salon})
+        if serializer.is_valid():
+            stylist = serializer.validated_data.get('stylist')
+            exception = serializer.save(salon=None if stylist else salon)
+            return _exception_response(request, exception, status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsSalonManager])
+def api_manager_schedule_exception_detail(request, exception_id):
+    """
+    Get, update, or delete a closure or time off (GET ?conflicts=1 lists affected bookings).
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        exception = get_object_or_404(
+            ScheduleException.objects.select_related('salon', 'stylist__salon'),
+            Q(salon__manager=manager_profile) | Q(stylist__salon__manager=manager_profile),
+            id=exception_id
+        )
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        return _exception_response(request, exception)
+
+    elif request.method == 'PATCH':
+        salon = exception.salon or exception.stylist.salon
+        serializer = ScheduleExceptionSerializer(
+            exception, data=request.data, partial=True, context={'salon': salon}
+        )
+        if serializer.is_valid():
+            if 'stylist' in serializer.validated_data:
+                stylist = serializer.validated_data['stylist']
+                exception = serializer.save(salon=None if stylist else salon)
+            else:
+                exception = serializer.save()
+            return _exception_response(request, exception)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    elif request.method == 'DELETE':
+        exception.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ============================================================================
+# BULK SCHEDULE EDITING AND COPYING
+# ============================================================================
+
+@api_view(['GET', 'PUT'])
+@permission_classes([IsSalonManager])
+def api_manager_weekly_schedule(request, salon_id):
+    """
+    Get or replace a whole weekly schedule in one request.
+    
+    Without a stylist this is the salon-wide schedule; with ?stylist=<id>
+    (GET) or "stylist" in the body (PUT) it is that stylist's own hours.
+    PUT applies only the difference to the stored rows, in one transaction.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        salon = get_object_or_404(Salon, id=salon_id, manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        serializer = WeeklyScheduleSerializer(
+            data={'stylist': request.query_params.get('stylist'), 'hours': []},
+            context={'salon': salon}
+        )
+        serializer.is_valid(raise_exception=True)
+        stylist = serializer.validated_data.get('stylist')
+        hours = stylist.working_hours.all() if stylist else salon.working_hours.all()
+        return Response({
+            'stylist': stylist.id if stylist else None,
+            'hours': WorkingHoursSerializer(hours, many=True).data,
+        })
+
+    elif request.method == 'PUT':
+        serializer = WeeklyScheduleSerializer(data=request.data, context={'salon': salon})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        stylist = serializer.validated_data.get('stylist')
+        plan = [
+            (row['day_of_week'], row['start_time'], row['end_time'], row.get('is_active', True))
+            for row in serializer.validated_data['hours']
+        ]
+        with invalidate_once([salon.id]):
+            with transaction.atomic():
+                if stylist:
+                    changes = sync_working_hours('stylist', {stylist.id: plan})
+                else:
+                    changes = sync_working_hours('salon', {salon.id: plan})
+
+        hours = stylist.working_hours.all() if stylist else salon.working_hours.all()
+        return Response({
+            'stylist': stylist.id if stylist else None,
+            'hours': WorkingHoursSerializer(hours, many=True).data,
+            'changes': changes,
+        })
+
+
+def _copy_services(source, targets):
+    """
+    Copy the salon-wide services of source into each target salon.
+    
+    Services are matched on (service_type, custom_name): matches get the
+    source's price, duration and state, the rest are created. Existing
+    target services are never deleted since bookings refer to them, and
+    types a male salon may not offer are skipped.
+    """
+    female_only = (
+        {code for code, _ in Service.FEMALE_SERVICE_TYPES}
+        - {code for code, _ in Service.MALE_SERVICE_TYPES}
+    )
+    originals = list(source.services.filter(stylist__isnull=True))
+    existing = {
+        (service.salon_id, service.service_type, service.custom_name): service
+        for service in Service.objects.filter(salon__in=targets, stylist__isnull=True)
+    }
+
+    to_create, to_update = [], []
+    skipped = 0
+    for target in targets:
+        for original in originals:
+            if target.gender_type == 'male' and original.service_type in female_only:
+                skipped += 1
+                continue
+            match = existing.get((target.id, original.service_type, original.custom_name))
+            if match is None:
+                to_create.append(Service(
+                    salon=target,
+                    service_type=original.service_type,
+                    custom_name=original.custom_name,
+                    price=original.price,
+                    duration_minutes=original.duration_minutes,
+                    is_active=original.is_active,
+                ))
+            elif (match.price, match.duration_minutes, match.is_active) != (
+                    original.price, original.duration_minutes, original.is_active):
+                match.price = original.price
+                match.duration_minutes = original.duration_minutes
+                match.is_active = original.is_active
+                to_update.append(match)
+
+    if to_create:
+        Service.objects.bulk_create(to_create)
+    if to_update:
+        Service.objects.bulk_update(to_update, ['price', 'duration_minutes', 'is_active'])
+    return {'created': len(to_create), 'updated': len(to_update), 'skipped': skipped}
+
+
+@api_view(['POST'])
+@permission_classes([IsSalonManager])
+def api_manager_copy_salon_setup(request, salon_id):
+    """
+    Copy this salon's weekly hours and service catalog to other salons of the manager.
+    
+    The salon-wide hours of every target are replaced by the source's;
+    services are merged (see _copy_services). Stylist hours and required
+    resources belong to one salon and are not copied.
+    """
+    try:
+        manager_profile = request.user.manager_profile
+        salon = get_object_or_404(Salon, id=salon_id, manager=manager_profile)
+    except AttributeError:
+        return Response(
+            {'error': 'شما مدیر سالن نیستید'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    serializer = SalonCopySerializer(data=request.data, context={'salon': salon})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    targets = serializer.validated_data['target_salons']
+    result = {'target_salons': [target.id for target in targets]}
+    with invalidate_once([target.id for target in targets]):
+        with transaction.atomic():
+            if serializer.validated_data['schedule']:
+                plan = list(salon.working_hours.values_list(
+                    'day_of_week', 'start_time', 'end_time', 'is_active'
+                ))
+                result['schedule'] = sync_working_hours('salon', {target.id: plan for target in targets})
+            if serializer.validated_data['services']:
+                result['services'] = _copy_services(salon, targets)
+                Salon.objects.filter(pk__in=[target.id for target in targets]).bump_version()
+
+    if serializer.validated_data['services']:
+        invalidate_manager_dashboard(manager_profile.id)
+        invalidate_salon_caches(target.id for target in targets)
+        refresh_salon_search(target.id for target in targets)
+    return Response(result)
+
+
 # ============================================================================
 # LEGACY ENDPOINTS (Keep for backward compatibility)
 # ============================================================================
@@ -261,7 +682,7 @@ def api_manager_services(request):
         return Response(serializer.data)
 
     elif request.method == 'POST':
-        serializer = ServiceSerializer(data=request.data)
+        serializer = ServiceSerializer(data=request.data, context={'salon': salon})
         if serializer.is_valid():
             serializer.save(salon=salon)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -2,8 +2,22 @@
 Serializers for Salon Management API endpoints.
 """
 from rest_framework import serializers
-from .models import Salon, Service, WorkingHours
+from .models import Salon, SalonResource, ScheduleException, Service, WorkingHours
+from apps.accounts.models import StylistProfile
 from apps.accounts.serializers import StylistProfileSerializer
+from apps.appointments.models import Appointment
+from apps.appointments.utils import jalali_to_gregorian
+from apps.core.serializers import ImageDerivativesField
+from apps.ratings.models import Rating
+
+
+class SalonResourceSerializer(serializers.ModelSerializer):
+    """Serializer for SalonResource model."""
+    
+    class Meta:
+        model = SalonResource
+        fields = ['id', 'name', 'capacity', 'is_active']
+        read_only_fields = ['id']
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -15,9 +29,17 @@ class ServiceSerializer(serializers.ModelSerializer):
         model = Service
         fields = [
             'id', 'service_type', 'service_type_display', 'custom_name',
-            'price', 'duration_minutes', 'is_active', 'stylist', 'stylist_name'
+            'price', 'duration_minutes', 'is_active', 'stylist', 'stylist_name',
+            'required_resources'
         ]
         read_only_fields = ['id']
+    
+    def validate_required_resources(self, value):
+        """Resources must belong to the service's salon."""
+        salon = self.instance.salon if self.instance else self.context.get('salon')
+        if salon and any(resource.salon_id != salon.id for resource in value):
+            raise serializers.ValidationError("منابع انتخاب شده متعلق به این سالن نیستند")
+        return value
 
 
 class WorkingHoursSerializer(serializers.ModelSerializer):
@@ -33,17 +55,197 @@ class WorkingHoursSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class ScheduleExceptionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for salon closures and stylist time off.
+    
+    Dates are given in Jalali (YYYY/MM/DD). Leave the times empty to
+    block whole days. Without a stylist the whole salon is closed.
+    """
+    stylist_name = serializers.CharField(source='stylist.full_name', read_only=True, allow_null=True)
+    jalali_start_date = serializers.CharField()
+    jalali_end_date = serializers.CharField()
+    is_full_day = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = ScheduleException
+        fields = [
+            'id', 'stylist', 'stylist_name', 'start_date', 'end_date',
+            'jalali_start_date', 'jalali_end_date', 'start_time', 'end_time',
+            'is_full_day', 'reason'
+        ]
+        read_only_fields = ['id', 'start_date', 'end_date']
+    
+    def validate_stylist(self, value):
+        """Stylist must work at the salon."""
+        salon = self.context.get('salon')
+        if value and salon and value.salon_id != salon.id:
+            raise serializers.ValidationError("این آرایشگر در این سالن کار نمی‌کند")
+        return value
+    
+    def validate(self, data):
+        """Convert Jalali dates and check the date and time ranges."""
+        for bound in ('start', 'end'):
+            jalali = data.pop(f'jalali_{bound}_date', None)
+            if jalali is not None:
+                try:
+                    data[f'{bound}_date'] = jalali_to_gregorian(jalali)
+                except Exception:
+                    raise serializers.ValidationError({f'jalali_{bound}_date': "تاریخ نامعتبر است"})
+        
+        def current(field):
+            return data.get(field, getattr(self.instance, field, None))
+        
+        if current('start_date') > current('end_date'):
+            raise serializers.ValidationError("تاریخ شروع باید قبل از تاریخ پایان باشد")
+        
+        start_time, end_time = current('start_time'), current('end_time')
+        if (start_time is None) != (end_time is None):
+            raise serializers.ValidationError("برای تعطیلی ساعتی، هر دو ساعت شروع و پایان لازم است")
+        if start_time is not None and start_time >= end_time:
+            raise serializers.ValidationError("ساعت شروع باید قبل از ساعت پایان باشد")
+        return data
+
+
+class WeeklyScheduleSerializer(serializers.Serializer):
+    """
+    A whole weekly schedule, replacing the current one in one request.
+    
+    Without a stylist the salon-wide hours are replaced; with one, only
+    that stylist's own hours. An empty list clears the schedule.
+    """
+    stylist = serializers.PrimaryKeyRelatedField(
+        queryset=StylistProfile.objects.all(), required=False, allow_null=True
+    )
+    hours = WorkingHoursSerializer(many=True)
+    
+    def validate_stylist(self, value):
+        """Stylist must work at the salon."""
+        salon = self.context.get('salon')
+        if value and salon and value.salon_id != salon.id:
+            raise serializers.ValidationError("این آرایشگر در این سالن کار نمی‌کند")
+        return value
+    
+    def validate_hours(self, value):
+        """Every row needs a positive time range."""
+        for row in value:
+            if row['start_time'] >= row['end_time']:
+                raise serializers.ValidationError("ساعت شروع باید قبل از ساعت پایان باشد")
+        return value
+
+
+class SalonCopySerializer(serializers.Serializer):
+    """Copy a salon's weekly hours and/or service catalog to other salons."""
+    target_salons = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    schedule = serializers.BooleanField(default=True)
+    services = serializers.BooleanField(default=True)
+    
+    def validate_target_salons(self, value):
+        """Targets must be other salons of the same manager."""
+        source = self.context['salon']
+        ids = set(value) - {source.id}
+        targets = list(Salon.objects.filter(id__in=ids, manager_id=source.manager_id))
+        if not ids or len(targets) != len(ids):
+            raise serializers.ValidationError("سالن‌های مقصد باید از سالن‌های خود شما باشند")
+        return targets
+    
+    def validate(self, data):
+        if not data['schedule'] and not data['services']:
+            raise serializers.ValidationError("حداقل یکی از ساعات کاری یا خدمات را انتخاب کنید")
+        return data
+
+
 class SalonManagementSerializer(serializers.ModelSerializer):
     """Serializer for Salon management (editing)."""
     services = ServiceSerializer(many=True, read_only=True)
     working_hours = WorkingHoursSerializer(many=True, read_only=True)
+    resources = SalonResourceSerializer(many=True, read_only=True)
     stylists = StylistProfileSerializer(many=True, read_only=True)
+    photo_sizes = ImageDerivativesField(source='photo_derivatives')
     
     class Meta:
         model = Salon
         fields = [
-            'id', 'name', 'address', 'gender_type', 'photo',
+            'id', 'name', 'address', 'latitude', 'longitude', 'gender_type', 'photo', 'photo_sizes',
             'average_rating', 'total_ratings',
-            'services', 'working_hours', 'stylists'
+            'auto_approve_appointments', 'stylist_assignment_policy',
+            'services', 'working_hours', 'resources', 'stylists'
         ]
         read_only_fields = ['id', 'average_rating', 'total_ratings']
+    
+    def validate(self, data):
+        latitude = data.get('latitude', getattr(self.instance, 'latitude', None))
+        longitude = data.get('longitude', getattr(self.instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError("عرض و طول جغرافیایی باید با هم وارد شوند")
+        return data
+
+
+class DashboardAppointmentSerializer(serializers.ModelSerializer):
+    """Today's appointment line on the manager dashboard."""
+    customer_name = serializers.CharField(source='customer.full_name', read_only=True)
+    stylist_name = serializers.CharField(source='stylist.full_name', read_only=True)
+    service_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Appointment
+        fields = ['id', 'appointment_time', 'status', 'customer_name', 'stylist', 'stylist_name', 'service_name']
+    
+    def get_service_name(self, obj):
+        return obj.service.custom_name or obj.service.get_service_type_display()
+
+
+class DashboardRatingSerializer(serializers.ModelSerializer):
+    """Recent rating on the manager dashboard (anonymous, with the review text if any)."""
+    stylist_name = serializers.CharField(source='stylist.full_name', read_only=True)
+    review = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Rating
+        fields = ['id', 'rating', 'stylist_name', 'review', 'created_at']
+    
+    def get_review(self, obj):
+        review = getattr(obj.appointment, 'review', None)
+        return review.text if review and review.is_approved else None
+
+
+class DashboardStylistSerializer(serializers.ModelSerializer):
+    """Compact stylist entry on the manager dashboard."""
+    full_name = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = StylistProfile
+        fields = ['id', 'first_name', 'last_name', 'full_name', 'is_temporary']
+
+
+class DashboardSalonSerializer(serializers.ModelSerializer):
+    """
+    One salon on the manager dashboard.
+    
+    Expects the queryset built by apps.salons.dashboard (count annotations
+    and prefetches) and today's appointments and recent ratings per salon
+    id in the context.
+    """
+    stylists = DashboardStylistSerializer(many=True, read_only=True)
+    services = ServiceSerializer(many=True, read_only=True)
+    pending_count = serializers.IntegerField(read_only=True)
+    today_count = serializers.IntegerField(read_only=True)
+    today_appointments = serializers.SerializerMethodField()
+    recent_ratings = serializers.SerializerMethodField()
+    photo_sizes = ImageDerivativesField(source='photo_derivatives')
+    
+    class Meta:
+        model = Salon
+        fields = [
+            'id', 'name', 'address', 'latitude', 'longitude', 'gender_type', 'photo', 'photo_sizes',
+            'average_rating', 'total_ratings',
+            'auto_approve_appointments', 'stylist_assignment_policy',
+            'pending_count', 'today_count', 'today_appointments',
+            'recent_ratings', 'stylists', 'services'
+        ]
+    
+    def get_today_appointments(self, obj):
+        return DashboardAppointmentSerializer(self.context['appointments'].get(obj.id, []), many=True).data
+    
+    def get_recent_ratings(self, obj):
+        return DashboardRatingSerializer(self.context['ratings'].get(obj.id, []), many=True).data
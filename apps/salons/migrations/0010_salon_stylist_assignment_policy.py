@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0009_salon_auto_approve_appointments_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='stylist_assignment_policy',
+            field=models.CharField(choices=[('least_booked', 'کمترین نوبت در روز'), ('round_robin', 'نوبتی'), ('highest_rated', 'بیشترین امتیاز')], default='least_booked', help_text='برای نوبت\u200cهایی که مشتری آرایشگر خاصی انتخاب نکرده است', max_length=20, verbose_name='روش انتخاب آرایشگر'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:24
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0010_salon_stylist_assignment_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalonResource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('name', models.CharField(max_length=100, verbose_name='نام')),
+                ('capacity', models.PositiveIntegerField(default=1, help_text='تعداد خدماتی که می\u200cتوانند هم\u200cزمان از این منبع استفاده کنند', validators=[django.core.validators.MinValueValidator(1)], verbose_name='ظرفیت')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resources', to='salons.salon', verbose_name='سالن')),
+            ],
+            options={
+                'verbose_name': 'منبع سالن',
+                'verbose_name_plural': 'منابع سالن',
+                'ordering': ['salon', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='required_resources',
+            field=models.ManyToManyField(blank=True, help_text='هر نوبت این خدمت یک واحد از هر منبع را اشغال می\u200cکند', related_name='services', to='salons.salonresource', verbose_name='منابع مورد نیاز'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+        ('salons', '0011_salon_resources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('start_date', models.DateField(verbose_name='از تاریخ')),
+                ('end_date', models.DateField(verbose_name='تا تاریخ')),
+                ('start_time', models.TimeField(blank=True, null=True, verbose_name='از ساعت')),
+                ('end_time', models.TimeField(blank=True, null=True, verbose_name='تا ساعت')),
+                ('reason', models.CharField(blank=True, max_length=200, verbose_name='علت')),
+                ('salon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='salons.salon', verbose_name='سالن')),
+                ('stylist', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='accounts.stylistprofile', verbose_name='آرایشگر')),
+            ],
+            options={
+                'verbose_name': 'تعطیلی / مرخصی',
+                'verbose_name_plural': 'تعطیلی\u200cها و مرخصی\u200cها',
+                'ordering': ['start_date', 'start_time'],
+                'indexes': [models.Index(fields=['salon', 'start_date', 'end_date'], name='salons_sche_salon_i_6fb6ba_idx'), models.Index(fields=['stylist', 'start_date', 'end_date'], name='salons_sche_stylist_7bb7aa_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('salon__isnull', False), ('stylist__isnull', False), _connector='OR'), name='scheduleexception_has_salon_or_stylist'), models.CheckConstraint(condition=models.Q(('end_date__gte', models.F('start_date'))), name='scheduleexception_valid_date_range')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:50
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from apps.core.search import normalize_persian
+
+
+def build_search_columns(apps, schema_editor):
+    Salon = apps.get_model('salons', 'Salon')
+    Service = apps.get_model('salons', 'Service')
+    StylistProfile = apps.get_model('accounts', 'StylistProfile')
+    labels = dict(Service._meta.get_field('service_type').choices)
+
+    words = {salon.id: [salon.name, salon.address] for salon in Salon.objects.only('name', 'address')}
+    for salon_id, first_name, last_name in StylistProfile.objects.values_list('salon_id', 'first_name', 'last_name'):
+        words[salon_id] += [first_name, last_name]
+    for salon_id, custom_name, service_type in Service.objects.filter(is_active=True).values_list(
+            'salon_id', 'custom_name', 'service_type'):
+        words[salon_id] += [custom_name, labels.get(service_type, '')]
+
+    Salon.objects.bulk_update([
+        Salon(
+            id=salon_id,
+            search_name=normalize_persian(parts[0])[:100],
+            search_document=normalize_persian(' '.join(filter(None, parts))),
+        )
+        for salon_id, parts in words.items()
+    ], ['search_name', 'search_document'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+        ('salons', '0012_schedule_exceptions'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='salon',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='salon',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(build_search_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='salon',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='salon_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_customerprofile_telegram_user_id_and_more'),
+        ('salons', '0013_salon_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)], verbose_name='عرض جغرافیایی'),
+        ),
+        migrations.AddField(
+            model_name='salon',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)], verbose_name='طول جغرافیایی'),
+        ),
+        migrations.AddIndex(
+            model_name='salon',
+            index=models.Index(fields=['latitude', 'longitude'], name='salon_location_idx'),
+        ),
+    ]
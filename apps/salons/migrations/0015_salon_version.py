@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0014_salon_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0015_salon_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='photo_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='نسخه\u200cهای کوچک عکس'),
+        ),
+    ]
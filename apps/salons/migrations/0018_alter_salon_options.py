@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0017_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='salon',
+            options={'verbose_name': 'سالن', 'verbose_name_plural': 'سالن\u200cها'},
+        ),
+    ]
@@ -1,10 +1,13 @@
 """
 Models for Salons, Services, and Working Hours.
 """
+import jdatetime
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
-from apps.core.models import TimeStampedModel
+from apps.core.models import RatingAggregatesModel, TimeStampedModel
+from apps.core.search import normalize_persian
 from apps.accounts.models import SalonManagerProfile
-from django.core.validators import MinValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 
 
 class SalonQuerySet(models.QuerySet):
@@ -20,9 +23,36 @@ class SalonQuerySet(models.QuerySet):
         Male customers see only male salons, female see only female.
         """
         return self.filter(gender_type=gender, manager__is_approved=True)
+    
+    def offering(self, service_type, min_price=None, max_price=None):
+        """
+        Salons with an active service of this type (optionally in a price range).
+        
+        An EXISTS subquery rather than a join, so it composes with the
+        per-salon aggregates the listing views annotate over services.
+        """
+        from .filters import offers_service
+        return self.filter(offers_service(service_type, min_price, max_price))
+    
+    def bump_version(self):
+        """
+        Advance the version stamp of these salons (one UPDATE, no signals).
+        
+        Template fragments of a salon are cached under its version_stamp,
+        so this retires them without touching other salons' fragments.
+        """
+        return self.update(version=models.F('version') + 1)
+    
+    def near(self, latitude, longitude, radius_km):
+        """
+        Salons within radius_km of a point, annotated with distance_km
+        and ordered nearest first (see apps.salons.geo).
+        """
+        from .geo import within_radius
+        return within_radius(self, latitude, longitude, radius_km)
 
 
-class Salon(TimeStampedModel):
+class Salon(RatingAggregatesModel, TimeStampedModel):
     """
     Salon model representing a barbershop or beauty salon.
     
@@ -33,6 +63,12 @@ class Salon(TimeStampedModel):
         ('female', 'زنانه'),  # Female
     ]
     
+    ASSIGNMENT_POLICY_CHOICES = [
+        ('least_booked', 'کمترین نوبت در روز'),  # Least booked that day
+        ('round_robin', 'نوبتی'),  # Round robin
+        ('highest_rated', 'بیشترین امتیاز'),  # Highest rated
+    ]
+    
     manager = models.ForeignKey(
         SalonManagerProfile,
         on_delete=models.CASCADE,
@@ -42,6 +78,8 @@ class Salon(TimeStampedModel):
     
     name = models.CharField(max_length=100, verbose_name="نام سالن")
     photo = models.ImageField(upload_to='salon_photos/', verbose_name="عکس سالن")
+    # Resized copies of photo, filled in by apps.core.tasks.generate_image_derivatives
+    photo_derivatives = models.JSONField(default=dict, blank=True, editable=False, verbose_name="نسخه‌های کوچک عکس")
     address = models.TextField(verbose_name="آدرس")
     
     gender_type = models.CharField(
@@ -51,7 +89,8 @@ class Salon(TimeStampedModel):
         help_text="مردانه فقط برای مردان، زنانه فقط برای زنان"
     )
     
-    # Cached rating fields (updated when ratings change)
+    # Cached rating fields, kept in step with the rating aggregates
+    # (apps.ratings.aggregates); total_ratings equals rating_count
     average_rating = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -66,39 +105,110 @@ class Salon(TimeStampedModel):
         verbose_name="تأیید خودکار نوبت‌ها",
         help_text="در صورت فعال بودن، نوبت‌ها بلافاصله تأیید می‌شوند"
     )
+    stylist_assignment_policy = models.CharField(
+        max_length=20,
+        choices=ASSIGNMENT_POLICY_CHOICES,
+        default='least_booked',
+        verbose_name="روش انتخاب آرایشگر",
+        help_text="برای نوبت‌هایی که مشتری آرایشگر خاصی انتخاب نکرده است"
+    )
+    
+    # Location (WGS84 degrees); salons without one are left out of nearby queries
+    latitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        verbose_name="عرض جغرافیایی"
+    )
+    longitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+        verbose_name="طول جغرافیایی"
+    )
+    
+    # Bumped whenever anything shown on the salon's public pages changes
+    # (see SalonQuerySet.bump_version and the signal handlers)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    
+    # Normalized search columns (see apps.core.search); search_document is
+    # rebuilt by apps.salons.search.refresh_salon_search
+    search_name = models.CharField(max_length=100, blank=True, editable=False)
+    search_document = models.TextField(blank=True, editable=False)
     
     objects = SalonQuerySet.as_manager()
     
     class Meta:
         verbose_name = "سالن"
         verbose_name_plural = "سالن‌ها"
-        ordering = ['-average_rating', '-created_at']
+        # No default ordering: listings order explicitly and the best-rated
+        # sections read the leaderboards (apps.ratings.leaderboards)
         indexes = [
             models.Index(fields=['gender_type', 'average_rating']),
+            models.Index(fields=['latitude', 'longitude'], name='salon_location_idx'),
+            GinIndex(fields=['search_document'], name='salon_search_trgm', opclasses=['gin_trgm_ops']),
         ]
     
     def __str__(self):
         return f"{self.name} ({self.get_gender_type_display()})"
     
+    @property
+    def version_stamp(self):
+        """Cache key part for this salon's page fragments; unique across database resets too."""
+        return f'{self.pk}:{self.version}:{self.created_at.timestamp():.6f}'
+    
+    def save(self, *args, **kwargs):
+        # Keep the normalized name in step with the name
+        self.search_name = normalize_persian(self.name)[:100]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+    
     def update_rating_cache(self):
         """
-        Update cached average rating from stylist ratings.
-        Salon rating = average of all its stylists' ratings.
+        Recompute the rating aggregates of this salon and its stylists
+        from the ratings table (ratings normally update them incrementally).
         """
-        from apps.ratings.models import Rating
-        from django.db.models import Avg, Count
+        from apps.ratings.aggregates import reconcile_rating_aggregates
         
-        # Get all ratings for stylists in this salon
-        stylist_ratings = Rating.objects.filter(
-            stylist__salon=self
-        ).aggregate(
-            avg=Avg('rating'),
-            count=Count('id')
-        )
-        
-        self.average_rating = stylist_ratings['avg'] or 0
-        self.total_ratings = stylist_ratings['count'] or 0
-        self.save(update_fields=['average_rating', 'total_ratings'])
+        reconcile_rating_aggregates(salon_ids=[self.pk])
+        self.refresh_from_db(fields=[
+            'rating_sum', 'rating_count', 'ratings_1', 'ratings_2', 'ratings_3', 'ratings_4', 'ratings_5',
+            'average_rating', 'total_ratings', 'version'
+        ])
+
+
+class SalonResource(TimeStampedModel):
+    """
+    A shared physical resource of a salon (chair, coloring room, ...).
+    
+    Services that require a resource consume one unit of it for their
+    whole duration; at most `capacity` of them may overlap.
+    """
+    salon = models.ForeignKey(
+        Salon,
+        on_delete=models.CASCADE,
+        related_name='resources',
+        verbose_name="سالن"
+    )
+    
+    name = models.CharField(max_length=100, verbose_name="نام")
+    
+    capacity = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        verbose_name="ظرفیت",
+        help_text="تعداد خدماتی که می‌توانند هم‌زمان از این منبع استفاده کنند"
+    )
+    
+    is_active = models.BooleanField(default=True, verbose_name="فعال")
+    
+    class Meta:
+        verbose_name = "منبع سالن"
+        verbose_name_plural = "منابع سالن"
+        ordering = ['salon', 'name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.capacity}) - {self.salon.name}"
 
 
 class Service(TimeStampedModel):
@@ -173,6 +283,14 @@ class Service(TimeStampedModel):
         verbose_name="مدت زمان (دقیقه)"
     )
     
+    required_resources = models.ManyToManyField(
+        SalonResource,
+        blank=True,
+        related_name='services',
+        verbose_name="منابع مورد نیاز",
+        help_text="هر نوبت این خدمت یک واحد از هر منبع را اشغال می‌کند"
+    )
+    
     is_active = models.BooleanField(default=True, verbose_name="فعال")
     
     class Meta:
@@ -270,3 +388,93 @@ class WorkingHours(TimeStampedModel):
         
         if self.start_time >= self.end_time:
             raise ValidationError("ساعت شروع باید قبل از ساعت پایان باشد")
+
+
+class ScheduleException(TimeStampedModel):
+    """
+    Date-ranged closure of a salon or time off of a stylist.
+    
+    Without start/end times the whole day is blocked; otherwise the time
+    range is blocked on every day from start_date to end_date (inclusive).
+    Salon-level exceptions apply to all stylists of the salon.
+    """
+    salon = models.ForeignKey(
+        Salon,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='schedule_exceptions',
+        verbose_name="سالن"
+    )
+    
+    stylist = models.ForeignKey(
+        'accounts.StylistProfile',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='schedule_exceptions',
+        verbose_name="آرایشگر"
+    )
+    
+    start_date = models.DateField(verbose_name="از تاریخ")
+    end_date = models.DateField(verbose_name="تا تاریخ")
+    
+    start_time = models.TimeField(null=True, blank=True, verbose_name="از ساعت")
+    end_time = models.TimeField(null=True, blank=True, verbose_name="تا ساعت")
+    
+    reason = models.CharField(max_length=200, blank=True, verbose_name="علت")
+    
+    class Meta:
+        verbose_name = "تعطیلی / مرخصی"
+        verbose_name_plural = "تعطیلی‌ها و مرخصی‌ها"
+        ordering = ['start_date', 'start_time']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(salon__isnull=False) | models.Q(stylist__isnull=False),
+                name='scheduleexception_has_salon_or_stylist'
+            ),
+            models.CheckConstraint(
+                check=models.Q(end_date__gte=models.F('start_date')),
+                name='scheduleexception_valid_date_range'
+            ),
+        ]
+        # "Is X blocked on date D" is a range scan on one of these
+        indexes = [
+            models.Index(fields=['salon', 'start_date', 'end_date']),
+            models.Index(fields=['stylist', 'start_date', 'end_date']),
+        ]
+    
+    def __str__(self):
+        entity = self.salon.name if self.salon else self.stylist.full_name
+        return f"{entity} - {self.jalali_start_date} تا {self.jalali_end_date}"
+    
+    @property
+    def is_full_day(self):
+        return self.start_time is None
+    
+    @property
+    def jalali_start_date(self):
+        return jdatetime.date.fromgregorian(date=self.start_date).strftime('%Y/%m/%d')
+    
+    @property
+    def jalali_end_date(self):
+        return jdatetime.date.fromgregorian(date=self.end_date).strftime('%Y/%m/%d')
+    
+    def clean(self):
+        """Validate owner, date range and optional time range."""
+        from django.core.exceptions import ValidationError
+        
+        if not self.salon and not self.stylist:
+            raise ValidationError("باید سالن یا آرایشگر انتخاب شود")
+        
+        if self.salon and self.stylist:
+            raise ValidationError("نمی‌توان هم سالن و هم آرایشگر را انتخاب کرد")
+        
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValidationError("تاریخ شروع باید قبل از تاریخ پایان باشد")
+        
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValidationError("برای تعطیلی ساعتی، هر دو ساعت شروع و پایان لازم است")
+        
+        if self.start_time is not None and self.start_time >= self.end_time:
+            raise ValidationError("ساعت شروع باید قبل از ساعت پایان باشد")
@@ -0,0 +1,262 @@
+"""
+Compiled weekly schedules.
+
+All WorkingHours rows of a salon and its stylists are folded into one
+structure per salon:
+
+    {
+        'salon': {day: [(start, end), ...]},
+        'stylists': {stylist_id: {day: [(start, end), ...]}},
+    }
+
+Days are Persian weekdays (0=Saturday) and times are minutes since
+midnight. A day may hold several windows (split shifts; the gaps are
+breaks). On any day where a stylist has rows of their own, those
+replace the salon's rows for that stylist.
+
+The compiled form is cached without expiry and dropped by signals once
+a change to WorkingHours rows commits, so reading a schedule never touches
+the schedule tables. Each process also keeps the schedules it reads in
+a LocalCache (apps.core.local_cache) in front of Redis; invalidation
+drops both. Code that changes rows with QuerySet.update() or
+bulk_create() must call invalidate_salon_schedule() itself, or run
+inside invalidate_once() which does it once for the whole operation.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from apps.core.deferred import deferrable_batch
+from apps.core.local_cache import LocalCache
+
+from .models import WorkingHours
+
+Interval = Tuple[int, int]
+
+SCHEDULE_CACHE_KEY = 'schedule:salon:{salon_id}'
+
+# A compiled schedule is a few KB; these caps keep every salon of a large
+# city in each process without letting a runaway caller grow it unbounded
+_local_schedules = LocalCache('salon_schedules', ttl=600, max_entries=5000, max_bytes=32 * 1024 * 1024)
+
+_state = threading.local()
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def compile_salon_schedules(salon_ids: Iterable[int]) -> Dict[int, dict]:
+    """Build the weekly schedules of several salons and their stylists in one query."""
+    salon_ids = set(salon_ids)
+    rows = WorkingHours.objects.filter(
+        Q(salon_id__in=salon_ids) | Q(stylist__salon_id__in=salon_ids),
+        is_active=True
+    ).order_by().values_list('salon_id', 'stylist__salon_id', 'stylist_id', 'day_of_week', 'start_time', 'end_time')
+
+    salon_days: Dict[int, Dict[int, List[Interval]]] = {salon_id: {} for salon_id in salon_ids}
+    stylist_days: Dict[int, Dict[int, Dict[int, List[Interval]]]] = {salon_id: {} for salon_id in salon_ids}
+    for salon_id, stylist_salon_id, stylist_id, day, start_time, end_time in rows:
+        start = start_time.hour * 60 + start_time.minute
+        end = end_time.hour * 60 + end_time.minute
+        if start >= end:
+            continue
+        if stylist_id is None:
+            days = salon_days[salon_id]
+        else:
+            days = stylist_days[stylist_salon_id].setdefault(stylist_id, {})
+        days.setdefault(day, []).append((start, end))
+
+    return {
+        salon_id: {
+            'salon': {day: _merge(windows) for day, windows in salon_days[salon_id].items()},
+            'stylists': {
+                stylist_id: {day: _merge(windows) for day, windows in days.items()}
+                for stylist_id, days in stylist_days[salon_id].items()
+            },
+        }
+        for salon_id in salon_ids
+    }
+
+
+def compile_salon_schedule(salon_id: int) -> dict:
+    """Build the weekly schedule of a salon and its stylists in one query."""
+    return compile_salon_schedules([salon_id])[salon_id]
+
+
+def _shared_salon_schedule(salon_id: int) -> dict:
+    key = SCHEDULE_CACHE_KEY.format(salon_id=salon_id)
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = compile_salon_schedule(salon_id)
+        cache.set(key, schedule, None)
+    return schedule
+
+
+def _shared_salon_schedules(salon_ids: Iterable[int]) -> Dict[int, dict]:
+    keys = {SCHEDULE_CACHE_KEY.format(salon_id=salon_id): salon_id for salon_id in set(salon_ids)}
+    cached = cache.get_many(list(keys))
+    schedules = {keys[key]: schedule for key, schedule in cached.items()}
+    missing = [salon_id for key, salon_id in keys.items() if key not in cached]
+    if missing:
+        compiled = compile_salon_schedules(missing)
+        cache.set_many({SCHEDULE_CACHE_KEY.format(salon_id=salon_id): schedule
+                        for salon_id, schedule in compiled.items()}, None)
+        schedules.update(compiled)
+    return schedules
+
+
+def get_salon_schedule(salon_id: int) -> dict:
+    """Return the compiled schedule of a salon, compiling it on a cache miss."""
+    return _local_schedules.get(salon_id, lambda: _shared_salon_schedule(salon_id))
+
+
+def get_salon_schedules(salon_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Compiled schedules of several salons: the ones this process does not
+    hold cost one cache round trip, plus one query that compiles all the
+    misses together.
+    """
+    return _local_schedules.get_many(set(salon_ids), _shared_salon_schedules)
+
+
+@deferrable_batch
+def invalidate_salon_schedules(salon_ids: Iterable[int]) -> None:
+    """Drop the cached schedules of several salons in one round trip, in every process."""
+    salon_ids = {salon_id for salon_id in salon_ids if salon_id}
+    if salon_ids:
+        cache.delete_many([SCHEDULE_CACHE_KEY.format(salon_id=salon_id) for salon_id in salon_ids])
+        _local_schedules.invalidate(salon_ids)
+
+
+@deferrable_batch
+def invalidate_salon_schedules_on_commit(salon_ids: Iterable[int]) -> None:
+    """
+    invalidate_salon_schedules once the surrounding transaction has committed.
+
+    Dropping the entries earlier would let a concurrent reader re-cache
+    the old rows, and schedules are cached without expiry.
+    """
+    salon_ids = list(salon_ids)
+    transaction.on_commit(lambda: invalidate_salon_schedules(salon_ids))
+
+
+def invalidate_salon_schedule(salon_id: int) -> None:
+    """Drop the cached schedule of a salon; the next read recompiles it."""
+    invalidate_salon_schedules([salon_id])
+
+
+def stylist_windows(schedule: dict, stylist_id: int, day_of_week: int) -> List[Interval]:
+    """
+    Working windows of a stylist on a weekday.
+
+    The stylist's own windows win for that day; otherwise the salon's.
+    An empty list means the stylist is off.
+    """
+    days = schedule['stylists'].get(stylist_id)
+    if days and day_of_week in days:
+        return days[day_of_week]
+    return schedule['salon'].get(day_of_week, [])
+
+
+def invalidation_suspended() -> bool:
+    """True inside invalidate_once(); signal handlers skip per-row work."""
+    return getattr(_state, 'depth', 0) > 0
+
+
+@contextmanager
+def invalidate_once(salon_ids: Iterable[int]):
+    """
+    Suspend per-row schedule invalidation for a bulk edit.
+
+    The schedules of salon_ids are dropped once, in one round trip, when
+    the block exits. Wrap the transaction in this block (not the other way
+    round) so the drop happens after commit and a concurrent reader cannot
+    re-cache the old rows.
+    """
+    _state.depth = getattr(_state, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
+        salon_ids = set(salon_ids)
+        if salon_ids:
+            cache.delete_many([SCHEDULE_CACHE_KEY.format(salon_id=salon_id) for salon_id in salon_ids])
+            _local_schedules.invalidate(salon_ids)
+
+
+def sync_working_hours(owner_field: str, plans: Dict[int, list]) -> Dict[str, int]:
+    """
+    Make the WorkingHours rows of each owner match its plan.
+
+    owner_field is 'salon' or 'stylist' and plans map an owner id to a
+    list of (day_of_week, start_time, end_time, is_active). Rows that
+    already match are left alone, the rest are reused in place where
+    possible, so the whole change is one fetch plus at most one
+    bulk_create, one bulk_update and one delete. Callers must wrap this
+    in invalidate_once().
+    """
+    existing: Dict[Tuple[int, int], List[WorkingHours]] = {}
+    rows = WorkingHours.objects.filter(**{f'{owner_field}_id__in': list(plans)}).order_by('start_time')
+    for row in rows:
+        existing.setdefault((getattr(row, f'{owner_field}_id'), row.day_of_week), []).append(row)
+
+    wanted: Dict[Tuple[int, int], list] = {}
+    for owner_id, plan in plans.items():
+        for day, start_time, end_time, is_active in plan:
+            wanted.setdefault((owner_id, day), []).append((start_time, end_time, is_active))
+
+    to_create, to_update, to_delete = [], [], []
+    unchanged = 0
+    for key in set(existing) | set(wanted):
+        current = existing.get(key, [])
+        targets = sorted(wanted.get(key, []))
+
+        # Exact matches stay as they are
+        matched = set()
+        leftover = []
+        for row in current:
+            values = (row.start_time, row.end_time, row.is_active)
+            if values in targets and values not in matched:
+                matched.add(values)
+                unchanged += 1
+            else:
+                leftover.append(row)
+        targets = [values for values in targets if values not in matched]
+
+        # Reuse the remaining rows of the day before creating or deleting
+        for row, (start_time, end_time, is_active) in zip(leftover, targets):
+            row.start_time, row.end_time, row.is_active = start_time, end_time, is_active
+            to_update.append(row)
+        to_delete.extend(row.pk for row in leftover[len(targets):])
+        owner_id, day = key
+        to_create.extend(
+            WorkingHours(**{f'{owner_field}_id': owner_id}, day_of_week=day,
+                         start_time=start_time, end_time=end_time, is_active=is_active)
+            for start_time, end_time, is_active in targets[len(leftover):]
+        )
+
+    if to_create:
+        WorkingHours.objects.bulk_create(to_create)
+    if to_update:
+        WorkingHours.objects.bulk_update(to_update, ['start_time', 'end_time', 'is_active'])
+    if to_delete:
+        WorkingHours.objects.filter(pk__in=to_delete).delete()
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(to_delete),
+        'unchanged': unchanged,
+    }
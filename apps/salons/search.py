@@ -0,0 +1,60 @@
+"""
+Salon search documents and queries.
+
+A salon's search_document is the normalized concatenation of its name,
+address, stylist names and active service names, so one trigram-indexed
+column answers "find a salon by name, neighborhood, stylist or service".
+Signals rebuild it when any of those rows change; bulk writers call
+refresh_salon_search() themselves (or write inside deferred_signals()).
+"""
+from typing import Iterable
+
+from apps.accounts.models import StylistProfile
+from apps.core.deferred import deferrable_batch
+from apps.core.search import match_all_terms, normalize_persian, rank_terms
+from .models import Salon, Service
+
+SERVICE_TYPE_LABELS = dict(Service.ALL_SERVICE_TYPES)
+
+# (field, weight when the field starts with the term, weight when it contains it)
+SALON_RANK_FIELDS = [
+    ('search_name', 8, 5),
+    ('search_document', 3, 1),
+]
+
+
+@deferrable_batch
+def refresh_salon_search(salon_ids: Iterable[int]) -> None:
+    """Rebuild search_document for the given salons: three reads and one UPDATE."""
+    salon_ids = set(salon_ids)
+    if not salon_ids:
+        return
+
+    parts = {
+        salon_id: [name, address]
+        for salon_id, name, address in Salon.objects.filter(id__in=salon_ids).values_list('id', 'name', 'address')
+    }
+    for salon_id, first_name, last_name in StylistProfile.objects.filter(
+        salon_id__in=salon_ids
+    ).values_list('salon_id', 'first_name', 'last_name'):
+        if salon_id in parts:
+            parts[salon_id] += [first_name, last_name]
+    for salon_id, custom_name, service_type in Service.objects.filter(
+        salon_id__in=salon_ids, is_active=True
+    ).values_list('salon_id', 'custom_name', 'service_type'):
+        if salon_id in parts:
+            parts[salon_id] += [custom_name, SERVICE_TYPE_LABELS.get(service_type, '')]
+
+    if not parts:
+        return
+    Salon.objects.bulk_update([
+        Salon(id=salon_id, search_document=normalize_persian(' '.join(filter(None, words))))
+        for salon_id, words in parts.items()
+    ], ['search_document'])
+
+
+def search_salons(queryset, terms):
+    """Filter a salon queryset to rows matching every term, annotated with search_rank."""
+    return queryset.filter(match_all_terms(terms, 'search_document')).annotate(
+        search_rank=rank_terms(terms, SALON_RANK_FIELDS)
+    )
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Salon, Service, WorkingHours
+from apps.accounts.models import StylistProfile
 from apps.accounts.serializers import StylistProfileSerializer
+from apps.core.serializers import ImageDerivativesField
 
 class ServiceSerializer(serializers.ModelSerializer):
     """Serializer for Salon Services."""
@@ -15,17 +17,68 @@ class ServiceSerializer(serializers.ModelSerializer):
 
 class SalonSerializer(serializers.ModelSerializer):
     """Serializer for Salon listing and details."""
-    manager_name = serializers.CharField(source='manager.full_name', read_only=True)
+    manager_name = serializers.CharField(source='manager.user.get_full_name', read_only=True)
     services = ServiceSerializer(many=True, read_only=True)
     stylists = StylistProfileSerializer(many=True, read_only=True)
+    photo_sizes = ImageDerivativesField(source='photo_derivatives')
     
     class Meta:
         model = Salon
         fields = [
-            'id', 'name', 'photo', 'address', 'gender_type', 
+            'id', 'name', 'photo', 'photo_sizes', 'address', 'latitude', 'longitude', 'gender_type', 
             'average_rating', 'total_ratings', 'manager_name', 'services', 'stylists'
         ]
 
+class SalonListSerializer(serializers.ModelSerializer):
+    """
+    Compact salon card for listings.
+    
+    Expects the queryset from SalonListAPIView, which annotates
+    min_price and active_service_types in the same query.
+    """
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=0, read_only=True)
+    service_types = serializers.SerializerMethodField()
+    photo_sizes = ImageDerivativesField(source='photo_derivatives')
+    
+    SERVICE_TYPE_LABELS = dict(Service.ALL_SERVICE_TYPES)
+    
+    class Meta:
+        model = Salon
+        fields = [
+            'id', 'name', 'photo', 'photo_sizes', 'address', 'latitude', 'longitude', 'gender_type',
+            'average_rating', 'total_ratings', 'min_price', 'service_types'
+        ]
+    
+    def get_service_types(self, obj):
+        return [
+            {'service_type': code, 'display': self.SERVICE_TYPE_LABELS.get(code, code)}
+            for code in sorted(obj.active_service_types or [])
+        ]
+
+
+class NearbySalonSerializer(SalonListSerializer):
+    """Salon card plus its distance from the requested point (Salon.objects.near)."""
+    distance_km = serializers.SerializerMethodField()
+    
+    class Meta(SalonListSerializer.Meta):
+        fields = SalonListSerializer.Meta.fields + ['distance_km']
+    
+    def get_distance_km(self, obj):
+        return round(obj.distance_km, 2)
+
+
+class TopStylistSerializer(serializers.ModelSerializer):
+    """Leaderboard entry for a stylist, with their salon."""
+    full_name = serializers.ReadOnlyField()
+    salon_name = serializers.CharField(source='salon.name', read_only=True)
+    average_rating = serializers.FloatField(source='rating_average', read_only=True)
+    total_ratings = serializers.IntegerField(source='rating_count', read_only=True)
+    
+    class Meta:
+        model = StylistProfile
+        fields = ['id', 'full_name', 'salon', 'salon_name', 'average_rating', 'total_ratings']
+
+
 class WorkingHoursSerializer(serializers.ModelSerializer):
     """Serializer for Working Hours."""
     day_name = serializers.CharField(source='get_day_of_week_display', read_only=True)
@@ -0,0 +1,133 @@
+"""
+Signal handlers for compiled schedule, salon catalog, search document,
+manager dashboard and public page fragment invalidation.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import SalonManagerProfile, StylistProfile
+from apps.core.deferred import deferrable_batch
+from apps.core.signals import derivatives_ready
+from apps.core.utils import bump_cache_generation
+from .dashboard import invalidate_dashboard_for_salon, invalidate_manager_dashboard
+from .models import Salon, Service, WorkingHours
+from .schedules import invalidate_salon_schedule, invalidate_salon_schedules_on_commit, invalidation_suspended
+from .search import refresh_salon_search
+
+
+@deferrable_batch
+def invalidate_stylist_schedules(stylist_ids):
+    """Drop the schedules of the salons some stylists work at, after commit (one lookup now)."""
+    invalidate_salon_schedules_on_commit(list(
+        StylistProfile.objects.filter(pk__in=set(stylist_ids)).values_list('salon_id', flat=True)
+    ))
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def invalidate_schedule_on_hours_change(sender, instance, **kwargs):
+    """Recompile the owning salon's schedule once a working hours change commits."""
+    if invalidation_suspended():
+        return
+    if instance.salon_id:
+        invalidate_salon_schedules_on_commit([instance.salon_id])
+    elif instance.stylist_id:
+        invalidate_stylist_schedules([instance.stylist_id])
+
+
+@receiver(post_save, sender=StylistProfile)
+def invalidate_schedule_on_stylist_change(sender, instance, **kwargs):
+    """A stylist joining or moving to a salon brings their own hours along (and takes them from the old one)."""
+    invalidate_salon_schedules_on_commit([instance.salon_id, instance._saved_salon_id])
+    instance._saved_salon_id = instance.salon_id
+
+
+@receiver(post_save, sender=Salon)
+def invalidate_schedule_on_salon_created(sender, instance, created, **kwargs):
+    """Never serve a stale entry left behind under a reused salon id."""
+    if created:
+        invalidate_salon_schedule(instance.id)
+
+
+@receiver(post_save, sender=Salon)
+@receiver(post_delete, sender=Salon)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=SalonManagerProfile)
+def invalidate_salon_catalog(sender, **kwargs):
+    """Salon listings show names, ratings, prices and approval; drop all cached pages."""
+    bump_cache_generation('salon_catalog')
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Salon)
+def refresh_search_on_salon_change(sender, instance, update_fields=None, **kwargs):
+    """Name and address are part of the salon's search document."""
+    if _touches(update_fields, {'name', 'address'}):
+        refresh_salon_search([instance.id])
+
+
+@receiver(post_save, sender=StylistProfile)
+@receiver(post_delete, sender=StylistProfile)
+def refresh_search_on_stylist_change(sender, instance, update_fields=None, **kwargs):
+    """Customers can find a salon by the name of one of its stylists."""
+    if _touches(update_fields, {'first_name', 'last_name', 'salon'}):
+        refresh_salon_search([instance.salon_id])
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def refresh_search_on_service_change(sender, instance, **kwargs):
+    """Customers can find a salon by the services it offers."""
+    refresh_salon_search([instance.salon_id])
+
+
+@receiver(post_save, sender=Salon)
+@receiver(post_delete, sender=Salon)
+def invalidate_dashboard_on_salon_change(sender, instance, **kwargs):
+    invalidate_manager_dashboard(instance.manager_id)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_dashboard_on_service_change(sender, instance, **kwargs):
+    invalidate_dashboard_for_salon(instance.salon_id)
+
+
+@receiver(post_save, sender=StylistProfile)
+@receiver(post_delete, sender=StylistProfile)
+def invalidate_dashboard_on_stylist_change(sender, instance, **kwargs):
+    invalidate_dashboard_for_salon(instance.salon_id)
+
+
+@deferrable_batch
+def bump_salon_versions(salon_ids):
+    """One UPDATE for all salons whose pages changed."""
+    Salon.objects.filter(pk__in=[salon_id for salon_id in set(salon_ids) if salon_id]).bump_version()
+
+
+@receiver(post_save, sender=Salon)
+def bump_version_on_salon_change(sender, instance, created, **kwargs):
+    """Name, address, photo and rating (update_rating_cache saves the salon)."""
+    if not created:
+        bump_salon_versions([instance.pk])
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=StylistProfile)
+@receiver(post_delete, sender=StylistProfile)
+def bump_version_on_listing_change(sender, instance, **kwargs):
+    """Services and stylists are sections of the salon's detail page."""
+    bump_salon_versions([instance.salon_id])
+
+
+@receiver(derivatives_ready, sender=Salon)
+def refresh_pages_on_photo_derivatives(sender, pk, **kwargs):
+    """Cards and dashboards switch from the original photo to the resized ones."""
+    bump_salon_versions([pk])
+    bump_cache_generation('salon_catalog')
+    invalidate_dashboard_for_salon(pk)
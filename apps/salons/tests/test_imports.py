@@ -0,0 +1,165 @@
+"""
+Tests for bulk CSV import of stylists and services.
+"""
+import time as clock
+
+from django.contrib.auth import authenticate
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import StylistProfile
+from apps.salons.importers import import_stylists, read_rows
+from apps.salons.models import Service
+from apps.core.tests.factories import FixturesMixin, next_phone
+
+
+def csv_file(text, name='rows.csv'):
+    return SimpleUploadedFile(name, text.encode('utf-8'), content_type='text/csv')
+
+
+class StylistImportTestCase(FixturesMixin, TestCase):
+    """Test importing stylists from CSV."""
+
+    def setUp(self):
+        self.salon = self.make_salon()
+        self.client = APIClient()
+        self.client.force_authenticate(self.salon.manager.user)
+        self.url = reverse('salons:api_manager_import_stylists', args=[self.salon.id])
+
+    def upload(self, text, **params):
+        return self.client.post(self.url, {'file': csv_file(text), **params}, format='multipart')
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        existing = self.make_stylist(self.salon).user.phone_number
+        phone = next_phone()
+        text = (
+            'phone_number,first_name,last_name,gender,password\n'
+            f'{phone},علی,رضایی,male,secret123\n'
+            f'{existing},تکراری,,male,\n'
+            '0912,کوتاه,,male,\n'
+            f'{phone},دوباره,,male,\n'
+        )
+
+        response = self.upload(text, default_password='welcome1')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [4, 5, 3])
+        stylist = StylistProfile.objects.get(user__phone_number=phone)
+        self.assertEqual((stylist.salon, stylist.first_name), (self.salon, 'علی'))
+        self.assertTrue(stylist.is_temporary)
+        self.assertEqual(authenticate(username=phone, password='secret123'), stylist.user)
+
+        report = self.client.get(
+            reverse('salons:api_manager_import_report', args=[response.data['error_report']])
+        )
+        self.assertEqual(report.status_code, 200)
+        self.assertIn('text/csv', report['Content-Type'])
+        self.assertEqual(report.content.decode('utf-8-sig').splitlines()[0], 'row,column,error')
+
+    def test_persian_digits_and_default_password(self):
+        phone = next_phone()
+        persian = phone.translate(str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹'))
+
+        response = self.upload(f'phone_number,first_name\n{persian},سارا\n', default_password='welcome1')
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertIsNone(response.data['error_report'])
+        self.assertIsNotNone(authenticate(username=phone, password='welcome1'))
+
+    def test_default_password_rows_get_distinct_hashes(self):
+        text = 'phone_number\n' + ''.join(f'{next_phone()}\n' for _ in range(3))
+
+        self.upload(text, default_password='welcome1')
+
+        hashes = list(StylistProfile.objects.values_list('user__password', flat=True))
+        self.assertEqual(len(hashes), 3)
+        self.assertEqual(len(set(hashes)), 3)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.client.post(f'{self.url}?dry_run=1', {
+            'file': csv_file(f'phone_number\n{next_phone()}\n'), 'default_password': 'welcome1'
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(StylistProfile.objects.filter(salon=self.salon).exists())
+
+    def test_rejects_missing_columns(self):
+        response = self.upload('first_name\nعلی\n')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_report_is_private_to_the_manager(self):
+        response = self.upload('phone_number\n123\n', default_password='welcome1')
+        other = self.make_salon().manager.user
+        self.client.force_authenticate(other)
+
+        report = self.client.get(
+            reverse('salons:api_manager_import_report', args=[response.data['error_report']])
+        )
+
+        self.assertEqual(report.status_code, 404)
+
+    def test_batch_query_count(self):
+        rows = read_rows(csv_file(
+            'phone_number,password\n' + ''.join(f'{next_phone()},pass{i % 3}\n' for i in range(50))
+        ), required=('phone_number',))
+
+        # Collision check, then users and profiles in one bulk_create each
+        # inside a savepoint, the salon's version stamp, then its search
+        # document (3 reads, 1 write)
+        with self.assertNumQueries(10):
+            result = import_stylists(self.salon, rows)
+        self.assertEqual(result['created'], 50)
+
+    # Every row is hashed with its own salt; measure the import itself,
+    # not PBKDF2's deliberately slow work factor
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_thousand_rows_in_seconds(self):
+        text = 'phone_number,first_name\n' + ''.join(f'{next_phone()},آرایشگر\n' for _ in range(1000))
+
+        started = clock.perf_counter()
+        response = self.upload(text, default_password='welcome1')
+
+        self.assertEqual(response.data['created'], 1000)
+        self.assertLess(clock.perf_counter() - started, 10)
+
+
+class ServiceImportTestCase(FixturesMixin, TestCase):
+    """Test importing services from CSV."""
+
+    def setUp(self):
+        self.salon = self.make_salon(gender='male')
+        self.stylist = self.make_stylist(self.salon)
+        self.client = APIClient()
+        self.client.force_authenticate(self.salon.manager.user)
+        self.url = reverse('salons:api_manager_import_services', args=[self.salon.id])
+
+    def test_imports_services(self):
+        text = (
+            'service_type,custom_name,price,duration_minutes,stylist_phone\n'
+            'haircut,کوتاهی کلاسیک,250000,45,\n'
+            f'beard_trim,,120000,,{self.stylist.user.phone_number}\n'
+            'makeup,,300000,60,\n'
+            'shave,,ارزان,30,\n'
+            'shave,,90000,30,09999999999\n'
+        )
+
+        response = self.client.post(self.url, {'file': csv_file(text)}, format='multipart')
+
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['column'] for error in response.data['errors']],
+                         ['service_type', 'price', 'stylist_phone'])
+        beard = Service.objects.get(salon=self.salon, service_type='beard_trim')
+        self.assertEqual((beard.stylist, beard.duration_minutes), (self.stylist, 30))
+
+    def test_rejects_unknown_format(self):
+        response = self.client.post(self.url, {
+            'file': SimpleUploadedFile('rows.txt', b'service_type,price\n')
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,112 @@
+"""
+Tests for the one-shot manager dashboard endpoint.
+"""
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.ratings.models import Rating, Review
+from apps.salons.dashboard import invalidate_manager_dashboard
+from apps.salons.models import Salon
+from apps.core.tests.factories import FixturesMixin
+
+
+class ManagerDashboardTestCase(FixturesMixin, TestCase):
+    """Test api_manager_dashboard payload, query count and invalidation."""
+
+    def setUp(self):
+        self.salon = self.make_salon(name='شعبه یک')
+        self.manager = self.salon.manager
+        self.stylist = self.make_stylist(self.salon, first_name='علی')
+        self.service = self.make_service(self.salon)
+        self.open_all_week(self.salon, start=time(10, 0), end=time(20, 0))
+        self.customer = self.make_customer()
+        self.today = timezone.localdate()
+        invalidate_manager_dashboard(self.manager.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager.user)
+        self.url = reverse('salons:api_manager_dashboard')
+
+    def add_salon(self):
+        salon = Salon.objects.create(manager=self.manager, name='شعبه', address='تهران', gender_type='male')
+        stylist = self.make_stylist(salon)
+        service = self.make_service(salon)
+        self.make_service(salon, service_type='shave')
+        self.open_all_week(salon)
+        self.book(self.customer, stylist, service, self.today, time(11, 0))
+        self.book(self.customer, stylist, service, self.today + timedelta(days=1), time(11, 0), status='pending')
+        past = self.book(self.customer, stylist, service, self.today - timedelta(days=1), time(11, 0), status='completed')
+        Rating.objects.create(customer=self.customer, stylist=stylist, appointment=past, rating=4)
+        return salon
+
+    def test_payload(self):
+        self.book(self.customer, self.stylist, self.service, self.today, time(12, 0), status='pending')
+        self.book(self.customer, self.stylist, self.service, self.today, time(13, 0), status='cancelled')
+        past = self.book(self.customer, self.stylist, self.service, self.today - timedelta(days=2), time(12, 0),
+                         status='completed')
+        Rating.objects.create(customer=self.customer, stylist=self.stylist, appointment=past, rating=5)
+        Review.objects.create(customer=self.customer, stylist=self.stylist, appointment=past, text='عالی بود')
+
+        salon = self.client.get(self.url).data['salons'][0]
+
+        self.assertEqual(salon['name'], 'شعبه یک')
+        self.assertEqual(salon['pending_count'], 1)
+        self.assertEqual(salon['today_count'], 1)
+        self.assertEqual(salon['today_hours'], [{'start': '10:00', 'end': '20:00'}])
+        self.assertEqual([a['appointment_time'] for a in salon['today_appointments']], ['12:00:00'])
+        self.assertEqual(salon['recent_ratings'][0]['rating'], 5)
+        self.assertEqual(salon['recent_ratings'][0]['review'], 'عالی بود')
+        self.assertEqual([s['first_name'] for s in salon['stylists']], ['علی'])
+        self.assertEqual(len(salon['services']), 1)
+
+    def test_query_count_does_not_grow_with_salons(self):
+        self.add_salon()
+        invalidate_manager_dashboard(self.manager.id)
+        # Salons, stylists, services, resources, appointments, ratings
+        # and one compile for the schedule misses
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['salons']), 2)
+
+        for _ in range(3):
+            self.add_salon()
+        invalidate_manager_dashboard(self.manager.id)
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['salons']), 5)
+
+    def test_cached_until_a_relevant_write(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.book(self.customer, self.stylist, self.service, self.today, time(15, 0), status='pending')
+        salon = self.client.get(self.url).data['salons'][0]
+        self.assertEqual(salon['pending_count'], 1)
+
+        self.make_service(self.salon, service_type='shave')
+        salon = self.client.get(self.url).data['salons'][0]
+        self.assertEqual(len(salon['services']), 2)
+
+    def test_weekly_schedule_editor_invalidates(self):
+        self.client.get(self.url)
+
+        self.client.put(
+            reverse('salons:api_manager_weekly_schedule', args=[self.salon.id]),
+            {'hours': [{'day_of_week': day, 'start_time': '08:00', 'end_time': '12:00'} for day in range(7)]},
+            format='json'
+        )
+
+        salon = self.client.get(self.url).data['salons'][0]
+        self.assertEqual(salon['today_hours'], [{'start': '08:00', 'end': '12:00'}])
+
+    def test_only_own_salons(self):
+        self.make_salon(name='رقیب')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([salon['name'] for salon in response.data['salons']], ['شعبه یک'])
@@ -0,0 +1,100 @@
+"""
+Tests for nearby salon queries (bounding box + haversine).
+"""
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.salons.geo import bounding_box, box_filter, nearest
+from apps.salons.models import Salon
+from apps.core.tests.factories import FixturesMixin
+
+VANAK = (35.7575, 51.4100)
+
+
+class GeoHelpersTestCase(TestCase):
+    """Test the bounding box arithmetic."""
+
+    def test_box_contains_circle(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(*VANAK, 10)
+
+        # ~0.09 degrees of latitude per 10 km; longitude degrees are shorter here
+        self.assertAlmostEqual(max_lat - VANAK[0], 0.0899, places=3)
+        self.assertGreater(max_lng - VANAK[1], max_lat - VANAK[0])
+
+    def test_box_near_pole_spans_all_longitudes(self):
+        _, max_lat, min_lng, max_lng = bounding_box(89.99, 10, 5)
+
+        self.assertEqual((min_lng, max_lng), (-180.0, 180.0))
+        self.assertEqual(max_lat, 90.0)
+
+    def test_box_wraps_antimeridian(self):
+        condition = str(box_filter(0, 179.99, 5))
+
+        self.assertIn('longitude__gte', condition)
+        self.assertIn('longitude__lte', condition)
+        self.assertIn('OR', condition)
+
+
+class NearbySalonsTestCase(FixturesMixin, TestCase):
+    """Test Salon.objects.near, nearest() and the nearby endpoint."""
+
+    def setUp(self):
+        self.vanak = self.make_salon(name='ونک', latitude=35.7580, longitude=51.4110)
+        self.tajrish = self.make_salon(name='تجریش', latitude=35.8040, longitude=51.4330)
+        self.karaj = self.make_salon(name='کرج', latitude=35.8400, longitude=50.9391)
+        self.female = self.make_salon(gender='female', name='زنانه', latitude=35.7590, longitude=51.4120)
+        self.unlocated = self.make_salon(name='بی‌مختصات')
+        for salon in (self.vanak, self.tajrish, self.karaj, self.female, self.unlocated):
+            self.make_service(salon, service_type='haircut')
+        self.make_service(self.tajrish, service_type='shave')
+        self.client = APIClient()
+        self.url = reverse('salons:api_salon_nearby')
+
+    def test_within_radius_is_exact_and_ordered(self):
+        salons = list(Salon.objects.filter(gender_type='male').near(*VANAK, 10))
+
+        self.assertEqual(salons, [self.vanak, self.tajrish])
+        self.assertLess(salons[0].distance_km, 0.2)
+        # Vanak to Tajrish is about 5.5 km
+        self.assertAlmostEqual(salons[1].distance_km, 5.5, delta=0.3)
+
+    def test_box_corner_is_excluded(self):
+        # Tajrish is inside the 7 km box but about 7.7 km away
+        point = (35.7575, 51.3700)
+        self.assertTrue(Salon.objects.filter(box_filter(*point, 7), id=self.tajrish.id).exists())
+        self.assertNotIn(self.tajrish, Salon.objects.near(*point, 7))
+
+    def test_nearest_expands_radius(self):
+        salons = nearest(Salon.objects.filter(gender_type='male'), *VANAK, limit=3)
+
+        self.assertEqual(salons, [self.vanak, self.tajrish, self.karaj])
+
+    def test_nearest_stops_at_max_radius(self):
+        salons = nearest(Salon.objects.all(), *VANAK, limit=10, max_radius_km=10)
+
+        self.assertNotIn(self.karaj, salons)
+        self.assertNotIn(self.unlocated, salons)
+
+    def test_endpoint_applies_gender_and_service(self):
+        customer = self.make_customer(gender='male')
+        self.client.force_authenticate(customer.user)
+
+        response = self.client.get(self.url, {'lat': VANAK[0], 'lng': VANAK[1], 'service_type': 'shave'})
+
+        self.assertEqual([card['name'] for card in response.data], ['تجریش'])
+        self.assertEqual(
+            [entry['service_type'] for entry in response.data[0]['service_types']], ['haircut', 'shave']
+        )
+
+    def test_endpoint_radius_and_limit(self):
+        response = self.client.get(self.url, {'lat': VANAK[0], 'lng': VANAK[1], 'radius_km': 10, 'limit': 2})
+
+        self.assertEqual([card['name'] for card in response.data], ['ونک', 'زنانه'])
+        self.assertIn('distance_km', response.data[0])
+
+    def test_endpoint_rejects_bad_params(self):
+        for params in ({}, {'lat': 'x', 'lng': 1}, {'lat': 95, 'lng': 1},
+                       {'lat': 35, 'lng': 51, 'radius_km': 500}, {'lat': 35, 'lng': 51, 'service_type': 'nope'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
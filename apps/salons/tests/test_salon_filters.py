@@ -0,0 +1,100 @@
+"""
+Tests for salon listing filters and facet counts.
+"""
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.utils import bump_cache_generation
+from apps.salons.models import Salon, ScheduleException
+from apps.core.tests.factories import FixturesMixin
+
+# A Saturday (Persian weekday 0)
+DAY = date(2026, 10, 17)
+
+
+class SalonFiltersTestCase(FixturesMixin, TestCase):
+    """Test the service, price, rating and opening-time filters and the facets."""
+
+    def setUp(self):
+        bump_cache_generation('salon_catalog')
+        self.cheap = self.make_salon(name='ارزان')
+        self.make_service(self.cheap, service_type='haircut', price=100000)
+        self.fancy = self.make_salon(name='لوکس')
+        self.make_service(self.fancy, service_type='haircut', price=400000)
+        self.make_service(self.fancy, service_type='shave', price=150000)
+        self.shaver = self.make_salon(name='اصلاح')
+        self.make_service(self.shaver, service_type='shave', price=50000)
+        self.make_service(self.shaver, service_type='facial', price=90000, is_active=False)
+        Salon.objects.filter(id=self.cheap.id).update(average_rating=3.2)
+        Salon.objects.filter(id=self.fancy.id).update(average_rating=4.6)
+        Salon.objects.filter(id=self.shaver.id).update(average_rating=2.1)
+        self.client = APIClient()
+        self.url = reverse('salons:api_salon_list')
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return {card['name'] for card in response.data['results']}
+
+    def test_service_type_and_price_apply_to_the_same_service(self):
+        self.assertEqual(self.names(service_type='haircut'), {'ارزان', 'لوکس'})
+        self.assertEqual(self.names(service_type='haircut', max_price=200000), {'ارزان'})
+        # لوکس has a shave at 150000 but no haircut in range
+        self.assertEqual(self.names(min_price=120000, max_price=200000), {'لوکس'})
+        self.assertEqual(self.names(service_type='facial'), set())
+
+    def test_min_rating(self):
+        self.assertEqual(self.names(min_rating=3), {'ارزان', 'لوکس'})
+
+    def test_open_at(self):
+        self.open_all_week(self.cheap)
+        self.open_all_week(self.fancy, start=time(14, 0), end=time(22, 0))
+
+        self.assertEqual(self.names(open_at=f'{DAY}T10:00'), {'ارزان'})
+        self.assertEqual(self.names(open_at=f'{DAY}T20:00'), {'لوکس'})
+
+        ScheduleException.objects.create(salon=self.cheap, start_date=DAY, end_date=DAY)
+        bump_cache_generation('salon_catalog')
+        self.assertEqual(self.names(open_at=f'{DAY}T10:00'), set())
+
+    def test_facets_ignore_their_own_filter(self):
+        response = self.client.get(self.url, {'service_type': 'shave', 'min_rating': 3})
+        facets = response.data['facets']
+
+        self.assertEqual([card['name'] for card in response.data['results']], ['لوکس'])
+        # Service counts keep the rating filter but not the service filter
+        self.assertEqual(
+            {facet['service_type']: facet['count'] for facet in facets['service_types']},
+            {'haircut': 2, 'shave': 1}
+        )
+        # Rating counts keep the service filter but not the rating filter
+        self.assertEqual(
+            {facet['min_rating']: facet['count'] for facet in facets['ratings']},
+            {4: 1, 3: 1, 2: 2, 1: 2}
+        )
+
+    def test_facets_are_one_query(self):
+        self.client.get(self.url)
+        bump_cache_generation('salon_catalog')
+
+        # Count, page and facets
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'service_type': 'haircut', 'min_rating': 1, 'max_price': 500000})
+
+    def test_filters_are_cached_separately(self):
+        self.assertEqual(self.names(service_type='shave'), {'لوکس', 'اصلاح'})
+        self.assertEqual(self.names(service_type='haircut'), {'ارزان', 'لوکس'})
+
+    def test_bad_filters_are_rejected(self):
+        for params in ({'service_type': 'nope'}, {'min_price': 'x'}, {'min_price': 5, 'max_price': 1},
+                       {'min_rating': 7}, {'open_at': 'tomorrow'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_search_takes_the_same_filters(self):
+        response = self.client.get(reverse('salons:api_salon_search'), {'q': 'سالن', 'service_type': 'shave'})
+
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,78 @@
+"""
+Tests for the compact, cached salon listing.
+"""
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.utils import bump_cache_generation
+from apps.core.tests.factories import FixturesMixin
+
+
+class SalonListingTestCase(FixturesMixin, TestCase):
+    """Test SalonListAPIView payload, query count and caching."""
+
+    def setUp(self):
+        bump_cache_generation('salon_catalog')
+        self.salon = self.make_salon()
+        self.make_stylist(self.salon)
+        self.make_service(self.salon, service_type='haircut', price=150000)
+        self.make_service(self.salon, service_type='shave', price=80000)
+        self.make_service(self.salon, service_type='haircut', price=250000)
+        self.make_service(self.salon, service_type='facial', price=10000, is_active=False)
+        self.client = APIClient()
+        self.url = reverse('salons:api_salon_list')
+
+    def test_compact_card(self):
+        card = self.client.get(self.url).data['results'][0]
+
+        self.assertEqual(card['min_price'], '80000')
+        self.assertEqual([entry['service_type'] for entry in card['service_types']], ['haircut', 'shave'])
+        self.assertNotIn('stylists', card)
+        self.assertNotIn('services', card)
+
+    def test_query_count_does_not_grow_with_salons(self):
+        for _ in range(15):
+            salon = self.make_salon()
+            self.make_stylist(salon)
+            self.make_service(salon)
+        bump_cache_generation('salon_catalog')
+
+        # Count, page and facets
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 16)
+
+    def test_second_request_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_service_change_invalidates_cached_pages(self):
+        self.client.get(self.url)
+
+        self.make_service(self.salon, service_type='beard_trim', price=50000)
+
+        card = self.client.get(self.url).data['results'][0]
+        self.assertEqual(card['min_price'], '50000')
+
+    def test_genders_are_cached_separately(self):
+        self.make_salon(gender='female')
+        self.client.get(self.url)
+        customer = self.make_customer(gender='female')
+        self.client.force_authenticate(customer.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual([card['gender_type'] for card in response.data['results']], ['female'])
+
+    def test_detail_shows_manager_name(self):
+        user = self.salon.manager.user
+        user.first_name, user.last_name = 'رضا', 'احمدی'
+        user.save()
+
+        response = self.client.get(reverse('salons:api_salon_detail', args=[self.salon.id]))
+
+        self.assertEqual(response.data['manager_name'], 'رضا احمدی')
+        self.assertEqual(len(response.data['services']), 4)
@@ -0,0 +1,92 @@
+"""
+Tests for the paginated, fragment-cached salon template pages.
+"""
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.utils import bump_cache_generation
+from apps.salons.models import Salon
+from apps.core.tests.factories import FixturesMixin
+
+
+class SalonPagesTestCase(FixturesMixin, TestCase):
+    """Test salon_list / salon_detail pagination and fragment caching."""
+
+    def setUp(self):
+        bump_cache_generation('salon_catalog')
+        self.salon = self.make_salon(name='سالن اصلی')
+        self.service = self.make_service(self.salon, custom_name='کوتاهی کلاسیک')
+
+    def test_list_is_paginated(self):
+        for i in range(14):
+            self.make_salon(name=f'سالن {i}')
+
+        first = self.client.get(reverse('salons:salon_list'))
+        second = self.client.get(reverse('salons:salon_list'), {'page': 2})
+
+        self.assertEqual(len(first.context['salons']), 12)
+        self.assertEqual(len(second.context['salons']), 3)
+        self.assertContains(first, 'rel="next"')
+
+    def test_cached_list_page_only_counts(self):
+        self.client.get(reverse('salons:salon_list'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('salons:salon_list'))
+        self.assertContains(response, 'سالن اصلی')
+
+    def test_rating_change_refreshes_card(self):
+        self.client.get(reverse('salons:salon_list'))
+
+        self.salon.average_rating = 4.5
+        self.salon.save(update_fields=['average_rating'])
+
+        self.assertContains(self.client.get(reverse('salons:salon_list')), '4.50')
+
+    def test_service_change_bumps_only_its_salon(self):
+        other = self.make_salon()
+        versions = dict(Salon.objects.values_list('id', 'version'))
+
+        self.make_service(self.salon, service_type='shave')
+
+        self.assertEqual(Salon.objects.get(pk=self.salon.pk).version, versions[self.salon.pk] + 1)
+        self.assertEqual(Salon.objects.get(pk=other.pk).version, versions[other.pk])
+
+    def test_cached_detail_loads_only_the_salon(self):
+        url = reverse('salons:salon_detail', args=[self.salon.id])
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, 'کوتاهی کلاسیک')
+
+    def test_service_change_refreshes_detail_sections(self):
+        url = reverse('salons:salon_detail', args=[self.salon.id])
+        self.client.get(url)
+
+        self.service.custom_name = 'کوتاهی مدرن'
+        self.service.save()
+
+        response = self.client.get(url)
+        self.assertContains(response, 'کوتاهی مدرن')
+        self.assertNotContains(response, 'کوتاهی کلاسیک')
+
+    def test_detail_hours_follow_the_schedule(self):
+        url = reverse('salons:salon_detail', args=[self.salon.id])
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.open_all_week(self.salon)
+
+        self.assertContains(self.client.get(url), 'شنبه: 09:00 - 18:00')
+
+    def test_detail_links_stylists_to_booking(self):
+        stylist = self.make_stylist(self.salon, first_name='رضا', last_name='احمدی')
+        url = reverse('salons:salon_detail', args=[self.salon.id])
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f"{reverse('appointments:booking_page')}?stylist_id={stylist.id}")
+        # The cached stylist section still carries the link
+        self.assertContains(self.client.get(url), 'رضا احمدی')
@@ -0,0 +1,48 @@
+"""
+Tests for Persian-aware salon search.
+"""
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.salons.models import Salon
+from apps.core.tests.factories import FixturesMixin
+
+
+class SalonSearchTestCase(FixturesMixin, TestCase):
+    """Test the salon search endpoint."""
+
+    def setUp(self):
+        self.by_name = self.make_salon(name='آرایشگاه کوثر', address='تهران، ونک')
+        self.by_address = self.make_salon(name='سالن نگین', address='تهران، کوثر شمالی')
+        self.by_stylist = self.make_salon(name='سالن آفتاب', address='تجریش')
+        self.make_stylist(self.by_stylist, first_name='علی', last_name='کریمی')
+        self.make_service(self.by_address, service_type='beard_trim', custom_name='اصلاح ویژه داماد')
+        self.client = APIClient()
+        self.url = reverse('salons:api_salon_search')
+
+    def search(self, q):
+        return [card['id'] for card in self.client.get(self.url, {'q': q}).data['results']]
+
+    def test_name_match_ranks_before_address_match(self):
+        # Arabic kaf/yeh in the query still match
+        self.assertEqual(self.search('كوثر'), [self.by_name.id, self.by_address.id])
+
+    def test_finds_salon_by_stylist_and_service(self):
+        self.assertEqual(self.search('کریمي'), [self.by_stylist.id])
+        self.assertEqual(self.search('داماد'), [self.by_address.id])
+        # Service type labels are searchable too
+        self.assertEqual(self.search('اصلاح ریش'), [self.by_address.id])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search('کوثر ونک'), [self.by_name.id])
+
+    def test_document_follows_renames(self):
+        self.by_stylist.name = 'سالن مهتاب'
+        self.by_stylist.save()
+
+        self.assertEqual(self.search('مهتاب'), [self.by_stylist.id])
+        self.assertEqual(Salon.objects.get(id=self.by_stylist.id).search_name, 'سالن مهتاب')
+
+    def test_rejects_short_query(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'a'}).status_code, 400)
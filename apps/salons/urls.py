@@ -4,8 +4,12 @@ from .management_api_views import (
     api_manager_salon, api_manager_services, api_manager_service_detail,
     api_manager_working_hours, api_manager_working_hours_detail,
     # New endpoints
-    api_manager_salons, api_manager_salon_detail,
-    api_manager_salon_stylists, api_manager_stylist_detail
+    api_manager_salons, api_manager_dashboard, api_manager_salon_detail,
+    api_manager_salon_stylists, api_manager_stylist_detail,
+    api_manager_salon_resources, api_manager_resource_detail,
+    api_manager_schedule_exceptions, api_manager_schedule_exception_detail,
+    api_manager_weekly_schedule, api_manager_copy_salon_setup,
+    api_manager_import, api_manager_import_report
 )
 
 app_name = 'salons'
@@ -20,13 +24,26 @@ urlpatterns = [
 
     # API URLs
     path('api/list/', api_views.SalonListAPIView.as_view(), name='api_salon_list'),
+    path('api/search/', api_views.SalonSearchAPIView.as_view(), name='api_salon_search'),
+    path('api/nearby/', api_views.SalonNearbyAPIView.as_view(), name='api_salon_nearby'),
+    path('api/top/', api_views.TopRatedAPIView.as_view(), name='api_salon_top'),
     path('api/<int:pk>/', api_views.SalonDetailAPIView.as_view(), name='api_salon_detail'),
     
     # Manager Dashboard API URLs - Multi-Salon Support
     path('api/manager/salons/', api_manager_salons, name='api_manager_salons'),
+    path('api/manager/dashboard/', api_manager_dashboard, name='api_manager_dashboard'),
     path('api/manager/salons/<int:salon_id>/', api_manager_salon_detail, name='api_manager_salon_detail_new'),
     path('api/manager/salons/<int:salon_id>/stylists/', api_manager_salon_stylists, name='api_manager_salon_stylists'),
     path('api/manager/stylists/<int:stylist_id>/', api_manager_stylist_detail, name='api_manager_stylist_detail'),
+    path('api/manager/salons/<int:salon_id>/import/stylists/', api_manager_import, {'kind': 'stylists'}, name='api_manager_import_stylists'),
+    path('api/manager/salons/<int:salon_id>/import/services/', api_manager_import, {'kind': 'services'}, name='api_manager_import_services'),
+    path('api/manager/imports/<str:token>/errors/', api_manager_import_report, name='api_manager_import_report'),
+    path('api/manager/salons/<int:salon_id>/resources/', api_manager_salon_resources, name='api_manager_salon_resources'),
+    path('api/manager/resources/<int:resource_id>/', api_manager_resource_detail, name='api_manager_resource_detail'),
+    path('api/manager/salons/<int:salon_id>/exceptions/', api_manager_schedule_exceptions, name='api_manager_schedule_exceptions'),
+    path('api/manager/exceptions/<int:exception_id>/', api_manager_schedule_exception_detail, name='api_manager_schedule_exception_detail'),
+    path('api/manager/salons/<int:salon_id>/weekly-schedule/', api_manager_weekly_schedule, name='api_manager_weekly_schedule'),
+    path('api/manager/salons/<int:salon_id>/copy/', api_manager_copy_salon_setup, name='api_manager_copy_salon_setup'),
     
     # Legacy Manager Dashboard API URLs (for backward compatibility)
     path('api/manager/salon/', api_manager_salon, name='api_manager_salon'),
@@ -1,12 +1,29 @@
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404
-from .models import Salon
+from apps.appointments.scheduling import minutes_to_time
+from apps.core.utils import SALON_CATALOG, get_cache_generation
+from .models import Salon, WorkingHours
+from .schedules import get_salon_schedule
+
+SALONS_PER_PAGE = 12
+
+# Fragments are keyed by salon version stamps or the catalog generation,
+# so they never go stale; the timeout only bounds memory
+SALON_FRAGMENT_TIMEOUT = 60 * 60 * 24
+
 
 def salon_list(request):
     """
-    List of all approved salons.
+    List of all approved salons, paginated.
     Enforces gender-based visibility for customers.
+    
+    The card grid of a page is cached per gender under the 'salon_catalog'
+    generation, and each card under its salon's version stamp, so a
+    rebuilt grid re-renders only the salons that changed. The page's
+    salons are only fetched when the grid is rebuilt.
     """
     salons = Salon.objects.approved()
+    gender = None
     
     if request.user.is_authenticated and request.user.user_type == 'customer':
         try:
@@ -15,15 +32,41 @@ def salon_list(request):
         except AttributeError:
             # Fallback if profile issue, though shouldn't happen for valid customers
             pass
-            
-    return render(request, 'salons/salon_list.html', {'salons': salons})
+    
+    paginator = Paginator(salons.order_by('-average_rating', '-created_at', 'id'), SALONS_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'salons/salon_list.html', {
+        'salons': page,
+        'page_obj': page,
+        'gender': gender or 'all',
+        'catalog_generation': get_cache_generation(SALON_CATALOG),
+        'fragment_timeout': SALON_FRAGMENT_TIMEOUT,
+    })
 
 def salon_detail(request, pk):
-    """Detail view for a salon."""
+    """
+    Detail view for a salon.
+    
+    The info, stylists and services sections are cached under the salon's
+    version stamp; their querysets are lazy, so a cached page costs the
+    one query that loads the salon. Working hours come from the compiled
+    schedule, which is cached and invalidated on its own.
+    """
     salon = get_object_or_404(Salon, pk=pk)
     # Filter out temporary (incomplete profile) stylists
     stylists = salon.stylists.filter(is_temporary=False)
-    return render(request, 'salons/salon_detail.html', {'salon': salon, 'stylists': stylists})
+    days = get_salon_schedule(salon.id)['salon']
+    hours = [
+        (label, [(minutes_to_time(start), minutes_to_time(end)) for start, end in days[day]])
+        for day, label in WorkingHours.WEEKDAY_CHOICES
+        if day in days
+    ]
+    return render(request, 'salons/salon_detail.html', {
+        'salon': salon,
+        'stylists': stylists,
+        'hours': hours,
+        'fragment_timeout': SALON_FRAGMENT_TIMEOUT,
+    })
 
 # ============================================================================
 # Management Views
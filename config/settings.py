@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -199,6 +200,13 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Booking
+# What to do when a customer books over one of their own appointments
+# (at any salon): 'block' rejects the booking, 'warn' accepts it with a warning
+BOOKING_CUSTOMER_OVERLAP = config('BOOKING_CUSTOMER_OVERLAP', default='block')
+# Minimum notice (minutes) between booking and appointment start
+BOOKING_MIN_LEAD_MINUTES = config('BOOKING_MIN_LEAD_MINUTES', default=30, cast=int)
+
 # SMS Configuration (stub for future integration)
 SMS_API_KEY = config('SMS_API_KEY', default='')
 SMS_PROVIDER = 'stub'  # Change to 'kavenegar', 'ghasedak', etc.
@@ -13,6 +13,13 @@ export interface AdminStats {
     today_appointments: number;
 }
 
+export type CacheEvent =
+    | 'hit' | 'stale' | 'miss' | 'early' | 'recompute' | 'wait' | 'timeout'
+    | 'evict' | 'invalidate';
+
+// Counters per cache name, summed over all server processes
+export type CacheStats = Record<string, Partial<Record<CacheEvent, number>>>;
+
 export interface PaginatedUsers {
     count: number;
     next: string | null;
@@ -20,12 +27,47 @@ export interface PaginatedUsers {
     results: User[];
 }
 
+/** Rows of a bulk operation: explicit ids or a filter (never both). */
+export type BulkSelection<F> = { ids: number[] } | { filter: F };
+
+export interface BulkResult {
+    message: string;
+    updated: number;
+}
+
+export interface UserBulkFilter {
+    user_type?: string;
+    is_active?: boolean;
+    joined_after?: string;
+    joined_before?: string;
+}
+
+export interface ReviewBulkFilter {
+    stylist_id?: number;
+    salon_id?: number;
+    customer_id?: number;
+    is_approved?: boolean;
+    created_after?: string;
+    created_before?: string;
+}
+
+export interface ManagerBulkFilter {
+    salon_gender_type?: 'male' | 'female';
+    created_after?: string;
+    created_before?: string;
+}
+
 export const adminApi = {
     getStats: async () => {
         const response = await client.get<AdminStats>('/accounts/api/admin/stats/');
         return response.data;
     },
 
+    getCacheStats: async () => {
+        const response = await client.get<CacheStats>('/accounts/api/admin/cache-stats/');
+        return response.data;
+    },
+
     getUsers: async (page = 1, userType = '') => {
         const response = await client.get<PaginatedUsers>('/accounts/api/admin/users/', {
             params: { page, user_type: userType },
@@ -41,4 +83,19 @@ export const adminApi = {
     deleteUser: async (userId: number) => {
         await client.delete(`/accounts/api/admin/users/${userId}/`);
     },
+
+    bulkUsers: async (action: 'activate' | 'deactivate', selection: BulkSelection<UserBulkFilter>) => {
+        const response = await client.post<BulkResult>('/accounts/api/admin/users/bulk/', { action, ...selection });
+        return response.data;
+    },
+
+    approveManagers: async (selection: BulkSelection<ManagerBulkFilter>) => {
+        const response = await client.post<BulkResult>('/accounts/api/admin/managers/approve/', selection);
+        return response.data;
+    },
+
+    bulkReviews: async (action: 'approve' | 'reject', selection: BulkSelection<ReviewBulkFilter>) => {
+        const response = await client.post<BulkResult>('/ratings/api/admin/reviews/bulk/', { action, ...selection });
+        return response.data;
+    },
 };
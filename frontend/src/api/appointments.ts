@@ -1,14 +1,27 @@
 import client from './client';
 
+export type SlotBadge = 'exact_fit' | 'adjacent' | 'leaves_gap';
+
+export interface RankedSlot {
+    time: string;
+    score: number;
+    badge: SlotBadge | null;
+}
+
 export interface TimeSlotResponse {
     stylist_id: string;
     stylist_name: string;
     jalali_date: string;
     available_slots: string[];
+    ranked_slots?: RankedSlot[];
     working_hours: {
         start: string;
         end: string;
     };
+    windows?: {
+        start: string;
+        end: string;
+    }[];
 }
 
 export interface BookingRequest {
@@ -19,6 +32,25 @@ export interface BookingRequest {
     customer_notes?: string;
 }
 
+export type StylistAssignmentPolicy = 'least_booked' | 'round_robin' | 'highest_rated';
+
+export interface AnyStylistBookingRequest {
+    salon_id: number;
+    service_id: number;
+    jalali_date: string; // YYYY/MM/DD
+    time_slot: string;   // HH:MM
+    policy?: StylistAssignmentPolicy;
+    customer_notes?: string;
+}
+
+export interface VisitBookingRequest {
+    salon_id: number;
+    service_ids: number[]; // In the order they should be performed
+    jalali_date: string;   // YYYY/MM/DD
+    not_before?: string;   // HH:MM
+    customer_notes?: string;
+}
+
 export interface Appointment {
     id: number;
     customer_name?: string; // Present for stylists
@@ -51,6 +83,16 @@ export const appointmentApi = {
         return response.data;
     },
 
+    bookAnyStylist: async (data: AnyStylistBookingRequest) => {
+        const response = await client.post('/appointments/api/book/any/', data);
+        return response.data;
+    },
+
+    bookVisit: async (data: VisitBookingRequest) => {
+        const response = await client.post('/appointments/api/book/visit/', data);
+        return response.data;
+    },
+
     myAppointments: async () => {
         const response = await client.get<MyAppointmentsResponse>('/appointments/api/my-appointments/');
         return response.data;
@@ -2,6 +2,7 @@
  * API endpoints for Salon Manager Dashboard
  */
 import client from './client';
+import type { PhotoSizes } from '../types/salon';
 
 export interface Service {
     id: number;
@@ -24,6 +25,27 @@ export interface WorkingHours {
     is_active: boolean;
 }
 
+export interface WeeklySchedule {
+    stylist: number | null;
+    hours: Pick<WorkingHours, 'day_of_week' | 'start_time' | 'end_time' | 'is_active'>[];
+    changes?: { created: number; updated: number; deleted: number; unchanged: number };
+}
+
+export interface ScheduleException {
+    id: number;
+    stylist: number | null;
+    stylist_name?: string | null;
+    start_date: string;
+    end_date: string;
+    jalali_start_date: string; // YYYY/MM/DD
+    jalali_end_date: string;
+    start_time: string | null;
+    end_time: string | null;
+    is_full_day: boolean;
+    reason: string;
+    conflicts?: any[];
+}
+
 export interface Stylist {
     id: number;
     full_name: string;
@@ -35,17 +57,58 @@ export interface SalonDetails {
     id: number;
     name: string;
     address: string;
+    latitude: number | null;
+    longitude: number | null;
     gender_type: 'male' | 'female';
     photo: string;
+    photo_sizes: PhotoSizes;
     average_rating: number;
     total_ratings: number;
     services: Service[];
     working_hours: WorkingHours[];
     stylists: Stylist[];
     auto_approve_appointments: boolean;
+    stylist_assignment_policy: 'least_booked' | 'round_robin' | 'highest_rated';
+}
+
+// One salon on the manager dashboard (GET /salons/api/manager/dashboard/)
+export interface DashboardSalon {
+    id: number;
+    name: string;
+    address: string;
+    latitude: number | null;
+    longitude: number | null;
+    gender_type: 'male' | 'female';
+    photo: string;
+    photo_sizes: PhotoSizes;
+    average_rating: number;
+    total_ratings: number;
+    auto_approve_appointments: boolean;
+    stylist_assignment_policy: 'least_booked' | 'round_robin' | 'highest_rated';
+    pending_count: number;
+    today_count: number;
+    today_hours: { start: string; end: string }[];
+    today_appointments: {
+        id: number;
+        appointment_time: string;
+        status: string;
+        customer_name: string;
+        stylist: number;
+        stylist_name: string;
+        service_name: string;
+    }[];
+    recent_ratings: { id: number; rating: number; stylist_name: string; review: string | null; created_at: string }[];
+    stylists: { id: number; first_name: string; last_name: string; full_name: string; is_temporary: boolean }[];
+    services: Service[];
 }
 
 export const managerApi = {
+    // Everything the dashboard shows, in one request
+    getDashboard: async () => {
+        const response = await client.get<{ date: string; salons: DashboardSalon[] }>('/salons/api/manager/dashboard/');
+        return response.data;
+    },
+
     // Multi-Salon Management
     getSalons: async () => {
         const response = await client.get<SalonDetails[]>('/salons/api/manager/salons/');
@@ -144,6 +207,62 @@ export const managerApi = {
         await client.delete(`/salons/api/manager/working-hours/${id}/`);
     },
 
+    // Whole-week schedule editing (salon-wide, or one stylist's own hours)
+    getWeeklySchedule: async (salonId: number, stylistId?: number) => {
+        const response = await client.get<WeeklySchedule>(
+            `/salons/api/manager/salons/${salonId}/weekly-schedule/`,
+            { params: stylistId ? { stylist: stylistId } : {} }
+        );
+        return response.data;
+    },
+
+    replaceWeeklySchedule: async (salonId: number, data: WeeklySchedule) => {
+        const response = await client.put<WeeklySchedule>(`/salons/api/manager/salons/${salonId}/weekly-schedule/`, data);
+        return response.data;
+    },
+
+    importFile: async (salonId: number, kind: 'stylists' | 'services', file: File, options: { defaultPassword?: string; dryRun?: boolean } = {}) => {
+        const form = new FormData();
+        form.append('file', file);
+        if (options.defaultPassword) form.append('default_password', options.defaultPassword);
+        const response = await client.post(`/salons/api/manager/salons/${salonId}/import/${kind}/`, form, {
+            params: options.dryRun ? { dry_run: 1 } : {},
+            headers: { 'Content-Type': 'multipart/form-data' },
+        });
+        return response.data;
+    },
+
+    downloadImportReport: async (token: string) => {
+        const response = await client.get(`/salons/api/manager/imports/${token}/errors/`, { responseType: 'blob' });
+        return response.data as Blob;
+    },
+
+    copySalonSetup: async (salonId: number, targetSalons: number[], options = { schedule: true, services: true }) => {
+        const response = await client.post(`/salons/api/manager/salons/${salonId}/copy/`, {
+            target_salons: targetSalons,
+            ...options,
+        });
+        return response.data;
+    },
+
+    // Closures, holidays and stylist time off
+    getScheduleExceptions: async (salonId: number) => {
+        const response = await client.get<ScheduleException[]>(`/salons/api/manager/salons/${salonId}/exceptions/`);
+        return response.data;
+    },
+
+    createScheduleException: async (salonId: number, data: Partial<ScheduleException>, listConflicts = false) => {
+        const response = await client.post<ScheduleException>(
+            `/salons/api/manager/salons/${salonId}/exceptions/`, data,
+            { params: listConflicts ? { conflicts: 1 } : {} }
+        );
+        return response.data;
+    },
+
+    deleteScheduleException: async (id: number) => {
+        await client.delete(`/salons/api/manager/exceptions/${id}/`);
+    },
+
     // Appointment Management
     getSalonAppointments: async (salonId: number) => {
         const response = await client.get<{ count: number; appointments: any[] }>(`/appointments/api/manage/list/${salonId}/`);
@@ -1,18 +1,56 @@
 import client from './client';
-import type { Salon } from '../types/salon';
+import type { NearbySalon, Salon, SalonFacets, SalonFilters, SalonSummary, TopStylist } from '../types/salon';
 
 export const salonApi = {
     getAll: async () => {
-        const response = await client.get<Salon[]>('/salons/api/list/');
+        const response = await client.get<SalonSummary[]>('/salons/api/list/');
         // If backend returns pagination { results: [] }, handle it. 
         // DRF generic ListAPIView handles pagination automatically if set in settings.
         // Based on curl output: {"count":2, "results":[...]}
         // So we need to return .results if paginated, or .data if not.
         // Let's assume pagination is enabled as seen in curl output.
         if ('results' in response.data && Array.isArray((response.data as any).results)) {
-            return (response.data as any).results as Salon[];
+            return (response.data as any).results as SalonSummary[];
         }
-        return response.data as unknown as Salon[];
+        return response.data as unknown as SalonSummary[];
+    },
+
+    // Filtered page with facet counts for the filter panel
+    list: async (filters: SalonFilters = {}, page = 1) => {
+        const response = await client.get<{
+            count: number; next: string | null; results: SalonSummary[]; facets: SalonFacets
+        }>('/salons/api/list/', { params: { ...filters, open_now: filters.open_now ? 1 : undefined, page } });
+        return response.data;
+    },
+
+    search: async (q: string, page = 1, filters: SalonFilters = {}) => {
+        const response = await client.get<{ count: number; next: string | null; results: SalonSummary[] }>(
+            '/salons/api/search/', { params: { ...filters, open_now: filters.open_now ? 1 : undefined, q, page } }
+        );
+        return response.data;
+    },
+
+    // Without radiusKm: the `limit` nearest salons (up to 50 km away)
+    nearby: async (params: { lat: number; lng: number; radiusKm?: number; limit?: number }, filters: SalonFilters = {}) => {
+        const response = await client.get<NearbySalon[]>('/salons/api/nearby/', {
+            params: {
+                ...filters,
+                open_now: filters.open_now ? 1 : undefined,
+                lat: params.lat,
+                lng: params.lng,
+                radius_km: params.radiusKm,
+                limit: params.limit,
+            },
+        });
+        return response.data;
+    },
+
+    // Best-rated salons and stylists for the customer's gender
+    top: async (limit = 10) => {
+        const response = await client.get<{ salons: SalonSummary[]; stylists: TopStylist[] }>(
+            '/salons/api/top/', { params: { limit } }
+        );
+        return response.data;
     },
 
     getById: async (id: number) => {
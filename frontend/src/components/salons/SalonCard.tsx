@@ -1,10 +1,10 @@
-import type { Salon } from '../../types/salon';
+import type { SalonSummary } from '../../types/salon';
 import { GENDER_LABELS } from '../../types/salon';
 import Button from '../ui/Button';
 import { Link } from 'react-router-dom';
 
 interface SalonCardProps {
-    salon: Salon;
+    salon: SalonSummary;
 }
 
 const SalonCard: React.FC<SalonCardProps> = ({ salon }) => {
@@ -40,14 +40,14 @@ const SalonCard: React.FC<SalonCardProps> = ({ salon }) => {
                     </p>
 
                     <div className="mt-3 flex flex-wrap gap-1">
-                        {salon.services.slice(0, 3).map(service => (
-                            <span key={service.id} className="inline-flex items-center px-2 py-0.5 rounded text-xs font-medium bg-blue-100 text-blue-800">
-                                {service.custom_name}
+                        {salon.service_types.slice(0, 3).map(type => (
+                            <span key={type.service_type} className="inline-flex items-center px-2 py-0.5 rounded text-xs font-medium bg-blue-100 text-blue-800">
+                                {type.display}
                             </span>
                         ))}
-                        {salon.services.length > 3 && (
+                        {salon.service_types.length > 3 && (
                             <span className="inline-flex items-center px-2 py-0.5 rounded text-xs font-medium bg-gray-100 text-gray-800">
-                                +{salon.services.length - 3}
+                                +{salon.service_types.length - 3}
                             </span>
                         )}
                     </div>
@@ -5,8 +5,12 @@ import SalonCard from '../components/salons/SalonCard';
 
 const Home: React.FC = () => {
     const { data: salons, isLoading, error } = useQuery({
-        queryKey: ['salons', 'list'],
-        queryFn: salonApi.getAll,
+        queryKey: ['salons', 'top'],
+        // Leaderboard first; the plain list until any salon has ratings
+        queryFn: async () => {
+            const { salons } = await salonApi.top(8);
+            return salons.length > 0 ? salons : salonApi.getAll();
+        },
     });
 
     return (
@@ -1,4 +1,5 @@
 // Types matching Django Serializers
+import type { PhotoSizes } from './salon';
 
 export interface CustomerProfile {
     id: number;
@@ -6,6 +7,7 @@ export interface CustomerProfile {
     last_name: string;
     full_name: string;
     selfie_photo?: string;
+    selfie_photo_sizes?: PhotoSizes;
     gender: 'male' | 'female';
     jalali_date_of_birth?: string;
     telegram_chat_id?: string | null;
@@ -15,6 +17,7 @@ export interface SalonManagerProfile {
     id: number;
     salon_name: string;
     salon_photo?: string;
+    salon_photo_sizes?: PhotoSizes;
     salon_address: string;
     is_approved: boolean;
     telegram_chat_id?: string | null;
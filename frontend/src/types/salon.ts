@@ -8,11 +8,17 @@ export interface Service {
     stylist_name?: string;
 }
 
+// Resized WebP/JPEG copies of an uploaded photo; null until rendered
+export type PhotoSizes = Record<'thumb' | 'card' | 'full', { webp: string; jpeg: string }> | null;
+
 export interface Salon {
     id: number;
     name: string;
     photo: string;
+    photo_sizes: PhotoSizes;
     address: string;
+    latitude: number | null;
+    longitude: number | null;
     gender_type: 'male' | 'female';
     average_rating: string;
     total_ratings: number;
@@ -21,6 +27,53 @@ export interface Salon {
     stylists: Stylist[];
 }
 
+// Compact card returned by the salon list endpoint
+export interface SalonSummary {
+    id: number;
+    name: string;
+    photo: string;
+    photo_sizes: PhotoSizes;
+    address: string;
+    latitude: number | null;
+    longitude: number | null;
+    gender_type: 'male' | 'female';
+    average_rating: string;
+    total_ratings: number;
+    min_price: string | null;
+    service_types: { service_type: string; display: string }[];
+}
+
+// Optional filters accepted by the list, search and nearby endpoints
+export interface SalonFilters {
+    service_type?: string;
+    min_price?: number;
+    max_price?: number;
+    min_rating?: number;
+    open_now?: boolean;
+    open_at?: string; // ISO datetime, local time
+}
+
+// Facet counts returned with each page of the salon list
+export interface SalonFacets {
+    service_types: { service_type: string; display: string; count: number }[];
+    ratings: { min_rating: number; count: number }[];
+}
+
+// Card returned by the nearby endpoint, nearest first
+export interface NearbySalon extends SalonSummary {
+    distance_km: number;
+}
+
+// Leaderboard entry of /salons/api/top/
+export interface TopStylist {
+    id: number;
+    full_name: string;
+    salon: number;
+    salon_name: string;
+    average_rating: number;
+    total_ratings: number;
+}
+
 export interface Stylist {
     id: number;
     first_name: string;